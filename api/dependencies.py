@@ -0,0 +1,28 @@
+"""
+路由共用的依赖
+
+HTTP 与 WebSocket 路由共用同一个对话引擎（同一个数据库执行器、套餐目录、用户资料缓存、
+幂等记录和NLG缓存），重新加载套餐目录等管理操作对所有客户端生效。
+"""
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from config import settings
+from core import TelecomChatbotPolicy
+
+chatbot = TelecomChatbotPolicy()
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    管理接口鉴权：请求头 X-Admin-Token 必须与 settings.ADMIN_TOKEN 一致
+
+    Raises:
+        HTTPException: 未配置 ADMIN_TOKEN（403，管理接口禁用）或令牌不匹配（401）
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="管理接口未启用")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="管理令牌无效")
@@ -3,7 +3,10 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
+from api.dependencies import chatbot
 from api.routers import chat, websocket
+from config import settings
+from database.migrate import migrate
 from utils import logger
 
 # 应用状态管理
@@ -17,6 +20,19 @@ async def lifespan(app: FastAPI):
 
     # 这里可以添加更多启动初始化代码
     # 例如：数据库连接、缓存初始化、模型加载等
+    # 执行未执行的表结构迁移（如版本3的 t_package_changes），失败时需手动运行 python -m database.migrate
+    if settings.DB_AUTO_MIGRATE:
+        try:
+            migrate(chatbot.db_executor.db)
+        except Exception as e:
+            logger.error(f"表结构迁移失败: {e}")
+
+    # 预加载套餐目录，失败时首次查询再加载
+    try:
+        chatbot.reload_catalog()
+    except Exception as e:
+        logger.error(f"套餐目录预加载失败: {e}")
+
     app_state["started"] = True
     app_state["startup_time"] = "你的启动时间"
 
@@ -29,6 +45,9 @@ async def lifespan(app: FastAPI):
 
     # 这里可以添加清理代码
     # 例如：关闭数据库连接、清理资源等
+    adb = chatbot.db_executor.adb
+    if adb is not None:
+        await adb.dispose()
     app_state.clear()
 
     logger.info("✅ FastAPI应用已关闭")
@@ -1,14 +1,19 @@
 """
 聊天API路由
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from core import TelecomChatbotPolicy
+from api.dependencies import chatbot, require_admin_token
+from models import json_default, to_plain
 from utils.logger import logger
+from utils.metrics import metrics
 
 router = APIRouter()
-chatbot = TelecomChatbotPolicy()
 
 
 # 请求模型
@@ -36,32 +41,76 @@ async def chat(request: ChatRequest):
         logger.info(f"收到聊天请求: {request.message}")
 
         # 调用对话引擎
-        result = chatbot.chat(
+        result = await chatbot.achat(
             user_input=request.message,
             session_id=request.session_id,
             user_phone=request.user_phone
         )
 
-        return ChatResponse(
-            session_id=result["session_id"],
-            response=result["response"],
-            action=result["action"],
-            intent=result["intent"],
-            requires_confirmation=result.get("requires_confirmation", False),
-            data=result.get("data"),
-            timestamp=result["metadata"]["timestamp"]
-        )
+        return to_chat_response(result)
 
     except Exception as e:
         logger.error(f"聊天处理失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    聊天接口（SSE流式）
+
+    事件：
+    - chunk: {"content": 增量文本}，仅NLG走LLM时产生，未经后处理
+    - final: ChatResponse 字段 + state，content 以此为准
+    - error: {"detail": 错误信息}
+    """
+    logger.info(f"收到流式聊天请求: {request.message}")
+
+    async def events():
+        try:
+            async for event in chatbot.astream_chat(
+                user_input=request.message,
+                session_id=request.session_id,
+                user_phone=request.user_phone
+            ):
+                if event["type"] == "chunk":
+                    yield sse_event("chunk", {"content": event["content"]})
+                else:
+                    result = event["result"]
+                    payload = to_chat_response(result).model_dump()
+                    payload["state"] = result.get("state")
+                    yield sse_event("final", payload)
+        except Exception as e:
+            logger.error(f"流式聊天处理失败: {e}", exc_info=True)
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def to_chat_response(result: dict) -> ChatResponse:
+    """对话引擎结果 → ChatResponse（查询结果模型在此转为字典）"""
+    return ChatResponse(
+        session_id=result["session_id"],
+        response=result["response"],
+        action=result["action"],
+        intent=result["intent"],
+        requires_confirmation=result.get("requires_confirmation", False),
+        data=to_plain(result.get("data")),
+        timestamp=result["metadata"]["timestamp"]
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """格式化一条SSE事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=json_default)}\n\n"
+
+
 @router.get("/session/{session_id}")
 async def get_session(session_id: str):
     """获取会话状态"""
     try:
-        state = chatbot.get_session_state(session_id)
+        state = await chatbot.aget_session_state(session_id)
         return {"session_id": session_id, "state": state}
     except Exception as e:
         raise HTTPException(status_code=404, detail="会话不存在")
@@ -71,7 +120,29 @@ async def get_session(session_id: str):
 async def reset_session(session_id: str):
     """重置会话"""
     try:
-        chatbot.reset_session(session_id)
+        await chatbot.areset_session(session_id)
         return {"message": "会话已重置", "session_id": session_id}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """进程内性能指标"""
+    return metrics.snapshot()
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """缓存统计：NLG响应缓存（命中/未命中/淘汰/命中率）与用户资料缓存"""
+    return chatbot.get_cache_stats()
+
+
+@router.post("/catalog/reload", dependencies=[Depends(require_admin_token)])
+async def reload_catalog():
+    """重新加载套餐目录（套餐上下架、调价后调用，需要管理令牌）"""
+    try:
+        return await asyncio.to_thread(chatbot.reload_catalog)
+    except Exception as e:
+        logger.error(f"套餐目录重新加载失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -7,11 +7,11 @@ from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict
 import json
-from core import TelecomChatbotPolicy
+from api.dependencies import chatbot
+from models import json_default
 from utils import logger
 
 router = APIRouter()
-chatbot = TelecomChatbotPolicy()
 
 
 # 连接管理器
@@ -32,12 +32,12 @@ class ConnectionManager:
     async def send_message(self, message: dict, client_id: str):
         if client_id in self.active_connections:
             await self.active_connections[client_id].send_text(
-                json.dumps(message, ensure_ascii=False)
+                json.dumps(message, ensure_ascii=False, default=json_default)
             )
 
     async def send_direct_message(self, websocket: WebSocket, message: dict):
         """直接向WebSocket发送消息（用于连接建立时）"""
-        await websocket.send_text(json.dumps(message, ensure_ascii=False))
+        await websocket.send_text(json.dumps(message, ensure_ascii=False, default=json_default))
 
 
 manager = ConnectionManager()
@@ -84,10 +84,25 @@ async def websocket_chat(websocket: WebSocket):
 
             # 调用对话引擎
             try:
-                result = chatbot.chat(
-                    user_input=user_message,
-                    session_id=session_id
-                )
+                if message.get("stream"):
+                    # 流式：先逐段发送 chunk（未经后处理），最后发送 response，content 以 response 为准
+                    async for event in chatbot.astream_chat(
+                        user_input=user_message,
+                        session_id=session_id
+                    ):
+                        if event["type"] == "chunk":
+                            await manager.send_message({
+                                "type": "chunk",
+                                "session_id": session_id,
+                                "content": event["content"]
+                            }, client_id)
+                        else:
+                            result = event["result"]
+                else:
+                    result = await chatbot.achat(
+                        user_input=user_message,
+                        session_id=session_id
+                    )
 
                 # 发送响应
                 await manager.send_message({
@@ -96,6 +111,7 @@ async def websocket_chat(websocket: WebSocket):
                     "content": result.get("response", "抱歉，我暂时无法处理您的请求"),
                     "action": result.get("action", ""),
                     "intent": result.get("intent", ""),
+                    "state": result.get("state"),
                     "timestamp": result.get("metadata", {}).get("timestamp", datetime.now().isoformat())
                 }, client_id)
 
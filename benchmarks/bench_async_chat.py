@@ -0,0 +1,64 @@
+"""
+异步对话管道吞吐基准
+
+对比单个worker（单事件循环）内并发请求的吞吐：
+- before: 路由在事件循环里直接调用同步 chat()，请求被串行化
+- after:  路由 await achat()，LLM/Redis/DB等待期间事件循环可以处理其他请求
+
+LLM与数据库均为离线模拟（固定延迟），不需要外部服务。
+
+运行: python -m benchmarks.bench_async_chat [并发数] [LLM延迟秒] [DB延迟秒]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import quiet_logs
+from core import TelecomChatbotPolicy
+from tests.support.chatbot import build_chatbot, USER_INPUT
+from utils import llm_singleflight
+
+async def run_blocking(bot: TelecomChatbotPolicy, concurrency: int) -> float:
+    """旧路由：async handler 内调用同步 chat()"""
+
+    async def handler(i: int):
+        return bot.chat(USER_INPUT, session_id=f"bench_sync_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async(bot: TelecomChatbotPolicy, concurrency: int) -> float:
+    """新路由：await achat()"""
+
+    async def handler(i: int):
+        return await bot.achat(USER_INPUT, session_id=f"bench_async_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    llm_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    db_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+
+    quiet_logs()
+    # 所有请求的提示词相同，关闭请求合并，只测量并发本身的收益
+    llm_singleflight.enabled = False
+    bot = build_chatbot(llm_latency, db_latency)
+
+    before = asyncio.run(run_blocking(bot, concurrency))
+    after = asyncio.run(run_async(bot, concurrency))
+
+    print(f"并发请求数: {concurrency}, LLM延迟: {llm_latency * 1000:.0f}ms x2/轮, DB延迟: {db_latency * 1000:.0f}ms")
+    print(f"{'模式':<10}{'总耗时(s)':>12}{'吞吐(req/s)':>14}")
+    print(f"{'before':<10}{before:>12.2f}{concurrency / before:>14.1f}")
+    print(f"{'after':<10}{after:>12.2f}{concurrency / after:>14.1f}")
+    print(f"提升: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+执行器异步路径基准（SQLite文件库）
+
+同一批并发请求分别走：
+- 线程池: asyncio.to_thread(execute_function)，每个请求占用一个线程等待同步连接池
+- 异步引擎: aexecute_function，在事件循环上等待异步连接池（aiosqlite）
+打印吞吐和两种连接池的等待时间分布（db_pool_wait_seconds）。
+
+运行: python -m benchmarks.bench_async_executor [用户数] [并发数] [SQLite文件]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import quiet_logs
+from database.async_db_manager import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+from database.seed import generate_users, seed_database, sqlite_url
+from executor.db_executor import DatabaseExecutor
+from utils import metrics
+
+
+async def run(call, phones) -> float:
+    """并发执行全部请求，返回每秒请求数"""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call("query_current_package", {"phone": phone}) for phone in phones))
+    elapsed = time.perf_counter() - start
+    assert all(r["success"] for r in results)
+    return len(phones) / elapsed
+
+
+async def bench(url: str, phones) -> None:
+    executor = DatabaseExecutor()
+    executor.db = DatabaseManager.create(url)
+    executor.adb = AsyncDatabaseManager(url)
+    executor.catalog = None
+    executor.user_cache = None
+
+    threaded = await run(lambda name, params: asyncio.to_thread(executor.execute_function, name, params), phones)
+    native = await run(executor.aexecute_function, phones)
+    await executor.adb.dispose()
+
+    print(f"{'路径':<12}{'请求/秒':>10}{'池等待p50(ms)':>16}{'池等待p99(ms)':>16}")
+    for label, engine, throughput in (("线程池", "sync", threaded), ("异步引擎", "async", native)):
+        wait = metrics.histogram("db_pool_wait_seconds", engine=engine)
+        print(f"{label:<12}{throughput:>10,.0f}{wait.quantile(0.5) * 1000:>16.2f}{wait.quantile(0.99) * 1000:>16.2f}")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(tempfile.mkdtemp(), "telecom.db")
+
+    quiet_logs()
+    url = sqlite_url(path)
+    seed_database(DatabaseManager.create(url), users=users, packages=200)
+
+    rng = random.Random(5)
+    active = [row["phone"] for row in generate_users(users, 200) if row["status"] == 1]
+    phones = [rng.choice(active) for _ in range(concurrency)]
+    print(f"SQLite({path}) {users}用户, 并发 {concurrency}")
+    asyncio.run(bench(url, phones))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+执行器分发开销基准
+
+对比每次调用的分发开销（不含函数本身）：
+- 旧: 每次重建 executor_map，inspect.signature 过滤参数
+- 新: 导入时生成的函数注册表（字典查找 + 参数绑定/类型转换）
+以及 execute_function 端到端（套餐详情查询走进程内目录，不访问数据库）。
+
+运行: python -m benchmarks.bench_executor_dispatch [调用次数]
+"""
+import inspect
+import sys
+import time
+
+from benchmarks.common import quiet_logs
+from executor.db_executor import DatabaseExecutor, FUNCTIONS
+from executor.package_catalog import PackageCatalog
+
+PACKAGES = [
+    {"id": 2, "name": "畅游套餐", "data_gb": 100, "voice_minutes": 300, "price": 180.0,
+     "target_user": "无限制", "description": ""},
+]
+PARAMETERS = {"package_name": "畅游套餐", "phone": "13800138000", "intent": "query_package_detail"}
+
+
+def legacy_dispatch(executor: DatabaseExecutor, function_name: str, parameters: dict):
+    """旧分发逻辑：每次重建路由表并读取签名"""
+    executor_map = {
+        "query_packages": executor.query_packages,
+        "query_current_package": executor.query_current_package,
+        "query_package_detail": executor.query_package_detail,
+        "change_package": executor.change_package,
+        "query_usage": executor.query_usage,
+        "business_consultation": executor.business_consultation
+    }
+    func = executor_map[function_name]
+    valid_params = set(inspect.signature(func).parameters.keys())
+    return func, {key: value for key, value in parameters.items() if key in valid_params}
+
+
+def registry_dispatch(executor: DatabaseExecutor, function_name: str, parameters: dict):
+    """新分发逻辑：注册表查找并绑定参数"""
+    spec = FUNCTIONS[function_name]
+    params, _ = spec.bind(parameters)
+    return spec.func, params
+
+
+def per_call_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    quiet_logs()
+
+    executor = DatabaseExecutor()
+    executor.catalog = PackageCatalog(lambda: [dict(p) for p in PACKAGES], ttl=0)
+    executor.user_cache = None
+
+    legacy = per_call_us(lambda: legacy_dispatch(executor, "query_package_detail", PARAMETERS), n)
+    registry = per_call_us(lambda: registry_dispatch(executor, "query_package_detail", PARAMETERS), n)
+    end_to_end = per_call_us(lambda: executor.execute_function("query_package_detail", PARAMETERS), n)
+
+    print(f"分发开销（{n}次）")
+    print(f"  旧 executor_map + inspect.signature: {legacy:6.2f} µs/次")
+    print(f"  新 函数注册表:                        {registry:6.2f} µs/次  ({legacy / registry:.1f}x)")
+    print(f"execute_function 端到端（含指标、日志、目录查询）: {end_to_end:6.2f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
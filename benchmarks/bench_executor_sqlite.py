@@ -0,0 +1,93 @@
+"""
+执行器离线基准（SQLite）
+
+在 SQLite 上按 database/seed.py 生成用户和套餐数据，不需要 MySQL 即可测量
+DatabaseExecutor 各函数的吞吐：
+- query_packages:        直接查库 vs 进程内套餐目录
+- query_current_package: 直接查库（关联查询）vs 用户资料缓存
+- query_usage:           同上
+- change_package:        单事务 upsert（每次使用新的幂等键）
+
+运行: python -m benchmarks.bench_executor_sqlite [用户数] [套餐数] [每项调用次数] [SQLite文件，默认内存库]
+"""
+import random
+import sys
+import time
+import uuid
+from typing import Callable
+
+from benchmarks.common import quiet_logs
+from database.db_manager import DatabaseManager
+from database.seed import generate_users, seed_database, sqlite_url
+from executor.db_executor import DatabaseExecutor
+from executor.package_catalog import PackageCatalog
+from executor.user_cache import UserProfileCache
+
+PACKAGE_FILTERS = [
+    {"price_max": 100},
+    {"price_max": 200, "data_min": 50},
+    {"data_min": 100, "sort_by": "data_desc"},
+    {"target_user": "在校生", "price_max": 150},
+]
+
+
+def build_executor(db: DatabaseManager, catalog: bool, user_cache: bool) -> DatabaseExecutor:
+    """使用指定数据库的执行器"""
+    executor = DatabaseExecutor()
+    executor.db = db
+    executor.catalog = PackageCatalog.from_db(db, ttl=0) if catalog else None
+    executor.user_cache = UserProfileCache(ttl=60) if user_cache else None
+    return executor
+
+
+def run(call: Callable[[int], dict], n: int) -> float:
+    """返回每秒调用次数"""
+    start = time.perf_counter()
+    for i in range(n):
+        result = call(i)
+        assert result.get("success"), result
+    elapsed = time.perf_counter() - start
+    return n / elapsed
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    packages = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    n = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    path = sys.argv[4] if len(sys.argv) > 4 else ":memory:"
+
+    quiet_logs()
+    db = DatabaseManager.create(sqlite_url(path))
+    start = time.perf_counter()
+    counts = seed_database(db, users=users, packages=packages)
+    print(f"SQLite({path}) 写入 {counts}, 耗时 {time.perf_counter() - start:.1f}s")
+
+    # 正常状态用户的手机号（跳过停机用户），每个手机号连续查询两次（同一会话前后两轮）
+    rng = random.Random(3)
+    phones = [row["phone"] for row in generate_users(users, packages) if row["status"] == 1]
+    sample = [rng.choice(phones) for _ in range(n // 2 + 1)]
+
+    plain = build_executor(db, catalog=False, user_cache=False)
+    cached = build_executor(db, catalog=True, user_cache=True)
+
+    cases = [
+        ("query_packages",
+         lambda ex: lambda i: ex.execute_function("query_packages", PACKAGE_FILTERS[i % len(PACKAGE_FILTERS)])),
+        ("query_current_package",
+         lambda ex: lambda i: ex.execute_function("query_current_package", {"phone": sample[i // 2]})),
+        ("query_usage",
+         lambda ex: lambda i: ex.execute_function("query_usage", {"phone": sample[i // 2]})),
+        ("change_package",
+         lambda ex: lambda i: ex.execute_function("change_package", {
+             "phone": sample[i // 2], "new_package_name": "畅游套餐", "idempotency_key": uuid.uuid4().hex})),
+    ]
+
+    print(f"{'函数':<24}{'直接查库/秒':>14}{'目录+缓存/秒':>14}")
+    for name, make in cases:
+        before = run(make(plain), n)
+        after = run(make(cached), n)
+        print(f"{name:<24}{before:>14,.0f}{after:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+本地意图分类器基准：准确率 vs LLM调用减少
+
+级联 规则 → 分类器 → LLM 中，只统计规则未命中（原本必须调用LLM）的输入：
+- 本地作答率：分类器置信度达到阈值、不再调用LLM的比例（即LLM调用减少比例）
+- 本地准确率：本地作答部分中意图正确的比例
+
+两种划分：
+- 同句式：训练/评估来自相同句式、不同套餐/价格/号码（日志回放的常见情况）
+- 新句式：评估句式在训练中从未出现（对新说法的泛化下限）
+
+可用 --logs 额外并入日志中的 (用户输入, 最终意图) 对参与训练。
+
+运行: python -m benchmarks.bench_intent_classifier [--logs logs/*.log]
+"""
+import argparse
+import time
+
+from benchmarks.common import quiet_logs
+from core.nlu.intent_classifier import IntentClassifier, OTHER, load_log_pairs, resolve_conflicts
+from core.nlu.rule_preprocessor import RulePreprocessor
+from tests.support.utterances import build_labeled_corpus
+
+THRESHOLDS = [0.5, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+
+def rule_misses(pairs):
+    """只保留规则未命中的输入（无上下文）"""
+    rules = RulePreprocessor()
+    return [(text, label) for text, label in pairs if rules.preprocess(text, {}) is None]
+
+
+def report(name, classifier, test):
+    misses = rule_misses(test)
+    print(f"\n[{name}] 评估 {len(test)} 条，其中规则未命中 {len(misses)} 条（基线：全部调用LLM）")
+    print(f"{'阈值':>6} {'LLM调用减少':>12} {'本地准确率':>10}")
+
+    predictions = [(classifier.predict(text), label) for text, label in misses]
+    for threshold in THRESHOLDS:
+        answered = [(intent, label) for (intent, confidence), label in predictions
+                    if intent != OTHER and confidence >= threshold]
+        correct = sum(intent == label for intent, label in answered)
+        print(f"{threshold:>6.2f} {len(answered) / max(len(misses), 1):>12.1%} "
+              f"{correct / max(len(answered), 1):>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logs", nargs="*", default=[])
+    parser.add_argument("--train-size", type=int, default=3000)
+    parser.add_argument("--test-size", type=int, default=1000)
+    args = parser.parse_args()
+    quiet_logs("ERROR")
+
+    log_pairs = resolve_conflicts(load_log_pairs(args.logs)) if args.logs else []
+    if log_pairs:
+        print(f"并入日志样本 {len(log_pairs)} 条")
+
+    for name, train_split, test_split in [("同句式", "all", "all"), ("新句式", "train", "test")]:
+        train = build_labeled_corpus(args.train_size, seed=42, split=train_split) + log_pairs
+        test = build_labeled_corpus(args.test_size, seed=7, split=test_split)
+
+        start = time.perf_counter()
+        classifier = IntentClassifier().fit([t for t, _ in train], [label for _, label in train])
+        train_s = time.perf_counter() - start
+        report(name, classifier, test)
+
+        start = time.perf_counter()
+        for text, _ in test:
+            classifier.predict(text)
+        per_call_us = (time.perf_counter() - start) / len(test) * 1e6
+        print(f"训练 {len(train)} 条耗时 {train_s:.2f}s；单次预测 {per_call_us:.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
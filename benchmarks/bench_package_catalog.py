@@ -0,0 +1,107 @@
+"""
+套餐目录查询吞吐基准
+
+把套餐目录扩大到数万个套餐/加油包，对比 query_packages 的过滤+排序吞吐：
+- before: 逐条扫描全部套餐过滤后排序（相当于无索引的全表扫描，且不含数据库往返）
+- after:  PackageCatalog（价格/流量有序索引 + bisect 区间切片）
+
+同时校验两者输出完全一致。
+
+运行: python -m benchmarks.bench_package_catalog [套餐数] [查询次数]
+"""
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import quiet_logs
+from executor.package_catalog import PackageCatalog
+
+TARGET_USERS = ["无限制", "在校生", "老年人", "商务"]
+SORTS = ["price_asc", "price_desc", "data_desc"]
+
+
+def build_packages(size: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """生成套餐目录（含流量加油包等小额产品）"""
+    rng = random.Random(seed)
+    return [
+        {"id": i, "name": f"套餐{i}", "data_gb": rng.choice([1, 5, 10, 20, 30, 50, 100, 200, 500, 1000]),
+         "voice_minutes": rng.choice([0, 100, 300, 1000]), "price": float(rng.randint(5, 600)),
+         "target_user": rng.choice(TARGET_USERS), "description": ""}
+        for i in range(1, size + 1)
+    ]
+
+
+def build_queries(count: int, seed: int = 2) -> List[Dict[str, Any]]:
+    """生成与NLU槽位分布相近的查询条件"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        query = {"sort_by": rng.choice(SORTS)}
+        if rng.random() < 0.7:
+            query["price_max"] = rng.choice([30, 50, 100, 150, 200])
+        if rng.random() < 0.5:
+            query["data_min"] = rng.choice([10, 50, 100, 200])
+        if rng.random() < 0.2:
+            query["target_user"] = "在校生"
+        queries.append(query)
+    return queries
+
+
+def scan(packages: List[Dict[str, Any]], price_min=None, price_max=None, data_min=None, data_max=None,
+         target_user=None, sort_by="price_asc") -> List[Dict[str, Any]]:
+    """优化前：逐条过滤 + 排序（仅用于对比）"""
+    result = [dict(p) for p in packages
+              if (price_min is None or p["price"] >= price_min)
+              and (price_max is None or p["price"] <= price_max)
+              and (data_min is None or p["data_gb"] >= data_min)
+              and (data_max is None or p["data_gb"] <= data_max)
+              and (not target_user or p["target_user"] in (target_user, "无限制"))]
+    keys = {
+        "price_desc": lambda p: (-p["price"], p["id"]),
+        "data_desc": lambda p: (-p["data_gb"], p["id"]),
+    }
+    return sorted(result, key=keys.get(sort_by, lambda p: (p["price"], p["id"])))
+
+
+def run(query, queries: List[Dict[str, Any]]) -> float:
+    """返回每秒查询次数"""
+    start = time.perf_counter()
+    for filters in queries:
+        query(**filters)
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    quiet_logs()
+    packages = build_packages(size)
+    queries = build_queries(count)
+    catalog = PackageCatalog(lambda: packages, ttl=0)
+
+    start = time.perf_counter()
+    catalog.reload()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    matched = 0
+    for filters in queries:
+        expected = scan(packages, **filters)
+        assert catalog.query(**filters) == expected, f"输出不一致: {filters}"
+        matched += len(expected)
+
+    before = run(lambda **f: scan(packages, **f), queries)
+    after = run(catalog.query, queries)
+
+    print(f"目录: {size}个套餐, 建索引 {load_ms:.1f}ms; 查询: {count}次, "
+          f"平均命中 {matched / count:.0f}个, 输出一致")
+    print(f"{'模式':<10}{'查询/秒':>14}")
+    print(f"{'before':<10}{before:>14,.0f}")
+    print(f"{'after':<10}{after:>14,.0f}")
+    print(f"提升: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+NLU Prompt预算基准
+
+对比每次LLM调用的估算输入token：
+- before: 完整 OPTIMIZED_SYSTEM_PROMPT（拼接槽位填充指示）+ 全部 FUNCTION_DEFINITIONS
+- after:  PromptBudgeter 按状态裁剪后的 System Prompt + 工具子集
+
+运行: python -m benchmarks.bench_prompt_budget
+"""
+from benchmarks.common import quiet_logs
+from core.nlu.function_definitions import FUNCTION_DEFINITIONS
+from core.nlu.prompt_budget import PromptBudgeter, estimate_tokens, _tools_tokens
+from core.nlu.prompt_templates import OPTIMIZED_SYSTEM_PROMPT, SLOT_FILLING_INSTRUCTION
+
+SCENARIOS = [
+    ("新会话", "帮我看看有没有流量多一点的", {}, False),
+    ("有上文", "那个多少钱", {"current_intent": "query_package_detail",
+                          "slot_values": {"package_name": "畅游套餐"}}, False),
+    ("等手机号", "我不记得了", {"current_intent": "change_package", "waiting_for_slot": "phone",
+                          "slot_values": {"new_package_name": "畅游套餐"}}, True),
+    ("等手机号/切换", "怎么查余额", {"current_intent": "change_package", "waiting_for_slot": "phone",
+                              "slot_values": {"new_package_name": "畅游套餐"}}, True),
+    ("等套餐名", "随便吧", {"current_intent": "query_package_detail",
+                        "waiting_for_slot": "package_name", "slot_values": {}}, True),
+]
+
+
+def main():
+    quiet_logs("ERROR")
+    budgeter = PromptBudgeter()
+    print(f"{'场景':<12} {'before':>7} {'after':>7} {'节省':>6}  工具")
+    for name, text, context, slot_filling in SCENARIOS:
+        # 槽位填充指示在System Prompt之后的消息中
+        messages = [{"role": "user", "content": text}]
+        if slot_filling:
+            messages.insert(0, {"role": "user", "content": SLOT_FILLING_INSTRUCTION})
+        system = OPTIMIZED_SYSTEM_PROMPT + (SLOT_FILLING_INSTRUCTION if slot_filling else "")
+        before = estimate_tokens(system) + _tools_tokens(FUNCTION_DEFINITIONS) + estimate_tokens(text)
+
+        plan = budgeter.plan(text, context, slot_filling, messages)
+        after = plan.tokens["total"]
+        tools = ",".join(tool["function"]["name"] for tool in plan.tools) if len(plan.tools) < 6 else "全部"
+        print(f"{name:<12} {before:>7} {after:>7} {1 - after / before:>6.0%}  {tools}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+执行器查询计划回归基准
+
+在大数据量 SQLite 库上（按 database/seed.py 生成，迁移到指定版本）逐个执行 DatabaseExecutor
+直接查库时发出的每条SQL，打印查询计划和平均耗时；任一查询出现整表扫描时以非零状态退出。
+
+--target 1 只建基线表结构（迁移前），可对比索引迁移前后的计划和耗时。
+
+运行: python -m benchmarks.bench_query_plans [--users 200000] [--packages 5000] [--repeat 20] [--target 版本]
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks.common import quiet_logs
+from database.db_manager import DatabaseManager
+from database.migrate import migrate
+from database.query_plan import explain, full_scans
+from database.seed import seed_database
+from tests.support.query_recording import record_queries
+
+def time_query(db: DatabaseManager, sql: str, params: dict, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.execute_query(sql, params)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="执行器查询计划回归检查")
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--packages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20, help="每条查询计时次数")
+    parser.add_argument("--target", type=int, default=None, help="迁移到的版本（默认最新）")
+    args = parser.parse_args(argv)
+
+    quiet_logs()
+    db = DatabaseManager.create("sqlite://")
+    migrate(db, args.target)
+    start = time.perf_counter()
+    counts = seed_database(db, users=args.users, packages=args.packages, create_schema=False)
+    print(f"SQLite(内存) 写入 {counts}, 耗时 {time.perf_counter() - start:.1f}s")
+
+    failures = []
+    for label, sql, params in record_queries(db):
+        scans = full_scans(db, sql, params)
+        elapsed = time_query(db, sql, params, args.repeat)
+        status = f"整表扫描: {', '.join(scans)}" if scans else "OK"
+        print(f"\n{label}  {elapsed:.2f}ms  {status}")
+        for line in explain(db, sql, params):
+            print(f"    {line}")
+        if scans:
+            failures.append(label)
+
+    if failures:
+        print(f"\n{len(failures)}条查询出现整表扫描: {failures}")
+        return 1
+    print("\n全部查询均使用索引")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+查询结果内存分配基准（tracemalloc）
+
+模拟对话轮次：套餐列表查询（进程内目录）+ 当前套餐查询（用户资料缓存命中），对比每轮的分配：
+- 旧: 套餐/资料为字典，目录和缓存每次返回 dict 副本；资料由 dict(zip(列名, 行)) 构建
+- 新: __slots__ 只读模型（Package / UserAccount），目录和缓存直接共享对象
+另测单个对象的大小，以及从查询行构建一批对象的分配。
+
+运行: python -m benchmarks.bench_row_models [轮数] [套餐数]
+"""
+import random
+import sys
+import tracemalloc
+from decimal import Decimal
+
+from benchmarks.common import quiet_logs
+from executor.db_executor import DatabaseExecutor
+from executor.package_catalog import PACKAGE_COLUMNS, PackageCatalog
+from executor.user_cache import UserProfileCache
+from models import Package, UserAccount
+
+PHONE = "13800138000"
+PROFILE_COLUMNS = UserAccount.__slots__
+
+
+def package_rows(count: int):
+    rng = random.Random(7)
+    return [(i, f"套餐{i}", rng.choice([5, 10, 20, 50, 100, 200]), rng.choice([100, 300, 500]),
+             Decimal(rng.randint(10, 400)), rng.choice(["无限制", "在校生", "老年人"]), "套餐说明")
+            for i in range(1, count + 1)]
+
+
+PROFILE_ROW = (PHONE, "套餐1", 20, 300, Decimal("99.00"), "无限制", "套餐说明", 5.2, 45, 45.5)
+
+
+class LegacyCatalog:
+    """旧目录：字典套餐，返回副本"""
+
+    def __init__(self, rows):
+        self.packages = []
+        for row in rows:
+            package = dict(zip(PACKAGE_COLUMNS, row))
+            package["price"] = float(package["price"])
+            self.packages.append(package)
+
+    def query(self, price_max):
+        return [dict(p) for p in self.packages if p["price"] <= price_max]
+
+
+class LegacyProfileCache:
+    """旧用户资料缓存：存取都复制"""
+
+    def __init__(self):
+        self.local = {}
+
+    def get(self, phone):
+        profile = self.local.get(phone)
+        return dict(profile) if profile is not None else None
+
+    def set(self, phone, profile):
+        self.local[phone] = dict(profile)
+
+
+def legacy_profile(row):
+    profile = dict(zip(PROFILE_COLUMNS, row))
+    profile["price"] = float(profile["price"])
+    return profile
+
+
+def measure(fn, turns: int):
+    """执行 turns 次并保留全部结果，返回 (每轮新增内存块数, 每轮新增字节)"""
+    fn()  # 预热
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [fn() for _ in range(turns)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    retained = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del results
+    return blocks / turns, retained / turns
+
+
+def peak(fn) -> int:
+    """fn 执行期间的峰值分配字节"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak_bytes
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    quiet_logs()
+    rows = package_rows(count)
+
+    legacy_catalog = LegacyCatalog(rows)
+    legacy_cache = LegacyProfileCache()
+    legacy_cache.set(PHONE, legacy_profile(PROFILE_ROW))
+
+    executor = DatabaseExecutor()
+    executor.catalog = PackageCatalog(lambda: [Package.from_row(row) for row in rows], ttl=0)
+    executor.user_cache = UserProfileCache(ttl=3600)
+    executor.user_cache.set(PHONE, UserAccount.from_row(PROFILE_ROW))
+
+    def legacy_turn():
+        return legacy_catalog.query(price_max=100), legacy_cache.get(PHONE)
+
+    def new_turn():
+        return executor.catalog.query(price_max=100), executor.user_cache.get(PHONE)
+
+    matched = len(new_turn()[0])
+    print(f"每轮: 套餐查询（命中 {matched}/{count} 个）+ 当前套餐（缓存命中），{turns} 轮")
+    print(f"{'':<22}{'分配块/轮':>10}{'字节/轮':>12}")
+    legacy_blocks, legacy_bytes = measure(legacy_turn, turns)
+    new_blocks, new_bytes = measure(new_turn, turns)
+    print(f"{'旧 字典 + 副本':<22}{legacy_blocks:>10.1f}{legacy_bytes:>12,.0f}")
+    print(f"{'新 __slots__ 模型共享':<22}{new_blocks:>10.1f}{new_bytes:>12,.0f}"
+          f"  ({legacy_bytes / max(new_bytes, 1):.1f}x)")
+
+    print(f"单个对象: 套餐字典 {sys.getsizeof(legacy_catalog.packages[0])} 字节, "
+          f"Package {sys.getsizeof(executor.catalog.get('套餐1'))} 字节")
+    legacy_build = peak(lambda: LegacyCatalog(rows).packages)
+    new_build = peak(lambda: [Package.from_row(row) for row in rows])
+    print(f"从查询行构建 {count} 个套餐（峰值）: 字典 {legacy_build:,} 字节, "
+          f"Package {new_build:,} 字节 ({legacy_build / new_build:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+流式NLG首字节耗时基准
+
+对比NLG走LLM时用户看到第一个字的时间：
+- blocking: achat() 等待完整生成后一次性返回
+- stream:   astream_chat() 在NLG首个片段到达时即产出
+
+NLU与NLG均为离线模拟（NLG按首token延迟 + 逐段间隔生成），不需要外部服务。
+
+运行: python -m benchmarks.bench_stream_nlg [轮数] [首token延迟秒] [片段间隔秒] [片段数]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.common import quiet_logs
+from core import TelecomChatbotPolicy
+from tests.support.chatbot import build_chatbot, USER_INPUT
+from tests.support.llm import FakeStreamingLLMClient
+from utils import LoopLocal, llm_singleflight
+
+
+def build_streaming_chatbot(first_token_latency: float, chunk_interval: float, chunk_count: int) -> TelecomChatbotPolicy:
+    """构建NLG支持流式的模拟对话系统（NLU延迟固定10ms）"""
+    bot = build_chatbot(0.01, 0.0)
+    chunks = [f"片段{i}，" for i in range(chunk_count)]
+    bot.nlg._async_llm_clients = LoopLocal(
+        lambda: FakeStreamingLLMClient(first_token_latency, chunk_interval, chunks)
+    )
+    return bot
+
+
+async def ttfb_blocking(bot: TelecomChatbotPolicy, session_id: str) -> float:
+    start = time.perf_counter()
+    await bot.achat(USER_INPUT, session_id=session_id)
+    return time.perf_counter() - start
+
+
+async def ttfb_stream(bot: TelecomChatbotPolicy, session_id: str) -> float:
+    start = time.perf_counter()
+    first = None
+    async for _ in bot.astream_chat(USER_INPUT, session_id=session_id):
+        if first is None:
+            first = time.perf_counter() - start
+    return first
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    first_token_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    chunk_interval = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    chunk_count = int(sys.argv[4]) if len(sys.argv) > 4 else 30
+
+    quiet_logs()
+    llm_singleflight.enabled = False
+    bot = build_streaming_chatbot(first_token_latency, chunk_interval, chunk_count)
+
+    async def run(measure, mode):
+        return [await measure(bot, f"bench_{mode}_{i}") for i in range(rounds)]
+
+    blocking = asyncio.run(run(ttfb_blocking, "blocking"))
+    stream = asyncio.run(run(ttfb_stream, "stream"))
+
+    print(f"轮数: {rounds}, NLG首token: {first_token_latency * 1000:.0f}ms, "
+          f"片段: {chunk_count} x {chunk_interval * 1000:.0f}ms")
+    print(f"{'模式':<10}{'TTFB p50(ms)':>14}{'TTFB max(ms)':>14}")
+    for mode, samples in (("blocking", blocking), ("stream", stream)):
+        print(f"{mode:<10}{statistics.median(samples) * 1000:>14.0f}{max(samples) * 1000:>14.0f}")
+    print(f"首字节提前: {statistics.median(blocking) / statistics.median(stream):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
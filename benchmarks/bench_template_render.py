@@ -0,0 +1,124 @@
+"""
+模板渲染吞吐基准
+
+对 templates.py 中的每个模板分别测量渲染吞吐：
+- before: 每次渲染 re.findall 提取占位符，参数准备执行两遍（校验一遍、渲染一遍）
+- after:  预编译模板（占位符编译时解析）+ 单次参数准备
+
+同时校验两者输出完全一致。
+
+运行: python -m benchmarks.bench_template_render [每个模板的渲染次数]
+"""
+import re
+import sys
+import time
+from typing import Any, Dict
+
+from benchmarks.common import quiet_logs
+from core.nlg import NLGGenerator
+from core.nlg.template_engine import template_engine, CompiledTemplate
+from core.policy import Action, ActionType
+
+PACKAGES = [
+    {"name": "经济套餐", "price": 50, "data_gb": 10, "voice_minutes": 100,
+     "target_user": "无限制", "description": "适合轻度用户"},
+    {"name": "畅游套餐", "price": 180, "data_gb": 100, "voice_minutes": 300,
+     "target_user": "无限制", "description": "适合重度流量用户"},
+]
+
+# 覆盖全部模板占位符的参数
+PARAMS = {
+    "data": PACKAGES,
+    "count": len(PACKAGES),
+    "slot": "手机号",
+    "intent": "change_package",
+    "error": "未找到该用户",
+    "message": "处理完成",
+    "phone": "13800138000",
+    "package_name": "经济套餐",
+    "new_package_name": "畅游套餐",
+    "monthly_usage_gb": 6.5,
+    "monthly_usage_minutes": 120,
+    "balance": 88.0,
+    "recommendation": "推荐畅游套餐",
+}
+
+
+class LegacyTemplateRenderer:
+    """优化前的实现（仅用于对比）"""
+
+    def __init__(self, nlg: NLGGenerator):
+        self.nlg = nlg
+
+    def render(self, template: str, params: Dict[str, Any]) -> str:
+        placeholders = re.findall(r'\{(\w+)\}', template)
+        validation_params = self._prepare(params)
+        for placeholder in placeholders:
+            value = validation_params.get(placeholder)
+            if value is None or value == "":
+                raise KeyError(placeholder)
+        return template.format(**self._prepare(dict(params)))
+
+    def _prepare(self, params: dict) -> dict:
+        processed_params = self.nlg._process_template_params(dict(params))
+        if "data" in params and isinstance(params["data"], list):
+            processed_params["package_list"] = self.nlg.formatter.format_package_list(params["data"])
+        for key, value in list(processed_params.items()):
+            if value is None:
+                processed_params[key] = ""
+            elif isinstance(value, (int, float)):
+                pass
+            elif not isinstance(value, str):
+                processed_params[key] = str(value)
+        return processed_params
+
+
+def render_compiled(nlg: NLGGenerator, template: CompiledTemplate, action: Action) -> str:
+    params = nlg._prepare_template_params(action, None)
+    missing = template.missing(params)
+    if missing is not None:
+        raise KeyError(missing)
+    return template.render(params)
+
+
+def run(render, n: int) -> float:
+    """返回每秒渲染次数"""
+    start = time.perf_counter()
+    for _ in range(n):
+        render()
+    elapsed = time.perf_counter() - start
+    return n / elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    quiet_logs()
+    nlg = NLGGenerator()
+    legacy = LegacyTemplateRenderer(nlg)
+    action = Action(action_type=ActionType.INFORM, intent="bench", parameters=PARAMS)
+
+    templates = list(template_engine.iter_templates())
+    width = max(len(path) for path, _ in templates) + 2
+    print(f"模板: {len(templates)}个, 每个渲染 {n} 次, 输出一致")
+    print(f"{'模板':<{width}}{'before/秒':>14}{'after/秒':>14}{'提升':>8}")
+
+    total_before = total_after = 0.0
+    for path, template in templates:
+        expected = legacy.render(template.text, PARAMS)
+        actual = render_compiled(nlg, template, action)
+        assert expected == actual, f"输出不一致: {path} {expected!r} != {actual!r}"
+
+        before = run(lambda: legacy.render(template.text, PARAMS), n)
+        after = run(lambda: render_compiled(nlg, template, action), n)
+        total_before += n / before
+        total_after += n / after
+        print(f"{path:<{width}}{before:>14,.0f}{after:>14,.0f}{after / before:>7.2f}x")
+
+    print(f"合计: before {len(templates) * n / total_before:,.0f}/秒, "
+          f"after {len(templates) * n / total_after:,.0f}/秒, "
+          f"提升 {total_before / total_after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+基准测试公共工具
+
+模拟LLM客户端与对话系统构建在 tests/support/ 中，测试与基准测试共用
+"""
+import sys
+
+from utils.logger import logger
+
+
+def quiet_logs(level: str = "WARNING"):
+    """压低日志级别，避免日志I/O干扰计时"""
+    logger.remove()
+    logger.add(sys.stderr, level=level)
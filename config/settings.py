@@ -28,6 +28,20 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4"
 
+    # LLM网关配置
+    LLM_TIMEOUT: float = 15.0  # 单次调用总时限（秒，含重试）
+    LLM_CONNECT_TIMEOUT: float = 3.0
+    LLM_MAX_RETRIES: int = 2  # 超时/连接错误/429/5xx 的重试次数
+    LLM_RETRY_BASE_DELAY: float = 0.3  # 退避基数（秒），full jitter
+    LLM_MAX_CONNECTIONS: int = 20  # HTTP连接池上限
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # 连续失败多少次熔断
+    LLM_BREAKER_RECOVERY_SECONDS: float = 30.0  # 熔断后多久放行探测请求
+    LLM_HEDGE_ENABLED: bool = False  # 主provider慢时向备用provider发对冲请求（仅异步调用）
+    LLM_HEDGE_PROVIDER: str = "openai"  # 备用provider，需配置对应API Key
+    LLM_HEDGE_DELAY_MS: float = 0  # 对冲延迟；0 表示取主provider最近调用的p90
+    LLM_HEDGE_MIN_DELAY_MS: float = 300  # 对冲延迟下限
+    LLM_HEDGE_MAX_RATE: float = 0.1  # 最近调用中对冲请求的最大比例
+
     # # Anthropic配置（备用）
     # ANTHROPIC_API_KEY: Optional[str] = None
     # ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
@@ -38,6 +52,10 @@ class Settings(BaseSettings):
     DB_USER: str = "root"
     DB_PASSWORD: str = "password"
     DB_NAME: str = "telecom_chatbot"
+    DB_BACKEND: str = "mysql"  # mysql / sqlite（本地开发与离线基准测试）
+    SQLITE_PATH: str = ":memory:"  # SQLite数据库文件；:memory: 为内存库
+    DB_ASYNC_ENABLED: bool = False  # 异步对话链路通过异步引擎访问数据库（需要 aiomysql / aiosqlite）
+    DB_AUTO_MIGRATE: bool = True  # 启动时执行未执行的表结构迁移（database/migrate.py）；多实例部署时可关闭后手动执行
 
     # Redis配置
     REDIS_HOST: str = "localhost"
@@ -53,6 +71,49 @@ class Settings(BaseSettings):
     # 会话配置
     SESSION_TIMEOUT: int = 1800  # 30分钟
     MAX_CONTEXT_TURNS: int = 10
+    NLU_SESSION_BACKEND: str = "memory"  # memory / redis（多worker共享NLU上下文）
+    NLU_SESSION_MAX_SIZE: int = 10000  # 进程内NLU会话上限（LRU淘汰）
+
+    # NLU结果缓存（LLM阶段前，按规范化输入+上下文签名缓存）
+    NLU_CACHE_ENABLED: bool = True
+    NLU_CACHE_BACKEND: str = "memory"  # memory / redis（Redis作为二级缓存）
+    NLU_CACHE_TTL: int = 600
+    NLU_CACHE_MAX_SIZE: int = 5000
+
+    # 本地意图分类器（规则与LLM之间，python -m core.nlu.train_intent_classifier 训练）
+    NLU_CLASSIFIER_ENABLED: bool = True
+    NLU_CLASSIFIER_MODEL_PATH: str = "data/intent_classifier.npz"  # 相对项目根目录
+    NLU_CLASSIFIER_THRESHOLD: float = 0.85  # 置信度低于阈值交给LLM
+
+    # NLU Prompt预算（单次LLM调用输入token上限，超出时按优先级裁剪Prompt分节）
+    NLU_PROMPT_MAX_TOKENS: int = 2000
+    NLU_PROMPT_MESSAGE_RESERVE: int = 400  # 为消息预留，前缀分节只在其余预算内裁剪，不随输入长度变化
+
+    # NLG LLM输出缓存（按动作类型+意图+参数指纹，每个键保存多条变体）
+    NLG_LLM_CACHE_ENABLED: bool = True
+    NLG_LLM_CACHE_TTL: int = 1800
+    NLG_LLM_CACHE_MAX_SIZE: int = 2000
+    NLG_LLM_CACHE_VARIANTS: int = 3  # 攒满后随机复用，避免回复千篇一律
+
+    # NLG模板与LLM竞速（推荐/多套餐对比场景；仅异步生成）
+    NLG_RACE_ENABLED: bool = False  # LLM在预算内返回用LLM文本，否则立即返回模板（仅异步接口，同步接口按LLM生成）
+    NLG_RACE_BUDGET_MS: float = 1200  # 等待LLM的时间预算
+    NLG_RACE_WARM_CACHE: bool = True  # 超时的LLM调用继续在后台完成并写入LLM缓存
+
+    # 进程内套餐目录（t_packages 整表缓存，按价格/流量建索引）
+    PACKAGE_CATALOG_ENABLED: bool = True
+    PACKAGE_CATALOG_TTL: int = 300  # 到期后重新加载；0 表示只在 /api/catalog/reload 时加载
+
+    # 用户资料读穿缓存（按手机号，change_package 写入时失效）
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_BACKEND: str = "memory"  # memory / redis（Redis作为二级缓存）
+    USER_CACHE_TTL: int = 30  # 使用量/余额由计费系统更新，TTL保持很短
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # 单轮对话时间预算（NLU → DB → NLG 共用，预算不足时逐阶段降级）
+    CHAT_DEADLINE_MS: float = 8000  # 0 表示不限
+    NLU_LLM_MIN_BUDGET_MS: float = 1500  # 剩余预算低于此值时NLU跳过LLM（纯规则）
+    NLG_LLM_MIN_BUDGET_MS: float = 1000  # 剩余预算低于此值时NLG改用模板
 
     # 确认相关配置
     # 🔥 新增：确认相关配置（带类型注解）
@@ -63,10 +124,13 @@ class Settings(BaseSettings):
     # API配置
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    ADMIN_TOKEN: Optional[str] = None  # 管理接口（如 /api/catalog/reload）的 X-Admin-Token；未配置时管理接口禁用
 
     @property
     def database_url(self) -> str:
         """数据库连接URL"""
+        if self.DB_BACKEND == "sqlite":
+            return "sqlite://" if self.SQLITE_PATH == ":memory:" else f"sqlite:///{self.SQLITE_PATH}"
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
     @property
@@ -2,7 +2,9 @@
 第三阶段完整对话系统 - 整合Policy + NLG
 修复版：正确的确认流程
 """
-from typing import Dict, Any, Optional
+import asyncio
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Callable
 import uuid
 from datetime import datetime
 
@@ -11,9 +13,13 @@ from core.dst import DialogStateTracker, DialogState
 from core.policy import PolicyEngine, ActionType, Action
 from core.nlg import NLGGenerator
 from core.recommendation import RecommendationEngine
+from config import settings
 from executor.db_executor import DatabaseExecutor
+from utils.deadline import Deadline
 from utils.logger import logger
+from utils.metrics import metrics
 from utils.cache import ResponseCache
+from utils.async_utils import run_sync
 
 
 class TelecomChatbotPolicy:
@@ -29,16 +35,18 @@ class TelecomChatbotPolicy:
 
         # 第三阶段：Policy + NLG ⭐
         self.policy = PolicyEngine()
-        self.nlg = NLGGenerator()
+        # 性能优化：确定性NLG输出缓存
+        self.cache = ResponseCache(ttl=300, max_size=1000)
+        self.nlg = NLGGenerator(response_cache=self.cache)
 
         # 高级特性
         self.recommendation = RecommendationEngine()
 
         # 执行器
         self.db_executor = DatabaseExecutor()
-
-        # 性能优化：缓存
-        self.cache = ResponseCache(ttl=300, max_size=1000)
+        # 套餐目录变化时，依赖目录内容的NLG缓存失效
+        if self.db_executor.catalog is not None:
+            self.db_executor.catalog.add_listener(self._on_catalog_change)
 
         logger.info("=" * 60)
         logger.info("第三阶段对话系统初始化完成（Policy + NLG）")
@@ -49,17 +57,41 @@ class TelecomChatbotPolicy:
              session_id: Optional[str] = None,
              user_phone: Optional[str] = None) -> Dict[str, Any]:
         """
-        处理用户输入
+        处理用户输入（同步接口，内部复用 achat）
+
+        Args:
+            user_input: 用户输入文本
+            session_id: 会话ID（可选，自动生成）
+            user_phone: 用户手机号（可选）
+
+        Returns:
+            Dict: 响应字典
+        """
+        return run_sync(self.achat(user_input, session_id, user_phone))
+
+    async def achat(self,
+                    user_input: str,
+                    session_id: Optional[str] = None,
+                    user_phone: Optional[str] = None,
+                    on_chunk: Optional[Callable[[str], Awaitable[Any]]] = None) -> Dict[str, Any]:
+        """
+        处理用户输入（异步接口）
+
+        LLM调用走 AsyncOpenAI，状态读写走 redis.asyncio，数据库查询走异步引擎
+        （DB_ASYNC_ENABLED 未开启时放到线程池执行），全程不阻塞事件循环。每轮对话有一个总时间预算（CHAT_DEADLINE_MS），依次传给
+        NLU → DB → NLG，预算不足时逐阶段降级，触发的降级写入 metadata.degradations
 
         Args:
             user_input: 用户输入文本
             session_id: 会话ID（可选，自动生成）
             user_phone: 用户手机号（可选）
+            on_chunk: 流式回调，NLG走LLM时逐段接收增量文本（见 astream_chat）
 
         Returns:
             Dict: 响应字典
         """
         start_time = datetime.now()
+        deadline = self._new_deadline()
 
         # 生成会话ID
         if not session_id:
@@ -72,7 +104,7 @@ class TelecomChatbotPolicy:
         try:
             # ========== 阶段0: 检查是否是确认响应 ⭐ ==========
             # 先加载状态，检查是否有待确认的操作
-            current_state = self.dst.get_state(session_id)
+            current_state = await self.dst.aget_state(session_id)
 
             logger.info(f"【阶段0】检查状态: pending_confirmation={current_state.pending_confirmation}")
 
@@ -81,10 +113,12 @@ class TelecomChatbotPolicy:
             if self._is_confirmation_word(user_input) or self._is_cancellation_word(user_input):
                 if current_state.pending_confirmation:
                     logger.info("【阶段0】检测到待确认状态，处理确认响应...")
-                    confirmation_result = self._handle_confirmation_response(
+                    confirmation_result = await self._handle_confirmation_response(
                         user_input,
                         session_id,
-                        current_state
+                        current_state,
+                        deadline,
+                        on_chunk
                     )
                     if confirmation_result:
                         return confirmation_result
@@ -115,13 +149,13 @@ class TelecomChatbotPolicy:
 
             # ========== 阶段1: NLU理解 ==========
             logger.info("【阶段1】NLU理解...")
-            nlu_result = self.nlu.understand(user_input, session_id, user_phone)
+            nlu_result = await self.nlu.aunderstand(user_input, session_id, user_phone, deadline=deadline)
             nlu_result.raw_input = user_input
             logger.info(f"✓ NLU完成: intent={nlu_result.intent}")
 
             # ========== 阶段2: DST状态跟踪 ==========
             logger.info("【阶段2】DST状态跟踪...")
-            dialog_state = self.dst.track(session_id, nlu_result)
+            dialog_state = await self.dst.atrack(session_id, nlu_result)
             logger.info(f"✓ DST完成: turn={dialog_state.turn_count}, "
                         f"needs_clarification={dialog_state.needs_clarification}")
 
@@ -147,7 +181,7 @@ class TelecomChatbotPolicy:
                 )
 
                 # 🔥 关键：这里必须保存状态
-                self.dst.state_store.save(session_id, dialog_state)
+                await self.dst.state_store.asave(session_id, dialog_state)
 
                 logger.info(f"【确认状态已保存】pending={dialog_state.pending_confirmation}, "
                             f"intent={dialog_state.confirmation_intent}")
@@ -155,9 +189,10 @@ class TelecomChatbotPolicy:
             elif not dialog_state.needs_clarification and dialog_state.current_intent:
                 # 🔥 不需要确认：执行业务
                 logger.info("【阶段3b】执行业务...")
-                exec_result = self.db_executor.execute_function(
+                exec_result = await self.db_executor.aexecute_function(
                     dialog_state.current_intent,
-                    dialog_state.slots
+                    dialog_state.slots,
+                    deadline=deadline
                 )
 
                 # 如果是查询套餐，生成推荐
@@ -178,7 +213,7 @@ class TelecomChatbotPolicy:
 
             # ========== 阶段3c: NLG生成 ⭐ ==========
             logger.info("【阶段3c】NLG生成回复...")
-            response_text = self.nlg.generate(action, dialog_state)
+            response_text = await self.nlg.agenerate(action, dialog_state, deadline, on_chunk)
 
             # 🔥 可选：如果新意图执行成功，但还有未完成的待确认操作，友好提醒
             if (action.action_type == ActionType.INFORM and
@@ -195,7 +230,7 @@ class TelecomChatbotPolicy:
             # ========== 阶段4: 更新状态 ==========
             logger.info(f"✓ 更新状态")
             dialog_state.add_turn('assistant', response_text)
-            self.dst.state_store.save(session_id, dialog_state)
+            await self.dst.state_store.asave(session_id, dialog_state)
 
             # ========== 构建响应 ==========
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -215,10 +250,13 @@ class TelecomChatbotPolicy:
                 },
                 "metadata": {
                     "execution_time_ms": round(execution_time, 2),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": datetime.now().isoformat(),
+                    "degradations": self._degradations(deadline)
                 }
             }
 
+            if on_chunk is None:
+                metrics.histogram("chat_ttfb_ms", mode="blocking").observe(execution_time)
             logger.info(f"✓ 对话完成，耗时: {execution_time:.0f}ms")
             logger.info(f"{'=' * 60}\n")
 
@@ -235,10 +273,55 @@ class TelecomChatbotPolicy:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def _handle_confirmation_response(self,
+    async def astream_chat(self,
+                           user_input: str,
+                           session_id: Optional[str] = None,
+                           user_phone: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        处理用户输入（流式接口）
+
+        与 achat 共用同一管道：NLG走LLM时逐段产出 {"type": "chunk", "content": 增量文本}，
+        最后产出 {"type": "final", "result": 完整响应}。片段未经后处理，最终文本以 final 为准；
+        模板回复没有片段，只有 final
+
+        Args:
+            user_input: 用户输入文本
+            session_id: 会话ID（可选，自动生成）
+            user_phone: 用户手机号（可选）
+
+        Yields:
+            Dict: chunk / final 事件
+        """
+        start = time.perf_counter()
+        chunks: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.achat(user_input, session_id, user_phone, on_chunk=chunks.put))
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        first_byte = True
+        try:
+            while True:
+                delta = await chunks.get()
+                if delta is None:
+                    break
+                if first_byte:
+                    first_byte = False
+                    metrics.histogram("chat_ttfb_ms", mode="stream").observe((time.perf_counter() - start) * 1000)
+                yield {"type": "chunk", "content": delta}
+        finally:
+            # 调用方提前退出（如连接断开）时取消管道
+            if not task.done():
+                task.cancel()
+
+        if first_byte:
+            metrics.histogram("chat_ttfb_ms", mode="stream").observe((time.perf_counter() - start) * 1000)
+        yield {"type": "final", "result": task.result()}
+
+    async def _handle_confirmation_response(self,
                                       user_input: str,
                                       session_id: str,
-                                      dialog_state: DialogState) -> Optional[Dict]:
+                                      dialog_state: DialogState,
+                                      deadline: Optional[Deadline] = None,
+                                      on_chunk: Optional[Callable[[str], Awaitable[Any]]] = None) -> Optional[Dict]:
         """
         处理确认响应（增强版）
 
@@ -246,6 +329,8 @@ class TelecomChatbotPolicy:
             user_input: 用户输入
             session_id: 会话ID
             dialog_state: 对话状态
+            deadline: 请求时间预算
+            on_chunk: 流式回调
 
         Returns:
             Optional[Dict]: 如果是确认响应，返回处理结果；否则返回None
@@ -280,10 +365,11 @@ class TelecomChatbotPolicy:
             logger.info(f"【确认处理】待确认意图: {dialog_state.confirmation_intent}")
             logger.info(f"【确认处理】待确认参数: {dialog_state.confirmation_slots}")
 
-            # 执行待确认的业务
-            exec_result = self.db_executor.execute_function(
+            # 执行待确认的业务（带幂等键：重复确认只办理一次）
+            exec_result = await self.db_executor.aexecute_function(
                 dialog_state.confirmation_intent,
-                dialog_state.confirmation_slots
+                {**dialog_state.confirmation_slots, "idempotency_key": dialog_state.confirmation_key()},
+                deadline=deadline
             )
 
             # 清除待确认状态
@@ -298,18 +384,18 @@ class TelecomChatbotPolicy:
                     intent=confirmed_intent,
                     parameters=exec_result
                 )
-                response_text = self.nlg.generate(action, dialog_state)
+                response_text = await self.nlg.agenerate(action, dialog_state, deadline, on_chunk)
             else:
                 action = Action(
                     action_type=ActionType.APOLOGIZE,
                     intent=confirmed_intent,
                     parameters=exec_result or {"error": "执行失败"}
                 )
-                response_text = self.nlg.generate(action, dialog_state)
+                response_text = await self.nlg.agenerate(action, dialog_state, deadline, on_chunk)
 
             # 更新状态
             dialog_state.add_turn('assistant', response_text)
-            self.dst.state_store.save(session_id, dialog_state)
+            await self.dst.state_store.asave(session_id, dialog_state)
 
             return {
                 "session_id": session_id,
@@ -326,7 +412,8 @@ class TelecomChatbotPolicy:
                 },
                 "metadata": {
                     "execution_time_ms": 0,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": datetime.now().isoformat(),
+                    "degradations": self._degradations(deadline)
                 }
             }
 
@@ -340,7 +427,7 @@ class TelecomChatbotPolicy:
             # 更新状态
             response_text = "已取消操作。还有什么可以帮您的吗？"
             dialog_state.add_turn('assistant', response_text)
-            self.dst.state_store.save(session_id, dialog_state)
+            await self.dst.state_store.asave(session_id, dialog_state)
 
             return {
                 "session_id": session_id,
@@ -496,19 +583,63 @@ class TelecomChatbotPolicy:
 
         return False
 
+    @staticmethod
+    def _new_deadline() -> Optional[Deadline]:
+        """本轮对话的时间预算（CHAT_DEADLINE_MS 为0时不限）"""
+        if settings.CHAT_DEADLINE_MS <= 0:
+            return None
+        return Deadline(settings.CHAT_DEADLINE_MS / 1000)
+
+    @staticmethod
+    def _degradations(deadline: Optional[Deadline]) -> list:
+        """本轮触发的降级（写入响应 metadata）"""
+        return list(deadline.degradations) if deadline is not None else []
+
     def get_session_state(self, session_id: str) -> Dict:
         """获取会话状态（用于调试）"""
         state = self.dst.get_state(session_id)
         return state.to_dict()
 
+    async def aget_session_state(self, session_id: str) -> Dict:
+        """获取会话状态（异步版本）"""
+        state = await self.dst.aget_state(session_id)
+        return state.to_dict()
+
     def reset_session(self, session_id: str):
         """重置会话"""
         self.dst.reset_state(session_id)
         logger.info(f"重置会话: {session_id}")
 
+    async def areset_session(self, session_id: str):
+        """重置会话（异步版本）"""
+        await self.dst.areset_state(session_id)
+        logger.info(f"重置会话: {session_id}")
+
     def get_cache_stats(self) -> dict:
-        """获取缓存统计"""
-        return self.cache.stats()
+        """获取缓存统计（NLG响应缓存；启用时附带用户资料缓存）"""
+        stats = self.cache.stats()
+        if self.db_executor.user_cache is not None:
+            stats["user_profile"] = self.db_executor.user_cache.stats()
+        return stats
+
+    def reload_catalog(self) -> dict:
+        """
+        重新加载套餐目录（内容变化时NLG缓存随之失效）
+
+        Returns:
+            dict: 目录统计
+        """
+        catalog = self.db_executor.catalog
+        if catalog is None:
+            return {"enabled": False}
+        catalog.reload()
+        return {"enabled": True, **catalog.stats()}
+
+    def _on_catalog_change(self):
+        """套餐目录变化：清空模板响应缓存与NLG LLM缓存"""
+        self.cache.clear()
+        if self.nlg.llm_cache is not None:
+            self.nlg.llm_cache.invalidate_catalog()
 
     def _get_pending_description(self, intent: str) -> str:
         """获取待确认操作的描述"""
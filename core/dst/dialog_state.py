@@ -1,6 +1,8 @@
 """
 对话状态数据结构
 """
+import hashlib
+import json
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
@@ -140,6 +142,27 @@ class DialogState:
         self.confirmation_timestamp = datetime.now()  # 🆕 记录时间
         self.updated_at = datetime.now()
 
+    def confirmation_key(self) -> Optional[str]:
+        """
+        待确认操作的幂等键
+
+        同一次确认（会话 + 意图 + 参数 + 发起时间）的键相同，重复回复"确认"或请求重试时
+        执行器据此只办理一次；重新发起的确认时间不同，键也不同
+
+        Returns:
+            str: 幂等键；没有待确认操作时返回None
+        """
+        if not self.pending_confirmation:
+            return None
+        timestamp = self.confirmation_timestamp
+        raw = json.dumps([
+            self.session_id,
+            self.confirmation_intent,
+            self.confirmation_slots,
+            timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+        ], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
     def clear_pending_confirmation(self):
         """清除待确认状态"""
         self.pending_confirmation = False
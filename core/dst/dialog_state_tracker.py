@@ -42,6 +42,52 @@ class DialogStateTracker:
         # 1. 加载旧状态
         old_state = self.state_store.load(session_id)
 
+        new_state = self._update_state(session_id, old_state, nlu_result)
+
+        # 11. 保存状态
+        self.state_store.save(session_id, new_state)
+
+        logger.info(f"[DST] 状态跟踪完成: turn={new_state.turn_count}, "
+                    f"需要澄清={new_state.needs_clarification}, "
+                    f"待确认={new_state.pending_confirmation}")
+
+        return new_state
+
+    async def atrack(self, session_id: str, nlu_result) -> DialogState:
+        """
+        跟踪对话状态（异步版本，状态读写走 redis.asyncio）
+
+        Args:
+            session_id: 会话ID
+            nlu_result: NLU解析结果
+
+        Returns:
+            更新后的对话状态
+        """
+        logger.info(f"[DST] 开始跟踪会话(async): {session_id}")
+
+        old_state = await self.state_store.aload(session_id)
+        new_state = self._update_state(session_id, old_state, nlu_result)
+        await self.state_store.asave(session_id, new_state)
+
+        logger.info(f"[DST] 状态跟踪完成: turn={new_state.turn_count}, "
+                    f"需要澄清={new_state.needs_clarification}, "
+                    f"待确认={new_state.pending_confirmation}")
+
+        return new_state
+
+    def _update_state(self, session_id: str, old_state: DialogState, nlu_result) -> DialogState:
+        """
+        根据NLU结果由旧状态推导新状态（纯内存计算，同步/异步共用）
+
+        Args:
+            session_id: 会话ID
+            old_state: 已加载的旧状态
+            nlu_result: NLU解析结果
+
+        Returns:
+            新状态
+        """
         # 2. 检查是否过期
         if self.state_manager.is_state_expired(old_state):
             logger.info(f"会话已过期，重新初始化: {session_id}")
@@ -131,13 +177,6 @@ class DialogStateTracker:
         if not self.state_manager.validate_state(new_state):
             logger.error(f"状态验证失败: {session_id}")
 
-        # 11. 保存状态
-        self.state_store.save(session_id, new_state)
-
-        logger.info(f"[DST] 状态跟踪完成: turn={new_state.turn_count}, "
-                    f"需要澄清={new_state.needs_clarification}, "
-                    f"待确认={new_state.pending_confirmation}")
-
         return new_state
 
     def _should_clear_pending_confirmation(self,
@@ -222,6 +261,10 @@ class DialogStateTracker:
         """
         return self.state_store.load(session_id)
 
+    async def aget_state(self, session_id: str) -> DialogState:
+        """获取对话状态（异步版本）"""
+        return await self.state_store.aload(session_id)
+
     def reset_state(self, session_id: str):
         """
         重置对话状态
@@ -232,6 +275,11 @@ class DialogStateTracker:
         self.state_store.delete(session_id)
         logger.info(f"重置会话状态: {session_id}")
 
+    async def areset_state(self, session_id: str):
+        """重置对话状态（异步版本）"""
+        await self.state_store.adelete(session_id)
+        logger.info(f"重置会话状态: {session_id}")
+
     def update_user_info(self, session_id: str, phone: Optional[str] = None,
                          name: Optional[str] = None):
         """
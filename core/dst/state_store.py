@@ -14,17 +14,17 @@ class StateStore:
 
     def __init__(self):
         """初始化"""
+        # 内存存储：Redis不可用或运行中降级时使用
+        self.memory_store = {}
         try:
             self.redis = redis_manager.get_client()
             self.use_redis = redis_manager.test_connection()
 
             if not self.use_redis:
                 logger.warning("Redis不可用，降级到内存存储")
-                self.memory_store = {}
         except Exception as e:
             logger.error(f"Redis初始化失败: {e}, 使用内存存储")
             self.use_redis = False
-            self.memory_store = {}
 
         self.ttl = settings.SESSION_TIMEOUT  # 默认30分钟
 
@@ -48,14 +48,21 @@ class StateStore:
 
     def _save_to_redis(self, session_id: str, state: DialogState):
         """保存到Redis"""
+        # 使用Pipeline提高性能
+        pipe = self.redis.pipeline()
+        self._queue_save(pipe, session_id, state)
+        pipe.execute()
+
+        logger.debug(f"状态已保存到Redis: {session_id}")
+
+    def _queue_save(self, pipe, session_id: str, state: DialogState):
+        """将保存命令写入Pipeline（同步/异步Pipeline共用）"""
         key = f"session:{session_id}:state"
 
         # 序列化状态
         state_dict = state.to_dict()
         state_json = json.dumps(state_dict, ensure_ascii=False, default=str)
 
-        # 使用Pipeline提高性能
-        pipe = self.redis.pipeline()
         pipe.set(key, state_json)
         pipe.expire(key, self.ttl)
 
@@ -65,10 +72,6 @@ class StateStore:
             pipe.sadd(user_key, session_id)
             pipe.expire(user_key, 604800)  # 7天
 
-        pipe.execute()
-
-        logger.debug(f"状态已保存到Redis: {session_id}")
-
     def _save_to_memory(self, session_id: str, state: DialogState):
         """保存到内存"""
         self.memory_store[session_id] = state
@@ -97,7 +100,10 @@ class StateStore:
         """从Redis加载"""
         key = f"session:{session_id}:state"
         data = self.redis.get(key)
+        return self._deserialize(session_id, data)
 
+    def _deserialize(self, session_id: str, data) -> DialogState:
+        """反序列化Redis中的状态"""
         if not data:
             logger.debug(f"Redis中不存在会话: {session_id}, 返回新状态")
             return DialogState(session_id=session_id)
@@ -159,4 +165,69 @@ class StateStore:
             return list(sessions)
         except Exception as e:
             logger.error(f"获取用户会话列表失败: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    # ========== 异步接口（redis.asyncio）==========
+
+    @property
+    def async_redis(self):
+        """当前事件循环对应的异步Redis客户端"""
+        return redis_manager.get_async_client()
+
+    async def asave(self, session_id: str, state: DialogState):
+        """
+        保存状态（异步版本）
+
+        Args:
+            session_id: 会话ID
+            state: 对话状态
+        """
+        if self.use_redis:
+            try:
+                pipe = self.async_redis.pipeline()
+                self._queue_save(pipe, session_id, state)
+                await pipe.execute()
+                logger.debug(f"状态已保存到Redis: {session_id}")
+                return
+            except Exception as e:
+                logger.error(f"保存到Redis失败: {e}, 降级到内存")
+                self.use_redis = False
+
+        self._save_to_memory(session_id, state)
+
+    async def aload(self, session_id: str) -> DialogState:
+        """
+        加载状态（异步版本）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            对话状态，如果不存在则返回新状态
+        """
+        if self.use_redis:
+            try:
+                data = await self.async_redis.get(f"session:{session_id}:state")
+                return self._deserialize(session_id, data)
+            except Exception as e:
+                logger.error(f"从Redis加载失败: {e}")
+
+        return self._load_from_memory(session_id)
+
+    async def adelete(self, session_id: str):
+        """
+        删除状态（异步版本）
+
+        Args:
+            session_id: 会话ID
+        """
+        if self.use_redis:
+            try:
+                await self.async_redis.delete(f"session:{session_id}:state")
+                logger.info(f"从Redis删除会话: {session_id}")
+            except Exception as e:
+                logger.error(f"从Redis删除失败: {e}")
+
+        if session_id in self.memory_store:
+            del self.memory_store[session_id]
+            logger.info(f"从内存删除会话: {session_id}")
@@ -0,0 +1,21 @@
+"""
+LLM接入模块
+NLU/NLG共享的LLM网关：连接池、超时重试、请求合并、熔断、对冲
+"""
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .gateway import LLMGateway, LLMProvider, RETRYABLE_ERRORS
+from .hedging import HedgeBudget
+
+# 全局LLM网关实例
+llm_gateway = LLMGateway()
+
+__all__ = [
+    'LLMGateway',
+    'LLMProvider',
+    'llm_gateway',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'RETRYABLE_ERRORS',
+    'HedgeBudget',
+]
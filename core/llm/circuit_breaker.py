@@ -0,0 +1,114 @@
+"""
+熔断器
+
+closed（正常） → 连续失败达到阈值 → open（拒绝调用） → 冷却结束 → half_open（放行一次探测）
+探测成功回到 closed，失败重新 open；探测既不成功也不失败（参数错误、被取消、流被提前关闭）时
+只释放探测名额，状态仍为 half_open，下一个调用继续探测。
+"""
+import threading
+import time
+
+from utils import logger, metrics
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开，调用被拒绝"""
+
+
+class CircuitBreaker:
+    """连续失败计数熔断器（线程安全）"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # 仪表盘数值：0=closed 1=half_open 2=open
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Args:
+            name: 名称（用作指标标签）
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多久（秒）允许探测
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self._gauge = metrics.gauge("llm_circuit_state", breaker=name)
+        self._gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        """当前状态（open 冷却结束后视为 half_open）"""
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def available(self) -> bool:
+        """是否允许调用（open 时为 False）"""
+        return self.state != self.OPEN
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._set_state(self.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning(f"[熔断器:{self.name}] {self._state} → {state}")
+            metrics.counter("llm_circuit_transitions_total", breaker=self.name, to=state).inc()
+        self._state = state
+        self._gauge.set(self._STATE_VALUES[state])
+
+    def before_call(self) -> bool:
+        """
+        调用前检查
+
+        Returns:
+            bool: 本次调用是否为半开状态下的探测（是则调用方必须以 record_success / record_failure /
+            release_probe 之一结束）
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下已有探测请求在途
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                raise CircuitOpenError(f"{self.name} 熔断中")
+            if state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(f"{self.name} 熔断探测中")
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def release_probe(self):
+        """探测没有结果（不可重试错误、被取消、流被提前关闭）：释放探测名额，不改变状态"""
+        with self._lock:
+            self._probing = False
+
+    def reset(self):
+        """重置为 closed"""
+        self.record_success()
@@ -0,0 +1,436 @@
+"""
+LLM网关
+
+进程内所有NLU/NLG实例共享：
+- 一个带连接池上限的同步客户端 + 每个事件循环一个异步客户端
+- 单次调用总时限（含重试），超时/连接错误/429/5xx 按抖动指数退避重试
+- 相同在途请求合并（single-flight）
+- 熔断器：上游持续失败时拒绝调用，NLU降级为纯规则、NLG降级为纯模板
+- 对冲（可选，仅异步调用）：主provider超过对冲延迟未返回时，向备用provider发出同一请求，
+  先成功者胜出、另一方被取消；对冲比例受上限约束
+- 流式调用：逐段返回增量文本，记录首字节耗时；已发出的片段无法撤回，因此不做合并、重试与对冲
+"""
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+import openai
+from openai import OpenAI, AsyncOpenAI
+
+from config import settings
+from utils import logger, metrics, LoopLocal, llm_singleflight
+from .circuit_breaker import CircuitBreaker
+from .hedging import HedgeBudget, hedge_delay_ms
+
+# 可重试的上游错误
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMProvider:
+    """一个上游provider：带连接池上限的同步客户端 + 每个事件循环一个异步客户端"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: deepseek / openai
+        """
+        self.name = name
+        if name == "deepseek":
+            self.model = settings.DEEPSEEK_MODEL
+            self.api_key = settings.DEEPSEEK_API_KEY
+            client_params = {"api_key": settings.DEEPSEEK_API_KEY, "base_url": settings.DEEPSEEK_BASE_URL}
+        else:
+            self.model = settings.OPENAI_MODEL
+            self.api_key = settings.OPENAI_API_KEY
+            client_params = {"api_key": settings.OPENAI_API_KEY}
+
+        timeout = httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT)
+        limits = httpx.Limits(max_connections=settings.LLM_MAX_CONNECTIONS,
+                              max_keepalive_connections=settings.LLM_MAX_CONNECTIONS)
+
+        # 重试由网关统一处理，关闭SDK内置重试
+        self.client = OpenAI(
+            **client_params, max_retries=0, timeout=timeout,
+            http_client=httpx.Client(limits=limits, timeout=timeout)
+        )
+        # 异步客户端的连接与事件循环绑定，每个循环一份
+        self.async_clients = LoopLocal(lambda: AsyncOpenAI(
+            **client_params, max_retries=0, timeout=timeout,
+            http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+        ))
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """当前事件循环对应的异步客户端"""
+        return self.async_clients.get()
+
+
+class LLMGateway:
+    """LLM网关 - 单例模式"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        """初始化客户端与熔断器"""
+        self.provider = settings.LLM_PROVIDER
+        self.primary = LLMProvider(self.provider)
+        self.model = self.primary.model
+        self.client = self.primary.client
+        self.async_clients = self.primary.async_clients
+
+        self.timeout = settings.LLM_TIMEOUT
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.retry_base_delay = settings.LLM_RETRY_BASE_DELAY
+
+        self.breaker = CircuitBreaker(
+            self.provider,
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY_SECONDS
+        )
+
+        # 对冲：备用provider与主provider相同或未配置API Key时不启用
+        self.secondary = None
+        self.hedge_breaker = None
+        self.hedge_delay_ms = settings.LLM_HEDGE_DELAY_MS
+        self.hedge_min_delay_ms = settings.LLM_HEDGE_MIN_DELAY_MS
+        self.hedge_budget = HedgeBudget(settings.LLM_HEDGE_MAX_RATE)
+        if settings.LLM_HEDGE_ENABLED and settings.LLM_HEDGE_PROVIDER != self.provider:
+            secondary = LLMProvider(settings.LLM_HEDGE_PROVIDER)
+            if secondary.api_key:
+                self.enable_hedging(secondary)
+            else:
+                logger.warning(f"对冲provider {secondary.name} 未配置API Key，不启用对冲")
+
+        logger.info(f"LLM网关初始化: {self.provider} ({self.model}), "
+                    f"timeout={self.timeout}s, retries={self.max_retries}, "
+                    f"pool={settings.LLM_MAX_CONNECTIONS}, "
+                    f"hedge={self.secondary.name if self.secondary else 'off'}")
+
+    def enable_hedging(self, secondary: LLMProvider):
+        """
+        启用对冲
+
+        Args:
+            secondary: 备用provider（需提供 name / model / async_client）
+        """
+        self.secondary = secondary
+        self.hedge_breaker = CircuitBreaker(
+            secondary.name,
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY_SECONDS
+        )
+
+    def disable_hedging(self):
+        """关闭对冲"""
+        self.secondary = None
+        self.hedge_breaker = None
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """当前事件循环对应的异步客户端"""
+        return self.primary.async_client
+
+    @property
+    def available(self) -> bool:
+        """上游是否可用（熔断器未打开）"""
+        return self.breaker.available
+
+    # ========== 调用 ==========
+
+    def call(self, request: Dict[str, Any], fn: Callable[..., Any], caller: str = "",
+             timeout: Optional[float] = None) -> Any:
+        """
+        同步调用
+
+        Args:
+            request: chat.completions.create 参数（用于请求合并）
+            fn: 实际调用，接收本次尝试的 timeout 关键字参数
+            caller: 调用方标签（指标用）
+            timeout: 调用方剩余时间预算（秒），与 LLM_TIMEOUT 取较小值
+
+        Raises:
+            CircuitOpenError: 熔断中
+            TimeoutError: 等待在途的相同请求超过时间预算
+        """
+        return llm_singleflight.call(request, lambda: self._call_with_retry(fn, caller, timeout), caller=caller,
+                                     timeout=self._budget(timeout))
+
+    async def acall(self, request: Dict[str, Any], fn: Callable[..., Awaitable[Any]], caller: str = "",
+                    timeout: Optional[float] = None) -> Any:
+        """
+        异步调用（启用对冲时，每次尝试都可能向备用provider发出同一请求）
+
+        Args:
+            request: chat.completions.create 参数（用于请求合并与对冲）
+            fn: 返回协程的实际调用，接收本次尝试的 timeout 关键字参数
+            caller: 调用方标签（指标用）
+            timeout: 调用方剩余时间预算（秒），与 LLM_TIMEOUT 取较小值
+
+        Raises:
+            CircuitOpenError: 熔断中
+            TimeoutError: 等待在途的相同请求超过时间预算
+        """
+        return await llm_singleflight.acall(request, lambda: self._acall_with_retry(request, fn, caller, timeout),
+                                            caller=caller, timeout=self._budget(timeout))
+
+    async def astream(self, request: Dict[str, Any], fn: Callable[..., Awaitable[Any]], caller: str = "",
+                      timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        流式调用（异步生成器，逐段产出增量文本）
+
+        Args:
+            request: chat.completions.create 参数（需包含 stream=True）
+            fn: 返回协程的实际调用，接收 timeout 关键字参数，协程结果为异步可迭代的chunk流
+            caller: 调用方标签（指标用）
+            timeout: 调用方剩余时间预算（秒），与 LLM_TIMEOUT 取较小值
+
+        Raises:
+            CircuitOpenError: 熔断中
+        """
+        probe = self.breaker.before_call()
+        start = time.perf_counter()
+        first_chunk = True
+        try:
+            stream = await fn(timeout=max(self._deadline(timeout) - time.monotonic(), 0.001))
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_chunk:
+                    first_chunk = False
+                    metrics.histogram("llm_ttfb_ms", caller=caller).observe((time.perf_counter() - start) * 1000)
+                yield delta
+        except RETRYABLE_ERRORS as e:
+            self.breaker.record_failure()
+            metrics.counter("llm_requests_total", caller=caller, outcome="failure").inc()
+            logger.error(f"[LLM网关] {caller} 流式调用失败: {e}")
+            raise
+        except Exception as e:
+            self._on_error(e, caller, probe)
+            raise
+        except BaseException:
+            # 调用方取消或提前关闭流（GeneratorExit）
+            self._release(probe)
+            raise
+        self._on_success(caller, start, None)
+
+    def _budget(self, timeout: Optional[float]) -> float:
+        """本次调用（含重试）的时间预算：调用方剩余预算与 LLM_TIMEOUT 取较小值"""
+        return self.timeout if timeout is None else min(self.timeout, timeout)
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        """本次调用（含重试）的截止时刻"""
+        return time.monotonic() + self._budget(timeout)
+
+    def _call_with_retry(self, fn: Callable[..., Any], caller: str, timeout: Optional[float] = None) -> Any:
+        deadline = self._deadline(timeout)
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                result = fn(timeout=max(deadline - time.monotonic(), 0.001))
+                self._observe_provider(self.primary.name, start)
+            except RETRYABLE_ERRORS as e:
+                delay = self._on_failure(e, caller, attempt, start, deadline)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self._on_error(e, caller, probe)
+                raise
+            except BaseException:
+                self._release(probe)
+                raise
+            self._on_success(caller, start, result)
+            return result
+
+    async def _acall_with_retry(self, request: Dict[str, Any], fn: Callable[..., Awaitable[Any]],
+                                caller: str, timeout: Optional[float] = None) -> Any:
+        deadline = self._deadline(timeout)
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                result, breaker = await self._attempt(request, fn, caller, max(deadline - time.monotonic(), 0.001))
+            except RETRYABLE_ERRORS as e:
+                delay = self._on_failure(e, caller, attempt, start, deadline)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self._on_error(e, caller, probe)
+                raise
+            except BaseException:
+                # 调用方取消（客户端断开、NLG竞速落败等）
+                self._release(probe)
+                raise
+            self._on_success(caller, start, result, breaker)
+            return result
+
+    # ========== 对冲 ==========
+
+    async def _attempt(self, request: Dict[str, Any], fn: Callable[..., Awaitable[Any]],
+                       caller: str, timeout: float):
+        """
+        一次异步尝试
+
+        主provider超过对冲延迟未返回时向备用provider发出同一请求，先成功者胜出、另一方被取消；
+        一方失败时等待另一方，两方都失败时抛出主provider的错误（交给重试逻辑）
+
+        Returns:
+            tuple: (响应, 胜出方的熔断器)
+        """
+        primary = asyncio.ensure_future(self._timed(self.primary.name, fn(timeout=timeout)))
+        hedge = None
+        try:
+            if self.secondary is None:
+                return await primary, self.breaker
+            self.hedge_budget.record_call()
+            # 半开状态的探测请求只走主provider，探测结果不被对冲掩盖
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                return await primary, self.breaker
+
+            delay = hedge_delay_ms(self.primary.name, self.hedge_delay_ms, self.hedge_min_delay_ms) / 1000
+            done, _ = await asyncio.wait({primary}, timeout=min(delay, timeout))
+            if done:
+                return primary.result(), self.breaker
+            if not self.hedge_breaker.available:
+                metrics.counter("llm_hedge_skipped_total", reason="secondary_open").inc()
+                return await primary, self.breaker
+            if not self.hedge_budget.try_acquire():
+                metrics.counter("llm_hedge_skipped_total", reason="rate_cap").inc()
+                return await primary, self.breaker
+
+            secondary = self.secondary
+            logger.info(f"[LLM网关] {caller} {self.primary.name} {delay * 1000:.0f}ms未返回，对冲到 {secondary.name}")
+            hedge = asyncio.ensure_future(self._timed(secondary.name, secondary.async_client.chat.completions.create(
+                **{**request, "model": secondary.model}, timeout=max(timeout - delay, 0.001)
+            )))
+            return await self._race(primary, hedge, caller)
+        finally:
+            # 取消落败方（以及调用方被取消时的在途请求）
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _race(self, primary: asyncio.Future, hedge: asyncio.Future, caller: str):
+        pending = {primary, hedge}
+        primary_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    winner = "secondary" if task is hedge else "primary"
+                    metrics.counter("llm_hedges_total", caller=caller, winner=winner).inc()
+                    if task is primary:
+                        return task.result(), self.breaker
+                    # 对冲胜出：主provider的可重试错误照常计入熔断
+                    if isinstance(primary_error, RETRYABLE_ERRORS):
+                        self.breaker.record_failure()
+                    return task.result(), self.hedge_breaker
+                if task is primary:
+                    primary_error = error
+                else:
+                    self.hedge_breaker.record_failure()
+                    logger.warning(f"[LLM网关] {caller} 对冲请求失败: {error}")
+
+        metrics.counter("llm_hedges_total", caller=caller, winner="none").inc()
+        raise primary_error
+
+    @staticmethod
+    def _observe_provider(provider: str, start: float):
+        metrics.histogram("llm_provider_latency_ms", provider=provider).observe((time.perf_counter() - start) * 1000)
+
+    async def _timed(self, provider: str, coro: Awaitable[Any]) -> Any:
+        """
+        等待上游响应并记录该provider的耗时
+
+        只记录完成（返回或报错）的调用：对冲中被取消的一方只等到了对冲胜出为止，
+        计入会拉低p90，进而让对冲延迟越来越短
+        """
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except Exception:
+            self._observe_provider(provider, start)
+            raise
+        self._observe_provider(provider, start)
+        return result
+
+    # ========== 结果记录 ==========
+
+    def _on_success(self, caller: str, start: float, result: Any, breaker: CircuitBreaker = None):
+        (breaker or self.breaker).record_success()
+        metrics.histogram("llm_latency_ms", caller=caller).observe((time.perf_counter() - start) * 1000)
+        metrics.counter("llm_requests_total", caller=caller, outcome="success").inc()
+        self._record_prompt_cache(caller, getattr(result, "usage", None))
+
+    @staticmethod
+    def _record_prompt_cache(caller: str, usage):
+        """
+        记录服务端前缀缓存命中的token数（上游返回时）
+
+        DeepSeek: usage.prompt_cache_hit_tokens / prompt_cache_miss_tokens；
+        OpenAI: usage.prompt_tokens_details.cached_tokens
+        """
+        if usage is None:
+            return
+        hit = getattr(usage, "prompt_cache_hit_tokens", None)
+        miss = getattr(usage, "prompt_cache_miss_tokens", None)
+        if hit is None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            hit = getattr(details, "cached_tokens", None)
+            if hit is not None and getattr(usage, "prompt_tokens", None) is not None:
+                miss = usage.prompt_tokens - hit
+        if hit is None:
+            return
+
+        metrics.counter("llm_prompt_cache_hit_tokens_total", caller=caller).inc(hit)
+        if miss is not None:
+            metrics.counter("llm_prompt_cache_miss_tokens_total", caller=caller).inc(miss)
+
+    def _on_error(self, error: Exception, caller: str, probe: bool = False):
+        """不可重试的错误（参数错误、鉴权失败等）：不计入熔断"""
+        self._release(probe)
+        metrics.counter("llm_requests_total", caller=caller, outcome="error").inc()
+        logger.error(f"[LLM网关] {caller} 调用失败: {error}")
+
+    def _release(self, probe: bool):
+        """探测没有成功/失败结果时释放探测名额，否则熔断器会一直停在“探测中”"""
+        if probe:
+            self.breaker.release_probe()
+
+    def _on_failure(self, error: Exception, caller: str, attempt: int, start: float, deadline: float) -> float:
+        """
+        可重试错误：计入熔断，返回退避时间；重试次数或时限用尽时抛出
+
+        退避采用 full jitter：random(0, base * 2^attempt)
+        """
+        self.breaker.record_failure()
+        metrics.histogram("llm_latency_ms", caller=caller).observe((time.perf_counter() - start) * 1000)
+
+        delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+        if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+            metrics.counter("llm_requests_total", caller=caller, outcome="failure").inc()
+            logger.error(f"[LLM网关] {caller} 调用失败（已重试{attempt}次）: {error}")
+            raise error
+
+        metrics.counter("llm_retries_total", caller=caller).inc()
+        logger.warning(f"[LLM网关] {caller} 调用失败，{delay:.2f}s后重试: {error}")
+        return delay
@@ -0,0 +1,78 @@
+"""
+对冲请求（hedged request）
+
+主provider在对冲延迟内未返回时，向备用provider发出同一请求，取先返回者、取消另一方。
+对冲延迟默认取主provider最近调用的p90；对冲比例受滑动窗口上限约束，控制额外成本。
+"""
+import threading
+from collections import deque
+
+from utils import metrics
+
+
+class HedgeBudget:
+    """对冲比例上限：最近 window 次调用中对冲次数不超过 max_rate"""
+
+    def __init__(self, max_rate: float, window: int = 200):
+        """
+        Args:
+            max_rate: 最大对冲比例（0~1）
+            window: 滑动窗口（调用次数）
+        """
+        self.max_rate = max_rate
+        self._calls = deque(maxlen=window)
+        self._hedged = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        """记录一次主调用（未对冲）"""
+        with self._lock:
+            if len(self._calls) == self._calls.maxlen and self._calls[0]:
+                self._hedged -= 1
+            self._calls.append(False)
+
+    def try_acquire(self) -> bool:
+        """
+        申请一次对冲：未超比例时把窗口内最近一次未对冲的调用标记为已对冲
+
+        Returns:
+            bool: 是否允许对冲
+        """
+        with self._lock:
+            if (self._hedged + 1) / max(len(self._calls), 1) > self.max_rate:
+                return False
+            for i in range(len(self._calls) - 1, -1, -1):
+                if not self._calls[i]:
+                    self._calls[i] = True
+                    self._hedged += 1
+                    return True
+            return False
+
+    @property
+    def rate(self) -> float:
+        """当前窗口内的对冲比例"""
+        with self._lock:
+            return self._hedged / len(self._calls) if self._calls else 0.0
+
+
+def hedge_delay_ms(provider: str, fixed_ms: float, min_ms: float,
+                   warmup_ms: float = 1000.0, min_samples: int = 20) -> float:
+    """
+    对冲延迟
+
+    Args:
+        provider: 主provider名称
+        fixed_ms: 固定延迟（>0 时直接使用）
+        min_ms: 下限（避免p90过小时几乎每次都对冲）
+        warmup_ms: 样本不足时使用的延迟
+        min_samples: 使用p90所需的最少样本数
+
+    Returns:
+        float: 延迟（毫秒）
+    """
+    if fixed_ms > 0:
+        return fixed_ms
+    histogram = metrics.histogram("llm_provider_latency_ms", provider=provider)
+    if histogram.count < min_samples:
+        return max(warmup_ms, min_ms)
+    return max(histogram.quantile(0.9), min_ms)
@@ -0,0 +1,120 @@
+"""
+NLG LLM输出缓存
+
+推荐话术、多套餐对比等LLM生成的回复，对相同的动作参数（套餐列表、预算、流量需求）
+本来就应该一致，没必要每个用户都重新生成。按 动作类型 + 意图 + 参数指纹 缓存生成结果：
+
+- 每个键最多保存 variants 条不同的回复，攒满之前继续调用LLM补充，之后随机取一条，避免回复千篇一律
+- 参数中含有用户个人信息（手机号等）时不缓存：LLM回复可能复述这些信息
+- 缓存条目有TTL；套餐目录变化时调用 invalidate_catalog() 使全部条目失效
+"""
+import hashlib
+import json
+import random
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Optional
+
+from config import settings
+from models import json_default
+from utils import logger, metrics
+from utils.cache import TTLCache
+
+# 个人信息字段：参数中出现这些字段时不缓存
+PII_KEYS = {"phone", "user_phone", "user_name", "id_card", "balance"}
+
+
+def _contains_pii(value: Any) -> bool:
+    if isinstance(value, Mapping):
+        return any(k in PII_KEYS or _contains_pii(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_pii(v) for v in value)
+    return False
+
+
+class NLGLLMCache:
+    """NLG LLM生成结果缓存（进程内 LRU/TTL，每个键多条变体）"""
+
+    def __init__(self, max_size: int = 2000, ttl: int = 1800, variants: int = 3):
+        """
+        Args:
+            max_size: 缓存键上限
+            ttl: 缓存存活时间（秒）
+            variants: 每个键保存的回复变体数
+        """
+        self.variants = max(variants, 1)
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self._catalog_version = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, kind: str, action_type: str, intent: str, parameters: Dict[str, Any]) -> Optional[str]:
+        """
+        生成缓存键
+
+        Args:
+            kind: 生成类型（reply / enhancement）
+            action_type: 动作类型
+            intent: 意图
+            parameters: 影响生成内容的参数
+
+        Returns:
+            str: 缓存键；参数含个人信息时返回None
+        """
+        if _contains_pii(parameters):
+            metrics.counter("nlg_llm_cache_total", kind=kind, result="skip_pii").inc()
+            return None
+        raw = json.dumps([kind, action_type, intent, self._catalog_version, parameters],
+                         ensure_ascii=False, sort_keys=True, default=json_default)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, kind: str) -> Optional[str]:
+        """
+        读取缓存：变体攒满后随机返回一条，否则返回None（调用方继续生成）
+
+        Args:
+            key: 缓存键
+            kind: 生成类型（指标标签）
+        """
+        variants = self.local.get(key)
+        if variants is None or len(variants) < self.variants:
+            metrics.counter("nlg_llm_cache_total", kind=kind, result="miss").inc()
+            return None
+        metrics.counter("nlg_llm_cache_total", kind=kind, result="hit").inc()
+        return random.choice(variants)
+
+    def add(self, key: str, text: str):
+        """
+        保存一条生成结果（重复文本不计入变体）
+
+        Args:
+            key: 缓存键
+            text: LLM生成的文本
+        """
+        with self._lock:
+            variants = list(self.local.get(key) or ())
+            if text in variants or len(variants) >= self.variants:
+                return
+            variants.append(text)
+            self.local.set(key, tuple(variants))
+
+    def invalidate_catalog(self):
+        """套餐目录变化：旧键全部失效"""
+        with self._lock:
+            self._catalog_version += 1
+            self.local.clear()
+        logger.info("NLG LLM缓存已失效（套餐目录变化）")
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {**self.local.stats(), "variants": self.variants}
+
+
+def create_llm_cache() -> Optional[NLGLLMCache]:
+    """按配置创建NLG LLM缓存（禁用时返回None）"""
+    if not settings.NLG_LLM_CACHE_ENABLED:
+        return None
+    return NLGLLMCache(
+        max_size=settings.NLG_LLM_CACHE_MAX_SIZE,
+        ttl=settings.NLG_LLM_CACHE_TTL,
+        variants=settings.NLG_LLM_CACHE_VARIANTS
+    )
@@ -1,16 +1,23 @@
 """
 NLG生成器主类
 """
+import asyncio
 import json
-import random
-from typing import Optional, Dict, Any
+from collections.abc import Mapping
+from typing import Optional, Dict, Any, Awaitable, Callable, Tuple
 
 from core.policy.action import Action, ActionType
 from core.dst.dialog_state import DialogState
-from core.nlg.templates import RESPONSE_TEMPLATES
+from core.nlg.template_engine import template_engine, CompiledTemplate, TemplateVariants
 from core.nlg.response_formatter import ResponseFormatter
+from core.nlg.llm_cache import create_llm_cache
 from config import settings
+from models import json_default
+from core.llm import llm_gateway
+from utils.cache import ResponseCache
+from utils.deadline import Deadline, time_left
 from utils.logger import logger
+from utils.metrics import metrics
 
 
 class NLGGenerator:
@@ -32,33 +39,42 @@ class NLGGenerator:
 - 不要重复用户已知的信息
 """
 
-    def __init__(self):
-        """初始化NLG生成器"""
-        self.templates = RESPONSE_TEMPLATES
-        self.formatter = ResponseFormatter()
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
+        """
+        初始化NLG生成器
 
-        # 初始化LLM客户端
-        if settings.LLM_PROVIDER == "deepseek":
-            from openai import OpenAI
-            self.llm_client = OpenAI(
-                api_key=settings.DEEPSEEK_API_KEY,
-                base_url=settings.DEEPSEEK_BASE_URL
-            )
-            self.llm_model = settings.DEEPSEEK_MODEL
-        else:
-            from openai import OpenAI
-            self.llm_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.llm_model = settings.OPENAI_MODEL
+        Args:
+            response_cache: 确定性模板输出的缓存（None表示不缓存）
+        """
+        # 模板库在模块导入时预编译，进程内共享
+        self.template_engine = template_engine
+        self.formatter = ResponseFormatter()
+        self.response_cache = response_cache
+        # LLM生成结果缓存（None表示禁用）
+        self.llm_cache = create_llm_cache()
+
+        # LLM客户端由网关统一管理（连接池、超时重试、熔断），进程内共享
+        self.llm_client = llm_gateway.client
+        self._async_llm_clients = llm_gateway.async_clients
+        self.llm_model = llm_gateway.model
+        # 剩余时间预算低于此值时不调用LLM（秒）
+        self.llm_min_budget = settings.NLG_LLM_MIN_BUDGET_MS / 1000
+        # 模板与LLM竞速时等待LLM的预算（秒，None表示不竞速）
+        self.race_budget = settings.NLG_RACE_BUDGET_MS / 1000 if settings.NLG_RACE_ENABLED else None
+        self.race_warm_cache = settings.NLG_RACE_WARM_CACHE
+        # 竞速超时后仍在后台运行的LLM调用（持有引用避免被回收）
+        self._late_llm_tasks = set()
 
         logger.info("NLG生成器初始化完成")
 
-    def generate(self, action: Action, state: DialogState) -> str:
+    def generate(self, action: Action, state: DialogState, deadline: Optional[Deadline] = None) -> str:
         """
         生成回复
 
         Args:
             action: 系统动作
             state: 对话状态
+            deadline: 请求时间预算（剩余不足时改用模板）
 
         Returns:
             str: 生成的回复文本
@@ -67,15 +83,16 @@ class NLGGenerator:
 
         try:
             # 选择生成策略
-            strategy = self._choose_strategy(action, state)
+            strategy = self._apply_deadline(self._choose_strategy(action, state), deadline)
 
             # 根据策略生成
             if strategy == "template":
-                response = self._generate_from_template(action, state)
-            elif strategy == "llm":
-                response = self._generate_from_llm(action, state)
+                response = self._render_template(action, state)
+            elif strategy in ("llm", "race"):
+                # 同步接口不竞速（没有事件循环可以后台完成LLM调用），race 按 llm 生成
+                response = self._generate_from_llm(action, state, deadline)
             else:  # hybrid
-                response = self._generate_hybrid(action, state)
+                response = self._generate_hybrid(action, state, deadline)
 
             # 后处理
             guidance = action.parameters.get("guidance")
@@ -88,6 +105,54 @@ class NLGGenerator:
             logger.error(f"[NLG] 生成失败: {e}", exc_info=True)
             return self._fallback_response(action)
 
+    async def agenerate(self, action: Action, state: DialogState, deadline: Optional[Deadline] = None,
+                        on_chunk: Optional[Callable[[str], Awaitable[Any]]] = None) -> str:
+        """
+        生成回复（异步版本）
+
+        模板渲染是纯CPU操作直接复用；LLM生成改为 AsyncOpenAI，不阻塞事件循环
+
+        Args:
+            action: 系统动作
+            state: 对话状态
+            deadline: 请求时间预算（剩余不足时改用模板）
+            on_chunk: 流式回调，LLM生成时逐段接收增量文本（未经后处理，最终文本以返回值为准）
+
+        Returns:
+            str: 生成的回复文本
+        """
+        logger.info(f"[NLG] 生成回复(async): action={action.action_type.value}, intent={action.intent}")
+
+        try:
+            strategy = self._apply_deadline(self._choose_strategy(action, state), deadline)
+
+            if strategy == "template":
+                response = self._render_template(action, state)
+            elif strategy in ("llm", "race") and on_chunk is not None:
+                # 流式输出首字节已经足够快，不竞速
+                response = await self._astream_from_llm(action, state, deadline, on_chunk)
+            elif strategy == "llm":
+                response = await self._agenerate_from_llm(action, state, deadline)
+            elif strategy == "race":
+                response = await self._arace_template_llm(action, state, deadline)
+            else:  # hybrid
+                response = await self._agenerate_hybrid(action, state, deadline)
+
+            guidance = action.parameters.get("guidance")
+            response = self.formatter.post_process(response, state, guidance)
+
+            logger.info(f"[NLG] 生成成功，长度: {len(response)}")
+            return response
+
+        except Exception as e:
+            logger.error(f"[NLG] 生成失败: {e}", exc_info=True)
+            return self._fallback_response(action)
+
+    @property
+    def async_llm_client(self):
+        """当前事件循环对应的异步LLM客户端"""
+        return self._async_llm_clients.get()
+
     def _choose_strategy(self, action: Action, state: DialogState) -> str:
         """
         选择生成策略
@@ -97,11 +162,16 @@ class NLGGenerator:
             state: 对话状态
 
         Returns:
-            str: 策略名称 (template/llm/hybrid)
+            str: 策略名称 (template/llm/race/hybrid)
         """
-        # 强制使用LLM
+        # LLM熔断中：纯模板模式
+        if not llm_gateway.available:
+            metrics.counter("nlg_template_only_total").inc()
+            return "template"
+
+        # 强制使用LLM（Policy对推荐场景设置）
         if action.use_llm:
-            return "llm"
+            return self._llm_strategy()
 
         # REQUEST和CONFIRM总是用模板
         if action.action_type in [ActionType.REQUEST, ActionType.CONFIRM]:
@@ -109,19 +179,58 @@ class NLGGenerator:
 
         # 推荐场景用LLM
         if action.parameters.get("should_recommend"):
-            return "llm"
+            return self._llm_strategy()
 
         # 多结果对比用LLM
         if action.parameters.get("count", 0) > 3:
-            return "llm"
+            return self._llm_strategy()
 
         # 其他用模板
         return "template"
 
+    def _llm_strategy(self) -> str:
+        """需要LLM生成时的策略：开启竞速时与模板竞速（仅异步接口，同步接口按 llm 处理）"""
+        return "llm" if self.race_budget is None else "race"
+
+    def _apply_deadline(self, strategy: str, deadline: Optional[Deadline]) -> str:
+        """剩余时间预算不足以调用LLM时，llm/race/hybrid 策略降级为模板"""
+        if strategy == "template" or deadline is None or deadline.allows(self.llm_min_budget):
+            return strategy
+        deadline.degrade("nlg_template")
+        logger.warning(f"[NLG] 剩余预算 {deadline.remaining() * 1000:.0f}ms，改用模板")
+        return "template"
+
+    def _render_template(self, action: Action, state: DialogState) -> str:
+        """
+        模板生成，确定性结果（REQUEST/CONFIRM、套餐目录查询）走响应缓存
+
+        缓存的是后处理之前的文本，后处理仍按当前对话状态执行
+        """
+        if self.response_cache is None:
+            return self._generate_from_template(action, state)
+
+        action_type = action.action_type.value if isinstance(action.action_type, ActionType) else action.action_type
+        # 先算键：_select_template 会把单条数据展开进 action.parameters
+        cache_key = self.response_cache.generate_key(action_type, action.intent, action.parameters)
+        if cache_key is None:
+            return self._generate_from_template(action, state)
+
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            metrics.counter("nlg_response_cache_total", result="hit").inc()
+            return cached
+
+        metrics.counter("nlg_response_cache_total", result="miss").inc()
+        response = self._generate_from_template(action, state)
+        self.response_cache.set(cache_key, response)
+        return response
+
     def _generate_from_template(self, action: Action, state: DialogState) -> str:
         """
         从模板生成
 
+        参数只准备一次，缺参检查与渲染共用；首选模板参数不全时走预编译的降级链
+
         Args:
             action: 系统动作
             state: 对话状态
@@ -131,21 +240,26 @@ class NLGGenerator:
         """
         # 选择模板
         template = self._select_template(action, state)
-        logger.info(f"选择模版为={template}")
+        logger.info(f"选择模版为={template.text}")
 
         # 准备参数
         params = self._prepare_template_params(action, state)
 
+        missing = template.missing(params)
+        if missing is not None:
+            logger.warning(f"[NLG] 模板参数不完整（{missing}），使用降级模板")
+            template = self.template_engine.fallback(action.intent, params)
+
         try:
             # 格式化模板
-            response = template.format(**params)
-            logger.info(f"[NLG] 模板生成成功")
+            response = template.render(params)
+            logger.info("[NLG] 模板生成成功")
             return response
         except KeyError as e:
             logger.error(f"[NLG] 模板参数缺失: {e}")
             return self._fallback_response(action)
 
-    def _select_template(self, action: Action, state: DialogState) -> str:
+    def _select_template(self, action: Action, state: DialogState) -> CompiledTemplate:
         """
         选择模板
 
@@ -154,114 +268,52 @@ class NLGGenerator:
             state: 对话状态
 
         Returns:
-            str: 模板字符串
+            CompiledTemplate: 预编译模板
         """
         action_type = action.action_type.value if isinstance(action.action_type, ActionType) else action.action_type
-
-        # 获取动作类型的模板
-        action_templates = self.templates.get(action_type, {})
-
-        # 如果指定了模板键
-        if action.template_key and action.template_key in action_templates:
-            template = action_templates[action.template_key]
-        # 否则按意图查找
-        elif action.intent in action_templates:
-            template = action_templates[action.intent]
-        else:
-            template = action_templates.get("default", "处理完成")
+        template = self.template_engine.lookup(action_type, action.template_key, action.intent)
 
         # 如果是字典，按数据特征选择
         if isinstance(template, dict):
             count = action.parameters.get("count", 0)
             if count == 0:
-                template = template.get("empty", template.get("default", ""))
+                template = template.get("empty", template.get("default", self.template_engine.default_template))
             elif count == 1:
                 data = action.parameters.get("data", [{}])[0]
-                template = template.get("single", template.get("default", ""))
+                template = template.get("single", template.get("default", self.template_engine.default_template))
                 # 将单个数据扁平化到参数中
                 action.parameters.update(data)
             else:
-                template = template.get("multiple", template.get("default", ""))
-
-        # 如果是列表，随机选择
-        if isinstance(template, list):
-            template = random.choice(template)
+                template = template.get("multiple", template.get("default", self.template_engine.default_template))
 
-        # ========== 新增：参数验证和降级 ==========
-        if not self._validate_template_params(template, action.parameters):
-            logger.warning(f"[NLG] 模板参数不完整，使用降级模板")
-            template = self._get_fallback_template(action, template)
+        # 如果是多个候选，随机选择
+        if isinstance(template, TemplateVariants):
+            template = template.pick()
 
         return template
 
-    def _validate_template_params(self, template: str, params: dict) -> bool:
-        """
-        验证模板所需参数是否齐全（修复版）
-
-        Args:
-            template: 模板字符串
-            params: 参数字典
-
-        Returns:
-            bool: 参数是否齐全
-        """
-        import re
-
-        logger.info(f"template: {template}, params: {params}")
-
-        # 提取模板中的占位符
-        placeholders = re.findall(r'\{(\w+)\}', template)
-
-        # 🔥 关键修复：使用完整的参数准备逻辑
-        try:
-            # 创建一个临时 Action 对象用于验证
-            temp_action = Action(
-                action_type=ActionType.INFORM,
-                intent="validation",
-                parameters=params
-            )
-
-            # 使用与渲染时相同的参数准备逻辑
-            processed_params = self._prepare_validation_params(params)
-
-        except Exception as e:
-            logger.error(f"参数处理失败: {e}")
-            return False
-
-        # 检查每个占位符是否在参数中
-        for placeholder in placeholders:
-            if placeholder not in processed_params:
-                logger.warning(f"参数验证失败: 占位符 '{placeholder}' 不存在")
-                return False
-
-            value = processed_params[placeholder]
-            if value is None or value == "":
-                logger.warning(f"参数验证失败: 占位符 '{placeholder}' 为空")
-                return False
-
-        return True
-
-    def _prepare_validation_params(self, params: dict) -> dict:
+    def _prepare_template_params(self, action: Action, state: DialogState) -> Dict[str, Any]:
         """
-        准备验证参数（与 _prepare_template_params 逻辑一致）
+        准备模板参数（每次渲染只执行一次）
 
         Args:
-            params: 原始参数字典
+            action: 系统动作
+            state: 对话状态
 
         Returns:
-            dict: 处理后的参数字典
+            Dict: 参数字典
         """
-        processed_params = dict(params)
+        params = action.parameters
 
         # 1. 基础参数处理（展开 data）
-        processed_params = self._process_template_params(processed_params)
+        processed_params = self._process_template_params(params)
 
-        # 2. 🔥 生成 package_list（关键修复）
-        if "data" in params and isinstance(params["data"], list):
+        # 2. 生成 package_list
+        if isinstance(params.get("data"), list):
             processed_params["package_list"] = self.formatter.format_package_list(params["data"])
 
         # 3. 确保所有参数都有值
-        for key, value in list(processed_params.items()):
+        for key, value in processed_params.items():
             if value is None:
                 processed_params[key] = ""
             elif isinstance(value, (int, float)):
@@ -272,28 +324,9 @@ class NLGGenerator:
 
         return processed_params
 
-    def _prepare_template_params(self, action: Action, state: DialogState) -> Dict[str, Any]:
-        """
-        准备模板参数（使用统一的处理逻辑）
-
-        Args:
-            action: 系统动作
-            state: 对话状态
-
-        Returns:
-            Dict: 参数字典
-        """
-        params = dict(action.parameters)
-        logger.info(f"_prepare_template_params params={params}")
-
-        # 🔥 使用统一的验证参数准备方法
-        params = self._prepare_validation_params(params)
-
-        return params
-
     def _process_template_params(self, params: dict) -> dict:
         """
-        处理模板参数（供验证和渲染共用）
+        处理模板参数（展开 data 字段）
 
         Args:
             params: 原始参数字典
@@ -307,81 +340,205 @@ class NLGGenerator:
         if "data" in processed_params:
             data = processed_params["data"]
 
-            # 如果data是字典，将其字段展开到根级别
-            if isinstance(data, dict):
+            # 如果data是字典（或查询结果模型），将其字段展开到根级别
+            if isinstance(data, Mapping):
                 for key, value in data.items():
                     processed_params[key] = value
             # 如果data是列表且不为空，取第一个元素展开
-            elif isinstance(data, list) and len(data) > 0 and isinstance(data[0], dict):
+            elif isinstance(data, list) and len(data) > 0 and isinstance(data[0], Mapping):
                 for key, value in data[0].items():
                     processed_params[key] = value
 
         return processed_params
 
-    def _get_fallback_template(self, action: Action, original_template: str) -> str:
+    def _generate_from_llm(self, action: Action, state: DialogState, deadline: Optional[Deadline] = None) -> str:
         """
-        获取降级模板
+        使用LLM生成
 
         Args:
             action: 系统动作
-            original_template: 原始模板
+            state: 对话状态
+            deadline: 请求时间预算（LLM调用时限不超过剩余预算）
 
         Returns:
-            str: 降级模板
-        """
-        # 预定义的降级模板（只依赖必填参数）
-        fallback_templates = {
-            "change_package": "已成功为您办理【{new_package_name}】，次月生效！",
-            "query_packages": "为您找到相关套餐",
-            "query_current_package": "已查询到您的套餐信息",
-            "query_usage": "已查询到您的使用情况",
-        }
+            str: 生成的文本
+        """
+        try:
+            cache_key, cached = self._cached_llm_text("reply", action, action.parameters)
+            if cached is not None:
+                return cached
 
-        template = fallback_templates.get(action.intent)
-        if template and self._validate_template_params(template, action.parameters):
-            return template
+            request = self._build_llm_request(action, state)
+            response = llm_gateway.call(request, self._llm_create(request), caller="nlg",
+                                        timeout=time_left(deadline))
+            return self._accept_llm_text(self._response_text(response), cache_key)
 
-        # 最终降级：使用 message 字段或通用消息
-        if "message" in action.parameters:
-            return "{message}"
+        except Exception as e:
+            return self._on_llm_error(e, action, state, deadline)
 
-        return "处理完成"
+    async def _agenerate_from_llm(self, action: Action, state: DialogState,
+                                  deadline: Optional[Deadline] = None) -> str:
+        """使用LLM生成（异步版本）"""
+        try:
+            cache_key, cached = self._cached_llm_text("reply", action, action.parameters)
+            if cached is not None:
+                return cached
 
+            request = self._build_llm_request(action, state)
+            response = await llm_gateway.acall(request, self._allm_create(request), caller="nlg",
+                                               timeout=time_left(deadline))
+            return self._accept_llm_text(self._response_text(response), cache_key)
 
+        except Exception as e:
+            return self._on_llm_error(e, action, state, deadline)
 
-    def _generate_from_llm(self, action: Action, state: DialogState) -> str:
+    async def _astream_from_llm(self, action: Action, state: DialogState, deadline: Optional[Deadline],
+                                on_chunk: Callable[[str], Awaitable[Any]]) -> str:
         """
-        使用LLM生成
+        使用LLM流式生成：增量文本逐段交给 on_chunk，返回完整文本
+
+        中途失败时降级到模板，调用方以返回的完整文本覆盖已发出的片段；LLM缓存命中时整段作为一个片段
+        """
+        cache_key, cached = self._cached_llm_text("reply", action, action.parameters)
+        if cached is not None:
+            await on_chunk(cached)
+            return cached
+
+        request = {**self._build_llm_request(action, state), "stream": True}
+        parts = []
+        try:
+            async for delta in llm_gateway.astream(request, self._allm_create(request), caller="nlg",
+                                                   timeout=time_left(deadline)):
+                parts.append(delta)
+                await on_chunk(delta)
+        except Exception as e:
+            return self._on_llm_error(e, action, state, deadline)
+
+        text = "".join(parts).strip()
+        if not text:
+            return self._generate_from_template(action, state)
+        return self._accept_llm_text(text, cache_key)
+
+    async def _arace_template_llm(self, action: Action, state: DialogState,
+                                  deadline: Optional[Deadline] = None) -> str:
+        """
+        模板与LLM竞速：LLM调用发出后立即渲染模板，LLM在预算内返回则用LLM文本，否则返回模板
+
+        超时的LLM调用按配置在后台继续完成并写入LLM缓存（下次同参数直接命中），否则取消
 
         Args:
             action: 系统动作
             state: 对话状态
+            deadline: 请求时间预算（等待时间不超过剩余预算）
 
         Returns:
             str: 生成的文本
         """
-        # 构建提示
-        user_prompt = self._build_llm_prompt(action, state)
-
+        cache_key, cached = self._cached_llm_text("reply", action, action.parameters)
+        if cached is not None:
+            metrics.counter("nlg_race_total", winner="cache").inc()
+            return cached
+
+        # 先构建请求：模板渲染会把单条数据展开进 action.parameters
+        request = self._build_llm_request(action, state)
+        # 竞速只限制等待时间；落败后在后台继续的调用也不超过请求的剩余预算
+        task = asyncio.ensure_future(llm_gateway.acall(request, self._allm_create(request), caller="nlg",
+                                                       timeout=time_left(deadline)))
+        template_response = self._render_template(action, state)
+
+        budget = self.race_budget if deadline is None else min(self.race_budget, deadline.remaining())
         try:
-            response = self.llm_client.chat.completions.create(
-                model=self.llm_model,
-                messages=[
-                    {"role": "system", "content": self.NLG_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=200
-            )
-
-            text = response.choices[0].message.content.strip()
-            logger.debug(f"[NLG] LLM生成成功")
-            return text
-
+            response = await asyncio.wait_for(asyncio.shield(task), budget)
+            text = self._response_text(response)
+        except asyncio.TimeoutError:
+            logger.info(f"[NLG] LLM未在 {budget * 1000:.0f}ms 内返回，使用模板")
+            metrics.counter("nlg_race_total", winner="template").inc()
+            self._finish_late_llm(task, cache_key)
+            return template_response
         except Exception as e:
             logger.error(f"[NLG] LLM生成失败: {e}")
-            # 降级到模板
-            return self._generate_from_template(action, state)
+            metrics.counter("nlg_race_total", winner="template").inc()
+            return template_response
+
+        if not text:
+            metrics.counter("nlg_race_total", winner="template").inc()
+            return template_response
+
+        metrics.counter("nlg_race_total", winner="llm").inc()
+        return self._accept_llm_text(text, cache_key)
+
+    def _finish_late_llm(self, task: asyncio.Future, cache_key: Optional[str]):
+        """竞速超时的LLM调用：可缓存时后台完成后写入LLM缓存，否则取消"""
+        if not (self.race_warm_cache and cache_key):
+            task.cancel()
+            metrics.counter("nlg_race_late_total", result="cancelled").inc()
+            return
+
+        def done(t: asyncio.Future):
+            self._late_llm_tasks.discard(t)
+            if t.cancelled() or t.exception() is not None:
+                metrics.counter("nlg_race_late_total", result="failed").inc()
+                return
+            self._accept_llm_text(self._response_text(t.result()), cache_key)
+            metrics.counter("nlg_race_late_total", result="warmed").inc()
+
+        self._late_llm_tasks.add(task)
+        task.add_done_callback(done)
+
+    def _llm_cache_key(self, kind: str, action: Action, parameters: Dict[str, Any]) -> Optional[str]:
+        """LLM输出缓存键（缓存禁用或参数含个人信息时为None）"""
+        if self.llm_cache is None:
+            return None
+        action_type = action.action_type.value if isinstance(action.action_type, ActionType) else action.action_type
+        return self.llm_cache.make_key(kind, action_type, action.intent, parameters)
+
+    def _cached_llm_text(self, kind: str, action: Action,
+                         parameters: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """查LLM缓存，返回 (缓存键, 缓存的文本)；不可缓存或未命中时对应项为None"""
+        cache_key = self._llm_cache_key(kind, action, parameters)
+        return cache_key, self.llm_cache.get(cache_key, kind) if cache_key else None
+
+    def _accept_llm_text(self, text: str, cache_key: Optional[str]) -> str:
+        """LLM生成的文本写入LLM缓存（空文本不缓存）"""
+        logger.debug("[NLG] LLM生成成功")
+        if cache_key and text:
+            self.llm_cache.add(cache_key, text)
+        return text
+
+    @staticmethod
+    def _response_text(response) -> str:
+        """LLM响应中的回复文本"""
+        return (response.choices[0].message.content or "").strip()
+
+    def _llm_create(self, request: Dict[str, Any]) -> Callable[..., Any]:
+        """网关调用的实际请求（同步客户端，接收本次尝试的 timeout）"""
+        return lambda timeout: self.llm_client.chat.completions.create(**request, timeout=timeout)
+
+    def _allm_create(self, request: Dict[str, Any]) -> Callable[..., Awaitable[Any]]:
+        """网关调用的实际请求（当前事件循环的异步客户端）"""
+        return lambda timeout: self.async_llm_client.chat.completions.create(**request, timeout=timeout)
+
+    def _on_llm_error(self, error: Exception, action: Action, state: DialogState,
+                      deadline: Optional[Deadline]) -> str:
+        """LLM生成失败：降级到模板（失败耗尽了预算时记录降级）"""
+        logger.error(f"[NLG] LLM生成失败: {error}")
+        self._apply_deadline("llm", deadline)
+        return self._generate_from_template(action, state)
+
+    def _build_llm_request(self, action: Action, state: DialogState) -> Dict[str, Any]:
+        """构建LLM生成请求参数（同步/异步共用）"""
+        # 构建提示
+        user_prompt = self._build_llm_prompt(action, state)
+
+        return {
+            "model": self.llm_model,
+            "messages": [
+                {"role": "system", "content": self.NLG_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 200
+        }
 
     def _build_llm_prompt(self, action: Action, state: DialogState) -> str:
         """
@@ -403,19 +560,20 @@ class NLGGenerator:
 【对话轮次】{state.turn_count}
 
 【数据内容】
-{json.dumps(action.parameters, ensure_ascii=False, indent=2)}
+{json.dumps(action.parameters, ensure_ascii=False, indent=2, default=json_default)}
 
 请生成自然、专业的客服回复:"""
 
         return prompt
 
-    def _generate_hybrid(self, action: Action, state: DialogState) -> str:
+    def _generate_hybrid(self, action: Action, state: DialogState, deadline: Optional[Deadline] = None) -> str:
         """
         混合生成
 
         Args:
             action: 系统动作
             state: 对话状态
+            deadline: 请求时间预算
 
         Returns:
             str: 生成的文本
@@ -425,41 +583,89 @@ class NLGGenerator:
 
         # LLM增强（添加推荐或建议）
         if action.parameters.get("should_recommend"):
-            enhancement = self._generate_enhancement(action, state)
+            enhancement = self._generate_enhancement(action, state, deadline)
             return f"{base_response}\n\n{enhancement}"
 
         return base_response
 
-    def _generate_enhancement(self, action: Action, state: DialogState) -> str:
+    async def _agenerate_hybrid(self, action: Action, state: DialogState,
+                                deadline: Optional[Deadline] = None) -> str:
+        """混合生成（异步版本）"""
+        base_response = self._generate_from_template(action, state)
+
+        if action.parameters.get("should_recommend"):
+            enhancement = await self._agenerate_enhancement(action, state, deadline)
+            return f"{base_response}\n\n{enhancement}"
+
+        return base_response
+
+    def _generate_enhancement(self, action: Action, state: DialogState,
+                              deadline: Optional[Deadline] = None) -> str:
         """
         生成增强内容（推荐/建议）
 
         Args:
             action: 系统动作
             state: 对话状态
+            deadline: 请求时间预算
 
         Returns:
             str: 增强内容
         """
+        try:
+            cache_key, cached = self._cached_llm_text("enhancement", action, self._enhancement_inputs(action, state))
+            if cached is not None:
+                return cached
+
+            request = self._build_enhancement_request(action, state)
+            response = llm_gateway.call(request, self._llm_create(request), caller="nlg_enhancement",
+                                        timeout=time_left(deadline))
+            return self._accept_llm_text(self._response_text(response), cache_key)
+        except:
+            return "根据您的需求，建议选择性价比高的套餐"
+
+    async def _agenerate_enhancement(self, action: Action, state: DialogState,
+                                     deadline: Optional[Deadline] = None) -> str:
+        """生成增强内容（异步版本）"""
+        try:
+            cache_key, cached = self._cached_llm_text("enhancement", action, self._enhancement_inputs(action, state))
+            if cached is not None:
+                return cached
+
+            request = self._build_enhancement_request(action, state)
+            response = await llm_gateway.acall(request, self._allm_create(request), caller="nlg_enhancement",
+                                               timeout=time_left(deadline))
+            return self._accept_llm_text(self._response_text(response), cache_key)
+        except Exception:
+            return "根据您的需求，建议选择性价比高的套餐"
+
+    @staticmethod
+    def _enhancement_inputs(action: Action, state: DialogState) -> Dict[str, Any]:
+        """增强内容Prompt的全部输入（同时作为LLM缓存的参数）"""
+        return {
+            "count": action.parameters.get('count', 0),
+            "price_max": state.slots.get('price_max', '未知'),
+            "data_min": state.slots.get('data_min', '未知')
+        }
+
+    def _build_enhancement_request(self, action: Action, state: DialogState) -> Dict[str, Any]:
+        """构建增强内容请求参数（同步/异步共用）"""
+        inputs = self._enhancement_inputs(action, state)
         prompt = f"""基于用户查询结果，生成个性化推荐:
 
-【查询结果】{action.parameters.get('count', 0)}个套餐
+【查询结果】{inputs['count']}个套餐
 【用户特征】
-- 价格预算: {state.slots.get('price_max', '未知')}元
-- 流量需求: {state.slots.get('data_min', '未知')}GB
+- 价格预算: {inputs['price_max']}元
+- 流量需求: {inputs['data_min']}GB
 
 生成一句推荐话术（30字以内）:"""
 
-        try:
-            response = self.llm_client.chat.completions.create(
-                model=self.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8,
-                max_tokens=100
-            )
-            return response.choices[0].message.content.strip()
-        except:
-            return "根据您的需求，建议选择性价比高的套餐"
+        return {
+            "model": self.llm_model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.8,
+            "max_tokens": 100
+        }
 
     def _fallback_response(self, action: Action) -> str:
         """
@@ -0,0 +1,138 @@
+"""
+预编译模板引擎
+
+启动时把 RESPONSE_TEMPLATES 编译一次：每个模板的占位符在编译时解析，
+渲染时只做缺参检查和 str.format；各意图的降级模板同样预编译，
+降级链为 意图降级模板 → {message} → "处理完成"。
+"""
+import random
+from string import Formatter
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .templates import RESPONSE_TEMPLATES, FALLBACK_TEMPLATES
+
+
+class CompiledTemplate:
+    """预编译模板：原文 + 占位符"""
+
+    __slots__ = ("text", "placeholders")
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text: 模板原文（str.format 语法）
+        """
+        self.text = text
+        self.placeholders: Tuple[str, ...] = tuple(dict.fromkeys(
+            field for _, field, _, _ in Formatter().parse(text) if field
+        ))
+
+    def missing(self, params: Dict[str, Any]) -> Optional[str]:
+        """
+        第一个缺失或为空的占位符
+
+        Returns:
+            Optional[str]: 占位符名；参数齐全返回None
+        """
+        for name in self.placeholders:
+            value = params.get(name)
+            if value is None or value == "":
+                return name
+        return None
+
+    def render(self, params: Dict[str, Any]) -> str:
+        """渲染（参数缺失时抛出 KeyError）"""
+        return self.text.format(**params)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.text!r})"
+
+
+class TemplateVariants(tuple):
+    """同一场景的多个候选模板，渲染时随机选一个"""
+
+    def pick(self) -> CompiledTemplate:
+        return random.choice(self)
+
+
+CompiledNode = Union[CompiledTemplate, TemplateVariants, Dict[str, Any]]
+
+
+def _compile(node) -> CompiledNode:
+    if isinstance(node, str):
+        return CompiledTemplate(node)
+    if isinstance(node, list):
+        return TemplateVariants(CompiledTemplate(text) for text in node)
+    return {key: _compile(value) for key, value in node.items()}
+
+
+class TemplateEngine:
+    """模板库（按 动作类型 → 模板键/意图 组织，结构与 RESPONSE_TEMPLATES 一致）"""
+
+    def __init__(self,
+                 templates: Dict[str, Dict[str, Any]] = RESPONSE_TEMPLATES,
+                 fallbacks: Dict[str, str] = FALLBACK_TEMPLATES):
+        """
+        Args:
+            templates: 模板库
+            fallbacks: 各意图的降级模板（只依赖必填参数）
+        """
+        self.templates: Dict[str, Dict[str, CompiledNode]] = {
+            action_type: _compile(group) for action_type, group in templates.items()
+        }
+        self.fallbacks = {intent: CompiledTemplate(text) for intent, text in fallbacks.items()}
+        self.message_template = CompiledTemplate("{message}")
+        self.default_template = CompiledTemplate("处理完成")
+
+    def lookup(self, action_type: str, template_key: Optional[str], intent: Optional[str]) -> CompiledNode:
+        """
+        查找模板：指定的模板键 → 意图 → 该动作类型的 default
+
+        Returns:
+            CompiledTemplate / TemplateVariants / 按数据量区分的 dict
+        """
+        group = self.templates.get(action_type, {})
+        if template_key and template_key in group:
+            return group[template_key]
+        if intent in group:
+            return group[intent]
+        return group.get("default", self.default_template)
+
+    def fallback(self, intent: Optional[str], params: Dict[str, Any]) -> CompiledTemplate:
+        """
+        降级模板
+
+        Args:
+            intent: 意图
+            params: 已准备好的模板参数
+        """
+        template = self.fallbacks.get(intent)
+        if template is not None and template.missing(params) is None:
+            return template
+        if "message" in params:
+            return self.message_template
+        return self.default_template
+
+    def iter_templates(self):
+        """
+        遍历全部编译后的模板（基准测试用）
+
+        Yields:
+            tuple: (路径, CompiledTemplate)
+        """
+        def walk(path, node):
+            if isinstance(node, CompiledTemplate):
+                yield path, node
+            elif isinstance(node, TemplateVariants):
+                for i, template in enumerate(node):
+                    yield f"{path}[{i}]", template
+            else:
+                for key, value in node.items():
+                    yield from walk(f"{path}.{key}", value)
+
+        for action_type, group in self.templates.items():
+            yield from walk(action_type, group)
+
+
+# 进程内共享：模板库只编译一次
+template_engine = TemplateEngine()
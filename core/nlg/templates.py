@@ -147,4 +147,12 @@ RESPONSE_TEMPLATES: Dict[str, Dict[str, Union[str, List[str], Dict]]] = {
         "unsatisfied": "如果还有疑问，欢迎继续咨询",
         "default": "还需要其他帮助吗？"
     }
-}
\ No newline at end of file
+}
+
+# 降级模板：首选模板参数不全时使用（只依赖必填参数）
+FALLBACK_TEMPLATES: Dict[str, str] = {
+    "change_package": "已成功为您办理【{new_package_name}】，次月生效！",
+    "query_packages": "为您找到相关套餐",
+    "query_current_package": "已查询到您的套餐信息",
+    "query_usage": "已查询到您的使用情况",
+}
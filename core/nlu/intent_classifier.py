@@ -0,0 +1,319 @@
+"""
+本地意图分类器
+
+位于规则之后、LLM之前：字符n-gram哈希特征 + 多分类逻辑回归（NumPy，纯CPU）。
+只有置信度达到阈值时才直接给出意图，其余（真正有歧义的输入）仍交给LLM。
+
+标签为 FUNCTION_DEFINITIONS 中的业务意图，外加 other（闲聊、问候等非业务输入，
+预测为 other 时同样交给LLM）。
+
+训练数据来自日志中的 (用户输入, 最终意图) 对，也可以额外提供 "文本<TAB>意图" 的标注文件：
+    python -m core.nlu.train_intent_classifier --logs logs/*.log --data labeled.tsv
+"""
+import random
+import re
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，缺失时分类器层不启用
+    np = None
+
+from config import settings
+from utils import logger
+from .function_definitions import FUNCTION_DEFINITIONS
+
+# 业务意图
+INTENTS = [func["function"]["name"] for func in FUNCTION_DEFINITIONS]
+# 非业务输入
+OTHER = "other"
+# 日志中归为 other 的意图
+_OTHER_INTENTS = {"chat", "greeting", "thanks"}
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 日志格式见 NLUEngine.understand / aunderstand
+_LOG_START = re.compile(r"\[(?P<sid>[^\]]+)\] 开始NLU理解(?:\(async\))?: (?P<text>.+)$")
+_LOG_DONE = re.compile(r"\[(?P<sid>[^\]]+)\] NLU完成: intent=(?P<intent>\w+)")
+
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize(text: str) -> str:
+    """
+    特征前的规范化：小写；数字串按长度归为手机号(P)或普通数字(N)，使不同号码/价格共享特征
+
+    Args:
+        text: 用户输入
+
+    Returns:
+        str: 规范化文本（带首尾边界符）
+    """
+    text = _DIGITS.sub(lambda m: "P" if len(m.group()) >= 7 else "N", text.strip().lower())
+    return f"^{text}$"
+
+
+class IntentClassifier:
+    """字符n-gram哈希 + 线性softmax意图分类器"""
+
+    def __init__(self,
+                 labels: Sequence[str] = tuple(INTENTS + [OTHER]),
+                 n_features: int = 2 ** 15,
+                 ngram_range: Tuple[int, int] = (1, 3)):
+        """
+        Args:
+            labels: 类别标签
+            n_features: 哈希空间大小
+            ngram_range: 字符n-gram长度范围（含两端）
+        """
+        if np is None:
+            raise ImportError("IntentClassifier 需要 numpy")
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    # ========== 特征 ==========
+
+    def features(self, text: str):
+        """
+        文本 → 稀疏特征（L2归一化的n-gram计数）
+
+        Returns:
+            tuple: (特征下标数组, 特征值数组)
+        """
+        text = normalize(text)
+        low, high = self.ngram_range
+        buckets = [
+            zlib.crc32(text[i:i + n].encode("utf-8")) % self.n_features
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)
+        ]
+        index, counts = np.unique(np.asarray(buckets, dtype=np.int64), return_counts=True)
+        values = counts.astype(np.float32)
+        return index, values / np.linalg.norm(values)
+
+    def _batch(self, rows):
+        index = np.concatenate([r[0] for r in rows])
+        values = np.concatenate([r[1] for r in rows])
+        lengths = np.fromiter((len(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return index, values, offsets, lengths
+
+    def _logits(self, index, values, offsets):
+        contrib = self.weights[index] * values[:, None]
+        return np.add.reduceat(contrib, offsets, axis=0) + self.bias
+
+    @staticmethod
+    def _softmax(logits):
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    # ========== 训练 / 预测 ==========
+
+    def fit(self,
+            texts: Sequence[str],
+            labels: Sequence[str],
+            epochs: int = 30,
+            learning_rate: float = 2.0,
+            l2: float = 1e-5,
+            batch_size: int = 32,
+            seed: int = 0) -> "IntentClassifier":
+        """
+        小批量SGD训练（交叉熵 + L2）
+
+        Args:
+            texts: 用户输入
+            labels: 对应意图（需在 self.labels 中）
+            epochs: 训练轮数
+            learning_rate: 学习率
+            l2: L2正则系数
+            batch_size: 批大小
+            seed: 随机种子
+
+        Returns:
+            IntentClassifier: self
+        """
+        label_ids = {label: i for i, label in enumerate(self.labels)}
+        rows = [self.features(text) for text in texts]
+        targets = np.array([label_ids[label] for label in labels], dtype=np.int64)
+
+        rng = random.Random(seed)
+        order = list(range(len(rows)))
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                index, values, offsets, lengths = self._batch([rows[i] for i in batch])
+
+                grad = self._softmax(self._logits(index, values, offsets))
+                grad[np.arange(len(batch)), targets[batch]] -= 1.0
+                grad /= len(batch)
+
+                self.weights *= (1.0 - learning_rate * l2)
+                np.add.at(self.weights, index, -learning_rate * grad[np.repeat(np.arange(len(batch)), lengths)]
+                          * values[:, None])
+                self.bias -= learning_rate * grad.sum(axis=0)
+        return self
+
+    def predict_proba(self, text: str):
+        """各类别概率（顺序同 self.labels）"""
+        index, values = self.features(text)
+        return self._softmax(values @ self.weights[index] + self.bias)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        预测意图
+
+        Returns:
+            tuple: (意图, 置信度)
+        """
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return self.labels[best], float(proba[best])
+
+    # ========== 持久化 ==========
+
+    def save(self, path) -> None:
+        """保存为 .npz"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias,
+                            labels=np.array(self.labels),
+                            n_features=self.n_features,
+                            ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, path) -> "IntentClassifier":
+        """从 .npz 加载"""
+        with np.load(path, allow_pickle=False) as data:
+            classifier = cls(labels=[str(label) for label in data["labels"]],
+                             n_features=int(data["n_features"]),
+                             ngram_range=tuple(int(n) for n in data["ngram_range"]))
+            classifier.weights = data["weights"].astype(np.float32)
+            classifier.bias = data["bias"].astype(np.float32)
+        return classifier
+
+
+# ========== 训练数据 ==========
+
+def _label(intent: str) -> Optional[str]:
+    if intent in INTENTS:
+        return intent
+    if intent in _OTHER_INTENTS:
+        return OTHER
+    return None  # error 及历史遗留的无效意图名不参与训练
+
+
+def load_log_pairs(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    从应用日志提取 (用户输入, 最终意图) 对
+
+    按会话ID把 "开始NLU理解" 与随后的 "NLU完成: intent=..." 配对
+
+    Args:
+        paths: 日志文件路径
+
+    Returns:
+        List[Tuple[str, str]]: (文本, 标签)
+    """
+    pairs = []
+    for path in paths:
+        pending: Dict[str, str] = {}
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                start = _LOG_START.search(line)
+                if start:
+                    pending[start.group("sid")] = start.group("text").strip()
+                    continue
+                done = _LOG_DONE.search(line)
+                if done and done.group("sid") in pending:
+                    label = _label(done.group("intent"))
+                    text = pending.pop(done.group("sid"))
+                    if label and text:
+                        pairs.append((text, label))
+    return pairs
+
+
+def load_labeled_file(path: str) -> List[Tuple[str, str]]:
+    """
+    读取 "文本<TAB>意图" 标注文件（# 开头为注释）
+
+    Returns:
+        List[Tuple[str, str]]: (文本, 标签)
+    """
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            text, intent = line.rstrip("\n").split("\t")[:2]
+            label = _label(intent.strip())
+            if label:
+                pairs.append((text.strip(), label))
+    return pairs
+
+
+def resolve_conflicts(pairs: Iterable[Tuple[str, str]], min_agreement: float = 0.8) -> List[Tuple[str, str]]:
+    """
+    同一文本被标注为不同意图时按多数投票；一致率不足的文本丢弃
+
+    日志中的追问回答（如单独的手机号）在不同会话里对应不同意图，属于上下文相关输入，不应学习
+
+    Args:
+        pairs: (文本, 标签)
+        min_agreement: 多数标签最低占比
+
+    Returns:
+        List[Tuple[str, str]]: 保留全部出现次数的 (文本, 多数标签)
+    """
+    votes: Dict[str, Counter] = defaultdict(Counter)
+    for text, label in pairs:
+        votes[text][label] += 1
+
+    resolved = []
+    for text, counter in votes.items():
+        label, count = counter.most_common(1)[0]
+        total = sum(counter.values())
+        if count / total >= min_agreement:
+            resolved.extend([(text, label)] * total)
+    return resolved
+
+
+def resolve_model_path(path: str) -> Path:
+    """相对路径按项目根目录解析"""
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def create_intent_classifier() -> Optional[IntentClassifier]:
+    """
+    按配置加载意图分类器
+
+    未启用、缺少numpy或模型文件不存在时返回None（直接规则 → LLM）
+    """
+    if not settings.NLU_CLASSIFIER_ENABLED:
+        return None
+    if np is None:
+        logger.warning("未安装numpy，本地意图分类器不启用")
+        return None
+
+    path = resolve_model_path(settings.NLU_CLASSIFIER_MODEL_PATH)
+    if not path.exists():
+        logger.info(f"未找到意图分类器模型 {path}，跳过分类器层"
+                    f"（训练: python -m core.nlu.train_intent_classifier）")
+        return None
+
+    try:
+        classifier = IntentClassifier.load(path)
+    except Exception as e:
+        logger.error(f"意图分类器加载失败: {e}")
+        return None
+
+    logger.info(f"✓ 本地意图分类器: {path.name}, 阈值={settings.NLU_CLASSIFIER_THRESHOLD}")
+    return classifier
@@ -3,6 +3,7 @@
 """
 import json
 import re
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -10,11 +11,16 @@ from typing import Optional, Dict, Any, List
 from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
 
 from config import settings, SYSTEM_PROMPT, SLOT_QUESTIONS
-from utils import logger
-from .function_definitions import FUNCTION_DEFINITIONS, get_required_params
+from core.llm import llm_gateway, CircuitOpenError, RETRYABLE_ERRORS
+from utils import logger, metrics, Deadline, time_left
+from .function_definitions import get_required_params, get_function_by_name
+from .intent_classifier import OTHER, create_intent_classifier
 from .rule_preprocessor import RulePreprocessor
-from .prompt_templates import OPTIMIZED_SYSTEM_PROMPT
+from .prompt_budget import PromptBudgeter, PromptPlan
+from .prompt_templates import SLOT_FILLING_INSTRUCTION
 from .result_validator import ResultValidator
+from .session_store import create_session_store
+from .result_cache import create_result_cache
 
 
 @dataclass
@@ -28,158 +34,430 @@ class NLUResult:
     clarification_message: Optional[str] = None
     missing_slots: List[str] = field(default_factory=list)
     raw_response: Optional[str] = None
-    source: str = "llm"  # rule / llm / corrected
+    source: str = "llm"  # rule / slot_fill / classifier / cache / llm / corrected / rule_only
 
 
 class NLUEngine:
     """改进的NLU引擎"""
 
+    # LLM不可用（熔断/时间预算不足）且规则未命中时的提示
+    RULE_ONLY_HINT = "系统繁忙，请换个简单的说法，例如：查询我的套餐、有哪些套餐、办理畅游套餐"
+
     def __init__(self):
         """初始化NLU引擎"""
         self.provider = settings.LLM_PROVIDER
 
-        # 导入OpenAI SDK（DeepSeek兼容OpenAI接口）
-        from openai import OpenAI
-
         if self.provider == "deepseek":
-            # 配置DeepSeek
             if not settings.DEEPSEEK_API_KEY:
                 raise ValueError("未配置DEEPSEEK_API_KEY，请检查.env文件")
-
-            self.client = OpenAI(
-                api_key=settings.DEEPSEEK_API_KEY,
-                base_url=settings.DEEPSEEK_BASE_URL
-            )
-            self.model = settings.DEEPSEEK_MODEL
-            logger.info(f"✓ NLU引擎初始化成功: DeepSeek ({self.model})")
-
         elif self.provider == "openai":
             if not settings.OPENAI_API_KEY:
                 raise ValueError("未配置OPENAI_API_KEY")
-
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.model = settings.OPENAI_MODEL
-            logger.info(f"✓ NLU引擎初始化成功: OpenAI ({self.model})")
-
         else:
             raise ValueError(f"不支持的LLM提供商: {self.provider}")
+
+        # 客户端由LLM网关统一管理（连接池、超时重试、熔断），进程内共享
+        self.client = llm_gateway.client
+        self._async_clients = llm_gateway.async_clients
+        self.model = llm_gateway.model
+        logger.info(f"✓ NLU引擎初始化成功: {self.provider} ({self.model})")
+
         # 🆕 新增组件
         self.rule_preprocessor = RulePreprocessor()      # 规则前置
         self.result_validator = ResultValidator()        # 后验证
+        self.prompt_budgeter = PromptBudgeter()          # 按状态裁剪Prompt与工具集
 
-        self.sessions = {}
+        # 本地意图分类器（None表示未启用或无模型）
+        self.intent_classifier = create_intent_classifier()
+        self.classifier_threshold = settings.NLU_CLASSIFIER_THRESHOLD
+
+        # 剩余时间预算低于此值时不调用LLM（秒）
+        self.llm_min_budget = settings.NLU_LLM_MIN_BUDGET_MS / 1000
+
+        # 会话上下文存储（LRU + 空闲TTL，可选Redis共享）
+        self.sessions = create_session_store()
+        # LLM解析结果缓存（None表示禁用）
+        self.result_cache = create_result_cache()
         logger.info(f"✓ NLU引擎初始化完成: {self.provider} ({self.model})")
         logger.info("✓ 规则前置 + LLM兜底 + 后验证架构已启用")
 
     def understand(self,
                    user_input: str,
                    session_id: str,
-                   user_phone: Optional[str] = None) -> NLUResult:
+                   user_phone: Optional[str] = None,
+                   deadline: Optional[Deadline] = None) -> NLUResult:
         """
         理解用户输入 - 三阶段处理
         流程：规则前置 → LLM理解 → 后验证
+
+        deadline 剩余预算不足时跳过LLM，降级为纯规则
         """
         logger.info(f"[{session_id}] 开始NLU理解: {user_input}")
 
         try:
-            # 1. 预处理
-            processed_text = self._preprocess(user_input)
-            logger.debug(f"[{session_id}] 预处理后: {processed_text}")
-
-            # 2. 获取上下文
             context = self._get_session_context(session_id)
-            if user_phone:
-                context["user_phone"] = user_phone
-
-            # 🆕 3. 阶段1：规则前置（80%场景）
-            rule_result = self.rule_preprocessor.preprocess(processed_text, context)
-            if rule_result:
-                # 规则命中，构建NLUResult
-                nlu_result = NLUResult(
-                    intent=rule_result["intent"],
-                    function_name=rule_result["intent"],
-                    parameters=rule_result["parameters"],
-                    confidence=rule_result["confidence"],
-                    source="rule"
-                )
+            processed_text, nlu_result = self._understand_locally(
+                user_input, session_id, user_phone, context
+            )
 
-                logger.info(f"[{session_id}] ✓ 规则命中: {rule_result['rule_name']}")
-            else:
-                # 🆕 4. 阶段2：LLM理解（20%场景）
-                logger.info(f"[{session_id}] 规则未命中，使用LLM")
-
-                # 构建消息（使用优化后的Prompt）
-                messages = self._build_messages(processed_text, context)
-                logger.info(f"[{session_id}] 规则未命中，使用LLM，message: {messages}")
-                # 调用LLM
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=FUNCTION_DEFINITIONS,
-                    tool_choice="required",
-                    temperature=0.2,
-                    top_p=0.9
-                )
+            if nlu_result is None:
+                # 🆕 4. 阶段2：LLM理解（20%场景），先查结果缓存
+                cache_key = self._cache_key(processed_text, context)
+                cached = self.result_cache.get(cache_key) if cache_key else None
+                nlu_result = self._from_cache(cached, session_id)
+
+            if nlu_result is None and not self._llm_in_budget(deadline, session_id):
+                nlu_result = self._rule_only_result(session_id, reason="时间预算不足")
+
+            if nlu_result is None:
+                request = self._build_llm_request(processed_text, context, session_id)
+                start = time.perf_counter()
+                try:
+                    response = llm_gateway.call(
+                        request,
+                        lambda timeout: self.client.chat.completions.create(**request, timeout=timeout),
+                        caller="nlu",
+                        timeout=time_left(deadline)
+                    )
+                except CircuitOpenError:
+                    nlu_result = self._rule_only_result(session_id)
+                except RETRYABLE_ERRORS:
+                    if self._llm_in_budget(deadline, session_id):
+                        raise
+                    nlu_result = self._rule_only_result(session_id, reason="时间预算耗尽")
+                else:
+                    latency_ms = self._observe_llm_latency(start)
+                    self._observe_usage(response)
+                    nlu_result = self._parse_response(response, context, processed_text)
+                    nlu_result.source = "llm"
+                    if cache_key:
+                        self.result_cache.set(cache_key, nlu_result, context, processed_text, latency_ms)
+
+            nlu_result = self._finalize_result(nlu_result, user_input, session_id, context)
+            self.sessions.save(session_id, context)
+            return nlu_result
 
-                # 解析响应
-                nlu_result = self._parse_response(response, context, processed_text)
-                nlu_result.source = "llm"
+        except Exception as e:
+            return self._error_result(session_id, e)
 
-            # 🆕 5. 阶段3：后验证（规则二次验证）
-            validation = self.result_validator.validate(
-                nlu_result.intent,
-                nlu_result.parameters,
-                user_input,
-                context
-            )
+    async def aunderstand(self,
+                          user_input: str,
+                          session_id: str,
+                          user_phone: Optional[str] = None,
+                          deadline: Optional[Deadline] = None) -> NLUResult:
+        """
+        理解用户输入（异步版本）
 
-            # 应用验证结果
-            if not validation["valid"] or validation["warnings"]:
-                logger.warning(
-                    f"[{session_id}] 后验证发现问题: "
-                    f"valid={validation['valid']}, "
-                    f"warnings={validation['warnings']}"
-                )
+        与 understand 共用规则前置与后验证逻辑，仅LLM调用改为 AsyncOpenAI，不阻塞事件循环
+        """
+        logger.info(f"[{session_id}] 开始NLU理解(async): {user_input}")
 
-                # 修正意图
-                if validation["corrected_intent"] != nlu_result.intent:
-                    logger.info(
-                        f"[{session_id}] 意图修正: "
-                        f"{nlu_result.intent} → {validation['corrected_intent']}"
+        try:
+            context = await self._aget_session_context(session_id)
+            processed_text, nlu_result = self._understand_locally(
+                user_input, session_id, user_phone, context
+            )
+
+            if nlu_result is None:
+                cache_key = self._cache_key(processed_text, context)
+                cached = await self.result_cache.aget(cache_key) if cache_key else None
+                nlu_result = self._from_cache(cached, session_id)
+
+            if nlu_result is None and not self._llm_in_budget(deadline, session_id):
+                nlu_result = self._rule_only_result(session_id, reason="时间预算不足")
+
+            if nlu_result is None:
+                request = self._build_llm_request(processed_text, context, session_id)
+                start = time.perf_counter()
+                try:
+                    response = await llm_gateway.acall(
+                        request,
+                        lambda timeout: self.async_client.chat.completions.create(**request, timeout=timeout),
+                        caller="nlu",
+                        timeout=time_left(deadline)
                     )
-                    nlu_result.intent = validation["corrected_intent"]
-                    nlu_result.function_name = validation["corrected_intent"]
-                    nlu_result.source = "corrected"
+                except CircuitOpenError:
+                    nlu_result = self._rule_only_result(session_id)
+                except RETRYABLE_ERRORS:
+                    if self._llm_in_budget(deadline, session_id):
+                        raise
+                    nlu_result = self._rule_only_result(session_id, reason="时间预算耗尽")
+                else:
+                    latency_ms = self._observe_llm_latency(start)
+                    self._observe_usage(response)
+                    nlu_result = self._parse_response(response, context, processed_text)
+                    nlu_result.source = "llm"
+                    if cache_key:
+                        await self.result_cache.aset(cache_key, nlu_result, context, processed_text, latency_ms)
+
+            nlu_result = self._finalize_result(nlu_result, user_input, session_id, context)
+            await self.sessions.asave(session_id, context)
+            return nlu_result
+
+        except Exception as e:
+            return self._error_result(session_id, e)
+
+    @property
+    def async_client(self):
+        """当前事件循环对应的异步LLM客户端"""
+        return self._async_clients.get()
+
+    def _understand_locally(self,
+                            user_input: str,
+                            session_id: str,
+                            user_phone: Optional[str],
+                            context: Dict):
+        """
+        预处理 + 本地理解（规则前置、槽位填充快速通道、本地意图分类器）
 
-                # 修正参数
-                nlu_result.parameters = validation["corrected_params"]
-                nlu_result.confidence = validation["confidence"]
+        Returns:
+            tuple: (预处理文本, 本地命中的NLUResult 或 None)
+        """
+        # 1. 预处理
+        processed_text = self._preprocess(user_input)
+        logger.debug(f"[{session_id}] 预处理后: {processed_text}")
+
+        # 2. 上下文
+        if user_phone:
+            context["user_phone"] = user_phone
+
+        # 🆕 3. 阶段1：规则前置（80%场景）
+        rule_result = self.rule_preprocessor.preprocess(processed_text, context)
+        if not rule_result:
+            # 🆕 3.5 槽位填充快速通道：用户在回答追问时，本地识别出槽位值则不调用LLM
+            slot_result = self._resolve_waiting_slot(processed_text, context, session_id)
+            if slot_result is None:
+                # 3.6 本地意图分类器：置信度足够时不调用LLM
+                slot_result = self._classify_locally(processed_text, context, session_id)
+            return processed_text, slot_result
+
+        # 规则命中，构建NLUResult
+        nlu_result = NLUResult(
+            intent=rule_result["intent"],
+            function_name=rule_result["intent"],
+            parameters=rule_result["parameters"],
+            confidence=rule_result["confidence"],
+            source="rule"
+        )
 
-            # 6. 验证参数完整性
-            self._validate_and_fill_slots(nlu_result, context)
+        logger.info(f"[{session_id}] ✓ 规则命中: {rule_result['rule_name']}")
+        return processed_text, nlu_result
 
-            # 7. 更新会话
-            self._update_session(session_id, user_input, nlu_result, context)
+    def _resolve_waiting_slot(self,
+                              user_input: str,
+                              context: Dict,
+                              session_id: str) -> Optional[NLUResult]:
+        """
+        槽位填充快速通道
 
-            logger.info(
-                f"[{session_id}] NLU完成: "
-                f"intent={nlu_result.intent}, "
-                f"source={nlu_result.source}, "
-                f"confidence={nlu_result.confidence:.2f}"
-            )
+        处于追问状态（waiting_for_slot）时，如果能从输入中直接识别出等待的槽位值，
+        直接延续当前意图。LLM在这种情况下的返回本来也会被 _parse_slot_filling_response 忽略，
+        因此跳过LLM不改变结果。
 
-            return nlu_result
+        Returns:
+            Optional[NLUResult]: 识别成功返回结果（source=slot_fill），否则None
+        """
+        waiting_slot = context.get("waiting_for_slot")
+        if not waiting_slot or not context.get("current_intent"):
+            return None
 
+        slot_value = self._extract_slot_value(user_input, waiting_slot)
+        if not slot_value:
+            return None
 
-        except Exception as e:
-            logger.error(f"[{session_id}] NLU异常: {str(e)}")
-            return NLUResult(
-                intent="error",
-                confidence=0.0,
-                requires_clarification=True,
-                clarification_message=f"抱歉,处理出现问题: {str(e)}"
+        nlu_result = self._continue_with_slot(context, waiting_slot, slot_value)
+        nlu_result.source = "slot_fill"
+
+        metrics.counter("nlu_llm_calls_avoided_total", stage="slot_fill").inc()
+        logger.info(f"[{session_id}] ✓ 槽位填充快速通道: {waiting_slot}={slot_value}，跳过LLM")
+        return nlu_result
+
+    def _classify_locally(self,
+                          user_input: str,
+                          context: Dict,
+                          session_id: str) -> Optional[NLUResult]:
+        """
+        本地意图分类器
+
+        追问状态下输入依赖上下文（如单独的手机号），交给LLM；
+        分类为 other 或置信度低于阈值同样交给LLM。参数复用规则层的实体提取。
+
+        Returns:
+            Optional[NLUResult]: 置信时返回结果（source=classifier），否则None
+        """
+        if self.intent_classifier is None or context.get("waiting_for_slot"):
+            return None
+
+        intent, confidence = self.intent_classifier.predict(user_input)
+        if intent == OTHER or confidence < self.classifier_threshold:
+            metrics.counter("nlu_classifier_total", result="abstain").inc()
+            logger.debug(f"[{session_id}] 分类器未达阈值: {intent} ({confidence:.2f})")
+            return None
+
+        properties = list(get_function_by_name(intent)["parameters"]["properties"])
+        parameters = self.rule_preprocessor.extract_parameters(user_input, properties, context)
+
+        metrics.counter("nlu_classifier_total", result="accept").inc()
+        metrics.counter("nlu_llm_calls_avoided_total", stage="classifier").inc()
+        logger.info(f"[{session_id}] ✓ 分类器命中: {intent} ({confidence:.2f})，跳过LLM")
+        return NLUResult(
+            intent=intent,
+            function_name=intent,
+            parameters=parameters,
+            confidence=confidence,
+            source="classifier"
+        )
+
+    def _llm_in_budget(self, deadline: Optional[Deadline], session_id: str) -> bool:
+        """剩余时间预算是否足够调用LLM；不足时记录降级"""
+        if deadline is None or deadline.allows(self.llm_min_budget):
+            return True
+        deadline.degrade("nlu_rule_only")
+        logger.warning(f"[{session_id}] 剩余预算 {deadline.remaining() * 1000:.0f}ms，NLU跳过LLM")
+        return False
+
+    def _cache_key(self, processed_text: str, context: Dict) -> Optional[str]:
+        """结果缓存键（缓存禁用时为None）"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.make_key(processed_text, context)
+
+    def _from_cache(self, cached: Optional[Dict[str, Any]], session_id: str) -> Optional[NLUResult]:
+        """由缓存条目构建NLUResult"""
+        if not cached:
+            return None
+        logger.info(f"[{session_id}] ✓ NLU结果缓存命中: {cached['intent']}，跳过LLM")
+        return NLUResult(source="cache", **cached)
+
+    def _observe_llm_latency(self, start: float) -> float:
+        """记录LLM调用耗时（毫秒）"""
+        latency_ms = (time.perf_counter() - start) * 1000
+        metrics.histogram("nlu_llm_latency_ms").observe(latency_ms)
+        return latency_ms
+
+    def _observe_usage(self, response):
+        """记录上游返回的实际输入token数（与预算估算对照）"""
+        usage = getattr(response, "usage", None)
+        if usage and getattr(usage, "prompt_tokens", None):
+            metrics.histogram("nlu_prompt_tokens_actual").observe(usage.prompt_tokens)
+
+    def _build_llm_request(self, processed_text: str, context: Dict, session_id: str) -> Dict[str, Any]:
+        """构建LLM请求参数（同步/异步共用）"""
+        logger.info(f"[{session_id}] 规则未命中，使用LLM")
+        metrics.counter("nlu_llm_calls_total").inc()
+
+        # 构建消息：System Prompt与工具集按会话状态裁剪，并受token上限约束
+        conversation = self._build_messages(processed_text, context)
+        plan = self.prompt_budgeter.plan(
+            processed_text, context, self._is_slot_filling_state(context), conversation
+        )
+        self._record_prompt_plan(plan, session_id)
+        messages = [ChatCompletionSystemMessageParam(role="system", content=plan.system_prompt)] + plan.messages
+        logger.debug(f"[{session_id}] LLM请求消息: {messages}")
+
+        return {
+            "model": self.model,
+            "messages": messages,
+            "tools": plan.tools,
+            "tool_choice": "required",
+            "temperature": 0.2,
+            "top_p": 0.9
+        }
+
+    def _record_prompt_plan(self, plan: PromptPlan, session_id: str):
+        """记录每次调用的Prompt token估算"""
+        for part in ("system", "tools", "messages", "total"):
+            metrics.histogram("nlu_prompt_tokens", part=part, mode=plan.mode).observe(plan.tokens[part])
+        for section in plan.dropped:
+            metrics.counter("nlu_prompt_sections_dropped_total", section=section).inc()
+        if plan.dropped_messages:
+            metrics.counter("nlu_prompt_messages_dropped_total").inc(plan.dropped_messages)
+        if plan.over_budget:
+            metrics.counter("nlu_prompt_over_budget_total").inc()
+            logger.warning(f"[{session_id}] Prompt超出预算: {plan.tokens['total']} > {plan.tokens['ceiling']}")
+
+        logger.info(
+            f"[{session_id}] Prompt预算: mode={plan.mode}, tokens≈{plan.tokens['total']} "
+            f"(system={plan.tokens['system']}, tools={plan.tokens['tools']}, "
+            f"messages={plan.tokens['messages']}), "
+            f"工具={[tool['function']['name'] for tool in plan.tools]}"
+            + (f", 裁剪={plan.dropped}" if plan.dropped else "")
+            + (f", 丢弃上下文消息={plan.dropped_messages}" if plan.dropped_messages else "")
+        )
+
+    def _finalize_result(self,
+                         nlu_result: NLUResult,
+                         user_input: str,
+                         session_id: str,
+                         context: Dict) -> NLUResult:
+        """后验证 + 槽位补全 + 会话更新"""
+        # 🆕 5. 阶段3：后验证（规则二次验证）
+        validation = self.result_validator.validate(
+            nlu_result.intent,
+            nlu_result.parameters,
+            user_input,
+            context
+        )
+
+        # 应用验证结果
+        if not validation["valid"] or validation["warnings"]:
+            logger.warning(
+                f"[{session_id}] 后验证发现问题: "
+                f"valid={validation['valid']}, "
+                f"warnings={validation['warnings']}"
             )
 
+            # 修正意图
+            if validation["corrected_intent"] != nlu_result.intent:
+                logger.info(
+                    f"[{session_id}] 意图修正: "
+                    f"{nlu_result.intent} → {validation['corrected_intent']}"
+                )
+                nlu_result.intent = validation["corrected_intent"]
+                nlu_result.function_name = validation["corrected_intent"]
+                nlu_result.source = "corrected"
+
+            # 修正参数
+            nlu_result.parameters = validation["corrected_params"]
+            nlu_result.confidence = validation["confidence"]
+
+        # 6. 验证参数完整性
+        self._validate_and_fill_slots(nlu_result, context)
+
+        # 7. 更新会话
+        self._update_session(session_id, user_input, nlu_result, context)
+        metrics.counter("nlu_requests_total", source=nlu_result.source).inc()
+
+        logger.info(
+            f"[{session_id}] NLU完成: "
+            f"intent={nlu_result.intent}, "
+            f"source={nlu_result.source}, "
+            f"confidence={nlu_result.confidence:.2f}"
+        )
+
+        return nlu_result
+
+    def _rule_only_result(self, session_id: str, reason: str = "LLM熔断中") -> NLUResult:
+        """LLM不可用（熔断/时间预算不足）时的纯规则降级结果：规则未命中则引导用户换用规则可识别的说法"""
+        logger.warning(f"[{session_id}] {reason}，NLU降级为纯规则模式")
+        return NLUResult(
+            intent="chat",
+            confidence=0.0,
+            requires_clarification=True,
+            clarification_message=self.RULE_ONLY_HINT,
+            source="rule_only"
+        )
+
+    def _error_result(self, session_id: str, error: Exception) -> NLUResult:
+        """NLU异常时的兜底结果"""
+        logger.error(f"[{session_id}] NLU异常: {str(error)}")
+        return NLUResult(
+            intent="error",
+            confidence=0.0,
+            requires_clarification=True,
+            clarification_message=f"抱歉,处理出现问题: {str(error)}"
+        )
+
     def _validate_and_fill_slots(self, nlu_result: NLUResult, context: Dict):
         """验证并填充槽位"""
         if not nlu_result.function_name:
@@ -215,32 +493,41 @@ class NLUEngine:
         return text
 
     def _get_session_context(self, session_id: str) -> Dict:
-        """获取会话上下文"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "history": [],
-                "current_intent": None,
-                "slot_values": {},
-                "user_phone": None,
-                "created_at": datetime.now()
-            }
-        return self.sessions[session_id]
+        """获取会话上下文（不存在或已过期时新建）"""
+        context = self.sessions.get(session_id)
+        if context is None:
+            context = self._new_session_context()
+            self.sessions.save(session_id, context)
+        return context
+
+    async def _aget_session_context(self, session_id: str) -> Dict:
+        """获取会话上下文（异步版本）"""
+        context = await self.sessions.aget(session_id)
+        if context is None:
+            context = self._new_session_context()
+            await self.sessions.asave(session_id, context)
+        return context
+
+    def _new_session_context(self) -> Dict:
+        return {
+            "history": [],
+            "current_intent": None,
+            "slot_values": {},
+            "user_phone": None,
+            "created_at": datetime.now()
+        }
 
 
     def _build_messages(self, user_input: str, context: Dict) -> List[Any]:
-        """构建消息 - 使用优化后的Prompt"""
-        messages = []
+        """
+        构建对话消息（状态指示 + 上下文 + 当前输入）
 
-        # 1. 使用优化后的System Prompt
-        optimized_system_prompt = self._build_dynamic_system_prompt(context)
-        messages.append(
-            ChatCompletionSystemMessageParam(
-                role="system",
-                content=optimized_system_prompt  # 🆕 优化后的Prompt
-            )
-        )
+        System Prompt与工具定义是跨会话字节一致的前缀（见 PromptBudgeter），
+        所有随会话状态变化的文本都放在这里，位于前缀之后
+        """
+        messages = []
 
-        # 2. 上下文（如果有）
+        # 1. 上下文（如果有）
         is_slot_filling = self._is_slot_filling_state(context)
 
         if is_slot_filling:
@@ -248,7 +535,7 @@ class NLUEngine:
             messages.append(
                 ChatCompletionUserMessageParam(
                     role="user",
-                    content=task_context
+                    content=f"{SLOT_FILLING_INSTRUCTION}\n{task_context}"
                 )
             )
         else:
@@ -261,7 +548,7 @@ class NLUEngine:
                     )
                 )
 
-        # 3. 当前用户输入
+        # 2. 当前用户输入
         messages.append(
             ChatCompletionUserMessageParam(
                 role="user",
@@ -436,33 +723,6 @@ class NLUEngine:
 
         return "。".join(parts) + "。"
 
-    def _build_dynamic_system_prompt(self, context: Dict) -> str:
-        """
-        构建动态System Prompt
-
-        根据是否在槽位填充状态，调整提示词
-        """
-        base_prompt = OPTIMIZED_SYSTEM_PROMPT
-
-        if self._is_slot_filling_state(context):
-            # 槽位填充场景：添加特殊指示
-            slot_filling_instruction = f"""
-
-【当前状态】槽位填充模式
-- 用户的输入可能是在回答之前的问题
-- 优先判断输入是否是缺失槽位的值
-- 如果是槽位值（如手机号、套餐名），继续当前意图
-- 如果是全新问题，切换到新意图
-
-【判断规则】
-- 11位数字 → 可能是手机号，用于当前意图
-- 套餐名称 → 用于当前意图  
-- 明确新问题关键词（"查询"、"我要"等）→ 新意图
-"""
-            return base_prompt + slot_filling_instruction
-
-        return base_prompt
-
     # ========== 4️⃣ 改进响应解析（增加槽位填充识别）==========
     def _parse_response(self, response, context: Dict, user_input: str):
         """改进的响应解析 - 支持槽位填充场景"""
@@ -545,41 +805,13 @@ class NLUEngine:
         3. 如果不匹配，按正常流程处理（可能是新意图）
         """
         waiting_slot = context["waiting_for_slot"]
-        current_intent = context["current_intent"]
 
         # 尝试从用户输入直接识别槽位值
         slot_value = self._extract_slot_value(user_input, waiting_slot)
 
         if slot_value:
             # 成功识别槽位值，继续当前意图
-            parameters = dict(context.get("slot_values", {}))
-            parameters[waiting_slot] = slot_value
-
-            # 重新验证必填参数
-            missing_slots = self._validate_parameters(
-                current_intent,
-                parameters,
-                context
-            )
-
-            if missing_slots:
-                # 还有其他缺失槽位
-                return NLUResult(
-                    intent=current_intent,
-                    function_name=current_intent,
-                    parameters=parameters,
-                    requires_clarification=True,
-                    clarification_message=self._get_slot_question(missing_slots[0]),
-                    missing_slots=missing_slots
-                )
-            else:
-                # 所有槽位已填充
-                return NLUResult(
-                    intent=current_intent,
-                    function_name=current_intent,
-                    parameters=parameters,
-                    confidence=0.9
-                )
+            return self._continue_with_slot(context, waiting_slot, slot_value)
 
         # 无法识别为槽位值，可能是新意图
         # 检查LLM返回
@@ -606,6 +838,48 @@ class NLUEngine:
             raw_response=message.content or "抱歉，没有理解您的意思"
         )
 
+    def _continue_with_slot(self, context: Dict, slot_name: str, slot_value: str) -> NLUResult:
+        """
+        用识别出的槽位值延续当前意图
+
+        Args:
+            context: 会话上下文
+            slot_name: 槽位名
+            slot_value: 槽位值
+
+        Returns:
+            NLUResult: 延续当前意图的结果（可能仍缺其他槽位）
+        """
+        current_intent = context["current_intent"]
+        parameters = dict(context.get("slot_values", {}))
+        parameters[slot_name] = slot_value
+
+        # 重新验证必填参数
+        missing_slots = self._validate_parameters(
+            current_intent,
+            parameters,
+            context
+        )
+
+        if missing_slots:
+            # 还有其他缺失槽位
+            return NLUResult(
+                intent=current_intent,
+                function_name=current_intent,
+                parameters=parameters,
+                requires_clarification=True,
+                clarification_message=self._get_slot_question(missing_slots[0]),
+                missing_slots=missing_slots
+            )
+
+        # 所有槽位已填充
+        return NLUResult(
+            intent=current_intent,
+            function_name=current_intent,
+            parameters=parameters,
+            confidence=0.9
+        )
+
     def _extract_slot_value(self, user_input: str, slot_name: str):
         """
         从用户输入中提取槽位值
@@ -614,6 +888,7 @@ class NLUEngine:
         - phone: 11位数字
         - package_name: 套餐名称
         - new_package_name: 套餐名称
+        - query_type: 流量(data) / 话费余额(balance) / 全部(all)
         """
         import re
 
@@ -631,6 +906,17 @@ class NLUEngine:
                 if name in user_input:
                     return name
 
+        # 查询类型识别
+        if slot_name == "query_type":
+            has_data = "流量" in user_input
+            has_balance = "话费" in user_input or "余额" in user_input
+            if (has_data and has_balance) or "都" in user_input or "全部" in user_input:
+                return "all"
+            if has_data:
+                return "data"
+            if has_balance:
+                return "balance"
+
         return None
 
     # ========== 5️⃣ 新增：智能tool选择 ==========
@@ -0,0 +1,200 @@
+"""
+NLU Prompt预算
+
+按会话状态为每次LLM调用挑选最小的工具集与System Prompt分节，并保证输入token不超过上限：
+- 普通状态：全部工具 + 完整Prompt
+- 槽位填充状态：当前意图的工具 + 输入中出现切换关键词的意图；Prompt只保留判断"继续/切换"所需分节
+- 前缀（System Prompt + 工具定义）只在"上限 - 消息预留"内裁剪：超出时按优先级从低到高丢弃可选分节，必需分节始终保留
+- 消息超出剩余预算时从最早的上下文消息开始丢弃，当前输入始终保留
+
+System Prompt + 工具定义构成请求前缀，只由（模式, 工具子集）决定，不随输入长度与会话内容变化，
+同一状态类别下跨会话字节一致，可以命中服务端的前缀KV缓存（DeepSeek上下文硬盘缓存）；
+槽位填充指示等随状态变化的文本放在前缀之后的消息中。
+
+token数按DeepSeek官方换算估算（中文字符约0.6 token，其余字符约0.3 token），不依赖分词器。
+"""
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import settings
+from .function_definitions import FUNCTION_DEFINITIONS
+from .prompt_templates import OPTIMIZED_SYSTEM_PROMPT
+
+_CJK = re.compile(r"[　-〿一-鿿＀-￯]")
+_SECTION_HEADER = re.compile(r"^【([^】]+)】", re.MULTILINE)
+
+# 槽位填充状态下，输入中出现这些词说明用户可能切换了意图（与【意图识别规则】一致）
+SWITCH_KEYWORDS = {
+    "query_packages": ("有什么", "推荐", "便宜", "以内", "以下", "多一点", "哪些"),
+    "query_package_detail": ("详情", "内容", "介绍"),
+    "query_current_package": ("我的套餐", "当前套餐", "什么套餐"),
+    "change_package": ("办理", "换", "改成", "开通"),
+    "query_usage": ("流量", "话费", "余额", "用了多少", "剩余"),
+    "business_consultation": ("怎么", "如何", "条件", "流程", "需要什么"),
+}
+
+# 可选分节的保留优先级（靠前的先保留，超预算时从末尾开始丢弃）
+OPTIONAL_PRIORITY = ["示例学习", "意图识别规则", "核心原则", "套餐信息", "错误示例"]
+# 各模式使用的分节；intro（开头一句角色说明）与"重要提醒"为必需分节
+MODE_SECTIONS = {
+    "full": ["intro", "示例学习", "错误示例", "核心原则", "套餐信息", "意图识别规则", "重要提醒"],
+    "slot_filling": ["intro", "核心原则", "重要提醒"],
+}
+REQUIRED_SECTIONS = {"intro", "重要提醒"}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本token数
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 估算token数
+    """
+    cjk = len(_CJK.findall(text))
+    return math.ceil(cjk * 0.6 + (len(text) - cjk) * 0.3)
+
+
+def split_sections(prompt: str) -> Dict[str, str]:
+    """
+    按【标题】把Prompt拆成分节（标题取首个空格/符号前的部分，如"错误示例 - 请避免"→"错误示例"）
+
+    Returns:
+        dict: 分节名 → 原文（保持原顺序，开头无标题部分为 intro）
+    """
+    sections = {}
+    starts = [(m.start(), re.split(r"[\s\-]", m.group(1))[0]) for m in _SECTION_HEADER.finditer(prompt)]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, "intro"))
+    for i, (start, name) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(prompt)
+        sections[name] = prompt[start:end].strip("\n") + "\n"
+    return sections
+
+
+PROMPT_SECTIONS = split_sections(OPTIMIZED_SYSTEM_PROMPT)
+_TOOLS_BY_NAME = {tool["function"]["name"]: tool for tool in FUNCTION_DEFINITIONS}
+
+
+def _tools_tokens(tools: Sequence[Dict[str, Any]]) -> int:
+    return estimate_tokens(json.dumps(list(tools), ensure_ascii=False))
+
+
+def _messages_tokens(messages: Sequence[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(str(message.get("content") or "")) for message in messages)
+
+
+@dataclass
+class PromptPlan:
+    """一次LLM调用的Prompt方案"""
+    mode: str
+    system_prompt: str
+    tools: List[Dict[str, Any]]
+    sections: List[str]
+    tokens: Dict[str, int] = field(default_factory=dict)  # system / tools / messages / total
+    dropped: List[str] = field(default_factory=list)  # 因超预算丢弃的分节
+    messages: List[Dict[str, Any]] = field(default_factory=list)  # 裁剪后的消息（system之外）
+    dropped_messages: int = 0  # 因超预算丢弃的上下文消息数
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens.get("total", 0) > self.tokens.get("ceiling", math.inf)
+
+
+class PromptBudgeter:
+    """NLU Prompt预算器"""
+
+    def __init__(self, max_tokens: Optional[int] = None, message_reserve: Optional[int] = None):
+        """
+        Args:
+            max_tokens: 单次调用输入token上限（默认 NLU_PROMPT_MAX_TOKENS）
+            message_reserve: 为消息预留的token数，前缀只在其余部分内裁剪（默认 NLU_PROMPT_MESSAGE_RESERVE）
+        """
+        self.max_tokens = max_tokens or settings.NLU_PROMPT_MAX_TOKENS
+        if message_reserve is None:
+            message_reserve = settings.NLU_PROMPT_MESSAGE_RESERVE
+        self.message_reserve = message_reserve
+
+    def select_tools(self, user_input: str, context: Dict, slot_filling: bool) -> List[Dict[str, Any]]:
+        """
+        选择工具集
+
+        Args:
+            user_input: 用户输入
+            context: 会话上下文
+            slot_filling: 是否处于槽位填充状态
+
+        Returns:
+            list: FUNCTION_DEFINITIONS 的子集（保持原顺序）
+        """
+        current_intent = context.get("current_intent")
+        if not slot_filling or current_intent not in _TOOLS_BY_NAME:
+            return list(FUNCTION_DEFINITIONS)
+
+        wanted = {current_intent}
+        wanted.update(intent for intent, words in SWITCH_KEYWORDS.items()
+                      if any(word in user_input for word in words))
+        return [tool for tool in FUNCTION_DEFINITIONS if tool["function"]["name"] in wanted]
+
+    def plan(self,
+             user_input: str,
+             context: Dict,
+             slot_filling: bool,
+             messages: Sequence[Dict[str, Any]]) -> PromptPlan:
+        """
+        生成Prompt方案
+
+        Args:
+            user_input: 用户输入
+            context: 会话上下文
+            slot_filling: 是否处于槽位填充状态
+            messages: system之外的消息（状态指示、上下文、当前输入），计入预算
+
+        Returns:
+            PromptPlan: System Prompt、工具集、裁剪后的消息与各部分token估算
+        """
+        mode = "slot_filling" if slot_filling else "full"
+        tools = self.select_tools(user_input, context, slot_filling)
+        wanted = MODE_SECTIONS[mode]
+
+        # 前缀预算不看消息内容，保证同一（模式, 工具子集）下前缀字节一致
+        prefix_budget = self.max_tokens - self.message_reserve
+        # 先放必需分节，再按优先级放可选分节，直到预算用完
+        kept = {name for name in wanted if name in REQUIRED_SECTIONS}
+        used = _tools_tokens(tools) + sum(estimate_tokens(PROMPT_SECTIONS[name]) for name in kept)
+        dropped = []
+        for name in OPTIONAL_PRIORITY:
+            if name not in wanted:
+                continue
+            cost = estimate_tokens(PROMPT_SECTIONS[name])
+            if used + cost <= prefix_budget:
+                kept.add(name)
+                used += cost
+            else:
+                dropped.append(name)
+
+        sections = [name for name in wanted if name in kept]
+        system_prompt = "\n".join(PROMPT_SECTIONS[name] for name in sections)
+
+        tokens = {
+            "system": estimate_tokens(system_prompt),
+            "tools": _tools_tokens(tools),
+        }
+
+        # 消息超出剩余预算时从最早的上下文开始丢弃，当前输入（最后一条）始终保留
+        kept_messages = list(messages)
+        allowance = self.max_tokens - tokens["system"] - tokens["tools"]
+        while len(kept_messages) > 1 and _messages_tokens(kept_messages) > allowance:
+            kept_messages.pop(0)
+
+        tokens["messages"] = _messages_tokens(kept_messages)
+        tokens["total"] = sum(tokens.values())
+        tokens["ceiling"] = self.max_tokens
+        return PromptPlan(mode=mode, system_prompt=system_prompt, tools=tools,
+                          sections=sections, tokens=tokens, dropped=dropped,
+                          messages=kept_messages, dropped_messages=len(messages) - len(kept_messages))
@@ -109,6 +109,19 @@ OPTIMIZED_SYSTEM_PROMPT = """你是电信客服AI，负责理解用户需求并
 - 当前消息如果没有明确参数，该参数就留空，不要猜测或从其他地方提取！
 """
 
+# 槽位填充状态的指示（放在System Prompt之后的消息中，保持前缀稳定）
+SLOT_FILLING_INSTRUCTION = """【当前状态】槽位填充模式
+- 用户的输入可能是在回答之前的问题
+- 优先判断输入是否是缺失槽位的值
+- 如果是槽位值（如手机号、套餐名），继续当前意图
+- 如果是全新问题，切换到新意图
+
+【判断规则】
+- 11位数字 → 可能是手机号，用于当前意图
+- 套餐名称 → 用于当前意图  
+- 明确新问题关键词（"查询"、"我要"等）→ 新意图
+"""
+
 # Few-Shot示例（可在需要时动态添加）
 FEW_SHOT_EXAMPLES = [
     {
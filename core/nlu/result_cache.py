@@ -0,0 +1,223 @@
+"""
+NLU结果缓存
+
+位于LLM阶段之前：相同的（预处理后）输入 + 相同的上下文签名直接复用上次LLM的解析结果。
+
+上下文签名只包含影响解析结构的部分：当前意图、等待的槽位、已填充的槽位名、
+是否已知手机号——不包含槽位值，因此不同用户可以共享缓存。
+写入时会剔除从上下文带入（而非用户输入中出现）的参数值，
+命中后由 _validate_and_fill_slots 用当前会话的上下文重新补全，避免跨会话泄露。
+"""
+import hashlib
+import json
+from typing import Dict, Optional, Any
+
+from config import settings
+from utils import logger, metrics
+from utils.cache import TTLCache
+
+# 缓存的NLUResult字段（raw_response为LLM自由文本，不缓存）
+_CACHED_FIELDS = ("intent", "function_name", "parameters", "confidence",
+                  "requires_clarification", "clarification_message", "missing_slots")
+
+
+def context_signature(context: Dict) -> Dict[str, Any]:
+    """
+    上下文签名（不含PII值）
+
+    Args:
+        context: 会话上下文
+
+    Returns:
+        dict: {intent, waiting, filled, has_phone}
+    """
+    slot_values = context.get("slot_values") or {}
+    return {
+        "intent": context.get("current_intent"),
+        "waiting": context.get("waiting_for_slot"),
+        "filled": sorted(k for k, v in slot_values.items() if v),
+        "has_phone": bool(context.get("user_phone") or slot_values.get("phone"))
+    }
+
+
+class NLUResultCache:
+    """NLU结果缓存：进程内 LRU/TTL，可选 Redis 二级缓存"""
+
+    KEY_PREFIX = "nlu:result:"
+
+    def __init__(self, max_size: int = 5000, ttl: int = 600, redis_manager=None):
+        """
+        Args:
+            max_size: 进程内缓存条目上限
+            ttl: 缓存存活时间（秒）
+            redis_manager: Redis连接管理器；提供时启用Redis二级缓存，多worker共享
+        """
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self.redis_manager = redis_manager
+        self.redis = redis_manager.get_client() if redis_manager else None
+
+    @staticmethod
+    def make_key(processed_text: str, context: Dict) -> str:
+        """
+        生成缓存键
+
+        Args:
+            processed_text: _preprocess 规范化后的输入
+            context: 会话上下文
+        """
+        raw = json.dumps([processed_text, context_signature(context)],
+                         ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # ========== 读 ==========
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存
+
+        Returns:
+            dict: NLUResult字段；未命中返回None
+        """
+        entry = self.local.get(key)
+        if entry is None and self.redis is not None:
+            try:
+                data = self.redis.get(self.KEY_PREFIX + key)
+                entry = self._load_remote(key, data)
+            except Exception as e:
+                logger.error(f"NLU缓存读取Redis失败: {e}")
+        return self._record_lookup(entry)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存（异步版本）"""
+        entry = self.local.get(key)
+        if entry is None and self.redis is not None:
+            try:
+                data = await self.redis_manager.get_async_client().get(self.KEY_PREFIX + key)
+                entry = self._load_remote(key, data)
+            except Exception as e:
+                logger.error(f"NLU缓存读取Redis失败: {e}")
+        return self._record_lookup(entry)
+
+    def _load_remote(self, key: str, data) -> Optional[Dict[str, Any]]:
+        if not data:
+            return None
+        entry = json.loads(data)
+        self.local.set(key, entry)
+        return entry
+
+    def _record_lookup(self, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if entry is None:
+            metrics.counter("nlu_cache_requests_total", result="miss").inc()
+            return None
+
+        metrics.counter("nlu_cache_requests_total", result="hit").inc()
+        metrics.counter("nlu_cache_latency_saved_ms_total").inc(entry["latency_ms"])
+        # 返回副本，调用方会修改参数
+        result = dict(entry["result"])
+        result["parameters"] = dict(result["parameters"])
+        result["missing_slots"] = list(result["missing_slots"])
+        return result
+
+    # ========== 写 ==========
+
+    def set(self, key: str, nlu_result, context: Dict, processed_text: str, latency_ms: float):
+        """
+        写入缓存
+
+        Args:
+            key: make_key() 生成的键
+            nlu_result: LLM解析得到的NLUResult
+            context: 本次使用的会话上下文（用于识别从上下文带入的参数值）
+            processed_text: 规范化后的输入
+            latency_ms: 本次LLM调用耗时（命中时计入节省的延迟）
+        """
+        entry = self._make_entry(nlu_result, context, processed_text, latency_ms)
+        if entry is None:
+            return
+
+        self.local.set(key, entry)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.KEY_PREFIX + key, json.dumps(entry, ensure_ascii=False), ex=self.ttl)
+            except Exception as e:
+                logger.error(f"NLU缓存写入Redis失败: {e}")
+
+    async def aset(self, key: str, nlu_result, context: Dict, processed_text: str, latency_ms: float):
+        """写入缓存（异步版本）"""
+        entry = self._make_entry(nlu_result, context, processed_text, latency_ms)
+        if entry is None:
+            return
+
+        self.local.set(key, entry)
+        if self.redis is not None:
+            try:
+                await self.redis_manager.get_async_client().set(
+                    self.KEY_PREFIX + key, json.dumps(entry, ensure_ascii=False), ex=self.ttl)
+            except Exception as e:
+                logger.error(f"NLU缓存写入Redis失败: {e}")
+
+    def _make_entry(self, nlu_result, context: Dict, processed_text: str,
+                    latency_ms: float) -> Optional[Dict[str, Any]]:
+        # 只缓存函数调用结果；闲聊回复是LLM自由文本，可能引用会话内容
+        if not nlu_result.function_name or nlu_result.intent == "error":
+            return None
+
+        result = {field: getattr(nlu_result, field) for field in _CACHED_FIELDS}
+        result["parameters"] = self._strip_context_values(
+            nlu_result.parameters, context, processed_text
+        )
+        result["missing_slots"] = list(nlu_result.missing_slots)
+        return {"result": result, "latency_ms": round(latency_ms, 1)}
+
+    @staticmethod
+    def _strip_context_values(parameters: Dict, context: Dict, processed_text: str) -> Dict:
+        """剔除来自上下文、而非本次输入的参数值（如已知手机号、上轮槽位）"""
+        context_values = {str(v) for v in (context.get("slot_values") or {}).values() if v}
+        if context.get("user_phone"):
+            context_values.add(str(context["user_phone"]))
+
+        stripped = {}
+        for name, value in parameters.items():
+            text = str(value)
+            if name == "phone" and text not in processed_text:
+                continue
+            if text in context_values and text not in processed_text:
+                continue
+            stripped[name] = value
+        return stripped
+
+    def clear(self):
+        """清空进程内缓存"""
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return self.local.stats()
+
+
+def create_result_cache() -> Optional[NLUResultCache]:
+    """
+    按配置创建NLU结果缓存
+
+    NLU_CACHE_ENABLED=False 时返回None；NLU_CACHE_BACKEND=redis 且Redis可用时启用二级缓存
+    """
+    if not settings.NLU_CACHE_ENABLED:
+        return None
+
+    redis = None
+    if settings.NLU_CACHE_BACKEND == "redis":
+        from database import redis_manager
+        try:
+            if redis_manager.test_connection():
+                redis = redis_manager
+        except Exception as e:
+            logger.error(f"Redis初始化失败: {e}")
+        if redis is None:
+            logger.warning("Redis不可用，NLU结果缓存仅使用进程内缓存")
+
+    logger.info(f"NLU结果缓存: TTL={settings.NLU_CACHE_TTL}s, "
+                f"MaxSize={settings.NLU_CACHE_MAX_SIZE}, Redis={'是' if redis else '否'}")
+    return NLUResultCache(max_size=settings.NLU_CACHE_MAX_SIZE,
+                          ttl=settings.NLU_CACHE_TTL,
+                          redis_manager=redis)
@@ -2,6 +2,9 @@
 rule definitions
 """
 
+# 套餐名称
+PACKAGE_NAMES = ["经济套餐", "畅游套餐", "无限套餐", "校园套餐"]
+
 PRE_NLU_RULES = [
             # ===== 规则组1: 套餐办理类 =====
             {
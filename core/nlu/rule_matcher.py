@@ -0,0 +1,299 @@
+"""
+编译规则引擎
+
+- 规则正则在导入时一次性编译
+- 从正则中提取必需的字面关键词，用 Aho-Corasick 自动机单次扫描输入，
+  跳过关键词不齐、不可能命中的规则
+- 手机号/价格/流量等实体在一次扫描中提取，所有规则共用
+"""
+import re
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Any
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+from .rule_definitions import PRE_NLU_RULES, PACKAGE_NAMES
+
+_LITERAL = sre_parse.LITERAL
+_SUBPATTERN = sre_parse.SUBPATTERN
+_BRANCH = sre_parse.BRANCH
+_IN = sre_parse.IN
+
+# 数字串 + 可选单位：元/块 -> 价格，G/GB -> 流量（与原 [G|GB] 字符类保持一致）
+_NUMBER_PATTERN = re.compile(r"(\d+)\s*([元块]|[G|GB])?", re.IGNORECASE)
+_PHONE_PATTERN = re.compile(r"1[3-9]\d{9}")
+_PRICE_UNITS = frozenset("元块")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 多模式匹配：一次扫描找出文本中出现的所有关键词
+
+    每个关键词关联一个位掩码，scan() 返回所有出现关键词的掩码按位或，
+    调用方用整数运算判断关键词组合，避免逐条规则做集合运算。
+    """
+
+    def __init__(self, keywords: Dict[str, int]):
+        """
+        Args:
+            keywords: {关键词: 位掩码}（调用方负责统一大小写）
+        """
+        self.keywords = {k: v for k, v in keywords.items() if k}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [0]
+
+        for keyword, mask in self.keywords.items():
+            self._add(keyword, mask)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, mask: int):
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+            node = nxt
+        self._output[node] |= mask
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+
+    def scan(self, text: str) -> int:
+        """
+        扫描文本
+
+        Args:
+            text: 待扫描文本
+
+        Returns:
+            int: 文本中出现过的关键词的掩码按位或
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = 0
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found |= output[node]
+        return found
+
+
+_MAX_EXPANSIONS = 64
+
+
+def _literal_alternatives(items) -> Optional[List[str]]:
+    """
+    子模式若只由字面量、单字符字符集、分支组成，展开为所有可能的字面串
+
+    sre 会把 (以内|以下) 优化成 以[内下]，这里再展开回 ["以内", "以下"]；
+    含其他结构或展开过多时返回None。
+    """
+    expansions = [""]
+    for op, av in items:
+        if op is _LITERAL:
+            options = [chr(av)]
+        elif op is _IN:
+            options = _charset_literals(av)
+        elif op is _BRANCH:
+            options = []
+            for branch in av[1]:
+                branch_options = _literal_alternatives(branch)
+                if not branch_options:
+                    return None
+                options.extend(branch_options)
+        elif op is _SUBPATTERN:
+            options = _literal_alternatives(av[-1])
+        else:
+            return None
+
+        if not options:
+            return None
+        expansions = [prefix + option for prefix in expansions for option in options]
+        if len(expansions) > _MAX_EXPANSIONS:
+            return None
+
+    if not all(expansions):
+        return None
+    return expansions
+
+
+def _charset_literals(charset) -> Optional[List[str]]:
+    """[元块] 这类只含单个字符的字符集"""
+    chars = []
+    for op, av in charset:
+        if op is not _LITERAL:
+            return None
+        chars.append(chr(av))
+    return chars or None
+
+
+def _required_groups(items) -> List[Tuple[str, ...]]:
+    """
+    提取必需的关键词组
+
+    返回若干组关键词：要命中该正则，每组中至少有一个关键词出现在文本里。
+    只分析顶层序列中的连续字面量、字符集和分组，其余结构（重复、通配等）忽略，
+    因此结果是必要条件而非充分条件。
+    """
+    groups: List[Tuple[str, ...]] = []
+    run: List[str] = []
+
+    def flush():
+        if run:
+            groups.append(("".join(run),))
+            run.clear()
+
+    for op, av in items:
+        if op is _LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is _IN:
+            alternatives = _charset_literals(av)
+            if alternatives:
+                groups.append(tuple(alternatives))
+        elif op is _SUBPATTERN:
+            sub_items = list(av[-1])
+            alternatives = _literal_alternatives(sub_items)
+            if alternatives:
+                groups.append(tuple(alternatives))
+            else:
+                groups.extend(_required_groups(sub_items))
+    flush()
+    return groups
+
+
+def required_keywords(pattern: str) -> List[Tuple[str, ...]]:
+    """
+    从规则正则中推导关键词预筛条件（统一转小写，用于 IGNORECASE 匹配）
+
+    Args:
+        pattern: 正则字符串
+
+    Returns:
+        List[Tuple[str, ...]]: 关键词组列表；解析失败时返回空列表（不做预筛）
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    return [tuple(k.lower() for k in group) for group in _required_groups(list(parsed))]
+
+
+class CompiledRule:
+    """预编译的单条规则"""
+
+    __slots__ = ("name", "intent", "extract", "priority", "context_required",
+                 "pattern", "regex", "keyword_groups", "mask", "rule")
+
+    def __init__(self, rule: Dict[str, Any]):
+        self.rule = rule
+        self.name = rule["name"]
+        self.intent = rule["intent"]
+        self.extract = rule["extract"]
+        self.priority = rule.get("priority", 0)
+        self.context_required = bool(rule.get("context_required"))
+        self.pattern = rule["pattern"]
+        self.regex = re.compile(self.pattern, re.IGNORECASE)
+        self.keyword_groups = required_keywords(self.pattern)
+        # 每个关键词组占一位，由 RuleMatcher 分配
+        self.mask = 0
+
+    def may_match(self, found: int) -> bool:
+        """关键词预筛：任一必需关键词组在文本中完全缺失时不可能命中"""
+        return found & self.mask == self.mask
+
+
+class RuleMatcher:
+    """编译后的规则集"""
+
+    def __init__(self, rules: List[Dict[str, Any]], package_names: List[str]):
+        """
+        Args:
+            rules: 规则定义（不会被修改）
+            package_names: 套餐名称列表
+        """
+        # 按优先级稳定排序（副本，不修改模块级规则列表）
+        self.rules = [CompiledRule(r) for r in
+                      sorted(rules, key=lambda x: x.get("priority", 0), reverse=True)]
+        self.package_names = list(package_names)
+
+        # 为每个关键词组、每个套餐名分配一位
+        keywords: Dict[str, int] = {}
+        bit = 0
+        for rule in self.rules:
+            for group in rule.keyword_groups:
+                rule.mask |= 1 << bit
+                for keyword in group:
+                    keywords[keyword] = keywords.get(keyword, 0) | (1 << bit)
+                bit += 1
+
+        self._package_bits: List[Tuple[str, int]] = []
+        for name in self.package_names:
+            keywords[name.lower()] = keywords.get(name.lower(), 0) | (1 << bit)
+            self._package_bits.append((name, 1 << bit))
+            bit += 1
+
+        self.automaton = KeywordAutomaton(keywords)
+
+    def scan(self, text: str) -> int:
+        """单次扫描，返回出现过的关键词掩码（含套餐名）"""
+        return self.automaton.scan(text.lower())
+
+    def candidates(self, found: int) -> List[CompiledRule]:
+        """按优先级返回通过关键词预筛的规则"""
+        return [rule for rule in self.rules if found & rule.mask == rule.mask]
+
+    def extract_entities(self, text: str, found: int) -> Dict[str, Any]:
+        """
+        单次扫描提取实体
+
+        Args:
+            text: 用户输入
+            found: scan() 的结果，用于提取套餐名
+
+        Returns:
+            dict: {package_name, phone, price, data_gb}，未出现的为None
+        """
+        entities = {"package_name": None, "phone": None, "price": None, "data_gb": None}
+
+        for name, bit in self._package_bits:
+            if found & bit:
+                entities["package_name"] = name
+                break
+        for match in _NUMBER_PATTERN.finditer(text):
+            digits, unit = match.group(1), match.group(2)
+            if entities["phone"] is None and len(digits) >= 11:
+                phone = _PHONE_PATTERN.search(digits)
+                if phone:
+                    entities["phone"] = phone.group()
+            if unit:
+                if unit in _PRICE_UNITS:
+                    if entities["price"] is None:
+                        entities["price"] = int(digits)
+                elif entities["data_gb"] is None:
+                    entities["data_gb"] = int(digits)
+
+        return entities
+
+
+# 导入时编译一次，所有 RulePreprocessor 实例共享
+COMPILED_RULES = RuleMatcher(PRE_NLU_RULES, PACKAGE_NAMES)
@@ -1,24 +1,27 @@
 """
 规则前置处理器 - 处理80%高频场景
 """
-import re
 from typing import Optional, Dict, Any, List
 
-from .rule_definitions import PRE_NLU_RULES
+from .rule_matcher import COMPILED_RULES, RuleMatcher
 from utils import logger
 
 
 class RulePreprocessor:
     """规则前置处理器"""
 
-    def __init__(self):
-        """初始化规则库"""
+    def __init__(self, matcher: RuleMatcher = COMPILED_RULES):
+        """
+        初始化规则库
+
+        Args:
+            matcher: 编译后的规则集（默认使用导入时编译的全局规则集）
+        """
+        self.matcher = matcher
         # 套餐名称
-        self.package_names = ["经济套餐", "畅游套餐", "无限套餐", "校园套餐"]
-        # 高频规则库（优先级从高到低）
-        self.rules = PRE_NLU_RULES
-        # 按优先级排序
-        self.rules.sort(key=lambda x: x.get("priority", 0), reverse=True)
+        self.package_names = matcher.package_names
+        # 高频规则库（优先级从高到低，排序后的副本）
+        self.rules = [rule.rule for rule in matcher.rules]
 
         logger.info(f"✓ 规则库初始化完成: {len(self.rules)}条规则")
 
@@ -36,32 +39,36 @@ class RulePreprocessor:
         """
         logger.info(f"[规则匹配] 开始匹配: {user_input}")
 
-        for rule in self.rules:
+        # 单次扫描出所有关键词，跳过不可能命中的规则
+        found = self.matcher.scan(user_input)
+        has_context = bool(context.get("current_intent"))
+
+        for rule in self.matcher.candidates(found):
             # 检查是否需要上下文
-            if rule.get("context_required") and not context.get("current_intent"):
+            if rule.context_required and not has_context:
                 continue
             # 正则匹配
-            match = re.search(rule["pattern"], user_input, re.IGNORECASE)
+            match = rule.regex.search(user_input)
 
             if match:
                 # 命中规则
-                intent = rule["intent"]
+                intent = rule.intent
 
                 # 提取参数
+                entities = self.matcher.extract_entities(user_input, found)
                 parameters = self._extract_parameters(
                     user_input,
-                    match,
-                    rule["extract"],
-                    context,
-                    rule
+                    entities,
+                    rule.extract,
+                    context
                 )
 
                 # 特殊处理：上下文继承
-                if rule.get("context_required"):
+                if rule.context_required:
                     parameters = self._inherit_from_context(parameters, context)
 
                 logger.info(
-                    f"[规则命中] 规则='{rule['name']}', "
+                    f"[规则命中] 规则='{rule.name}', "
                     f"意图={intent}, 参数={parameters}"
                 )
 
@@ -70,49 +77,61 @@ class RulePreprocessor:
                     "parameters": parameters,
                     "source": "rule",
                     "confidence": 0.95,
-                    "rule_name": rule["name"]
+                    "rule_name": rule.name
                 }
 
         logger.info("[规则匹配] 未命中，交给LLM")
         return None
 
+    def extract_parameters(self, text: str, extract_list: List[str], context: Dict) -> Dict:
+        """
+        按给定字段列表从输入中提取参数（供规则之外的识别层复用实体提取）
+
+        Args:
+            text: 用户输入
+            extract_list: 需要提取的字段
+            context: 会话上下文
+        """
+        entities = self.matcher.extract_entities(text, self.matcher.scan(text))
+        return self._extract_parameters(text, entities, extract_list, context)
+
     def _extract_parameters(self,
                             text: str,
-                            match,
+                            entities: Dict[str, Any],
                             extract_list: List[str],
-                            context: Dict,
-                            rule: Dict) -> Dict:
-        """提取参数"""
+                            context: Dict) -> Dict:
+        """
+        按规则需要的字段组装参数
+
+        Args:
+            text: 用户输入
+            entities: extract_entities() 的单次扫描结果
+            extract_list: 规则声明需要提取的字段
+            context: 会话上下文
+        """
         params = {}
 
         # 1. 提取套餐名（new_package_name 或 package_name）
         if "new_package_name" in extract_list or "package_name" in extract_list:
-            for pkg in self.package_names:
-                if pkg in text:
-                    key = "new_package_name" if "new_package_name" in extract_list else "package_name"
-                    params[key] = pkg
-                    break
+            if entities["package_name"]:
+                key = "new_package_name" if "new_package_name" in extract_list else "package_name"
+                params[key] = entities["package_name"]
 
         # 2. 提取手机号
         if "phone" in extract_list:
-            phone_match = re.search(r'1[3-9]\d{9}', text)
-            if phone_match:
-                params["phone"] = phone_match.group()
+            if entities["phone"]:
+                params["phone"] = entities["phone"]
             elif context.get("user_phone"):
                 params["phone"] = context["user_phone"]
             # 如果没有，留空（后续追问）
 
         # 3. 提取价格范围
-        if "price_max" in extract_list:
-            price_match = re.search(r'(\d+)\s*[元块]', text)
-            if price_match:
-                params["price_max"] = int(price_match.group(1))
+        if "price_max" in extract_list and entities["price"] is not None:
+            params["price_max"] = entities["price"]
 
         # 4. 提取流量需求
-        if "data_min" in extract_list:
-            data_match = re.search(r'(\d+)\s*[G|GB]', text, re.IGNORECASE)
-            if data_match:
-                params["data_min"] = int(data_match.group(1))
+        if "data_min" in extract_list and entities["data_gb"] is not None:
+            params["data_min"] = entities["data_gb"]
 
         # 5. 提取咨询问题
         if "question" in extract_list:
@@ -0,0 +1,277 @@
+"""
+NLU会话上下文存储
+
+- MemorySessionStore: 进程内 LRU + 空闲TTL，容量有上限
+- RedisSessionStore: Redis存储，多个worker共享NLU上下文
+
+两者接口一致：get / save / delete（及异步版本 aget / asave / adelete）
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils import logger, metrics
+
+
+def _serialize(context: Dict) -> str:
+    return json.dumps(context, ensure_ascii=False, default=str)
+
+
+class MemorySessionStore:
+    """进程内会话存储：LRU + 空闲TTL"""
+
+    def __init__(self, max_size: int = 10000, ttl: int = 1800):
+        """
+        Args:
+            max_size: 最多保留的会话数，超出时淘汰最久未访问的会话
+            ttl: 空闲超时（秒），超过该时间未访问的会话被淘汰
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # session_id -> (上下文, 最后访问时间, 序列化字节数)，按访问顺序排列
+        self._sessions: "OrderedDict[str, Tuple[Dict, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self._live_gauge = metrics.gauge("nlu_sessions_live", store="memory")
+        self._bytes_gauge = metrics.gauge("nlu_sessions_bytes", store="memory")
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """
+        获取会话上下文（刷新访问时间）
+
+        Returns:
+            Dict: 上下文；不存在或已过期返回None
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        context, last_access, size = entry
+        now = time.monotonic()
+        if now - last_access > self.ttl:
+            self._evict(session_id, "ttl")
+            return None
+
+        self._sessions[session_id] = (context, now, size)
+        self._sessions.move_to_end(session_id)
+        return context
+
+    def save(self, session_id: str, context: Dict):
+        """保存会话上下文，并淘汰过期/超量会话"""
+        size = len(_serialize(context).encode("utf-8"))
+        old = self._sessions.pop(session_id, None)
+        if old is None:
+            self._live_gauge.inc()
+        else:
+            self._bytes -= old[2]
+            self._bytes_gauge.dec(old[2])
+
+        self._sessions[session_id] = (context, time.monotonic(), size)
+        self._bytes += size
+        self._bytes_gauge.inc(size)
+
+        self._evict_expired()
+        while len(self._sessions) > self.max_size:
+            self._evict(next(iter(self._sessions)), "lru")
+
+    def delete(self, session_id: str):
+        """删除会话"""
+        if session_id in self._sessions:
+            self._evict(session_id, "deleted")
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        return self.get(session_id)
+
+    async def asave(self, session_id: str, context: Dict):
+        self.save(session_id, context)
+
+    async def adelete(self, session_id: str):
+        self.delete(session_id)
+
+    def collect(self):
+        """清理过期会话（指标导出前调用）"""
+        self._evict_expired()
+
+    def clear(self):
+        """清空所有会话"""
+        for session_id in list(self._sessions):
+            self._evict(session_id, "deleted")
+
+    @property
+    def size_bytes(self) -> int:
+        """所有会话上下文序列化后的总字节数（估算内存占用）"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _evict_expired(self):
+        # 按访问顺序排列，队首最久未访问，遇到未过期的即可停止
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, (_, last_access, _) = next(iter(self._sessions.items()))
+            if last_access >= deadline:
+                break
+            self._evict(session_id, "ttl")
+
+    def _evict(self, session_id: str, reason: str):
+        _, _, size = self._sessions.pop(session_id)
+        self._bytes -= size
+        self._live_gauge.dec()
+        self._bytes_gauge.dec(size)
+        if reason != "deleted":
+            metrics.counter("nlu_sessions_evicted_total", reason=reason).inc()
+            logger.debug(f"NLU会话淘汰({reason}): {session_id}")
+
+
+class RedisSessionStore:
+    """
+    Redis会话存储：多个uvicorn worker共享NLU上下文
+
+    上下文以JSON保存，每次保存刷新过期时间（空闲TTL）；
+    另用一个有序集合（成员=会话ID，分值=最后保存时间）和一个哈希（会话ID→字节数）
+    统计存活会话数与总字节数。
+    """
+
+    KEY_PREFIX = "nlu:session:"
+    INDEX_KEY = "nlu:sessions:index"
+    BYTES_KEY = "nlu:sessions:bytes"
+
+    def __init__(self, redis_manager, ttl: int = 1800):
+        """
+        Args:
+            redis_manager: Redis连接管理器
+            ttl: 空闲超时（秒）
+        """
+        self.redis_manager = redis_manager
+        self.redis = redis_manager.get_client()
+        self.use_redis = True
+        self.ttl = ttl
+        # 运行中Redis失败时降级使用
+        self.fallback = MemorySessionStore(max_size=settings.NLU_SESSION_MAX_SIZE, ttl=ttl)
+
+        self._live_gauge = metrics.gauge("nlu_sessions_live", store="redis")
+        self._bytes_gauge = metrics.gauge("nlu_sessions_bytes", store="redis")
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}{session_id}"
+
+    def _queue_save(self, pipe, session_id: str, context: Dict):
+        """将保存命令写入Pipeline（同步/异步Pipeline共用）"""
+        data = _serialize(context)
+        pipe.set(self._key(session_id), data, ex=self.ttl)
+        pipe.zadd(self.INDEX_KEY, {session_id: time.time()})
+        pipe.hset(self.BYTES_KEY, session_id, len(data.encode("utf-8")))
+
+    def _queue_delete(self, pipe, session_id: str):
+        pipe.delete(self._key(session_id))
+        pipe.zrem(self.INDEX_KEY, session_id)
+        pipe.hdel(self.BYTES_KEY, session_id)
+
+    def _degrade(self, action: str, error: Exception):
+        logger.error(f"NLU会话{action}Redis失败: {error}, 降级到内存")
+        self.use_redis = False
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        if self.use_redis:
+            try:
+                data = self.redis.get(self._key(session_id))
+                return json.loads(data) if data else None
+            except Exception as e:
+                self._degrade("读取", e)
+        return self.fallback.get(session_id)
+
+    def save(self, session_id: str, context: Dict):
+        if self.use_redis:
+            try:
+                pipe = self.redis.pipeline()
+                self._queue_save(pipe, session_id, context)
+                pipe.execute()
+                return
+            except Exception as e:
+                self._degrade("保存", e)
+        self.fallback.save(session_id, context)
+
+    def delete(self, session_id: str):
+        if self.use_redis:
+            try:
+                pipe = self.redis.pipeline()
+                self._queue_delete(pipe, session_id)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"NLU会话删除失败: {e}")
+        self.fallback.delete(session_id)
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        if self.use_redis:
+            try:
+                data = await self.redis_manager.get_async_client().get(self._key(session_id))
+                return json.loads(data) if data else None
+            except Exception as e:
+                self._degrade("读取", e)
+        return self.fallback.get(session_id)
+
+    async def asave(self, session_id: str, context: Dict):
+        if self.use_redis:
+            try:
+                pipe = self.redis_manager.get_async_client().pipeline()
+                self._queue_save(pipe, session_id, context)
+                await pipe.execute()
+                return
+            except Exception as e:
+                self._degrade("保存", e)
+        self.fallback.save(session_id, context)
+
+    async def adelete(self, session_id: str):
+        if self.use_redis:
+            try:
+                pipe = self.redis_manager.get_async_client().pipeline()
+                self._queue_delete(pipe, session_id)
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"NLU会话删除失败: {e}")
+        self.fallback.delete(session_id)
+
+    def collect(self):
+        """清理索引中已过期的会话并刷新仪表盘（指标导出前调用）"""
+        self.fallback.collect()
+        if not self.use_redis:
+            return
+
+        expired = self.redis.zrangebyscore(self.INDEX_KEY, "-inf", time.time() - self.ttl)
+        if expired:
+            pipe = self.redis.pipeline()
+            pipe.zrem(self.INDEX_KEY, *expired)
+            pipe.hdel(self.BYTES_KEY, *expired)
+            pipe.execute()
+
+        self._live_gauge.set(self.redis.zcard(self.INDEX_KEY))
+        self._bytes_gauge.set(sum(int(v) for v in self.redis.hvals(self.BYTES_KEY)))
+
+
+def create_session_store():
+    """
+    按配置创建NLU会话存储
+
+    NLU_SESSION_BACKEND=redis 且Redis可用时使用Redis，否则使用进程内存储
+    """
+    if settings.NLU_SESSION_BACKEND == "redis":
+        from database import redis_manager
+        try:
+            if redis_manager.test_connection():
+                logger.info("NLU会话存储: Redis")
+                store = RedisSessionStore(redis_manager, ttl=settings.SESSION_TIMEOUT)
+                metrics.register_collector(store.collect)
+                return store
+        except Exception as e:
+            logger.error(f"Redis初始化失败: {e}")
+        logger.warning("Redis不可用，NLU会话降级到内存存储")
+
+    store = MemorySessionStore(max_size=settings.NLU_SESSION_MAX_SIZE, ttl=settings.SESSION_TIMEOUT)
+    metrics.register_collector(store.collect)
+    return store
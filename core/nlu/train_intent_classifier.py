@@ -0,0 +1,74 @@
+"""
+意图分类器训练CLI
+
+从应用日志（及可选的 "文本<TAB>意图" 标注文件）训练本地意图分类器，
+留出一部分不同文本评估本地作答率与准确率，之后用全部数据重新训练并保存。
+
+运行: python -m core.nlu.train_intent_classifier [--logs logs/*.log] [--data labeled.tsv] [--output 路径]
+"""
+import argparse
+import glob
+import random
+from collections import Counter
+from typing import List, Optional
+
+from config import settings
+from .intent_classifier import (
+    IntentClassifier, OTHER, PROJECT_ROOT,
+    load_labeled_file, load_log_pairs, resolve_conflicts, resolve_model_path
+)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="训练本地意图分类器")
+    parser.add_argument("--logs", nargs="*", default=sorted(glob.glob(str(PROJECT_ROOT / "logs" / "*.log"))),
+                        help="应用日志（默认 logs/*.log）")
+    parser.add_argument("--data", nargs="*", default=[], help="额外的 文本<TAB>意图 标注文件")
+    parser.add_argument("--output", default=settings.NLU_CLASSIFIER_MODEL_PATH, help="模型输出路径")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--n-features", type=int, default=2 ** 15)
+    parser.add_argument("--holdout", type=float, default=0.2, help="留出评估比例（0表示不评估）")
+    parser.add_argument("--threshold", type=float, default=settings.NLU_CLASSIFIER_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    pairs = load_log_pairs(args.logs)
+    for path in args.data:
+        pairs.extend(load_labeled_file(path))
+    pairs = resolve_conflicts(pairs)
+    if not pairs:
+        parser.error("没有可用的训练数据")
+
+    # 按文本划分留出集，避免同一句话同时出现在训练与评估中
+    texts = sorted({text for text, _ in pairs})
+    random.Random(0).shuffle(texts)
+    held_out = set(texts[:int(len(texts) * args.holdout)])
+    train = [p for p in pairs if p[0] not in held_out]
+    test = [p for p in pairs if p[0] in held_out]
+
+    print(f"训练样本 {len(train)} 条（{len(texts) - len(held_out)} 个不同文本），"
+          f"留出 {len(test)} 条；标签分布: {dict(Counter(label for _, label in pairs))}")
+
+    classifier = IntentClassifier(n_features=args.n_features)
+    classifier.fit([t for t, _ in train], [label for _, label in train], epochs=args.epochs)
+
+    if test:
+        answered = correct = 0
+        for text, label in test:
+            intent, confidence = classifier.predict(text)
+            if intent != OTHER and confidence >= args.threshold:
+                answered += 1
+                correct += intent == label
+        print(f"留出集 阈值={args.threshold}: 本地作答 {answered}/{len(test)}，"
+              f"准确率 {correct / max(answered, 1):.1%}")
+
+        # 评估后用全部数据重新训练
+        classifier = IntentClassifier(n_features=args.n_features)
+        classifier.fit([t for t, _ in pairs], [label for _, label in pairs], epochs=args.epochs)
+
+    output = resolve_model_path(args.output)
+    classifier.save(output)
+    print(f"模型已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
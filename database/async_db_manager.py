@@ -0,0 +1,130 @@
+"""
+异步数据库管理器
+
+同步 DatabaseManager 每次查询占用一个线程等待连接池和数据库；异步对话链路中
+改用 SQLAlchemy 异步引擎（MySQL: aiomysql，SQLite: aiosqlite），在事件循环上等待，
+不占用线程池。接口与 DatabaseManager 的查询/更新/事务方法一致（均为协程）。
+
+异步连接绑定创建它的事件循环：一个管理器只在一个事件循环（应用进程）中使用。
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from sqlalchemy import QueuePool, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import settings
+from utils import logger, metrics
+from .db_manager import _engine_options, collect_pool_metrics
+
+try:
+    import greenlet  # noqa: F401  SQLAlchemy 异步引擎依赖 greenlet
+except ImportError:  # 缺失时不启用异步执行路径
+    greenlet = None
+
+# 同步驱动 → 异步驱动
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """同步连接URL换成对应的异步驱动"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+class AsyncDatabaseManager:
+    """异步数据库管理器"""
+
+    def __init__(self, url: Optional[str] = None, echo: bool = False):
+        """
+        Args:
+            url: 同步或异步连接URL（默认使用配置中的数据库）
+            echo: 是否打印SQL
+        """
+        if greenlet is None:
+            raise ImportError("AsyncDatabaseManager 需要 greenlet")
+
+        url = url or settings.database_url
+        options = _engine_options(url)
+        # check_same_thread 仅用于同步 sqlite3 驱动；异步引擎默认使用 AsyncAdaptedQueuePool（同样的容量参数）
+        options.pop("connect_args", None)
+        if options.get("poolclass") is QueuePool:
+            del options["poolclass"]
+        self._engine = create_async_engine(async_url(url), echo=echo, **options)
+        self._session_factory = async_sessionmaker(self._engine, expire_on_commit=False)
+        metrics.register_collector(self.collect)
+        logger.info(f"异步数据库连接初始化成功: {self.dialect}")
+
+    @property
+    def dialect(self) -> str:
+        """数据库方言（mysql / sqlite）"""
+        return self._engine.dialect.name
+
+    @asynccontextmanager
+    async def _session(self):
+        """会话（先取得连接，记录连接池等待时间）"""
+        async with self._session_factory() as session:
+            start = time.perf_counter()
+            await session.connection()
+            metrics.histogram("db_pool_wait_seconds", engine="async").observe(time.perf_counter() - start)
+            yield session
+
+    def collect(self):
+        """指标采集回调：连接池占用情况"""
+        collect_pool_metrics("async", self._engine.pool)
+
+    async def execute_query(self, query: str, params: dict = None) -> list:
+        """执行查询"""
+        async with self._session() as session:
+            result = await session.execute(text(query), params or {})
+            return result.fetchall()
+
+    async def execute_update(self, query: str, params: dict = None) -> int:
+        """执行更新"""
+        async with self._session() as session:
+            result = await session.execute(text(query), params or {})
+            await session.commit()
+            return result.rowcount
+
+    async def execute_transaction(self, statements: list) -> list:
+        """
+        在同一个事务中依次执行多条写语句，全部成功才提交
+
+        Args:
+            statements: [(SQL, 参数字典), ...]
+
+        Returns:
+            list: 每条语句影响的行数
+        """
+        async with self._session() as session:
+            counts = []
+            for query, params in statements:
+                result = await session.execute(text(query), params or {})
+                counts.append(result.rowcount)
+            await session.commit()
+            return counts
+
+    async def dispose(self):
+        """关闭连接池"""
+        await self._engine.dispose()
+
+
+def create_async_db_manager() -> Optional[AsyncDatabaseManager]:
+    """
+    按配置创建异步数据库管理器
+
+    DB_ASYNC_ENABLED=False、缺少 greenlet 或异步驱动（aiomysql / aiosqlite）时返回None，
+    执行器在线程池中走同步路径
+    """
+    if not settings.DB_ASYNC_ENABLED:
+        return None
+    try:
+        return AsyncDatabaseManager()
+    except ImportError as e:
+        logger.warning(f"异步数据库驱动不可用，执行器使用同步路径: {e}")
+        return None
@@ -1,12 +1,53 @@
-
 """
 数据库管理器
 """
-from sqlalchemy import create_engine, QueuePool, text
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, QueuePool, StaticPool, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 
 from config import settings
-from utils import logger
+from utils import logger, metrics
+
+SCHEMA_DIR = Path(__file__).resolve().parent
+
+# 各后端的建表脚本
+SCHEMA_FILES = {
+    "mysql": SCHEMA_DIR / "schema.sql",
+    "sqlite": SCHEMA_DIR / "schema_sqlite.sql",
+}
+
+
+def _engine_options(url: str) -> dict:
+    """按后端选择连接池参数"""
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False}}
+        # 内存库只存在于单个连接中，所有会话共用同一个连接
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            options["poolclass"] = StaticPool
+        return options
+    return {
+        "poolclass": QueuePool,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_recycle": 3600,
+    }
+
+
+def pool_status(pool) -> dict:
+    """连接池占用情况（QueuePool 以外的连接池返回空字典）"""
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+
+
+def collect_pool_metrics(engine_label: str, pool):
+    """连接池占用情况写入仪表盘 db_pool_*{engine=...}"""
+    for name, value in pool_status(pool).items():
+        metrics.gauge(f"db_pool_{name}", engine=engine_label).set(value)
 
 
 class DatabaseManager:
@@ -23,36 +64,135 @@ class DatabaseManager:
             cls._instance._initialize()
         return cls._instance
 
-    def _initialize(self):
+    @classmethod
+    def create(cls, url: str, echo: bool = False) -> "DatabaseManager":
+        """
+        创建独立的管理器（不影响全局单例，用于测试和基准测试）
+
+        Args:
+            url: 数据库连接URL，如 sqlite:// 或 sqlite:///data/telecom.db
+            echo: 是否打印SQL
+        """
+        manager = super().__new__(cls)
+        manager._initialize(url, echo)
+        return manager
+
+    def _initialize(self, url: Optional[str] = None, echo: Optional[bool] = None):
         """初始化数据库连接"""
+        url = url or settings.database_url
         try:
-            self._engine = create_engine(
-                settings.database_url,
-                poolclass=QueuePool,
-                pool_size=5,
-                max_overflow=10,
-                pool_recycle=3600,
-                echo=settings.DEBUG
-            )
+            self._engine = create_engine(url, echo=settings.DEBUG if echo is None else echo,
+                                         **_engine_options(url))
+            if self.dialect == "sqlite":
+                event.listen(self._engine, "connect", self._configure_sqlite)
             self._session_factory = sessionmaker(bind=self._engine)
-            logger.info("数据库连接初始化成功")
+            metrics.register_collector(self.collect)
+            logger.info(f"数据库连接初始化成功: {self.dialect}")
         except Exception as e:
             logger.error(f"数据库连接初始化失败: {e}")
             raise
 
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record):
+        """SQLite连接参数：WAL 提升读写并发"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    @property
+    def dialect(self) -> str:
+        """数据库方言（mysql / sqlite）"""
+        return self._engine.dialect.name
+
+    def table_names(self) -> list:
+        """当前库中的表名"""
+        return inspect(self._engine).get_table_names()
+
     def get_session(self) -> Session:
         """获取数据库会话"""
         return self._session_factory()
 
+    @contextmanager
+    def _session(self):
+        """会话（先取得连接，记录连接池等待时间）"""
+        with self.get_session() as session:
+            start = time.perf_counter()
+            session.connection()
+            metrics.histogram("db_pool_wait_seconds", engine="sync").observe(time.perf_counter() - start)
+            yield session
+
+    def collect(self):
+        """指标采集回调：连接池占用情况"""
+        collect_pool_metrics("sync", self._engine.pool)
+
     def execute_query(self, query: str, params: dict = None) -> list:
         """执行查询"""
-        with self.get_session() as session:
+        with self._session() as session:
             result = session.execute(text(query), params or {})
             return result.fetchall()
 
     def execute_update(self, query: str, params: dict = None) -> int:
         """执行更新"""
-        with self.get_session() as session:
+        with self._session() as session:
             result = session.execute(text(query), params or {})
             session.commit()
-            return result.rowcount
\ No newline at end of file
+            return result.rowcount
+
+    def execute_transaction(self, statements: list) -> list:
+        """
+        在同一个事务中依次执行多条写语句，全部成功才提交
+
+        Args:
+            statements: [(SQL, 参数字典), ...]
+
+        Returns:
+            list: 每条语句影响的行数
+        """
+        with self._session() as session:
+            counts = [session.execute(text(query), params or {}).rowcount
+                      for query, params in statements]
+            session.commit()
+            return counts
+
+    def execute_many(self, query: str, rows: list) -> int:
+        """
+        批量写入（executemany，单个事务）
+
+        Args:
+            query: 带命名参数的SQL
+            rows: 参数字典列表
+
+        Returns:
+            int: 写入行数
+        """
+        if not rows:
+            return 0
+        with self._session() as session:
+            session.execute(text(query), rows)
+            session.commit()
+        return len(rows)
+
+    def execute_script(self, path: Path) -> int:
+        """
+        在同一个事务中执行SQL脚本（按分号拆分，忽略 -- 注释行）
+
+        Args:
+            path: 脚本路径
+
+        Returns:
+            int: 执行的语句数
+        """
+        script = Path(path).read_text(encoding="utf-8")
+        lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+        statements = [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+        with self._session() as session:
+            for statement in statements:
+                session.execute(text(statement))
+            session.commit()
+        return len(statements)
+
+    def create_schema(self):
+        """执行当前后端的建表脚本"""
+        count = self.execute_script(SCHEMA_FILES[self.dialect])
+        logger.info(f"建表完成: {SCHEMA_FILES[self.dialect].name}, {count}条语句")
@@ -0,0 +1,141 @@
+"""
+表结构迁移
+
+版本1为基线建表脚本（schema.sql / schema_sqlite.sql），之后的变更放在
+migrations/<后端>/NNNN_说明.sql，按版本号依次执行，已执行的版本记录在 t_schema_version。
+已有表但没有版本记录的旧库（如 docker 初始化的 MySQL）视为已在版本1。
+API 启动时自动执行（settings.DB_AUTO_MIGRATE），也可以手动运行。
+
+运行: python -m database.migrate [--path data/telecom.db | --url URL] [--target 版本] [--status]
+"""
+import argparse
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from utils import logger
+from .db_manager import DatabaseManager, SCHEMA_DIR, SCHEMA_FILES
+
+MIGRATIONS_DIR = SCHEMA_DIR / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+VERSION_TABLE_SQL = """
+                    CREATE TABLE IF NOT EXISTS t_schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name VARCHAR(100) NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    ) \
+                    """
+RECORD_VERSION_SQL = "INSERT INTO t_schema_version (version, name) VALUES (:version, :name)"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """一个版本的迁移脚本"""
+    version: int
+    name: str
+    path: Path
+
+
+class MigrationRunner:
+    """按版本号执行未执行过的迁移脚本"""
+
+    def __init__(self, db: DatabaseManager, directory: Path = MIGRATIONS_DIR):
+        """
+        Args:
+            db: 数据库管理器
+            directory: 迁移脚本根目录（下分 mysql/ sqlite/）
+        """
+        self.db = db
+        self.directory = Path(directory) / db.dialect
+
+    def migrations(self) -> List[Migration]:
+        """当前后端的全部迁移（含版本1基线），按版本号排序"""
+        found = [Migration(1, "initial", SCHEMA_FILES[self.db.dialect])]
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                match = MIGRATION_FILE.match(path.name)
+                if match:
+                    found.append(Migration(int(match.group(1)), match.group(2), path))
+        found.sort(key=lambda m: m.version)
+
+        versions = [m.version for m in found]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f"迁移版本号重复: {versions}")
+        return found
+
+    def current_version(self) -> int:
+        """已执行到的版本（0 表示空库）"""
+        self.db.execute_update(VERSION_TABLE_SQL)
+        rows = self.db.execute_query("SELECT MAX(version) FROM t_schema_version")
+        version = rows[0][0] if rows and rows[0][0] is not None else 0
+        if version == 0 and self._has_baseline_tables():
+            # 旧库：基线表已存在，补记版本1
+            self.db.execute_update(RECORD_VERSION_SQL, {"version": 1, "name": "initial"})
+            logger.info("检测到已有表结构，记录为版本1")
+            version = 1
+        return version
+
+    def pending(self) -> List[Migration]:
+        """尚未执行的迁移"""
+        current = self.current_version()
+        return [m for m in self.migrations() if m.version > current]
+
+    def migrate(self, target: Optional[int] = None) -> List[int]:
+        """
+        执行迁移到目标版本
+
+        Args:
+            target: 目标版本（默认最新）
+
+        Returns:
+            list: 本次执行的版本号
+        """
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            # MySQL 的 DDL 会隐式提交，单个版本失败时需要人工检查后再重试
+            count = self.db.execute_script(migration.path)
+            self.db.execute_update(RECORD_VERSION_SQL, {"version": migration.version, "name": migration.name})
+            logger.info(f"迁移完成: 版本{migration.version} {migration.name}, {count}条语句")
+            applied.append(migration.version)
+        return applied
+
+    def _has_baseline_tables(self) -> bool:
+        """基线表是否已存在"""
+        return {"t_packages", "t_user"} <= set(self.db.table_names())
+
+
+def migrate(db: DatabaseManager, target: Optional[int] = None) -> List[int]:
+    """执行迁移到目标版本（默认最新）"""
+    return MigrationRunner(db).migrate(target)
+
+
+def main(argv: Optional[List[str]] = None):
+    from .seed import sqlite_url
+
+    parser = argparse.ArgumentParser(description="执行表结构迁移")
+    parser.add_argument("--path", default=None, help="SQLite数据库文件（默认使用配置中的数据库）")
+    parser.add_argument("--url", default=None, help="数据库连接URL")
+    parser.add_argument("--target", type=int, default=None, help="目标版本（默认最新）")
+    parser.add_argument("--status", action="store_true", help="只显示当前版本和待执行的迁移")
+    args = parser.parse_args(argv)
+
+    url = args.url or (sqlite_url(args.path) if args.path else None)
+    db = DatabaseManager.create(url) if url else DatabaseManager()
+    runner = MigrationRunner(db)
+
+    if args.status:
+        print(f"当前版本: {runner.current_version()}")
+        for migration in runner.pending():
+            print(f"待执行: 版本{migration.version} {migration.name} ({migration.path.name})")
+        return
+
+    applied = runner.migrate(args.target)
+    print(f"已执行: {applied or '无'}，当前版本: {runner.current_version()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+-- 版本2: 执行器热点查询的索引
+-- t_user 按 phone（主键，唯一）+ status 查询，主键已覆盖
+-- t_packages 按 status=1 加价格/流量区间过滤并排序，单列 status 索引区分度低，改为组合索引
+
+ALTER TABLE t_packages
+    ADD INDEX idx_status_price (status, price),
+    ADD INDEX idx_status_data (status, data_gb),
+    DROP INDEX idx_status;
@@ -0,0 +1,9 @@
+-- 版本3: 套餐变更记录表（幂等键唯一，重复确认不会二次办理）
+
+CREATE TABLE IF NOT EXISTS t_package_changes (
+    idempotency_key CHAR(40) PRIMARY KEY COMMENT '幂等键（每次确认一个）',
+    phone VARCHAR(11) NOT NULL COMMENT '手机号',
+    package_id INT NOT NULL COMMENT '新套餐ID',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_phone (phone)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='套餐变更记录表';
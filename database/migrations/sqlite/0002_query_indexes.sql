@@ -0,0 +1,5 @@
+-- 版本2: 执行器热点查询的索引（与 mysql/0002_query_indexes.sql 一致）
+
+CREATE INDEX IF NOT EXISTS idx_packages_status_price ON t_packages (status, price);
+CREATE INDEX IF NOT EXISTS idx_packages_status_data ON t_packages (status, data_gb);
+DROP INDEX IF EXISTS idx_packages_status;
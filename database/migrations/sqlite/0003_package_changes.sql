@@ -0,0 +1,9 @@
+-- 版本3: 套餐变更记录表（与 mysql/0003_package_changes.sql 一致）
+
+CREATE TABLE IF NOT EXISTS t_package_changes (
+    idempotency_key CHAR(40) PRIMARY KEY,
+    phone VARCHAR(11) NOT NULL,
+    package_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_changes_phone ON t_package_changes (phone);
@@ -0,0 +1,60 @@
+"""
+查询计划检查
+
+对 SQL 执行 EXPLAIN，找出需要整表扫描的表，用于在大数据量下回归检查执行器查询的索引覆盖：
+- SQLite: EXPLAIN QUERY PLAN 中的 "SCAN <表>"（含按索引遍历全表）
+- MySQL:  EXPLAIN 中 type 为 ALL（全表）或 index（全索引）
+"""
+import re
+from typing import List, Optional
+
+from .db_manager import DatabaseManager
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+MYSQL_FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+def explain(db: DatabaseManager, sql: str, params: Optional[dict] = None) -> List[str]:
+    """
+    查询计划（每个步骤一行）
+
+    Args:
+        db: 数据库管理器
+        sql: 查询SQL
+        params: 查询参数
+
+    Returns:
+        list: 计划步骤描述
+    """
+    if db.dialect == "sqlite":
+        return [row[3] for row in db.execute_query(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    lines = []
+    for row in db.execute_query(f"EXPLAIN {sql}", params):
+        step = row._mapping
+        lines.append(f"{step['table']}: type={step['type']} key={step['key']} rows={step['rows']}")
+    return lines
+
+
+def full_scans(db: DatabaseManager, sql: str, params: Optional[dict] = None) -> List[str]:
+    """
+    需要整表扫描的表
+
+    Args:
+        db: 数据库管理器
+        sql: 查询SQL
+        params: 查询参数
+
+    Returns:
+        list: 表名（无整表扫描时为空）
+    """
+    if db.dialect == "sqlite":
+        tables = []
+        for line in explain(db, sql, params):
+            match = SQLITE_SCAN.match(line)
+            if match:
+                tables.append(match.group(1))
+        return tables
+
+    return [row._mapping["table"] for row in db.execute_query(f"EXPLAIN {sql}", params)
+            if row._mapping["type"] in MYSQL_FULL_SCAN_TYPES]
@@ -2,10 +2,11 @@
 Redis连接管理器
 """
 import redis
+import redis.asyncio as aioredis
 from redis.connection import ConnectionPool
 from typing import Optional
 from config import settings
-from utils import logger
+from utils import logger, LoopLocal
 
 
 class RedisManager:
@@ -13,6 +14,7 @@ class RedisManager:
 
     _instance = None
     _pool: Optional[ConnectionPool] = None
+    _async_pools: Optional[LoopLocal] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -40,11 +42,14 @@ class RedisManager:
                 connection_params['password'] = settings.REDIS_PASSWORD
 
             self._pool = ConnectionPool(**connection_params)
+            # 异步连接池与事件循环绑定，每个循环一份
+            self._async_pools = LoopLocal(lambda: aioredis.ConnectionPool(**connection_params))
 
             logger.info(f"Redis连接池初始化成功: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
         except Exception as e:
             logger.error(f"Redis连接池初始化失败: {e}")
             self._pool = None
+            self._async_pools = None
 
     def get_client(self) -> redis.Redis:
         """获取Redis客户端"""
@@ -52,6 +57,12 @@ class RedisManager:
             raise RuntimeError("Redis连接池未初始化")
         return redis.Redis(connection_pool=self._pool)
 
+    def get_async_client(self) -> aioredis.Redis:
+        """获取异步Redis客户端（需在事件循环内调用）"""
+        if self._async_pools is None:
+            raise RuntimeError("Redis连接池未初始化")
+        return aioredis.Redis(connection_pool=self._async_pools.get())
+
     def test_connection(self) -> bool:
         """测试连接"""
         try:
@@ -1,4 +1,5 @@
 
+-- 版本1（基线），后续表结构变更见 migrations/mysql/，由 python -m database.migrate 执行
 
 -- 创建数据库
 CREATE DATABASE IF NOT EXISTS telecom_chatbot DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -0,0 +1,52 @@
+-- SQLite 建表脚本（本地开发与离线基准测试，表结构与 schema.sql 一致）
+-- 版本1（基线），后续表结构变更见 migrations/sqlite/
+
+-- 1. 套餐表
+CREATE TABLE IF NOT EXISTS t_packages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    data_gb INTEGER NOT NULL,
+    voice_minutes INTEGER DEFAULT 0,
+    price DECIMAL(10,2) NOT NULL,
+    target_user VARCHAR(20) DEFAULT '无限制',
+    description TEXT,
+    status INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_packages_price ON t_packages (price);
+CREATE INDEX IF NOT EXISTS idx_packages_data ON t_packages (data_gb);
+CREATE INDEX IF NOT EXISTS idx_packages_status ON t_packages (status);
+
+-- 2. 用户表
+CREATE TABLE IF NOT EXISTS t_user (
+    phone VARCHAR(11) PRIMARY KEY,
+    name VARCHAR(50),
+    current_package_id INTEGER,
+    package_start_date DATE,
+    monthly_usage_gb DECIMAL(10,2) DEFAULT 0,
+    monthly_usage_minutes INTEGER DEFAULT 0,
+    balance DECIMAL(10,2) DEFAULT 0,
+    status INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_user_package ON t_user (current_package_id);
+CREATE INDEX IF NOT EXISTS idx_user_status ON t_user (status);
+
+-- 3. 对话记录表
+CREATE TABLE IF NOT EXISTS t_conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id VARCHAR(64) NOT NULL,
+    phone VARCHAR(11),
+    user_input TEXT NOT NULL,
+    intent VARCHAR(50),
+    function_name VARCHAR(50),
+    parameters TEXT,
+    bot_response TEXT,
+    execution_time_ms INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_session ON t_conversations (session_id);
+CREATE INDEX IF NOT EXISTS idx_conversations_phone ON t_conversations (phone);
+CREATE INDEX IF NOT EXISTS idx_conversations_created ON t_conversations (created_at);
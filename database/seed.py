@@ -0,0 +1,174 @@
+"""
+测试数据生成CLI
+
+按 schema 建表并执行迁移后写入套餐目录和用户数据，可生成数百万 t_user 行和大型 t_packages 目录，
+用于在 SQLite 上离线基准测试执行器（也可写入 MySQL）。
+前4个套餐与3个测试用户与 init_data.sql 一致，其余为随机生成（固定随机种子，结果可复现）。
+
+运行: python -m database.seed [--path data/telecom.db] [--users 1000000] [--packages 20000]
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .db_manager import DatabaseManager
+from .migrate import migrate
+
+# 与 init_data.sql 一致的基础套餐和测试用户
+BASE_PACKAGES = [
+    ("经济套餐", 10, 100, 50.00, "无限制", "适合轻度上网用户,性价比高,包含10GB流量和100分钟通话"),
+    ("畅游套餐", 100, 300, 180.00, "无限制", "适合经常上网的用户,流量充足,包含100GB流量和300分钟通话"),
+    ("无限套餐", 1000, 1000, 300.00, "无限制", "流量无忧,畅享网络,商务首选,包含1000GB流量和1000分钟通话"),
+    ("校园套餐", 200, 200, 150.00, "在校生", "学生专享优惠套餐,需提供学生证,包含200GB流量和200分钟通话"),
+]
+BASE_USERS = [
+    ("13800138000", "张三", 1, 5.2, 45, 45.50),
+    ("13900139000", "李四", 2, 67.8, 150, 120.00),
+    ("13700137000", "王五", 4, 125.5, 80, 50.00),
+]
+
+TARGET_USERS = ["无限制", "在校生", "老年人", "商务"]
+DATA_TIERS = [1, 5, 10, 20, 30, 50, 100, 200, 500, 1000]
+
+PACKAGE_SQL = """
+              INSERT INTO t_packages (id, name, data_gb, voice_minutes, price, target_user, description, status)
+              VALUES (:id, :name, :data_gb, :voice_minutes, :price, :target_user, :description, :status) \
+              """
+USER_SQL = """
+           INSERT INTO t_user (phone, name, current_package_id, monthly_usage_gb, monthly_usage_minutes,
+                               balance, status)
+           VALUES (:phone, :name, :current_package_id, :monthly_usage_gb, :monthly_usage_minutes,
+                   :balance, :status) \
+           """
+
+
+def generate_packages(count: int, seed: int = 1) -> List[Dict]:
+    """
+    生成套餐目录
+
+    Args:
+        count: 套餐总数（不少于基础套餐数）
+        seed: 随机种子
+
+    Returns:
+        list: t_packages 行
+    """
+    rng = random.Random(seed)
+    packages = [
+        {"id": i, "name": name, "data_gb": data_gb, "voice_minutes": voice, "price": price,
+         "target_user": target, "description": description, "status": 1}
+        for i, (name, data_gb, voice, price, target, description) in enumerate(BASE_PACKAGES, 1)
+    ]
+    for i in range(len(packages) + 1, count + 1):
+        data_gb = rng.choice(DATA_TIERS)
+        packages.append({
+            "id": i, "name": f"套餐{i:06d}", "data_gb": data_gb,
+            "voice_minutes": rng.choice([0, 100, 300, 1000]),
+            "price": float(rng.randint(5, 600)),
+            "target_user": rng.choice(TARGET_USERS),
+            "description": f"{data_gb}GB流量套餐",
+            # 约5%已下架
+            "status": 0 if rng.random() < 0.05 else 1
+        })
+    return packages
+
+
+def generate_users(count: int, package_count: int, seed: int = 2) -> Iterator[Dict]:
+    """
+    生成用户（手机号唯一，按批写入时逐条产出）
+
+    Args:
+        count: 用户总数（含基础测试用户）
+        package_count: 套餐数（current_package_id 的取值范围）
+        seed: 随机种子
+
+    Yields:
+        dict: t_user 行
+    """
+    rng = random.Random(seed)
+    reserved = {phone for phone, *_ in BASE_USERS}
+    for phone, name, package_id, usage_gb, usage_minutes, balance in BASE_USERS:
+        yield {"phone": phone, "name": name, "current_package_id": package_id,
+               "monthly_usage_gb": usage_gb, "monthly_usage_minutes": usage_minutes,
+               "balance": balance, "status": 1}
+
+    generated = 0
+    i = 0
+    while generated < count - len(BASE_USERS):
+        phone = f"1{3 + i % 7}{i:09d}"
+        i += 1
+        if phone in reserved:
+            continue
+        generated += 1
+        yield {
+            "phone": phone, "name": f"用户{i}",
+            "current_package_id": rng.randint(1, package_count),
+            "monthly_usage_gb": round(rng.uniform(0, 200), 2),
+            "monthly_usage_minutes": rng.randint(0, 1000),
+            "balance": round(rng.uniform(-50, 500), 2),
+            # 约3%停机
+            "status": 0 if rng.random() < 0.03 else 1
+        }
+
+
+def seed_database(db: DatabaseManager, users: int = 100000, packages: int = 1000,
+                  batch_size: int = 20000, create_schema: bool = True) -> Dict[str, int]:
+    """
+    建表并写入测试数据
+
+    Args:
+        db: 数据库管理器
+        users: 用户数
+        packages: 套餐数
+        batch_size: 每批写入行数
+        create_schema: 是否先执行建表脚本和迁移
+
+    Returns:
+        dict: 各表写入行数
+    """
+    if create_schema:
+        migrate(db)
+
+    package_rows = generate_packages(max(packages, len(BASE_PACKAGES)))
+    for start in range(0, len(package_rows), batch_size):
+        db.execute_many(PACKAGE_SQL, package_rows[start:start + batch_size])
+
+    written = 0
+    batch = []
+    for row in generate_users(max(users, len(BASE_USERS)), len(package_rows)):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += db.execute_many(USER_SQL, batch)
+            batch = []
+    written += db.execute_many(USER_SQL, batch)
+
+    return {"t_packages": len(package_rows), "t_user": written}
+
+
+def sqlite_url(path: str) -> str:
+    """SQLite连接URL（:memory: 为内存库）"""
+    return "sqlite://" if path == ":memory:" else f"sqlite:///{path}"
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生成测试数据库")
+    parser.add_argument("--path", default="data/telecom.db", help="SQLite数据库文件")
+    parser.add_argument("--url", default=None, help="数据库连接URL（指定时忽略 --path）")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--packages", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    if args.url is None and args.path != ":memory:":
+        Path(args.path).parent.mkdir(parents=True, exist_ok=True)
+
+    db = DatabaseManager.create(args.url or sqlite_url(args.path))
+    start = time.perf_counter()
+    counts = seed_database(db, users=args.users, packages=args.packages, batch_size=args.batch_size)
+    print(f"写入完成: {counts}, 耗时 {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # 执行层
 from .db_executor import DatabaseExecutor
+from .package_catalog import PackageCatalog
 
 
 
-__all__ = ['DatabaseExecutor']
\ No newline at end of file
+__all__ = ['DatabaseExecutor', 'PackageCatalog']
\ No newline at end of file
@@ -1,107 +1,280 @@
 
 """
 数据库执行器
+
+每个函数都有同步版本（execute_function，在线程池中执行）和异步版本（aexecute_function，
+配置 DB_ASYNC_ENABLED 后通过异步引擎在事件循环上等待数据库），两者共用SQL与结果组装。
 """
-import inspect
-from typing import Dict, Any, Optional
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
 
+from config import settings
+from models import Package, UserAccount
 from database import db_manager
-from utils import logger, validate_phone
+from database.async_db_manager import create_async_db_manager
+from executor.function_registry import FunctionSpec, ParameterError, build_registry
+from executor.idempotency import IdempotencyStore
+from executor.package_catalog import create_package_catalog
+from executor.user_cache import create_user_cache
+from utils import logger, metrics, validate_phone, Deadline
+
+# 更新用户当前套餐，用户不存在时创建（各后端的 upsert 语法）
+UPSERT_USER_PACKAGE_SQL = {
+    "mysql": """
+             INSERT INTO t_user (phone, current_package_id)
+             VALUES (:phone, :package_id)
+             ON DUPLICATE KEY UPDATE current_package_id = VALUES(current_package_id) \
+             """,
+    "sqlite": """
+              INSERT INTO t_user (phone, current_package_id)
+              VALUES (:phone, :package_id)
+              ON CONFLICT(phone) DO UPDATE SET current_package_id = excluded.current_package_id \
+              """,
+}
+
+PACKAGES_SQL = """
+               SELECT id, name, data_gb, voice_minutes, price, target_user, description
+               FROM t_packages
+               WHERE status = 1 \
+               """
+
+PACKAGE_BY_NAME_SQL = """
+                      SELECT id, name, data_gb, voice_minutes, price, target_user, description
+                      FROM t_packages
+                      WHERE name = :package_name \
+                        AND status = 1 \
+                      """
+
+# 列名与 UserAccount 字段一致
+PROFILE_SQL = """
+              SELECT u.phone, \
+                     p.name AS package_name, \
+                     p.data_gb, \
+                     p.voice_minutes, \
+                     p.price, \
+                     p.target_user, \
+                     p.description,
+                     u.monthly_usage_gb, \
+                     u.monthly_usage_minutes, \
+                     u.balance
+              FROM t_user u
+                       LEFT JOIN t_packages p ON u.current_package_id = p.id
+              WHERE u.phone = :phone \
+                AND u.status = 1 \
+              """
+
+PACKAGE_CHANGE_SQL = """
+                     INSERT INTO t_package_changes (idempotency_key, phone, package_id)
+                     VALUES (:idempotency_key, :phone, :package_id) \
+                     """
+
+PACKAGE_CHANGE_EXISTS_SQL = """
+                            SELECT 1
+                            FROM t_package_changes
+                            WHERE idempotency_key = :idempotency_key \
+                            """
+
+# 排序
+SORT_MAPPING = {
+    "price_asc": "price ASC",
+    "price_desc": "price DESC",
+    "data_desc": "data_gb DESC"
+}
+
+INVALID_PHONE = {
+    "success": False,
+    "error": "手机号格式不正确"
+}
+USER_NOT_FOUND = {
+    "success": False,
+    "error": "未找到该用户信息"
+}
 
 
 class DatabaseExecutor:
     """数据库执行器 - 执行Function调用"""
+
+    # 写操作：时间预算耗尽也照常执行（用户已确认）
+    WRITE_FUNCTIONS = {"change_package"}
+
     def __init__(self):
         """初始化执行器"""
         self.db = db_manager
+        # 异步数据库（None表示 aexecute_function 在线程池中执行同步版本）
+        self.adb = create_async_db_manager()
+        # 进程内套餐目录（None表示套餐查询直接走数据库）
+        self.catalog = create_package_catalog(self.db)
+        # 用户资料读穿缓存（None表示不缓存）
+        self.user_cache = create_user_cache()
+        # 本次调用中由缓存省下的数据库查询数（同步调用各在自己的线程，异步调用各在自己的任务上下文）
+        self._saved = ContextVar("db_queries_saved", default=0)
+        # 写操作幂等（按确认生成的幂等键去重）
+        self.idempotency = IdempotencyStore(ttl=settings.CONFIRMATION_TIMEOUT_MINUTES * 60 * 2)
         logger.info("数据库执行器初始化完成")
 
-    def execute_function(self, function_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def execute_function(self, function_name: str, parameters: Dict[str, Any],
+                         deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         执行Function调用
 
         Args:
             function_name: 函数名
             parameters: 参数字典
+            deadline: 请求时间预算（耗尽时跳过只读查询）
 
         Returns:
             执行结果
         """
-        logger.info(f"执行Function: {function_name}, 参数: {parameters}")
+        spec, params, early = self._prepare(function_name, parameters, deadline)
+        if early is not None:
+            return early
 
-        # 路由到对应的执行函数
-        executor_map = {
-            "query_packages": self.query_packages,
-            "query_current_package": self.query_current_package,
-            "query_package_detail": self.query_package_detail,
-            "change_package": self.change_package,
-            "query_usage": self.query_usage,
-            "business_consultation": self.business_consultation
-        }
+        start = time.perf_counter()
+        try:
+            self._saved.set(0)
+            result = spec.func(self, **params)
+        except Exception as e:
+            result = self._failed(function_name, e)
+            self._observe(function_name, start, "error")
+            return result
+        self._finish(function_name, start, result)
+        return result
 
-        executor = executor_map.get(function_name)
-        if not executor:
-            return {
-                "success": False,
-                "error": f"未知的函数: {function_name}"
-            }
+    async def aexecute_function(self, function_name: str, parameters: Dict[str, Any],
+                                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        执行Function调用（异步版本，参数与返回值同 execute_function）
 
-        try:
-            # 🔥 关键改进：过滤参数，只传递函数需要的参数
-            filtered_params = self._filter_params(executor, parameters)
-            logger.debug(f"过滤后参数: {filtered_params}")
+        未启用异步数据库时在线程池中执行同步版本
+        """
+        if self.adb is None:
+            return await asyncio.to_thread(self.execute_function, function_name, parameters, deadline=deadline)
 
-            result = executor(**filtered_params)
-            logger.info(f"Function执行成功: {function_name}")
-            return result
+        spec, params, early = self._prepare(function_name, parameters, deadline)
+        if early is not None:
+            return early
+
+        start = time.perf_counter()
+        try:
+            self._saved.set(0)
+            result = await spec.afunc(self, **params)
         except Exception as e:
-            logger.error(f"Function执行失败: {function_name}, 错误: {e}")
-            return {
-                "success": False,
-                "error": f"执行出错: {str(e)}"
-            }
+            result = self._failed(function_name, e)
+            self._observe(function_name, start, "error")
+            return result
+        self._finish(function_name, start, result)
+        return result
 
-    def _filter_params(self, func, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, function_name: str, parameters: Dict[str, Any], deadline: Optional[Deadline]
+                 ) -> Tuple[Optional[FunctionSpec], Dict[str, Any], Optional[Dict[str, Any]]]:
         """
-        过滤参数，只保留函数签名中定义的参数
-
-        Args:
-            func: 目标函数
-            params: 原始参数字典
+        查找函数并绑定参数
 
         Returns:
-            过滤后的参数字典
+            tuple: (函数, 调用参数, 提前返回的结果)；提前返回的结果不为None时不再执行
         """
-        # 获取函数签名
-        sig = inspect.signature(func)
+        logger.info(f"执行Function: {function_name}")
+        logger.debug("参数: {}", parameters)
 
-        # 获取函数接受的参数名
-        valid_params = set(sig.parameters.keys())
+        # 路由到对应的执行函数
+        spec = FUNCTIONS.get(function_name)
+        if spec is None:
+            return None, {}, self._unknown_function(function_name)
+
+        if deadline is not None and deadline.expired and not spec.write:
+            deadline.degrade("db_skipped")
+            logger.warning(f"时间预算已耗尽，跳过查询: {function_name}")
+            return spec, {}, {
+                "success": False,
+                "error": "系统繁忙，查询超时，请稍后再试"
+            }
 
-        # 过滤参数
-        filtered = {}
-        for key, value in params.items():
-            if key in valid_params:
-                filtered[key] = value
-            else:
-                logger.debug(f"跳过多余参数: {key}={value}")
+        # 只传递函数需要的参数，并转换为声明的类型
+        try:
+            params, dropped = spec.bind(parameters)
+        except ParameterError as e:
+            logger.warning(f"Function参数错误: {function_name}, {e}")
+            metrics.counter("executor_calls_total", function=function_name, result="bad_params").inc()
+            return spec, {}, {
+                "success": False,
+                "error": str(e)
+            }
+        if dropped:
+            logger.debug("跳过多余参数: {}", dropped)
+        return spec, params, None
+
+    def _finish(self, function_name: str, start: float, result: Dict[str, Any]):
+        logger.info(f"Function执行成功: {function_name}")
+        metrics.histogram("db_queries_saved_per_turn").observe(self._saved.get())
+        self._observe(function_name, start, "success" if result.get("success") else "failure")
+
+    @staticmethod
+    def _observe(function_name: str, start: float, result: str):
+        """每个函数的调用次数（按结果）与耗时"""
+        metrics.counter("executor_calls_total", function=function_name, result=result).inc()
+        metrics.histogram("executor_latency_seconds", function=function_name).observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _unknown_function(function_name: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": f"未知的函数: {function_name}"
+        }
 
-        return filtered
+    @staticmethod
+    def _failed(function_name: str, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Function执行失败: {function_name}, 错误: {error}")
+        return {
+            "success": False,
+            "error": f"执行出错: {str(error)}"
+        }
 
     def query_packages(self,
                        price_min: Optional[float] = None,
                        price_max: Optional[float] = None,
-                       data_min: Optional[int] = None,
-                       data_max: Optional[int] = None,
+                       data_min: Optional[float] = None,
+                       data_max: Optional[float] = None,
                        target_user: Optional[str] = None,
                        sort_by: str = "price_asc") -> Dict[str, Any]:
         """查询套餐列表"""
-        # 构建SQL查询
-        sql = """
-              SELECT id, name, data_gb, voice_minutes, price, target_user, description
-              FROM t_packages
-              WHERE status = 1 \
-              """
+        filters = dict(price_min=price_min, price_max=price_max, data_min=data_min,
+                       data_max=data_max, target_user=target_user, sort_by=sort_by)
+        if self.catalog is not None:
+            return self._package_list(self.catalog.query(**filters))
+
+        rows = self.db.execute_query(*self._packages_query(**filters))
+        return self._package_list([Package.from_row(row) for row in rows])
+
+    async def aquery_packages(self,
+                              price_min: Optional[float] = None,
+                              price_max: Optional[float] = None,
+                              data_min: Optional[float] = None,
+                              data_max: Optional[float] = None,
+                              target_user: Optional[str] = None,
+                              sort_by: str = "price_asc") -> Dict[str, Any]:
+        """查询套餐列表（异步）"""
+        filters = dict(price_min=price_min, price_max=price_max, data_min=data_min,
+                       data_max=data_max, target_user=target_user, sort_by=sort_by)
+        if self.catalog is not None:
+            await self._arefresh_catalog()
+            return self._package_list(self.catalog.query(**filters))
+
+        rows = await self.adb.execute_query(*self._packages_query(**filters))
+        return self._package_list([Package.from_row(row) for row in rows])
+
+    @staticmethod
+    def _packages_query(price_min: Optional[float] = None,
+                        price_max: Optional[float] = None,
+                        data_min: Optional[float] = None,
+                        data_max: Optional[float] = None,
+                        target_user: Optional[str] = None,
+                        sort_by: str = "price_asc") -> Tuple[str, Dict[str, Any]]:
+        """构建套餐列表查询，返回 (SQL, 参数)"""
+        sql = PACKAGES_SQL
         params = {}
 
         if price_min is not None:
@@ -124,174 +297,233 @@ class DatabaseExecutor:
             sql += " AND (target_user = :target_user OR target_user = '无限制')"
             params['target_user'] = target_user
 
-        # 排序
-        sort_mapping = {
-            "price_asc": "price ASC",
-            "price_desc": "price DESC",
-            "data_desc": "data_gb DESC"
-        }
-        sql += f" ORDER BY {sort_mapping.get(sort_by, 'price ASC')}"
-
-        rows = self.db.execute_query(sql, params)
-
-        # 格式化结果
-        packages = []
-        for row in rows:
-            packages.append({
-                "id": row[0],
-                "name": row[1],
-                "data_gb": row[2],
-                "voice_minutes": row[3],
-                "price": float(row[4]),
-                "target_user": row[5],
-                "description": row[6]
-            })
+        sql += f" ORDER BY {SORT_MAPPING.get(sort_by, 'price ASC')}"
+        return sql, params
 
+    @staticmethod
+    def _package_list(packages: list) -> Dict[str, Any]:
         return {
             "success": True,
             "data": packages,
             "count": len(packages)
         }
 
+    async def _arefresh_catalog(self):
+        """套餐目录需要（重新）加载时在线程池中完成，不阻塞事件循环"""
+        if self.catalog.stale:
+            await asyncio.to_thread(lambda: self.catalog.snapshot)
+
     def query_current_package(self, phone: str) -> Dict[str, Any]:
         """查询用户当前套餐"""
         if not validate_phone(phone):
-            return {
-                "success": False,
-                "error": "手机号格式不正确"
-            }
+            return dict(INVALID_PHONE)
+        return self._current_package_result(phone, self._load_profile(phone))
 
-        sql = """
-              SELECT p.name, \
-                     p.data_gb, \
-                     p.voice_minutes, \
-                     p.price, \
-                     p.target_user, \
-                     p.description,
-                     u.monthly_usage_gb, \
-                     u.monthly_usage_minutes, \
-                     u.balance
-              FROM t_user u
-                       LEFT JOIN t_packages p ON u.current_package_id = p.id
-              WHERE u.phone = :phone \
-                AND u.status = 1 \
-              """
-
-        rows = self.db.execute_query(sql, {"phone": phone})
+    async def aquery_current_package(self, phone: str) -> Dict[str, Any]:
+        """查询用户当前套餐（异步）"""
+        if not validate_phone(phone):
+            return dict(INVALID_PHONE)
+        return self._current_package_result(phone, await self._aload_profile(phone))
 
-        if not rows:
-            return {
-                "success": False,
-                "error": "未找到该用户信息"
-            }
+    @staticmethod
+    def _current_package_result(phone: str, profile: Optional[UserAccount]) -> Dict[str, Any]:
+        if profile is None:
+            return dict(USER_NOT_FOUND)
 
-        row = rows[0]
         return {
             "success": True,
-            "data": {
-                "phone": phone,
-                "package_name": row[0],
-                "data_gb": row[1],
-                "voice_minutes": row[2],
-                "price": float(row[3]),
-                "target_user": row[4],
-                "description": row[5],
-                "monthly_usage_gb": float(row[6]) if row[6] else 0,
-                "monthly_usage_minutes": row[7] or 0,
-                "balance": float(row[8]) if row[8] else 0
-            }
+            "data": profile
         }
 
+    def _load_profile(self, phone: str) -> Optional[UserAccount]:
+        """
+        读取用户资料（当前套餐 + 本月使用情况），先查用户资料缓存
+
+        Args:
+            phone: 手机号
+
+        Returns:
+            UserAccount: 用户资料（只读，与缓存共享）；用户不存在返回None
+        """
+        profile = self._cached_profile(phone)
+        if profile is not None:
+            return profile
+        return self._store_profile(phone, self.db.execute_query(PROFILE_SQL, {"phone": phone}))
+
+    async def _aload_profile(self, phone: str) -> Optional[UserAccount]:
+        """读取用户资料（异步）"""
+        profile = self._cached_profile(phone)
+        if profile is not None:
+            return profile
+        return self._store_profile(phone, await self.adb.execute_query(PROFILE_SQL, {"phone": phone}))
+
+    def _cached_profile(self, phone: str) -> Optional[UserAccount]:
+        if self.user_cache is None:
+            return None
+        profile = self.user_cache.get(phone)
+        if profile is not None:
+            self._saved.set(self._saved.get() + 1)
+        return profile
+
+    def _store_profile(self, phone: str, rows: list) -> Optional[UserAccount]:
+        """查询行 → 用户资料，并写入缓存"""
+        if not rows:
+            return None
+
+        profile = UserAccount.from_row(rows[0])
+        if self.user_cache is not None:
+            self.user_cache.set(phone, profile)
+        return profile
+
     def query_package_detail(self, package_name: str) -> Dict[str, Any]:
         """查询套餐详情"""
-        sql = """
-              SELECT id, name, data_gb, voice_minutes, price, target_user, description
-              FROM t_packages
-              WHERE name = :package_name \
-                AND status = 1 \
-              """
+        return self._package_detail_result(package_name, self._find_package(package_name))
 
-        rows = self.db.execute_query(sql, {"package_name": package_name})
+    async def aquery_package_detail(self, package_name: str) -> Dict[str, Any]:
+        """查询套餐详情（异步）"""
+        return self._package_detail_result(package_name, await self._afind_package(package_name))
 
-        if not rows:
+    @staticmethod
+    def _package_detail_result(package_name: str, package: Optional[Package]) -> Dict[str, Any]:
+        if package is None:
             return {
                 "success": False,
                 "error": f"未找到套餐: {package_name}"
             }
 
-        row = rows[0]
         return {
             "success": True,
-            "data": {
-                "id": row[0],
-                "name": row[1],
-                "data_gb": row[2],
-                "voice_minutes": row[3],
-                "price": float(row[4]),
-                "target_user": row[5],
-                "description": row[6]
-            }
+            "data": package
         }
 
-    def change_package(self, phone: str, new_package_name: str) -> Dict[str, Any]:
-        """办理套餐变更"""
+    def _find_package(self, package_name: str) -> Optional[Package]:
+        """按名称查找在售套餐（优先使用进程内目录）"""
+        if self.catalog is not None:
+            return self.catalog.get(package_name)
+
+        rows = self.db.execute_query(PACKAGE_BY_NAME_SQL, {"package_name": package_name})
+        return Package.from_row(rows[0]) if rows else None
+
+    async def _afind_package(self, package_name: str) -> Optional[Package]:
+        """按名称查找在售套餐（异步）"""
+        if self.catalog is not None:
+            await self._arefresh_catalog()
+            return self.catalog.get(package_name)
+
+        rows = await self.adb.execute_query(PACKAGE_BY_NAME_SQL, {"package_name": package_name})
+        return Package.from_row(rows[0]) if rows else None
+
+    def change_package(self, phone: str, new_package_name: str,
+                       idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        办理套餐变更
+
+        Args:
+            phone: 手机号
+            new_package_name: 新套餐名称
+            idempotency_key: 幂等键（同一次确认重复提交时返回之前的结果，不再写库）
+        """
         if not validate_phone(phone):
+            return dict(INVALID_PHONE)
+
+        if idempotency_key is None:
+            return self._change_package(phone, new_package_name)
+        return self.idempotency.run(
+            idempotency_key,
+            lambda: self._change_package(phone, new_package_name, idempotency_key),
+            name="change_package"
+        )
+
+    async def achange_package(self, phone: str, new_package_name: str,
+                              idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """办理套餐变更（异步，参数同 change_package）"""
+        if not validate_phone(phone):
+            return dict(INVALID_PHONE)
+
+        if idempotency_key is None:
+            return await self._achange_package(phone, new_package_name)
+        return await self.idempotency.arun(
+            idempotency_key,
+            lambda: self._achange_package(phone, new_package_name, idempotency_key),
+            name="change_package"
+        )
+
+    def _change_package(self, phone: str, new_package_name: str,
+                        idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """套餐变更：变更记录 + 用户套餐 upsert 在同一个事务中完成"""
+        # 查找新套餐的完整信息
+        package_info = self._find_package(new_package_name)
+
+        if package_info is None:
             return {
                 "success": False,
-                "error": "手机号格式不正确"
+                "error": f"未找到套餐: {new_package_name}"
             }
 
-        # 查找新套餐的完整信息（修改：增加所有字段）
-        sql_package = """
-                      SELECT id, name, price, data_gb, voice_minutes, target_user, description
-                      FROM t_packages
-                      WHERE name = :package_name \
-                        AND status = 1 \
-                      """
-        rows = self.db.execute_query(sql_package, {"package_name": new_package_name})
-
-        if not rows:
+        try:
+            self.db.execute_transaction(
+                self._change_statements(self.db.dialect, phone, package_info, idempotency_key))
+        except IntegrityError:
+            # 事务已回滚，只有变更记录中确实已有这个幂等键才是重复确认，其他约束冲突照常报错
+            if idempotency_key is None or not self.db.execute_query(
+                    PACKAGE_CHANGE_EXISTS_SQL, {"idempotency_key": idempotency_key}):
+                raise
+            self._on_duplicate_change(phone, new_package_name)
+
+        return self._changed(phone, new_package_name, package_info)
+
+    async def _achange_package(self, phone: str, new_package_name: str,
+                               idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """套餐变更（异步）"""
+        package_info = await self._afind_package(new_package_name)
+
+        if package_info is None:
             return {
                 "success": False,
                 "error": f"未找到套餐: {new_package_name}"
             }
 
-        # 解析套餐信息（新增）
-        package_id = rows[0][0]
-        package_info = {
-            "id": rows[0][0],
-            "name": rows[0][1],
-            "price": float(rows[0][2]),
-            "data_gb": rows[0][3],
-            "voice_minutes": rows[0][4],
-            "target_user": rows[0][5],
-            "description": rows[0][6]
+        try:
+            await self.adb.execute_transaction(
+                self._change_statements(self.adb.dialect, phone, package_info, idempotency_key))
+        except IntegrityError:
+            if idempotency_key is None or not await self.adb.execute_query(
+                    PACKAGE_CHANGE_EXISTS_SQL, {"idempotency_key": idempotency_key}):
+                raise
+            self._on_duplicate_change(phone, new_package_name)
+
+        return self._changed(phone, new_package_name, package_info)
+
+    @staticmethod
+    def _change_statements(dialect: str, phone: str, package_info: Dict[str, Any],
+                           idempotency_key: Optional[str]) -> list:
+        """套餐变更事务中的语句：变更记录（有幂等键时）+ 用户套餐 upsert"""
+        params = {
+            "package_id": package_info["id"],
+            "phone": phone,
+            "idempotency_key": idempotency_key
         }
-
-        # 更新用户套餐
-        sql_update = """
-                     UPDATE t_user
-                     SET current_package_id = :package_id
-                     WHERE phone = :phone \
-                     """
-
-        rowcount = self.db.execute_update(sql_update, {
-            "package_id": package_id,
-            "phone": phone
-        })
-
-        if rowcount == 0:
-            # 用户不存在，创建新用户
-            sql_insert = """
-                         INSERT INTO t_user (phone, current_package_id)
-                         VALUES (:phone, :package_id) \
-                         """
-            self.db.execute_update(sql_insert, {
-                "phone": phone,
-                "package_id": package_id
-            })
-
-        # 返回完整信息（修改：增加所有参数）
+        statements = []
+        if idempotency_key is not None:
+            # 幂等键唯一：其他进程已办理过同一次确认时整个事务失败
+            statements.append((PACKAGE_CHANGE_SQL, params))
+        # 更新用户套餐，用户不存在时创建
+        statements.append((UPSERT_USER_PACKAGE_SQL[dialect], params))
+        return statements
+
+    @staticmethod
+    def _on_duplicate_change(phone: str, new_package_name: str):
+        """变更记录幂等键冲突：其他进程已办理过同一次确认，按成功处理"""
+        logger.info(f"套餐变更已办理过（幂等键重复）: {phone} → {new_package_name}")
+        metrics.counter("idempotent_writes_total", function="change_package", result="duplicate_db").inc()
+
+    def _changed(self, phone: str, new_package_name: str, package_info: Package) -> Dict[str, Any]:
+        """套餐变更成功：使缓存的用户资料失效，返回完整信息"""
+        # 当前套餐已变更，缓存的用户资料失效
+        if self.user_cache is not None:
+            self.user_cache.invalidate(phone)
+
+        # 返回完整信息
         return {
             "success": True,
             "message": f"已成功为您办理【{new_package_name}】，次月生效",
@@ -305,38 +537,33 @@ class DatabaseExecutor:
     def query_usage(self, phone: str, query_type: str = "all") -> Dict[str, Any]:
         """查询使用情况"""
         if not validate_phone(phone):
-            return {
-                "success": False,
-                "error": "手机号格式不正确"
-            }
+            return dict(INVALID_PHONE)
 
-        sql = """
-              SELECT monthly_usage_gb, monthly_usage_minutes, balance
-              FROM t_user
-              WHERE phone = :phone \
-                AND status = 1 \
-              """
+        # 与 query_current_package 共用用户资料（同一会话前后两轮只查一次库）
+        return self._usage_result(phone, self._load_profile(phone), query_type)
 
-        rows = self.db.execute_query(sql, {"phone": phone})
+    async def aquery_usage(self, phone: str, query_type: str = "all") -> Dict[str, Any]:
+        """查询使用情况（异步）"""
+        if not validate_phone(phone):
+            return dict(INVALID_PHONE)
+        return self._usage_result(phone, await self._aload_profile(phone), query_type)
 
-        if not rows:
-            return {
-                "success": False,
-                "error": "未找到该用户信息"
-            }
+    @staticmethod
+    def _usage_result(phone: str, profile: Optional[UserAccount], query_type: str) -> Dict[str, Any]:
+        if profile is None:
+            return dict(USER_NOT_FOUND)
 
-        row = rows[0]
         result = {
             "success": True,
             "phone": phone
         }
 
         if query_type in ["data", "all"]:
-            result["monthly_usage_gb"] = float(row[0]) if row[0] else 0
-            result["monthly_usage_minutes"] = row[1] or 0
+            result["monthly_usage_gb"] = profile["monthly_usage_gb"]
+            result["monthly_usage_minutes"] = profile["monthly_usage_minutes"]
 
         if query_type in ["balance", "all"]:
-            result["balance"] = float(row[2]) if row[2] else 0
+            result["balance"] = profile["balance"]
 
         return result
 
@@ -351,4 +578,19 @@ class DatabaseExecutor:
                         "2. 拨打10086人工客服获取详细帮助\n"
                         "3. 访问官网了解更多信息",
             "note": "此处预留RAG接口,未来将接入知识库检索"
-        }
\ No newline at end of file
+        }
+
+    async def abusiness_consultation(self, question: str, business_type: str = "其他") -> Dict[str, Any]:
+        """业务咨询（异步，不访问数据库）"""
+        return self.business_consultation(question, business_type)
+
+
+# 函数名 → (同步方法, 异步方法)；导入时按方法签名生成注册表
+FUNCTIONS = build_registry(DatabaseExecutor, {
+    "query_packages": ("query_packages", "aquery_packages"),
+    "query_current_package": ("query_current_package", "aquery_current_package"),
+    "query_package_detail": ("query_package_detail", "aquery_package_detail"),
+    "change_package": ("change_package", "achange_package"),
+    "query_usage": ("query_usage", "aquery_usage"),
+    "business_consultation": ("business_consultation", "abusiness_consultation"),
+}, write_functions=frozenset(DatabaseExecutor.WRITE_FUNCTIONS))
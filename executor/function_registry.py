@@ -0,0 +1,135 @@
+"""
+执行器函数注册表
+
+导入时按执行器方法的签名一次性生成：函数名 → 方法（同步/异步）、可接受的参数及其类型。
+每次调用只做一次字典查找和参数绑定，不再重建路由表、不再调用 inspect.signature：
+
+- 多余参数丢弃（NLU/LLM 可能带上函数不需要的槽位）
+- 简单类型转换：LLM 常把数字写成字符串（"100"、"100.5"），手机号写成数字
+"""
+import inspect
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ParameterError(ValueError):
+    """参数无法转换为声明的类型"""
+
+    def __init__(self, name: str, value: Any):
+        self.name = name
+        self.value = value
+        super().__init__(f"参数格式不正确: {name}={value!r}")
+
+
+def _coerce_float(value: Any) -> float:
+    if isinstance(value, float):
+        return value
+    if isinstance(value, bool):
+        raise TypeError(value)
+    return float(value.strip() if isinstance(value, str) else value)
+
+
+def _coerce_int(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    number = _coerce_float(value)
+    if not number.is_integer():
+        raise ValueError(value)
+    return int(number)
+
+
+def _coerce_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 13800138000 / 13800138000.0 → "13800138000"
+        return str(int(value)) if float(value).is_integer() else str(value)
+    raise TypeError(value)
+
+
+# 参数声明类型 → 转换函数（其他类型原样传递）
+COERCERS: Dict[type, Callable[[Any], Any]] = {
+    float: _coerce_float,
+    int: _coerce_int,
+    str: _coerce_str,
+}
+
+
+def _declared_type(annotation: Any) -> Any:
+    """Optional[X] → X"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+@dataclass(frozen=True)
+class FunctionSpec:
+    """一个可调用的执行器函数"""
+    name: str
+    func: Callable[..., Dict[str, Any]]
+    afunc: Optional[Callable[..., Any]]
+    # 参数名 → 转换函数（None 表示不转换）
+    params: Dict[str, Optional[Callable[[Any], Any]]]
+    write: bool = False
+
+    def bind(self, parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+        """
+        按签名筛选并转换参数
+
+        Args:
+            parameters: 原始参数字典
+
+        Returns:
+            tuple: (调用参数, 丢弃的参数名)
+
+        Raises:
+            ParameterError: 参数无法转换为声明的类型
+        """
+        bound = {}
+        dropped = ()
+        for key, value in parameters.items():
+            if key not in self.params:
+                dropped += (key,)
+                continue
+            coerce = self.params[key]
+            if coerce is not None and value is not None:
+                try:
+                    value = coerce(value)
+                except (TypeError, ValueError):
+                    raise ParameterError(key, value) from None
+            bound[key] = value
+        return bound, dropped
+
+
+def build_registry(cls: type, functions: Dict[str, Tuple[str, Optional[str]]],
+                   write_functions: frozenset = frozenset()) -> Dict[str, FunctionSpec]:
+    """
+    按类的方法签名生成注册表
+
+    Args:
+        cls: 执行器类
+        functions: 函数名 → (同步方法名, 异步方法名或None)
+        write_functions: 写操作函数名
+
+    Returns:
+        dict: 函数名 → FunctionSpec
+    """
+    registry = {}
+    for name, (method, amethod) in functions.items():
+        func = getattr(cls, method)
+        hints = typing.get_type_hints(func)
+        params = {}
+        for param in list(inspect.signature(func).parameters.values())[1:]:  # 跳过 self
+            declared = _declared_type(hints.get(param.name, param.annotation))
+            params[param.name] = COERCERS.get(declared)
+        registry[name] = FunctionSpec(
+            name=name,
+            func=func,
+            afunc=getattr(cls, amethod) if amethod else None,
+            params=params,
+            write=name in write_functions
+        )
+    return registry
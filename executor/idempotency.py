@@ -0,0 +1,122 @@
+"""
+写操作幂等
+
+用户连续回复两次"确认"、接口重试或前端重复提交时，同一次确认可能被执行多次。
+调用方为每次确认生成幂等键（见 DialogState.confirmation_key），执行器按键去重：
+
+- 同一个键的并发请求串行执行，后到的等待先到的结果
+- 成功结果在进程内保存一段时间，重复请求直接返回之前的结果，不再访问数据库
+- 跨进程的重复由数据库中变更记录表的唯一键兜底（见 DatabaseExecutor.change_package）
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils import metrics
+from utils.cache import TTLCache
+
+
+class IdempotencyStore:
+    """按幂等键去重的执行结果表"""
+
+    def __init__(self, ttl: int = 600, max_size: int = 10000):
+        """
+        Args:
+            ttl: 成功结果保存时间（秒），应大于确认超时时间
+            max_size: 保存的结果数上限
+        """
+        self.results = TTLCache(max_size=max_size, ttl=ttl)
+        self._key_locks: Dict[str, list] = {}
+        self._async_key_locks: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], Dict[str, Any]], name: str = "") -> Dict[str, Any]:
+        """
+        执行一次写操作；相同幂等键已成功执行过时返回之前的结果
+
+        Args:
+            key: 幂等键
+            fn: 写操作，返回执行结果字典（success 为真时保存）
+            name: 操作名（指标标签）
+
+        Returns:
+            dict: 执行结果
+        """
+        previous = self._previous(key, name)
+        if previous is not None:
+            return previous
+
+        lock = self._acquire(key)
+        try:
+            with lock:
+                # 等待期间先到的请求可能已经完成
+                previous = self._previous(key, name)
+                if previous is not None:
+                    return previous
+
+                result = fn()
+                if result.get("success"):
+                    self.results.set(key, dict(result))
+                metrics.counter("idempotent_writes_total", function=name, result="executed").inc()
+                return result
+        finally:
+            self._release(key)
+
+    async def arun(self, key: str, fn: Callable[[], Awaitable[Dict[str, Any]]], name: str = "") -> Dict[str, Any]:
+        """
+        执行一次写操作（异步版本，同一事件循环内相同幂等键的请求串行执行）
+
+        Args:
+            key: 幂等键
+            fn: 返回协程的写操作
+            name: 操作名（指标标签）
+
+        Returns:
+            dict: 执行结果
+        """
+        previous = self._previous(key, name)
+        if previous is not None:
+            return previous
+
+        entry = self._async_key_locks.get(key)
+        if entry is None:
+            entry = self._async_key_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                previous = self._previous(key, name)
+                if previous is not None:
+                    return previous
+
+                result = await fn()
+                if result.get("success"):
+                    self.results.set(key, dict(result))
+                metrics.counter("idempotent_writes_total", function=name, result="executed").inc()
+                return result
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._async_key_locks[key]
+
+    def _previous(self, key: str, name: str) -> Optional[Dict[str, Any]]:
+        result = self.results.get(key)
+        if result is None:
+            return None
+        metrics.counter("idempotent_writes_total", function=name, result="duplicate").inc()
+        return dict(result)
+
+    def _acquire(self, key: str) -> threading.Lock:
+        """取得键对应的锁（引用计数，最后一个使用者释放后移除）"""
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release(self, key: str):
+        with self._lock:
+            entry = self._key_locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
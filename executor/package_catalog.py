@@ -0,0 +1,232 @@
+"""
+进程内套餐目录
+
+t_packages 表很小且很少变化，却几乎每轮对话都要查询。启动时整表加载到内存，
+按价格、流量建有序索引，query_packages 的区间过滤和排序直接在内存中完成：
+
+- 区间条件用 bisect 在有序索引上切片，取价格/流量中候选更少的一侧，其余条件逐条过滤
+- 目录快照不可变，重新加载时整体替换，读路径无锁
+- 套餐为只读的 Package 对象，查询结果直接共享目录中的对象，不逐个复制
+- 失效：TTL 到期自动重新加载，或调用 reload()（/api/catalog/reload）；
+  内容变化时版本号加一并通知监听者（NLG缓存等）
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from config import settings
+from models import Package
+from utils import logger, metrics
+
+PACKAGE_COLUMNS = ("id", "name", "data_gb", "voice_minutes", "price", "target_user", "description")
+
+CATALOG_SQL = f"""
+              SELECT {", ".join(PACKAGE_COLUMNS)}
+              FROM t_packages
+              WHERE status = 1 \
+              """
+
+# 不限人群的套餐，按人群过滤时总是包含
+TARGET_USER_ANY = "无限制"
+
+
+class CatalogSnapshot:
+    """某一版本的套餐目录及其索引（不可变）"""
+
+    def __init__(self, packages: List[Mapping], version: int):
+        """
+        Args:
+            packages: 在售套餐（Package 或字典）
+            version: 目录版本号
+        """
+        self.version = version
+        packages = [Package.from_dict(p) for p in packages]
+        # 价格升序；同价按ID
+        self.by_price = sorted(packages, key=lambda p: (p.price, p.id))
+        self.price_keys = [p.price for p in self.by_price]
+        # 流量升序；同流量按ID降序，反向遍历即为 data_desc 的顺序
+        self.by_data = sorted(packages, key=lambda p: (p.data_gb, -p.id))
+        self.data_keys = [p.data_gb for p in self.by_data]
+        self.by_name = {p.name: p for p in packages}
+
+    def __len__(self) -> int:
+        return len(self.by_price)
+
+    @staticmethod
+    def _slice(keys: List, low, high) -> Tuple[int, int]:
+        start = 0 if low is None else bisect_left(keys, low)
+        end = len(keys) if high is None else bisect_right(keys, high)
+        return start, max(start, end)
+
+    def query(self,
+              price_min: Optional[float] = None,
+              price_max: Optional[float] = None,
+              data_min: Optional[float] = None,
+              data_max: Optional[float] = None,
+              target_user: Optional[str] = None,
+              sort_by: str = "price_asc") -> List[Package]:
+        """
+        区间过滤 + 排序（语义与原SQL一致）
+
+        Returns:
+            list: 套餐（与目录共享，只读）
+        """
+        price_start, price_end = self._slice(self.price_keys, price_min, price_max)
+        data_start, data_end = self._slice(self.data_keys, data_min, data_max)
+
+        # 从候选更少的索引出发
+        if price_end - price_start <= data_end - data_start:
+            candidates = self.by_price[price_start:price_end]
+            if data_min is not None or data_max is not None:
+                candidates = [p for p in candidates
+                              if (data_min is None or p.data_gb >= data_min)
+                              and (data_max is None or p.data_gb <= data_max)]
+            ordered_by = "price_asc"
+        else:
+            candidates = self.by_data[data_start:data_end]
+            if price_min is not None or price_max is not None:
+                candidates = [p for p in candidates
+                              if (price_min is None or p.price >= price_min)
+                              and (price_max is None or p.price <= price_max)]
+            ordered_by = "data_asc"
+
+        if target_user:
+            candidates = [p for p in candidates if p.target_user in (target_user, TARGET_USER_ANY)]
+
+        if sort_by == "data_desc":
+            if ordered_by == "data_asc":
+                return candidates[::-1]
+            return sorted(candidates, key=lambda p: (-p.data_gb, p.id))
+        if sort_by == "price_desc":
+            return sorted(candidates, key=lambda p: (-p.price, p.id))
+        if ordered_by == "price_asc":
+            return candidates
+        return sorted(candidates, key=lambda p: (p.price, p.id))
+
+
+class PackageCatalog:
+    """带版本的进程内套餐目录（TTL + 显式重新加载）"""
+
+    def __init__(self, loader: Callable[[], List[Mapping]], ttl: float = 300):
+        """
+        Args:
+            loader: 加载在售套餐的函数
+            ttl: 目录存活时间（秒），到期后下次访问时重新加载；0 表示只在显式 reload() 时加载
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._fingerprint = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], Any]] = []
+        self._size_gauge = metrics.gauge("package_catalog_size")
+        self._version_gauge = metrics.gauge("package_catalog_version")
+
+    @classmethod
+    def from_db(cls, db, ttl: float = 300) -> "PackageCatalog":
+        """从 t_packages 加载的目录"""
+        return cls(lambda: [Package.from_row(row) for row in db.execute_query(CATALOG_SQL)], ttl=ttl)
+
+    def add_listener(self, callback: Callable[[], Any]):
+        """注册目录变化回调（版本号变化后调用）"""
+        self._listeners.append(callback)
+
+    # ========== 加载 ==========
+
+    def reload(self) -> int:
+        """
+        重新加载目录；内容有变化时版本号加一并通知监听者
+
+        Returns:
+            int: 当前版本号
+        """
+        with self._lock:
+            return self._reload()
+
+    def _reload(self) -> int:
+        packages = self.loader()
+        fingerprint = tuple(tuple(p[c] for c in PACKAGE_COLUMNS) for p in packages)
+        self._loaded_at = time.monotonic()
+
+        if self._snapshot is not None and fingerprint == self._fingerprint:
+            metrics.counter("package_catalog_reloads_total", changed="false").inc()
+            return self._snapshot.version
+
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = CatalogSnapshot(packages, version)
+        self._fingerprint = fingerprint
+        self._size_gauge.set(len(packages))
+        self._version_gauge.set(version)
+        metrics.counter("package_catalog_reloads_total", changed="true").inc()
+        logger.info(f"套餐目录已加载: {len(packages)}个套餐, 版本={version}")
+
+        if version > 1:
+            for callback in self._listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"套餐目录变化回调失败: {e}")
+        return version
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """当前目录快照（首次访问或TTL到期时加载）"""
+        snapshot = self._snapshot
+        if snapshot is not None and (not self.ttl or time.monotonic() - self._loaded_at < self.ttl):
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not snapshot:
+                return self._snapshot
+            try:
+                self._reload()
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                # 加载失败继续使用旧目录，TTL后再试
+                logger.error(f"套餐目录重新加载失败，继续使用版本{snapshot.version}: {e}")
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    @property
+    def stale(self) -> bool:
+        """下次访问 snapshot 时是否需要（重新）加载"""
+        return self._snapshot is None or bool(self.ttl) and time.monotonic() - self._loaded_at >= self.ttl
+
+    # ========== 查询 ==========
+
+    def query(self, **filters) -> List[Package]:
+        """
+        按条件筛选在售套餐（参数同 DatabaseExecutor.query_packages）
+
+        Returns:
+            list: 套餐（与目录共享，只读）
+        """
+        return self.snapshot.query(**filters)
+
+    def get(self, name: str) -> Optional[Package]:
+        """按名称查找在售套餐（只读）；不存在返回None"""
+        return self.snapshot.by_name.get(name)
+
+    @property
+    def version(self) -> int:
+        """当前版本号（未加载时为0）"""
+        return self._snapshot.version if self._snapshot else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """目录统计"""
+        return {
+            "version": self.version,
+            "size": len(self._snapshot) if self._snapshot else 0,
+            "ttl": self.ttl,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._snapshot else None
+        }
+
+
+def create_package_catalog(db) -> Optional[PackageCatalog]:
+    """按配置创建套餐目录（禁用时返回None，查询直接走数据库）"""
+    if not settings.PACKAGE_CATALOG_ENABLED:
+        return None
+    return PackageCatalog.from_db(db, ttl=settings.PACKAGE_CATALOG_TTL)
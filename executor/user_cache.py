@@ -0,0 +1,111 @@
+"""
+用户资料读穿缓存
+
+query_current_package 与 query_usage 查询同一手机号的 t_user 行（前者带套餐关联），
+同一会话中经常前后两轮连续出现。按手机号缓存用户资料（当前套餐 + 本月使用情况）：
+
+- 进程内 LRU/TTL 一级缓存，可选 Redis 二级缓存（多worker共享）
+- TTL 很短：使用量、余额由计费系统在库里更新，这里只消除短时间内的重复查询
+- change_package 写入后立即使该手机号的缓存失效；
+  其他worker的一级缓存最长在TTL后过期
+"""
+import json
+from typing import Any, Dict, Optional
+
+from config import settings
+from models import UserAccount
+from utils import logger, metrics
+from utils.cache import TTLCache
+
+
+class UserProfileCache:
+    """用户资料缓存：进程内 LRU/TTL，可选 Redis 二级缓存"""
+
+    KEY_PREFIX = "user:profile:"
+
+    def __init__(self, max_size: int = 10000, ttl: int = 30, redis_manager=None):
+        """
+        Args:
+            max_size: 进程内缓存条目上限
+            ttl: 缓存存活时间（秒）
+            redis_manager: Redis连接管理器；提供时启用Redis二级缓存
+        """
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self.redis = redis_manager.get_client() if redis_manager else None
+
+    def get(self, phone: str) -> Optional[UserAccount]:
+        """
+        读取用户资料
+
+        Returns:
+            UserAccount: 用户资料（只读，不复制）；未命中返回None
+        """
+        profile = self.local.get(phone)
+        if profile is None and self.redis is not None:
+            try:
+                data = self.redis.get(self.KEY_PREFIX + phone)
+                if data:
+                    profile = UserAccount.from_dict(json.loads(data))
+                    self.local.set(phone, profile)
+            except Exception as e:
+                logger.error(f"用户资料缓存读取Redis失败: {e}")
+
+        if profile is None:
+            metrics.counter("user_cache_requests_total", result="miss").inc()
+            return None
+        metrics.counter("user_cache_requests_total", result="hit").inc()
+        return profile
+
+    def set(self, phone: str, profile: UserAccount):
+        """写入用户资料"""
+        self.local.set(phone, profile)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.KEY_PREFIX + phone, json.dumps(profile.to_dict(), ensure_ascii=False),
+                               ex=self.ttl)
+            except Exception as e:
+                logger.error(f"用户资料缓存写入Redis失败: {e}")
+
+    def invalidate(self, phone: str):
+        """用户数据变更：删除该手机号的缓存"""
+        self.local.delete(phone)
+        if self.redis is not None:
+            try:
+                self.redis.delete(self.KEY_PREFIX + phone)
+            except Exception as e:
+                logger.error(f"用户资料缓存删除Redis失败: {e}")
+        metrics.counter("user_cache_invalidations_total").inc()
+
+    def clear(self):
+        """清空进程内缓存"""
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return self.local.stats()
+
+
+def create_user_cache() -> Optional[UserProfileCache]:
+    """
+    按配置创建用户资料缓存
+
+    USER_CACHE_ENABLED=False 时返回None；USER_CACHE_BACKEND=redis 且Redis可用时启用二级缓存
+    """
+    if not settings.USER_CACHE_ENABLED:
+        return None
+
+    redis = None
+    if settings.USER_CACHE_BACKEND == "redis":
+        from database import redis_manager
+        try:
+            if redis_manager.test_connection():
+                redis = redis_manager
+        except Exception as e:
+            logger.error(f"Redis初始化失败: {e}")
+        if redis is None:
+            logger.warning("Redis不可用，用户资料缓存仅使用进程内缓存")
+
+    return UserProfileCache(max_size=settings.USER_CACHE_MAX_SIZE,
+                            ttl=settings.USER_CACHE_TTL,
+                            redis_manager=redis)
@@ -1,26 +1,23 @@
 # 套餐数据模型
-from dataclasses import dataclass
 from typing import Optional
 
+from .row_model import RowModel
 
-@dataclass
-class Pacakge:
-    """套餐模型"""
-    id : int
-    name : str
-    data_gb: int
-    price: float
-    target_user: str
-    description: Optional[str] = None
-    status: int = 1
 
-    def to_dict(self):
-        """转为字典"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "data_gb": self.data_gb,
-            "price": self.price,
-            "target_user": self.target_user,
-            "description": self.description
-        }
+class Package(RowModel):
+    """套餐模型（字段顺序同 t_packages 查询列）"""
+
+    __slots__ = ("id", "name", "data_gb", "voice_minutes", "price", "target_user", "description")
+
+    def __init__(self, id: int, name: str, data_gb: int, voice_minutes: int = 0, price: float = 0.0,
+                 target_user: str = "无限制", description: Optional[str] = None):
+        super().__init__(
+            id=id,
+            name=name,
+            data_gb=data_gb,
+            voice_minutes=voice_minutes,
+            # DECIMAL → float
+            price=float(price),
+            target_user=target_user,
+            description=description
+        )
@@ -1 +1,6 @@
-# 数据模型
\ No newline at end of file
+# 数据模型
+from .row_model import RowModel, to_plain, json_default
+from .Package import Package
+from .user import UserAccount
+
+__all__ = ['RowModel', 'to_plain', 'json_default', 'Package', 'UserAccount']
@@ -0,0 +1,80 @@
+# 查询结果模型基类
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class RowModel(Mapping):
+    """
+    查询结果模型：__slots__ 存储，只读映射接口
+
+    字段即 __slots__（与查询列同名同序），子类在 __init__ 中完成类型转换（如 DECIMAL → float）后
+    调用 super().__init__(**字段) 赋值。
+    实现 Mapping，下游按 package["price"] / package.get("voice_minutes") 读取的代码不用修改；
+    对象在缓存、目录和结果之间共享，不复制，因此构建后不能再赋值（AttributeError）。
+    需要普通字典（JSON、API 响应）时用 to_dict() / to_plain()。
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        """按字段名赋值（只在构建时）"""
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} 只读，不能设置 {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} 只读，不能删除 {name}")
+
+    def __reduce__(self):
+        # 默认的 copy / pickle 通过 setattr 恢复 __slots__，改为按字段重新构建
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_row(cls, row) -> "RowModel":
+        """从查询行构建：SQLAlchemy Row 按列名（RowMapping，列名需与字段一致），元组按位置"""
+        mapping = getattr(row, "_mapping", None)
+        return cls(**mapping) if mapping is not None else cls(*row)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "RowModel":
+        """从字典构建（多余的键忽略）"""
+        return data if isinstance(data, cls) else cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def to_plain(value: Any) -> Any:
+    """递归地把结果中的模型对象转为字典（API 边界、JSON 序列化前调用）"""
+    if isinstance(value, RowModel):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps 的 default：模型对象转为字典，其余转为字符串"""
+    if isinstance(value, RowModel):
+        return value.to_dict()
+    return str(value)
@@ -1,23 +1,30 @@
 # 用户数据模型
-from dataclasses import dataclass
 from typing import Optional
 
+from .row_model import RowModel
 
-@dataclass
-class User:
-    """用户模型"""
-    phone: str
-    current_package_id: Optional[int] = None
-    monthly_usage_gb: float = 0.0
-    balance: float = 0.0
-    status: int = 1
 
-    def to_dict(self):
-        """转为字典"""
-        return {
-            "phone": self.phone,
-            "current_package_id": self.current_package_id,
-            "monthly_usage_gb": self.monthly_usage_gb,
-            "balance": self.balance,
-            "status": self.status
-        }
+class UserAccount(RowModel):
+    """用户账户：当前套餐 + 本月使用情况（t_user 关联 t_packages 的查询结果）"""
+
+    __slots__ = ("phone", "package_name", "data_gb", "voice_minutes", "price", "target_user", "description",
+                 "monthly_usage_gb", "monthly_usage_minutes", "balance")
+
+    def __init__(self, phone: str, package_name: Optional[str] = None, data_gb: Optional[int] = None,
+                 voice_minutes: Optional[int] = None, price: Optional[float] = None,
+                 target_user: Optional[str] = None, description: Optional[str] = None,
+                 monthly_usage_gb: Optional[float] = None, monthly_usage_minutes: Optional[int] = None,
+                 balance: Optional[float] = None):
+        super().__init__(
+            phone=phone,
+            package_name=package_name,
+            data_gb=data_gb,
+            voice_minutes=voice_minutes,
+            # DECIMAL → float；用户未办理套餐或尚无用量时为0
+            price=float(price) if price is not None else 0,
+            target_user=target_user,
+            description=description,
+            monthly_usage_gb=float(monthly_usage_gb) if monthly_usage_gb else 0,
+            monthly_usage_minutes=monthly_usage_minutes or 0,
+            balance=float(balance) if balance else 0
+        )
@@ -0,0 +1,32 @@
+"""
+测试公共fixture
+"""
+import pytest
+
+from core.llm import llm_gateway
+from executor.package_catalog import PackageCatalog
+from tests.support.db import FakeDB, PACKAGES
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_gateway():
+    """LLM网关为进程内单例：每个用例前后重置熔断器，避免访问不可达上游的用例影响后续用例"""
+    llm_gateway.breaker.reset()
+    if llm_gateway.hedge_breaker:
+        llm_gateway.hedge_breaker.reset()
+    yield
+    llm_gateway.breaker.reset()
+    if llm_gateway.hedge_breaker:
+        llm_gateway.hedge_breaker.reset()
+
+
+@pytest.fixture
+def fake_db():
+    """执行器的数据库替身（见 tests/support/db.py）"""
+    return FakeDB()
+
+
+@pytest.fixture
+def package_catalog():
+    """由 PACKAGES 构建的套餐目录（不过期）"""
+    return PackageCatalog(lambda: [dict(p) for p in PACKAGES], ttl=0)
@@ -0,0 +1,5 @@
+"""
+测试共用的离线替身与语料
+
+tests/ 与 benchmarks/ 都从这里导入，使测试不依赖基准脚本、也不依赖外部服务
+"""
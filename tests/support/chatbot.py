@@ -0,0 +1,43 @@
+"""
+使用模拟LLM/DB的对话系统
+
+规则未命中的输入走LLM NLU，查询返回4个套餐后NLG也走LLM
+"""
+import time
+
+from core import TelecomChatbotPolicy
+from tests.support.llm import fake_completion, FakeLLMClient, FakeAsyncLLMClient
+from utils import LoopLocal
+
+PACKAGES = [
+    {"id": i, "name": name, "data_gb": data, "voice_minutes": 100,
+     "price": price, "target_user": "无限制", "description": ""}
+    for i, (name, data, price) in enumerate(
+        [("经济套餐", 10, 50.0), ("校园套餐", 200, 150.0),
+         ("畅游套餐", 100, 180.0), ("无限套餐", 1000, 300.0)], 1)
+]
+
+# 规则未命中的输入，NLU走LLM；返回4个套餐，NLG也走LLM
+USER_INPUT = "帮我看看有没有流量多一点的"
+
+
+def build_chatbot(llm_latency: float, db_latency: float) -> TelecomChatbotPolicy:
+    """构建使用模拟LLM/DB的对话系统"""
+    bot = TelecomChatbotPolicy()
+    # 每次请求输入相同，关闭NLU结果缓存以测量完整的LLM往返
+    bot.nlu.result_cache = None
+
+    nlu_response = fake_completion("query_packages", {})
+    nlg_response = fake_completion(content="为您找到4个套餐，推荐畅游套餐。")
+
+    bot.nlu.client = FakeLLMClient(llm_latency, nlu_response)
+    bot.nlu._async_clients = LoopLocal(lambda: FakeAsyncLLMClient(llm_latency, nlu_response))
+    bot.nlg.llm_client = FakeLLMClient(llm_latency, nlg_response)
+    bot.nlg._async_llm_clients = LoopLocal(lambda: FakeAsyncLLMClient(llm_latency, nlg_response))
+
+    def execute_function(function_name, parameters, deadline=None):
+        time.sleep(db_latency)
+        return {"success": True, "data": list(PACKAGES), "count": len(PACKAGES)}
+
+    bot.db_executor.execute_function = execute_function
+    return bot
@@ -0,0 +1,61 @@
+"""
+执行器测试用的数据库替身
+
+套餐目录与用户资料均为固定数据：execute_query 对变更记录表按幂等键查询，对其他查询都返回 PHONE 的用户资料行，
+execute_transaction 按语句更新当前套餐、校验变更记录表的幂等键唯一
+"""
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+PHONE = "13800138000"
+PACKAGES = [
+    {"id": 1, "name": "经济套餐", "data_gb": 10, "voice_minutes": 100, "price": 50.0,
+     "target_user": "无限制", "description": ""},
+    {"id": 2, "name": "畅游套餐", "data_gb": 100, "voice_minutes": 300, "price": 180.0,
+     "target_user": "无限制", "description": ""},
+    {"id": 3, "name": "无限套餐", "data_gb": 1000, "voice_minutes": 1000, "price": 300.0,
+     "target_user": "无限制", "description": ""},
+    {"id": 4, "name": "校园套餐", "data_gb": 200, "voice_minutes": 200, "price": 150.0,
+     "target_user": "在校生", "description": ""},
+]
+
+
+class FakeDB:
+    """记录查询与事务次数的数据库替身"""
+
+    dialect = "mysql"
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: 每个事务的模拟耗时（秒）
+        """
+        self.latency = latency
+        self.queries = 0
+        self.transactions = 0
+        self.package = PACKAGES[0]
+        self.change_keys = set()
+        self._lock = threading.Lock()
+
+    def execute_query(self, query, params=None):
+        self.queries += 1
+        if "t_package_changes" in query:
+            return [(1,)] if params["idempotency_key"] in self.change_keys else []
+        p = self.package
+        return [(PHONE, p["name"], p["data_gb"], p["voice_minutes"], p["price"], p["target_user"],
+                 p["description"], 5.2, 45, 45.5)]
+
+    def execute_transaction(self, statements):
+        time.sleep(self.latency)
+        with self._lock:
+            self.transactions += 1
+            for query, params in statements:
+                if "t_package_changes" in query:
+                    if params["idempotency_key"] in self.change_keys:
+                        raise IntegrityError(query, params, Exception("Duplicate entry"))
+                    self.change_keys.add(params["idempotency_key"])
+                elif "package_id" in params:
+                    self.package = next(p for p in PACKAGES if p["id"] == params["package_id"])
+        return [1] * len(statements)
@@ -0,0 +1,83 @@
+"""
+优化前的规则预处理实现
+
+逐条规则 re.search 原始正则字符串，命中后再分别跑手机号/价格/流量正则；
+用于校验 RulePreprocessor 输出与之完全一致，并作为吞吐基准的对照组
+"""
+import copy
+import re
+from typing import Dict, List, Optional, Any
+
+from core.nlu.rule_definitions import PRE_NLU_RULES, PACKAGE_NAMES
+from core.nlu.rule_preprocessor import RulePreprocessor
+from utils import logger
+
+CONTEXTS = [
+    {},
+    {"current_intent": "query_packages", "slot_values": {"package_name": "畅游套餐"},
+     "user_phone": "13800138000"},
+]
+
+
+class LegacyRulePreprocessor:
+    """优化前的实现（仅用于对比）"""
+
+    def __init__(self):
+        self.package_names = list(PACKAGE_NAMES)
+        self.rules = copy.deepcopy(PRE_NLU_RULES)
+        self.rules.sort(key=lambda x: x.get("priority", 0), reverse=True)
+
+    def preprocess(self, user_input: str, context: Dict) -> Optional[Dict[str, Any]]:
+        logger.info(f"[规则匹配] 开始匹配: {user_input}")
+        for rule in self.rules:
+            if rule.get("context_required") and not context.get("current_intent"):
+                continue
+            match = re.search(rule["pattern"], user_input, re.IGNORECASE)
+            if match:
+                parameters = self._extract_parameters(user_input, rule["extract"], context)
+                if rule.get("context_required"):
+                    parameters = RulePreprocessor._inherit_from_context(self, parameters, context)
+                logger.info(f"[规则命中] 规则='{rule['name']}', 意图={rule['intent']}, 参数={parameters}")
+                return {"intent": rule["intent"], "parameters": parameters, "source": "rule",
+                        "confidence": 0.95, "rule_name": rule["name"]}
+        logger.info("[规则匹配] 未命中，交给LLM")
+        return None
+
+    def _extract_parameters(self, text: str, extract_list: List[str], context: Dict) -> Dict:
+        params = {}
+        if "new_package_name" in extract_list or "package_name" in extract_list:
+            for pkg in self.package_names:
+                if pkg in text:
+                    key = "new_package_name" if "new_package_name" in extract_list else "package_name"
+                    params[key] = pkg
+                    break
+        if "phone" in extract_list:
+            phone_match = re.search(r'1[3-9]\d{9}', text)
+            if phone_match:
+                params["phone"] = phone_match.group()
+            elif context.get("user_phone"):
+                params["phone"] = context["user_phone"]
+        if "price_max" in extract_list:
+            price_match = re.search(r'(\d+)\s*[元块]', text)
+            if price_match:
+                params["price_max"] = int(price_match.group(1))
+        if "data_min" in extract_list:
+            data_match = re.search(r'(\d+)\s*[G|GB]', text, re.IGNORECASE)
+            if data_match:
+                params["data_min"] = int(data_match.group(1))
+        if "question" in extract_list:
+            params["question"] = text
+            params["business_type"] = "办理流程"
+        return params
+
+
+def check_equivalent(old, new, corpus: List[str]) -> int:
+    """校验输出一致，返回命中条数"""
+    hits = 0
+    for context in CONTEXTS:
+        for text in corpus:
+            expected = old.preprocess(text, context)
+            actual = new.preprocess(text, context)
+            assert expected == actual, f"输出不一致: {text!r} {expected} != {actual}"
+            hits += expected is not None
+    return hits
@@ -0,0 +1,98 @@
+"""
+模拟LLM客户端
+
+构造与 OpenAI SDK 结构一致的响应，用固定延迟模拟网络往返
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+
+def fake_completion(function_name: Optional[str] = None,
+                    arguments: Optional[dict] = None,
+                    content: Optional[str] = None):
+    """构造与 OpenAI ChatCompletion 结构一致的响应对象"""
+    tool_calls = None
+    if function_name:
+        tool_calls = [SimpleNamespace(
+            id="call_0",
+            type="function",
+            function=SimpleNamespace(
+                name=function_name,
+                arguments=json.dumps(arguments or {}, ensure_ascii=False)
+            )
+        )]
+
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+    )
+
+
+class FakeLLMClient:
+    """同步LLM客户端：time.sleep 模拟网络延迟"""
+
+    def __init__(self, latency: float, response):
+        self.latency = latency
+        self.response = response
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.response
+
+
+class FakeAsyncLLMClient:
+    """异步LLM客户端：asyncio.sleep 模拟网络延迟"""
+
+    def __init__(self, latency: float, response):
+        self.latency = latency
+        self.response = response
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.response
+
+
+def fake_chunk(content: str):
+    """构造与 OpenAI ChatCompletionChunk 结构一致的流式片段"""
+    delta = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+
+class FakeStreamingLLMClient:
+    """
+    支持 stream=True 的异步LLM客户端
+
+    模拟逐token生成：首token延迟 first_token_latency，之后每段间隔 chunk_interval；
+    非流式调用等待全部生成完再返回
+    """
+
+    def __init__(self, first_token_latency: float, chunk_interval: float, chunks):
+        self.first_token_latency = first_token_latency
+        self.chunk_interval = chunk_interval
+        self.chunks = list(chunks)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, stream: bool = False, **kwargs):
+        self.calls += 1
+        if stream:
+            return self._stream()
+        await asyncio.sleep(self.first_token_latency + self.chunk_interval * (len(self.chunks) - 1))
+        return fake_completion(content="".join(self.chunks))
+
+    async def _stream(self):
+        await asyncio.sleep(self.first_token_latency)
+        for i, content in enumerate(self.chunks):
+            if i:
+                await asyncio.sleep(self.chunk_interval)
+            yield fake_chunk(content)
@@ -0,0 +1,71 @@
+"""
+记录执行器直接查库时发出的SQL
+
+执行器不使用套餐目录和用户缓存，逐个调用 CALLS 中的函数，
+供查询计划测试与基准检查每条SQL是否走索引
+"""
+from typing import List, Tuple
+
+from database.db_manager import DatabaseManager
+from executor.db_executor import DatabaseExecutor
+from executor.package_catalog import PackageCatalog
+
+PHONE = "13800138000"
+
+# 覆盖 query_packages 各个过滤条件与排序方式
+CALLS = [
+    ("query_packages", {}),
+    ("query_packages", {"price_max": 100}),
+    ("query_packages", {"price_min": 100, "price_max": 200, "sort_by": "price_desc"}),
+    ("query_packages", {"data_min": 100, "sort_by": "data_desc"}),
+    ("query_packages", {"data_min": 50, "data_max": 200}),
+    ("query_packages", {"price_max": 200, "data_min": 50}),
+    ("query_packages", {"target_user": "在校生", "price_max": 150}),
+    ("query_current_package", {"phone": PHONE}),
+    ("query_usage", {"phone": PHONE}),
+    ("query_package_detail", {"package_name": "畅游套餐"}),
+]
+
+
+class RecordingDB:
+    """记录执行器发出的查询，其余调用转发给真实数据库"""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.queries: List[Tuple[str, dict]] = []
+
+    def execute_query(self, query: str, params: dict = None) -> list:
+        self.queries.append((query, dict(params or {})))
+        return self.db.execute_query(query, params)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def record_queries(db: DatabaseManager) -> List[Tuple[str, str, dict]]:
+    """
+    执行器（不使用目录和用户缓存）各函数发出的SQL
+
+    Returns:
+        list: [(标签, SQL, 参数), ...]
+    """
+    recorder = RecordingDB(db)
+    executor = DatabaseExecutor()
+    executor.db = recorder
+    executor.catalog = None
+    executor.user_cache = None
+
+    recorded = []
+    for name, params in CALLS:
+        start = len(recorder.queries)
+        result = executor.execute_function(name, dict(params))
+        assert result.get("success"), (name, result)
+        for sql, sql_params in recorder.queries[start:]:
+            recorded.append((f"{name}{params or ''}", sql, sql_params))
+
+    # 套餐目录加载（启动与重新加载时）
+    start = len(recorder.queries)
+    PackageCatalog.from_db(recorder, ttl=0).reload()
+    for sql, sql_params in recorder.queries[start:]:
+        recorded.append(("package_catalog.reload", sql, sql_params))
+    return recorded
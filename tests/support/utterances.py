@@ -0,0 +1,137 @@
+"""
+测试与基准测试共用语料
+
+SEED_UTTERANCES 取自线上日志（logs/app_*.log 中的 "开始NLU理解"）与测试用例，
+build_corpus() 在此基础上按常见句式替换套餐名/价格/流量/手机号扩充到指定规模。
+"""
+import random
+from typing import List, Tuple
+
+SEED_UTTERANCES = [
+    # 日志
+    "查下我的套餐", "100元以内的套餐", "流量要50G以上", "查询我的流量使用情况",
+    "有100元以内的套餐吗", "有便宜的套餐吗", "我要办理畅游套餐", "13800138000",
+    "我用了多少流量", "有什么套餐", "有100块以内的套餐吗", "查我的套餐",
+    "我要办理套餐", "我的手机号是13800138000",
+    # 测试用例
+    "办理经济套餐，13800138000", "经济套餐有什么内容？", "确认办理", "确认",
+    "查一下我的余额", "我现在用的什么套餐", "查询下校园套餐详情", "算了不办了",
+    "帮我看看有没有流量多一点的", "怎么办理套餐", "畅游套餐",
+    "我要办理无限套餐，手机号13900139000",
+]
+
+_PACKAGES = ["经济套餐", "畅游套餐", "无限套餐", "校园套餐"]
+
+_TEMPLATES = [
+    "我要办理{package}", "帮我办理{package}，手机号{phone}", "换成{package}",
+    "查询{package}", "介绍一下{package}", "{package}有什么优惠",
+    "有{price}元以内的套餐吗", "{price}块左右的套餐", "推荐几个套餐，{price}元以下",
+    "流量要{data}G以上", "有没有{data}GB的套餐", "我还剩多少流量",
+    "话费还有多少", "余额多少", "我的手机号是{phone}", "{phone}",
+    "我现在是什么套餐", "当前套餐是什么", "怎么变更套餐", "办理套餐需要什么资料",
+    "你好", "谢谢", "人工客服", "好的", "不用了",
+]
+
+
+def build_corpus(size: int = 5000, seed: int = 42) -> List[str]:
+    """
+    构造基准语料
+
+    Args:
+        size: 语料条数
+        seed: 随机种子（保证可复现）
+
+    Returns:
+        List[str]: 种子语料 + 模板扩充
+    """
+    rng = random.Random(seed)
+    corpus = list(SEED_UTTERANCES)
+    while len(corpus) < size:
+        template = rng.choice(_TEMPLATES)
+        corpus.append(template.format(
+            package=rng.choice(_PACKAGES),
+            price=rng.choice([30, 50, 80, 100, 150, 200]),
+            data=rng.choice([10, 20, 50, 100]),
+            phone=f"1{rng.choice('3456789')}{rng.randrange(10 ** 9):09d}"
+        ))
+    rng.shuffle(corpus)
+    return corpus[:size]
+
+
+# 带意图标注的句式（意图分类器基准/测试用），每个意图的句式按下标奇偶划分训练/评估，
+# 评估句式在训练中从未出现，衡量的是对新说法的泛化能力
+LABELED_TEMPLATES = {
+    "query_packages": [
+        "有{price}元以内的套餐吗", "推荐几个套餐，{price}元以下", "流量要{data}G以上",
+        "有没有{data}GB的套餐", "帮我看看有没有流量多一点的", "有什么便宜点的套餐",
+        "想找个月租{price}左右的", "给我列一下所有套餐", "学生用哪个套餐合适",
+        "有没有不限流量的", "预算{price}块，推荐一下", "你们都有哪些套餐可以选",
+        "流量至少{data}个G", "最便宜的套餐多少钱", "适合老年人的套餐有吗",
+        "套餐价格从低到高排一下",
+    ],
+    "query_current_package": [
+        "我现在是什么套餐", "当前套餐是什么", "查下我的套餐", "看看我办的是哪个",
+        "我用的哪个套餐", "我的套餐叫什么名字", "帮我查一下现在的套餐，{phone}",
+        "{phone}这个号是什么套餐", "我目前的资费是多少", "看下我开通的套餐",
+        "我每个月套餐多少钱", "我这个号码办的啥套餐",
+    ],
+    "query_package_detail": [
+        "{package}有什么内容", "介绍一下{package}", "{package}包含多少流量",
+        "{package}每个月多少钱", "说说{package}的详情", "{package}通话时长有多少",
+        "{package}适合什么人", "讲讲{package}", "{package}的资费明细",
+        "{package}有什么优惠", "{package}具体是怎样的", "{package}流量和通话各多少",
+    ],
+    "change_package": [
+        "我要办理{package}", "帮我办理{package}，手机号{phone}", "换成{package}",
+        "给我改成{package}", "我想换{package}", "帮我把套餐变更为{package}",
+        "{phone}改{package}", "开通{package}", "我要换个套餐", "转到{package}",
+        "我想升级到{package}", "把我的套餐换掉",
+    ],
+    "query_usage": [
+        "我还剩多少流量", "话费还有多少", "余额多少", "我用了多少流量",
+        "查一下我这个月的用量", "本月通话用了多少分钟", "{phone}剩余流量",
+        "流量快用完了吗", "看看我的流量使用情况", "这个月花了多少钱",
+        "帮我查查余额，{phone}", "剩下多少分钟通话",
+    ],
+    "business_consultation": [
+        "怎么变更套餐", "办理套餐需要什么资料", "怎么办理套餐", "套餐变更什么时候生效",
+        "可以在网上办理吗", "换套餐要手续费吗", "办理流程是什么", "需要带身份证吗",
+        "合约期内能换套餐吗", "套餐可以退订吗", "变更后当月怎么计费", "异地可以办理吗",
+    ],
+    "other": [
+        "你好", "谢谢", "人工客服", "好的", "不用了", "在吗", "你是机器人吗",
+        "今天天气怎么样", "再见", "哈哈", "嗯嗯", "你叫什么名字",
+    ],
+}
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        package=rng.choice(_PACKAGES),
+        price=rng.choice([30, 50, 80, 100, 150, 200]),
+        data=rng.choice([10, 20, 50, 100]),
+        phone=f"1{rng.choice('3456789')}{rng.randrange(10 ** 9):09d}"
+    )
+
+
+def build_labeled_corpus(size: int = 2000, seed: int = 42, split: str = "all") -> List[Tuple[str, str]]:
+    """
+    构造带意图标注的语料
+
+    Args:
+        size: 语料条数
+        seed: 随机种子
+        split: all / train（偶数下标句式）/ test（奇数下标句式）
+
+    Returns:
+        List[Tuple[str, str]]: (文本, 意图)
+    """
+    offset = {"all": None, "train": 0, "test": 1}[split]
+    pool = [
+        (template, intent)
+        for intent, templates in LABELED_TEMPLATES.items()
+        for i, template in enumerate(templates)
+        if offset is None or i % 2 == offset
+    ]
+    rng = random.Random(seed)
+    return [(_fill(template, rng), intent) for template, intent in (rng.choice(pool) for _ in range(size))]
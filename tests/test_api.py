@@ -2,6 +2,8 @@
 import pytest
 from fastapi.testclient import TestClient
 from api.main import app
+from api.routers import chat, websocket
+from config import settings
 
 client = TestClient(app)
 
@@ -33,4 +35,25 @@ def test_session_api():
 
     # 重置会话
     reset_response = client.delete(f"/api/session/{session_id}")
-    assert reset_response.status_code == 200
\ No newline at end of file
+    assert reset_response.status_code == 200
+
+
+def test_routers_share_chatbot():
+    """测试HTTP与WebSocket路由共用同一个对话引擎（目录重新加载对两者都生效）"""
+    assert chat.chatbot is websocket.chatbot
+
+
+def test_catalog_reload_requires_admin_token(monkeypatch):
+    """测试重新加载套餐目录需要管理令牌"""
+    monkeypatch.setattr(chat.chatbot, "reload_catalog", lambda: {"enabled": True, "packages": 4})
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert client.post("/api/catalog/reload").status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/catalog/reload").status_code == 401
+    assert client.post("/api/catalog/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    response = client.post("/api/catalog/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json() == {"enabled": True, "packages": 4}
@@ -0,0 +1,54 @@
+"""
+异步对话管道测试
+"""
+import asyncio
+import time
+
+import pytest
+
+from tests.support.chatbot import build_chatbot, USER_INPUT
+
+
+class TestAsyncChat:
+    """achat 测试（LLM/DB为离线模拟）"""
+
+    LLM_LATENCY = 0.2
+
+    @pytest.fixture
+    def chatbot(self):
+        """创建使用模拟LLM/DB的聊天机器人实例"""
+        return build_chatbot(self.LLM_LATENCY, 0.0)
+
+    def test_achat_response(self, chatbot):
+        """测试异步接口返回完整响应"""
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="async_test_001"))
+
+        assert response["intent"] == "query_packages"
+        assert response["action"] == "INFORM"
+        assert response["data"]["count"] == 4
+
+    def test_achat_does_not_block_event_loop(self, chatbot):
+        """测试并发请求在LLM等待期间交错执行"""
+        concurrency = 5
+
+        async def run():
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                chatbot.achat(USER_INPUT, session_id=f"async_test_{i}")
+                for i in range(concurrency)
+            ))
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(run())
+
+        # 每轮两次LLM调用，串行执行至少需要 concurrency * 2 * latency
+        assert elapsed < concurrency * 2 * self.LLM_LATENCY / 2
+
+    def test_sync_chat_wrapper(self, chatbot):
+        """测试同步接口复用异步管道"""
+        session_id = "async_test_sync"
+
+        response = chatbot.chat(USER_INPUT, session_id=session_id)
+
+        assert response["intent"] == "query_packages"
+        assert chatbot.get_session_state(session_id)["turn_count"] == 2
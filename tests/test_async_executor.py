@@ -0,0 +1,102 @@
+"""
+异步执行路径测试（SQLite文件库，aiosqlite）
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from database.async_db_manager import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+from database.seed import seed_database, sqlite_url
+from executor.db_executor import DatabaseExecutor
+from executor.package_catalog import PackageCatalog
+from utils import metrics
+from tests.support.db import PHONE
+
+CALLS = [
+    ("query_packages", {"price_max": 200, "data_min": 50, "sort_by": "data_desc"}),
+    ("query_current_package", {"phone": PHONE}),
+    ("query_usage", {"phone": PHONE, "query_type": "balance"}),
+    ("query_package_detail", {"package_name": "畅游套餐"}),
+    ("query_usage", {"phone": "12345"}),
+    ("business_consultation", {"question": "怎么开发票"}),
+]
+
+
+@pytest.fixture
+def url(tmp_path):
+    url = sqlite_url(str(tmp_path / "telecom.db"))
+    seed_database(DatabaseManager.create(url), users=300, packages=40)
+    return url
+
+
+def make_executor(url: str, catalog: bool = False) -> DatabaseExecutor:
+    executor = DatabaseExecutor()
+    executor.db = DatabaseManager.create(url)
+    executor.adb = AsyncDatabaseManager(url)
+    executor.catalog = PackageCatalog.from_db(executor.db, ttl=0) if catalog else None
+    executor.user_cache = None
+    return executor
+
+
+def run(executor: DatabaseExecutor, make_coro):
+    """在同一个事件循环中执行并关闭异步连接池"""
+
+    async def main():
+        try:
+            return await make_coro()
+        finally:
+            await executor.adb.dispose()
+
+    return asyncio.run(main())
+
+
+class TestAsyncExecutor:
+    """DatabaseExecutor.aexecute_function 测试"""
+
+    @pytest.mark.parametrize("catalog", [False, True])
+    def test_matches_sync(self, url, catalog):
+        """测试异步版本与同步版本结果一致"""
+        executor = make_executor(url, catalog)
+
+        expected = [executor.execute_function(name, dict(params)) for name, params in CALLS]
+        actual = run(executor, lambda: asyncio.gather(
+            *(executor.aexecute_function(name, dict(params)) for name, params in CALLS)))
+
+        assert actual == expected
+
+    def test_concurrent_confirmations_apply_once(self, url):
+        """测试并发提交同一次确认只写一条变更记录"""
+        executor = make_executor(url)
+        params = {"phone": PHONE, "new_package_name": "无限套餐", "idempotency_key": "b" * 40}
+
+        results = run(executor, lambda: asyncio.gather(
+            *(executor.aexecute_function("change_package", dict(params)) for _ in range(10))))
+
+        assert all(r == results[0] for r in results)
+        assert results[0]["success"]
+        assert executor.db.execute_query("SELECT COUNT(*) FROM t_package_changes")[0][0] == 1
+        assert executor.execute_function("query_current_package", {"phone": PHONE})["data"]["package_name"] == "无限套餐"
+
+    def test_pool_wait_recorded(self, url):
+        """测试记录异步连接池等待时间"""
+        executor = make_executor(url)
+        wait = metrics.histogram("db_pool_wait_seconds", engine="async")
+        before = wait.count
+
+        run(executor, lambda: executor.aexecute_function("query_current_package", {"phone": PHONE}))
+
+        assert wait.count == before + 1
+
+    def test_falls_back_to_thread(self, url):
+        """测试未启用异步数据库时在线程池中执行同步版本"""
+        executor = make_executor(url)
+        asyncio.run(executor.adb.dispose())
+        executor.adb = None
+
+        result = asyncio.run(executor.aexecute_function("query_current_package", {"phone": PHONE}))
+
+        assert result["data"]["package_name"] == "经济套餐"
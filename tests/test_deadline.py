@@ -0,0 +1,94 @@
+"""
+请求时间预算（deadline）测试
+"""
+import asyncio
+
+import pytest
+
+from executor.db_executor import DatabaseExecutor
+from utils import Deadline, LoopLocal, metrics
+from tests.support.chatbot import build_chatbot, USER_INPUT
+from tests.support.llm import fake_completion, FakeAsyncLLMClient
+
+
+class TestDeadline:
+    """Deadline 基本行为"""
+
+    def test_remaining_and_expired(self):
+        """测试剩余预算与过期判断"""
+        deadline = Deadline(10)
+        assert not deadline.expired
+        assert deadline.allows(5)
+        assert not deadline.allows(20)
+
+        expired = Deadline(0)
+        assert expired.expired
+        assert expired.remaining() == 0.0
+
+    def test_degrade_recorded_once(self):
+        """测试同名降级只记录一次"""
+        counter = metrics.counter("deadline_degradations_total", stage="deadline_test")
+        before = counter.value
+
+        deadline = Deadline(1)
+        deadline.degrade("deadline_test")
+        deadline.degrade("deadline_test")
+
+        assert deadline.degradations == ["deadline_test"]
+        assert counter.value == before + 1
+
+
+class TestDeadlinePropagation:
+    """NLU → DB → NLG 按剩余预算降级（LLM/DB为离线模拟）"""
+
+    @pytest.fixture
+    def chatbot(self):
+        return build_chatbot(0.01, 0.0)
+
+    def test_no_degradation_within_budget(self, chatbot):
+        """测试预算充足时不降级"""
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="deadline_ok"))
+
+        assert response["intent"] == "query_packages"
+        assert response["metadata"]["degradations"] == []
+
+    def test_nlu_falls_back_to_rules(self, chatbot):
+        """测试剩余预算不足以调用LLM时NLU降级为纯规则"""
+        chatbot.nlu.llm_min_budget = 3600
+        client = FakeAsyncLLMClient(0.0, fake_completion("query_packages", {}))
+        chatbot.nlu._async_clients = LoopLocal(lambda: client)
+        results = []
+        aunderstand = chatbot.nlu.aunderstand
+
+        async def spy(*args, **kwargs):
+            results.append(await aunderstand(*args, **kwargs))
+            return results[-1]
+
+        chatbot.nlu.aunderstand = spy
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="deadline_nlu"))
+
+        assert "nlu_rule_only" in response["metadata"]["degradations"]
+        assert client.calls == 0
+        # 输入不命中规则，纯规则模式只能返回闲聊意图（而不是LLM识别的 query_packages）
+        assert results[0].source == "rule_only"
+        assert results[0].intent == "chat"
+        assert response["intent"] == "chat"
+
+    def test_nlg_falls_back_to_template(self, chatbot):
+        """测试剩余预算不足以调用LLM时NLG改用模板"""
+        chatbot.nlg.llm_min_budget = 3600
+
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="deadline_nlg"))
+
+        assert response["intent"] == "query_packages"
+        assert response["metadata"]["degradations"] == ["nlg_template"]
+        assert response["response"] != "为您找到4个套餐，推荐畅游套餐。"
+
+    def test_executor_skips_reads_when_expired(self):
+        """测试预算耗尽时跳过只读查询"""
+        deadline = Deadline(0)
+
+        result = DatabaseExecutor().execute_function("query_packages", {"price_max": 100}, deadline=deadline)
+
+        assert not result["success"]
+        assert deadline.degradations == ["db_skipped"]
@@ -0,0 +1,88 @@
+"""
+执行器函数注册表测试
+"""
+import pytest
+
+from executor.db_executor import DatabaseExecutor, FUNCTIONS
+from executor.function_registry import ParameterError
+from utils import metrics
+
+@pytest.fixture
+def executor(package_catalog):
+    executor = DatabaseExecutor()
+    executor.catalog = package_catalog
+    executor.user_cache = None
+    return executor
+
+
+class TestFunctionSpec:
+    """FunctionSpec.bind 测试"""
+
+    def test_coerces_declared_types(self):
+        """测试LLM给出的字符串数字、数字手机号转换为声明的类型"""
+        params, dropped = FUNCTIONS["query_packages"].bind(
+            {"price_max": "100", "data_min": "50.0", "sort_by": "price_asc", "intent": "query_packages"})
+
+        assert params == {"price_max": 100.0, "data_min": 50.0, "sort_by": "price_asc"}
+        assert dropped == ("intent",)
+        assert FUNCTIONS["query_usage"].bind({"phone": 13800138000})[0] == {"phone": "13800138000"}
+
+    def test_rejects_unconvertible(self):
+        """测试无法转换的参数报错"""
+        with pytest.raises(ParameterError):
+            FUNCTIONS["query_packages"].bind({"price_max": "一百"})
+        with pytest.raises(ParameterError):
+            FUNCTIONS["query_packages"].bind({"data_min": "十个G"})
+
+    def test_fractional_data_min(self):
+        """测试流量下限可以带小数（工具定义中为 number）"""
+        assert FUNCTIONS["query_packages"].bind({"data_min": "10.5"})[0] == {"data_min": 10.5}
+
+    def test_write_functions(self):
+        """测试写操作标记"""
+        assert {name for name, spec in FUNCTIONS.items() if spec.write} == DatabaseExecutor.WRITE_FUNCTIONS
+
+
+class TestDispatch:
+    """DatabaseExecutor.execute_function 分发测试"""
+
+    def test_string_price_filters(self, executor):
+        """测试字符串价格条件按数值过滤"""
+        result = executor.execute_function("query_packages", {"price_max": "100"})
+
+        assert [p["name"] for p in result["data"]] == ["经济套餐"]
+
+    def test_fractional_data_min_filters(self, executor):
+        """测试小数流量下限按数值过滤（不截断为整数）"""
+        result = executor.execute_function("query_packages", {"data_min": "10.5"})
+
+        assert result["success"]
+        assert "经济套餐" not in [p["name"] for p in result["data"]]
+        assert "畅游套餐" in [p["name"] for p in result["data"]]
+
+    def test_bad_params_not_executed(self, executor):
+        """测试参数错误时返回错误且不执行"""
+        bad = metrics.counter("executor_calls_total", function="query_packages", result="bad_params")
+        before = bad.value
+
+        result = executor.execute_function("query_packages", {"price_max": "便宜点"})
+
+        assert not result["success"]
+        assert "price_max" in result["error"]
+        assert bad.value == before + 1
+
+    def test_call_metrics(self, executor):
+        """测试按函数记录调用次数与耗时"""
+        calls = metrics.counter("executor_calls_total", function="query_package_detail", result="success")
+        failures = metrics.counter("executor_calls_total", function="query_package_detail", result="failure")
+        latency = metrics.histogram("executor_latency_seconds", function="query_package_detail")
+        before = (calls.value, failures.value, latency.count)
+
+        executor.execute_function("query_package_detail", {"package_name": "畅游套餐"})
+        executor.execute_function("query_package_detail", {"package_name": "不存在"})
+
+        assert (calls.value, failures.value, latency.count) == (before[0] + 1, before[1] + 1, before[2] + 2)
+
+    def test_unknown_function(self, executor):
+        """测试未知函数"""
+        assert executor.execute_function("drop_tables", {}) == {"success": False, "error": "未知的函数: drop_tables"}
@@ -0,0 +1,98 @@
+"""
+套餐变更幂等测试
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from core.dst.dialog_state import DialogState
+from executor.db_executor import DatabaseExecutor
+from tests.support.db import PHONE
+
+
+@pytest.fixture
+def executor(fake_db, package_catalog):
+    executor = DatabaseExecutor()
+    fake_db.latency = 0.05
+    executor.db = fake_db
+    executor.catalog = package_catalog
+    executor.user_cache = None
+    return executor
+
+
+class TestChangePackageIdempotency:
+    """DatabaseExecutor.change_package 幂等测试（数据库为替身）"""
+
+    def test_concurrent_confirmations_apply_once(self, executor):
+        """测试同一次确认并发提交多次，只写库一次且结果一致"""
+        params = {"phone": PHONE, "new_package_name": "畅游套餐", "idempotency_key": "confirm-001"}
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(lambda _: executor.execute_function("change_package", dict(params)),
+                                    range(50)))
+
+        assert executor.db.transactions == 1
+        assert all(r == results[0] for r in results)
+        assert results[0]["success"]
+
+    def test_duplicate_returns_prior_result_without_db(self, executor):
+        """测试重复确认直接返回之前的结果"""
+        params = {"phone": PHONE, "new_package_name": "畅游套餐", "idempotency_key": "confirm-002"}
+
+        first = executor.execute_function("change_package", params)
+        second = executor.execute_function("change_package", params)
+
+        assert first == second
+        assert executor.db.transactions == 1
+
+    def test_duplicate_from_other_process(self, executor):
+        """测试其他进程已办理过（数据库幂等键冲突）时按成功返回"""
+        executor.db.change_keys.add("confirm-003")
+
+        result = executor.execute_function(
+            "change_package", {"phone": PHONE, "new_package_name": "畅游套餐", "idempotency_key": "confirm-003"})
+
+        assert result["success"]
+        assert result["new_package_name"] == "畅游套餐"
+
+    def test_other_integrity_errors_fail(self, executor):
+        """测试幂等键之外的约束冲突不被当作重复确认"""
+
+        def violate(statements):
+            raise IntegrityError("INSERT INTO t_user", {}, Exception("foreign key constraint fails"))
+
+        executor.db.execute_transaction = violate
+
+        result = executor.execute_function(
+            "change_package", {"phone": PHONE, "new_package_name": "畅游套餐", "idempotency_key": "confirm-005"})
+
+        assert not result["success"]
+        assert "confirm-005" not in executor.db.change_keys
+
+    def test_failures_are_not_remembered(self, executor):
+        """测试失败结果不保存，修正后可以重新办理"""
+        params = {"phone": PHONE, "new_package_name": "不存在的套餐", "idempotency_key": "confirm-004"}
+
+        assert not executor.execute_function("change_package", params)["success"]
+        assert executor.db.transactions == 0
+
+
+class TestConfirmationKey:
+    """DialogState.confirmation_key 测试"""
+
+    def test_same_confirmation_same_key(self):
+        """测试同一次确认的键相同，重新发起后键不同"""
+        state = DialogState(session_id="idem_001")
+        assert state.confirmation_key() is None
+
+        state.set_pending_confirmation("change_package", {"phone": PHONE, "new_package_name": "畅游套餐"})
+        key = state.confirmation_key()
+        restored = DialogState.from_dict(state.to_dict())
+
+        assert restored.confirmation_key() == key
+
+        time.sleep(0.001)
+        state.set_pending_confirmation("change_package", {"phone": PHONE, "new_package_name": "畅游套餐"})
+        assert state.confirmation_key() != key
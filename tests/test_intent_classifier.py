@@ -0,0 +1,87 @@
+"""
+本地意图分类器测试
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.nlu.intent_classifier import IntentClassifier, load_log_pairs, resolve_conflicts
+from core.nlu.nlu_engine import NLUEngine
+from tests.support.llm import FakeLLMClient, fake_completion
+from tests.support.utterances import build_labeled_corpus
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    corpus = build_labeled_corpus(1500, seed=1)
+    return IntentClassifier(n_features=2 ** 12).fit([t for t, _ in corpus], [label for _, label in corpus])
+
+
+class TestIntentClassifier:
+    """分类器训练、预测与持久化测试"""
+
+    def test_accuracy(self, classifier):
+        """测试同句式新参数的预测准确率"""
+        test = build_labeled_corpus(300, seed=2)
+        correct = sum(classifier.predict(text)[0] == label for text, label in test)
+
+        assert correct / len(test) > 0.95
+
+    def test_save_load(self, classifier, tmp_path):
+        """测试保存后加载的预测结果一致"""
+        path = tmp_path / "model.npz"
+        classifier.save(path)
+        loaded = IntentClassifier.load(path)
+
+        assert loaded.labels == classifier.labels
+        assert loaded.predict("我还剩多少流量") == classifier.predict("我还剩多少流量")
+
+    def test_load_log_pairs(self, tmp_path):
+        """测试按会话配对日志中的输入与最终意图，并丢弃冲突标注"""
+        log = tmp_path / "app.log"
+        log.write_text(
+            "| [s1] 开始NLU理解: 我还剩多少流量\n"
+            "| [s2] 开始NLU理解(async): 13800138000\n"
+            "| [s1] NLU完成: intent=query_usage\n"
+            "| [s2] NLU完成: intent=change_package\n"
+            "| [s3] 开始NLU理解: 13800138000\n"
+            "| [s3] NLU完成: intent=query_usage\n"
+            "| [s4] 开始NLU理解: 你好\n"
+            "| [s4] NLU完成: intent=chat\n"
+            "| [s5] 开始NLU理解: 出错了\n"
+            "| [s5] NLU完成: intent=error\n",
+            encoding="utf-8"
+        )
+        pairs = load_log_pairs([str(log)])
+
+        assert len(pairs) == 4
+        assert resolve_conflicts(pairs) == [("我还剩多少流量", "query_usage"), ("你好", "other")]
+
+
+class TestClassifierTier:
+    """NLU引擎中的分类器层测试"""
+
+    @pytest.fixture
+    def nlu_engine(self, classifier):
+        engine = NLUEngine()
+        engine.intent_classifier = classifier
+        engine.result_cache = None
+        engine.client = FakeLLMClient(0, fake_completion("business_consultation", {"question": "?"}))
+        return engine
+
+    def test_confident_prediction_skips_llm(self, nlu_engine):
+        """测试置信的分类结果直接返回，参数由规则层实体提取补全"""
+        result = nlu_engine.understand("查一下我这个月的用量，13900139000", "classifier_hit")
+
+        assert result.source == "classifier"
+        assert result.intent == "query_usage"
+        assert result.parameters["phone"] == "13900139000"
+        assert nlu_engine.client.calls == 0
+
+    def test_low_confidence_goes_to_llm(self, nlu_engine):
+        """测试低于阈值时交给LLM"""
+        nlu_engine.classifier_threshold = 1.01
+        result = nlu_engine.understand("查一下我这个月的用量", "classifier_miss")
+
+        assert result.source == "llm"
+        assert nlu_engine.client.calls == 1
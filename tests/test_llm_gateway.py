@@ -0,0 +1,329 @@
+"""
+LLM网关与熔断器测试
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from core.dst.dialog_state import DialogState
+from core.llm import circuit_breaker, llm_gateway, CircuitBreaker, CircuitOpenError, HedgeBudget
+from core.nlg.nlg_generator import NLGGenerator
+from core.nlu.nlu_engine import NLUEngine
+from core.policy.action import Action, ActionType
+from utils import metrics
+from tests.support.llm import FakeAsyncLLMClient, FakeLLMClient, fake_chunk, fake_completion
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "网关测试"}]}
+
+
+def timeout_error():
+    return openai.APITimeoutError(request=httpx.Request("POST", "http://llm.test"))
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker():
+    for _ in range(llm_gateway.breaker.failure_threshold):
+        llm_gateway.breaker.record_failure()
+    assert not llm_gateway.available
+
+
+def half_open_breaker():
+    open_breaker()
+    llm_gateway.breaker._opened_at -= llm_gateway.breaker.recovery_timeout
+    assert llm_gateway.breaker.state == CircuitBreaker.HALF_OPEN
+
+
+class TestCircuitBreaker:
+    """熔断器状态转换测试"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+        return clock
+
+    def test_transitions(self, clock):
+        """测试 closed → open → half_open → closed"""
+        breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+        gauge = metrics.gauge("llm_circuit_state", breaker="test")
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert gauge.value == 2
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        clock.now += 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        # 半开状态只放行一个探测请求
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert gauge.value == 0
+
+    def test_failed_probe_reopens(self, clock):
+        """测试探测失败重新打开"""
+        breaker = CircuitBreaker("test_probe", failure_threshold=1, recovery_timeout=5)
+        breaker.record_failure()
+        clock.now += 5
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestLLMGateway:
+    """网关重试与降级测试"""
+
+    @pytest.fixture
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(llm_gateway, "retry_base_delay", 0.001)
+
+    def test_retry_then_success(self, no_backoff):
+        """测试可重试错误后重试成功，并收到剩余时限"""
+        attempts = []
+
+        def flaky(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                raise timeout_error()
+            return "ok"
+
+        retries = metrics.counter("llm_retries_total", caller="test").value
+        assert llm_gateway.call(REQUEST, flaky, caller="test") == "ok"
+        assert len(attempts) == 2
+        assert 0 < attempts[1] <= llm_gateway.timeout
+        assert metrics.counter("llm_retries_total", caller="test").value == retries + 1
+        assert llm_gateway.breaker.state == CircuitBreaker.CLOSED
+
+    def test_retries_exhausted(self, no_backoff):
+        """测试重试次数用尽后抛出原错误"""
+        attempts = []
+
+        def down(timeout):
+            attempts.append(timeout)
+            raise timeout_error()
+
+        with pytest.raises(openai.APITimeoutError):
+            llm_gateway.call(REQUEST, down, caller="test")
+        assert len(attempts) == llm_gateway.max_retries + 1
+
+    def test_open_breaker_rejects(self):
+        """测试熔断时不调用上游"""
+        open_breaker()
+        with pytest.raises(CircuitOpenError):
+            llm_gateway.call(REQUEST, lambda timeout: pytest.fail("不应调用LLM"), caller="test")
+
+    def test_nlu_rule_only_when_open(self):
+        """测试熔断时NLU降级为纯规则：规则命中照常，未命中给出引导且不调用LLM"""
+        engine = NLUEngine()
+        engine.client = FakeLLMClient(0, fake_completion("query_packages", {}))
+        engine.result_cache = None
+        open_breaker()
+
+        ruled = engine.understand("查下我的套餐", "gateway_rule")
+        assert ruled.source == "rule"
+
+        degraded = engine.understand("有便宜的套餐吗", "gateway_llm")
+        assert degraded.source == "rule_only"
+        assert degraded.requires_clarification
+        assert engine.client.calls == 0
+
+    def test_nlg_template_only_when_open(self):
+        """测试熔断时NLG只使用模板"""
+        nlg = NLGGenerator()
+        action = Action(action_type=ActionType.INFORM, intent="query_packages", use_llm=True)
+
+        assert nlg._choose_strategy(action, DialogState(session_id="gateway")) == "llm"
+        open_breaker()
+        assert nlg._choose_strategy(action, DialogState(session_id="gateway")) == "template"
+
+
+class TestProbeRelease:
+    """半开探测没有成功/失败结果时释放探测名额，后续调用可以继续探测"""
+
+    def test_non_retryable_error(self):
+        """测试探测遇到不可重试错误"""
+        half_open_breaker()
+
+        def bad_request(timeout):
+            response = httpx.Response(400, request=httpx.Request("POST", "http://llm.test"))
+            raise openai.BadRequestError("bad request", response=response, body=None)
+
+        with pytest.raises(openai.BadRequestError):
+            llm_gateway.call(REQUEST, bad_request, caller="test")
+        assert llm_gateway.breaker.state == CircuitBreaker.HALF_OPEN
+
+        assert llm_gateway.call(REQUEST, lambda timeout: "ok", caller="test") == "ok"
+        assert llm_gateway.breaker.state == CircuitBreaker.CLOSED
+
+    def test_cancelled(self):
+        """测试探测被调用方取消"""
+        half_open_breaker()
+
+        async def slow(timeout):
+            await asyncio.sleep(1)
+            return "slow"
+
+        async def ok(timeout):
+            return "ok"
+
+        async def run():
+            task = asyncio.create_task(llm_gateway.acall(REQUEST, slow, caller="test"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await llm_gateway.acall(REQUEST, ok, caller="test")
+
+        assert asyncio.run(run()) == "ok"
+        assert llm_gateway.breaker.state == CircuitBreaker.CLOSED
+
+    def test_stream_closed_early(self):
+        """测试探测的流被调用方提前关闭"""
+        half_open_breaker()
+
+        async def stream(timeout):
+            async def chunks():
+                for content in ("为您", "找到", "套餐"):
+                    yield fake_chunk(content)
+            return chunks()
+
+        async def run():
+            first = llm_gateway.astream(REQUEST, stream, caller="test")
+            assert await first.__anext__() == "为您"
+            await first.aclose()
+            return [delta async for delta in llm_gateway.astream(REQUEST, stream, caller="test")]
+
+        assert asyncio.run(run()) == ["为您", "找到", "套餐"]
+        assert llm_gateway.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedging:
+    """对冲请求测试"""
+
+    @pytest.fixture
+    def hedged(self, monkeypatch):
+        """主provider慢（0.3s），备用provider快（0.01s），对冲延迟50ms"""
+        primary = FakeAsyncLLMClient(0.3, fake_completion(content="primary"))
+        secondary = FakeAsyncLLMClient(0.01, fake_completion(content="secondary"))
+        requests = []
+        create = secondary.chat.completions.create
+        secondary.chat.completions.create = lambda **kwargs: requests.append(kwargs) or create(**kwargs)
+
+        monkeypatch.setattr(llm_gateway, "hedge_delay_ms", 50)
+        monkeypatch.setattr(llm_gateway, "hedge_budget", HedgeBudget(1.0))
+        llm_gateway.enable_hedging(SimpleNamespace(name="hedge_test", model="backup-model", async_client=secondary))
+        yield SimpleNamespace(primary=primary, secondary=secondary, requests=requests)
+        llm_gateway.disable_hedging()
+
+    @staticmethod
+    def call(primary, request=REQUEST):
+        fn = lambda timeout: primary.chat.completions.create(**request, timeout=timeout)
+        return llm_gateway.acall(request, fn, caller="hedge_test")
+
+    def test_hedge_wins_when_primary_slow(self, hedged):
+        """测试主provider慢时对冲请求胜出，落败方被取消"""
+        wins = metrics.counter("llm_hedges_total", caller="hedge_test", winner="secondary")
+        before = wins.value
+        primary_latency = metrics.histogram("llm_provider_latency_ms", provider=llm_gateway.primary.name)
+        secondary_latency = metrics.histogram("llm_provider_latency_ms", provider="hedge_test")
+        primary_samples, secondary_samples = primary_latency.count, secondary_latency.count
+
+        cancelled = []
+
+        async def slow(timeout):
+            try:
+                return await hedged.primary.chat.completions.create(**REQUEST, timeout=timeout)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            start = asyncio.get_running_loop().time()
+            result = await llm_gateway.acall(REQUEST, slow, caller="hedge_test")
+            elapsed = asyncio.get_running_loop().time() - start
+            await asyncio.sleep(0)
+            return result, elapsed
+
+        result, elapsed = asyncio.run(run())
+
+        assert result.choices[0].message.content == "secondary"
+        assert elapsed < 0.2
+        assert cancelled == [True]
+        assert hedged.requests[0]["model"] == "backup-model"
+        assert wins.value == before + 1
+        assert llm_gateway.hedge_breaker.state == CircuitBreaker.CLOSED
+        # 被取消的主provider调用不计入耗时分布（否则会拉低对冲延迟）
+        assert primary_latency.count == primary_samples
+        assert secondary_latency.count == secondary_samples + 1
+
+    def test_no_hedge_when_primary_fast(self, hedged):
+        """测试主provider在对冲延迟内返回时不发对冲请求"""
+        hedged.primary.latency = 0.001
+        result = asyncio.run(self.call(hedged.primary))
+
+        assert result.choices[0].message.content == "primary"
+        assert hedged.secondary.calls == 0
+
+    def test_primary_error_falls_back_to_hedge(self, hedged):
+        """测试对冲发出后主provider失败，使用对冲结果并计入主provider熔断"""
+        hedged.secondary.latency = 0.1
+
+        async def failing(timeout):
+            await asyncio.sleep(0.08)
+            raise timeout_error()
+
+        result = asyncio.run(llm_gateway.acall(REQUEST, failing, caller="hedge_test"))
+
+        assert result.choices[0].message.content == "secondary"
+        assert llm_gateway.breaker._failures == 1
+
+    def test_rate_cap(self, hedged, monkeypatch):
+        """测试对冲比例不超过上限"""
+        monkeypatch.setattr(llm_gateway, "hedge_budget", HedgeBudget(0.25))
+        hedged.primary.latency = 0.08
+
+        async def run():
+            for i in range(8):
+                request = {**REQUEST, "messages": [{"role": "user", "content": f"对冲{i}"}]}
+                await self.call(hedged.primary, request)
+
+        asyncio.run(run())
+
+        assert hedged.secondary.calls == 2
+        assert llm_gateway.hedge_budget.rate <= 0.25
+
+    def test_hedge_budget(self):
+        """测试滑动窗口内的对冲比例"""
+        budget = HedgeBudget(0.5, window=4)
+        budget.record_call()
+        assert not budget.try_acquire()
+        budget.record_call()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+        # 窗口滑出已对冲的调用后重新有额度
+        for _ in range(4):
+            budget.record_call()
+        assert budget.rate == 0
+        assert budget.try_acquire()
@@ -0,0 +1,72 @@
+"""
+表结构迁移与查询计划测试（SQLite内存库）
+"""
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.migrate import MigrationRunner
+from database.query_plan import full_scans
+from database.seed import seed_database
+from tests.support.query_recording import record_queries
+
+
+def package_indexes(db):
+    rows = db.execute_query("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 't_packages'")
+    return {row[0] for row in rows}
+
+
+class TestMigrationRunner:
+    """MigrationRunner 测试"""
+
+    def test_fresh_database(self):
+        """测试空库依次执行全部版本，再次执行无操作"""
+        db = DatabaseManager.create("sqlite://")
+        runner = MigrationRunner(db)
+
+        assert runner.current_version() == 0
+        assert runner.migrate() == [1, 2, 3]
+        assert runner.migrate() == []
+        assert runner.current_version() == 3
+        assert {"idx_packages_status_price", "idx_packages_status_data"} <= package_indexes(db)
+        assert "idx_packages_status" not in package_indexes(db)
+
+    def test_existing_tables_recorded_as_baseline(self):
+        """测试已有基线表的旧库从版本2开始执行，之后才有套餐变更记录表"""
+        db = DatabaseManager.create("sqlite://")
+        db.create_schema()
+        runner = MigrationRunner(db)
+
+        assert runner.current_version() == 1
+        assert "t_package_changes" not in db.table_names()
+        assert runner.migrate() == [2, 3]
+        assert "t_package_changes" in db.table_names()
+
+    def test_target_version(self):
+        """测试只执行到指定版本"""
+        db = DatabaseManager.create("sqlite://")
+        runner = MigrationRunner(db)
+
+        assert runner.migrate(target=1) == [1]
+        assert [m.version for m in runner.pending()] == [2, 3]
+
+
+class TestQueryPlans:
+    """执行器查询的索引覆盖"""
+
+    @pytest.fixture(scope="class")
+    def db(self):
+        db = DatabaseManager.create("sqlite://")
+        seed_database(db, users=2000, packages=200)
+        return db
+
+    def test_executor_queries_use_indexes(self, db):
+        """测试执行器直接查库时的每条SQL都不整表扫描"""
+        recorded = record_queries(db)
+
+        assert recorded
+        assert [(label, full_scans(db, sql, params)) for label, sql, params in recorded
+                if full_scans(db, sql, params)] == []
+
+    def test_detects_full_scan(self, db):
+        """测试无索引的过滤条件被识别为整表扫描"""
+        assert full_scans(db, "SELECT phone FROM t_user WHERE name = :name", {"name": "张三"}) == ["t_user"]
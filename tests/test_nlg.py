@@ -1,10 +1,17 @@
 """
 NLG模块测试
 """
+from types import SimpleNamespace
+
 import pytest
+
 from core.policy import Action, ActionType
 from core.dst.dialog_state import DialogState
 from core.nlg import NLGGenerator
+from core.nlg.llm_cache import NLGLLMCache
+from core.nlg.template_engine import template_engine, CompiledTemplate
+from utils.cache import ResponseCache
+from tests.support.llm import fake_completion
 
 
 class TestNLGGenerator:
@@ -72,3 +79,138 @@ class TestNLGGenerator:
         assert "13800138000" in response
         assert "畅游套餐" in response
         assert "确认" in response
+
+
+class TestResponseCache:
+    """NLG响应缓存测试"""
+
+    @pytest.fixture
+    def cache(self):
+        return ResponseCache(ttl=300, max_size=2)
+
+    def test_lru_eviction_and_stats(self, cache):
+        """测试容量满时淘汰最久未访问的条目，并统计命中/淘汰"""
+        cache.set("a", "A")
+        cache.set("b", "B")
+        assert cache.get("a") == "A"  # a 变为最近访问
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("c") == "C"
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == round(2 / 3, 4)
+
+    def test_generate_key(self):
+        """测试只对确定性响应生成键，参数顺序不影响键"""
+        assert ResponseCache.generate_key("REQUEST", "query_usage", {"a": 1, "b": 2}) == \
+            ResponseCache.generate_key("REQUEST", "query_usage", {"b": 2, "a": 1})
+        assert ResponseCache.generate_key("INFORM", "query_packages", {"count": 0}) is not None
+        assert ResponseCache.generate_key("INFORM", "query_usage", {"phone": "13800138000"}) is None
+
+    def test_nlg_uses_cache(self):
+        """测试模板输出命中缓存，后处理仍按当前状态执行"""
+        cache = ResponseCache()
+        nlg = NLGGenerator(response_cache=cache)
+        action = Action(
+            action_type=ActionType.CONFIRM,
+            intent="change_package",
+            parameters={"phone": "13800138000", "new_package_name": "畅游套餐", "price": 180}
+        )
+
+        first = nlg.generate(action, DialogState(session_id="cache_001"))
+        late_state = DialogState(session_id="cache_002", turn_count=5)
+        second = nlg.generate(action, late_state)
+
+        assert cache.stats()["hits"] == 1
+        assert second.startswith(first)
+        assert second.endswith("还有什么可以帮您的吗？")
+
+
+class TestNLGLLMCache:
+    """NLG LLM输出缓存测试"""
+
+    PARAMS = {"count": 4, "should_recommend": True, "data": [{"name": "畅游套餐", "price": 180}]}
+
+    @pytest.fixture
+    def cache(self):
+        return NLGLLMCache(max_size=10, ttl=300, variants=2)
+
+    def test_variants_fill_then_hit(self, cache):
+        """测试变体攒满前返回None，攒满后从变体中取"""
+        key = cache.make_key("reply", "INFORM", "query_packages", self.PARAMS)
+
+        assert cache.get(key, "reply") is None
+        cache.add(key, "回复A")
+        cache.add(key, "回复A")  # 重复文本不计入
+        assert cache.get(key, "reply") is None
+        cache.add(key, "回复B")
+
+        assert cache.get(key, "reply") in {"回复A", "回复B"}
+
+    def test_key_is_canonical_and_skips_pii(self, cache):
+        """测试参数顺序不影响键，含手机号的参数不缓存"""
+        reordered = dict(reversed(list(self.PARAMS.items())))
+        assert cache.make_key("reply", "INFORM", "query_packages", self.PARAMS) == \
+            cache.make_key("reply", "INFORM", "query_packages", reordered)
+        assert cache.make_key("reply", "INFORM", "query_current_package",
+                              {"data": {"phone": "13800138000"}}) is None
+
+    def test_invalidate_catalog(self, cache):
+        """测试套餐目录变化后旧条目失效"""
+        key = cache.make_key("reply", "INFORM", "query_packages", self.PARAMS)
+        cache.add(key, "回复A")
+        cache.add(key, "回复B")
+
+        cache.invalidate_catalog()
+
+        assert cache.get(key, "reply") is None
+        assert cache.make_key("reply", "INFORM", "query_packages", self.PARAMS) != key
+
+    def test_nlg_reuses_llm_output(self):
+        """测试变体攒满后不再调用LLM"""
+        nlg = NLGGenerator()
+        nlg.llm_cache = NLGLLMCache(variants=2)
+        replies = iter(["推荐畅游套餐", "畅游套餐最划算", "不应调用"])
+        nlg.llm_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kwargs: fake_completion(content=next(replies))
+        )))
+        action = Action(action_type=ActionType.INFORM, intent="query_packages",
+                        parameters=dict(self.PARAMS), use_llm=True)
+
+        texts = [nlg._generate_from_llm(action, DialogState(session_id=f"llm_cache_{i}")) for i in range(4)]
+
+        assert texts[:2] == ["推荐畅游套餐", "畅游套餐最划算"]
+        assert set(texts[2:]) <= {"推荐畅游套餐", "畅游套餐最划算"}
+
+
+class TestTemplateEngine:
+    """预编译模板测试"""
+
+    def test_placeholders_parsed_once(self):
+        """测试占位符在编译时解析"""
+        template = CompiledTemplate("请确认：为手机号 {phone} 办理【{new_package_name}】，{phone}")
+
+        assert template.placeholders == ("phone", "new_package_name")
+        assert template.missing({"phone": "13800138000"}) == "new_package_name"
+        assert template.missing({"phone": "13800138000", "new_package_name": ""}) == "new_package_name"
+
+    def test_fallback_chain(self):
+        """测试降级链：意图降级模板 → {message} → 处理完成"""
+        assert template_engine.fallback("change_package", {"new_package_name": "畅游套餐"}).text == \
+            "已成功为您办理【{new_package_name}】，次月生效！"
+        assert template_engine.fallback("change_package", {"message": "已受理"}).text == "{message}"
+        assert template_engine.fallback("unknown", {}).text == "处理完成"
+
+    def test_missing_params_use_fallback(self):
+        """测试首选模板参数不全时渲染降级模板"""
+        nlg = NLGGenerator()
+        action = Action(
+            action_type=ActionType.INFORM,
+            intent="query_usage",
+            parameters={"phone": "13800138000"}
+        )
+
+        assert nlg._generate_from_template(action, DialogState(session_id="tpl")) == "已查询到您的使用情况"
@@ -0,0 +1,95 @@
+"""
+NLG模板与LLM竞速测试
+"""
+import asyncio
+
+import pytest
+
+from config import settings
+from utils import LoopLocal, metrics
+from tests.support.chatbot import build_chatbot, USER_INPUT
+from tests.support.llm import fake_completion, FakeAsyncLLMClient
+
+LLM_TEXT = "为您找到4个套餐，推荐畅游套餐。"
+
+
+def slow_nlg(bot, latency: float):
+    """NLG的LLM调用改为指定延迟"""
+    response = fake_completion(content=LLM_TEXT)
+    bot.nlg._async_llm_clients = LoopLocal(lambda: FakeAsyncLLMClient(latency, response))
+
+
+class TestTemplateLLMRace:
+    """achat 竞速测试（LLM/DB为离线模拟，NLG返回4个套餐走LLM）"""
+
+    @pytest.fixture
+    def chatbot(self):
+        bot = build_chatbot(0.01, 0.0)
+        bot.nlg.race_budget = 0.2
+        return bot
+
+    def test_llm_wins_within_budget(self, chatbot):
+        """测试LLM在预算内返回时使用LLM文本"""
+        counter = metrics.counter("nlg_race_total", winner="llm")
+        before = counter.value
+
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="race_llm"))
+
+        assert response["response"] == LLM_TEXT
+        assert counter.value == before + 1
+
+    def test_template_wins_when_llm_is_slow(self, chatbot):
+        """测试LLM超出预算时立即返回模板"""
+        slow_nlg(chatbot, 1.0)
+        counter = metrics.counter("nlg_race_total", winner="template")
+        before = counter.value
+
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="race_template"))
+
+        assert response["response"] != LLM_TEXT
+        assert "4" in response["response"]
+        assert counter.value == before + 1
+
+    def test_late_llm_warms_cache(self, chatbot):
+        """测试超时的LLM调用在后台完成后写入LLM缓存"""
+        slow_nlg(chatbot, 0.3)
+        warmed = metrics.counter("nlg_race_late_total", result="warmed")
+        before = warmed.value
+
+        async def run():
+            response = await chatbot.achat(USER_INPUT, session_id="race_warm")
+            await asyncio.sleep(0.5)
+            return response
+
+        response = asyncio.run(run())
+
+        assert response["response"] != LLM_TEXT
+        assert warmed.value == before + 1
+        assert len(chatbot.nlg.llm_cache.local) == 1
+
+    def test_late_llm_cancelled_without_warming(self, chatbot):
+        """测试关闭预热时超时的LLM调用被取消"""
+        slow_nlg(chatbot, 0.3)
+        chatbot.nlg.race_warm_cache = False
+        cancelled = metrics.counter("nlg_race_late_total", result="cancelled")
+        before = cancelled.value
+
+        asyncio.run(chatbot.achat(USER_INPUT, session_id="race_cancel"))
+
+        assert cancelled.value == before + 1
+        assert not chatbot.nlg._late_llm_tasks
+
+    def test_llm_call_bounded_by_deadline(self, chatbot, monkeypatch):
+        """测试竞速中的LLM调用时限不超过本轮对话的剩余预算"""
+        monkeypatch.setattr(settings, "CHAT_DEADLINE_MS", 2000)
+        timeouts = []
+        client = FakeAsyncLLMClient(0.01, fake_completion(content=LLM_TEXT))
+        create = client.chat.completions.create
+        client.chat.completions.create = lambda **kwargs: timeouts.append(kwargs["timeout"]) or create(**kwargs)
+        chatbot.nlg._async_llm_clients = LoopLocal(lambda: client)
+
+        response = asyncio.run(chatbot.achat(USER_INPUT, session_id="race_deadline"))
+
+        assert response["response"] == LLM_TEXT
+        assert len(timeouts) == 1
+        assert 0 < timeouts[0] <= 2
@@ -1,9 +1,11 @@
 """
 NLU模块单元测试
 """
+from types import SimpleNamespace
+
 import pytest
 from core.nlu.nlu_engine import NLUEngine
-from utils import logger
+from utils import logger, metrics
 
 
 class TestNLUEngine:
@@ -25,4 +27,117 @@ class TestNLUEngine:
 
         assert result.intent == "query_packages"
         assert result.parameters.get("price_max") == 100
-        assert result.parameters.get("data_min") == 50
\ No newline at end of file
+        assert result.parameters.get("data_min") == 50
+
+class TestSlotFillFastPath:
+    """槽位填充快速通道测试"""
+
+    @pytest.fixture
+    def nlu_engine(self):
+        """创建NLU引擎实例（LLM调用即失败，确保快速通道不走LLM）"""
+        engine = NLUEngine()
+
+        def fail(**kwargs):
+            raise AssertionError("不应调用LLM")
+
+        engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fail)))
+        return engine
+
+    def _wait_for(self, nlu_engine, session_id, intent, slot, slot_values=None):
+        context = nlu_engine._get_session_context(session_id)
+        context["current_intent"] = intent
+        context["waiting_for_slot"] = slot
+        context["slot_values"] = dict(slot_values or {})
+
+    def test_phone_answer_skips_llm(self, nlu_engine):
+        """测试追问手机号时直接回答号码"""
+        session_id = "slot_fill_001"
+        self._wait_for(nlu_engine, session_id, "change_package", "phone",
+                       {"new_package_name": "畅游套餐"})
+        avoided = metrics.counter("nlu_llm_calls_avoided_total", stage="slot_fill").value
+
+        result = nlu_engine.understand("13800138000", session_id)
+
+        assert result.source == "slot_fill"
+        assert result.intent == "change_package"
+        assert result.parameters == {"new_package_name": "畅游套餐", "phone": "13800138000"}
+        assert not result.requires_clarification
+        assert metrics.counter("nlu_llm_calls_avoided_total", stage="slot_fill").value == avoided + 1
+
+    def test_package_answer_skips_llm(self, nlu_engine):
+        """测试追问套餐名时直接回答套餐名"""
+        session_id = "slot_fill_002"
+        self._wait_for(nlu_engine, session_id, "query_package_detail", "package_name")
+
+        result = nlu_engine.understand("畅游套餐", session_id)
+
+        assert result.source == "slot_fill"
+        assert result.parameters["package_name"] == "畅游套餐"
+
+    def test_query_type_answer(self, nlu_engine):
+        """测试查询类型识别"""
+        assert nlu_engine._extract_slot_value("流量", "query_type") == "data"
+        assert nlu_engine._extract_slot_value("话费余额", "query_type") == "balance"
+        assert nlu_engine._extract_slot_value("流量和余额都要", "query_type") == "all"
+
+    def test_unrelated_answer_goes_to_llm(self, nlu_engine):
+        """测试无法识别槽位值时仍交给LLM"""
+        session_id = "slot_fill_003"
+        self._wait_for(nlu_engine, session_id, "change_package", "phone")
+
+        result = nlu_engine.understand("帮我看看有没有流量多一点的", session_id)
+
+        # LLM被替换为直接失败，说明走到了LLM阶段
+        assert result.intent == "error"
+
+
+class TestNLUResultCache:
+    """NLU结果缓存测试"""
+
+    @pytest.fixture
+    def nlu_engine(self):
+        """创建NLU引擎实例（LLM为计数的离线模拟）"""
+        from tests.support.llm import FakeLLMClient, fake_completion
+
+        engine = NLUEngine()
+        engine.client = FakeLLMClient(0.0, fake_completion("query_packages", {"price_max": 50}))
+        return engine
+
+    def test_same_input_hits_cache(self, nlu_engine):
+        """测试不同会话的相同开场白只调用一次LLM"""
+        hits = metrics.counter("nlu_cache_requests_total", result="hit").value
+
+        first = nlu_engine.understand("有便宜的套餐吗", "cache_001")
+        second = nlu_engine.understand(" 有便宜的套餐吗  ", "cache_002")
+
+        assert nlu_engine.client.calls == 1
+        assert first.source == "llm"
+        assert second.source == "cache"
+        assert second.intent == first.intent == "query_packages"
+        assert second.parameters == first.parameters
+        assert metrics.counter("nlu_cache_requests_total", result="hit").value == hits + 1
+
+    def test_context_signature_in_key(self, nlu_engine):
+        """测试上下文签名不同时不命中"""
+        nlu_engine.understand("有便宜的套餐吗", "cache_003")
+        context = nlu_engine._get_session_context("cache_004")
+        context["current_intent"] = "query_usage"
+
+        result = nlu_engine.understand("有便宜的套餐吗", "cache_004")
+
+        assert nlu_engine.client.calls == 2
+        assert result.source == "llm"
+
+    def test_context_values_not_shared(self, nlu_engine):
+        """测试从上下文带入的手机号不会进入缓存"""
+        from tests.support.llm import fake_completion
+
+        nlu_engine.client.response = fake_completion("query_current_package", {})
+
+        first = nlu_engine.understand("看看我用的啥", "cache_005", user_phone="13800138000")
+        second = nlu_engine.understand("看看我用的啥", "cache_006", user_phone="13900139000")
+
+        assert nlu_engine.client.calls == 1
+        assert first.parameters["phone"] == "13800138000"
+        assert second.source == "cache"
+        assert second.parameters["phone"] == "13900139000"
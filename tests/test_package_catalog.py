@@ -0,0 +1,111 @@
+"""
+进程内套餐目录测试
+"""
+import random
+
+import pytest
+
+from executor.package_catalog import PackageCatalog
+from tests.support.db import PACKAGES
+
+
+def brute_force(packages, price_min=None, price_max=None, data_min=None, data_max=None,
+                target_user=None, sort_by="price_asc"):
+    """与原SQL语义一致的逐条过滤"""
+    result = [p for p in packages
+              if (price_min is None or p["price"] >= price_min)
+              and (price_max is None or p["price"] <= price_max)
+              and (data_min is None or p["data_gb"] >= data_min)
+              and (data_max is None or p["data_gb"] <= data_max)
+              and (not target_user or p["target_user"] in (target_user, "无限制"))]
+    keys = {
+        "price_desc": lambda p: (-p["price"], p["id"]),
+        "data_desc": lambda p: (-p["data_gb"], p["id"]),
+    }
+    return sorted(result, key=keys.get(sort_by, lambda p: (p["price"], p["id"])))
+
+
+class TestPackageCatalog:
+    """PackageCatalog 测试"""
+
+    def test_range_filters(self, package_catalog):
+        """测试价格/流量区间过滤与排序"""
+        result = package_catalog.query(price_max=200, data_min=50, sort_by="data_desc")
+
+        assert [p["name"] for p in result] == ["校园套餐", "畅游套餐"]
+
+    def test_target_user_includes_unrestricted(self, package_catalog):
+        """测试按人群过滤时包含不限人群的套餐"""
+        result = package_catalog.query(target_user="在校生", price_max=160)
+
+        assert [p["name"] for p in result] == ["经济套餐", "校园套餐"]
+
+    def test_matches_brute_force(self):
+        """测试大目录上与逐条过滤的结果一致"""
+        rng = random.Random(7)
+        packages = [
+            {"id": i, "name": f"套餐{i}", "data_gb": rng.choice([5, 10, 20, 50, 100, 200, 500]),
+             "voice_minutes": 100, "price": float(rng.randint(10, 400)),
+             "target_user": rng.choice(["无限制", "在校生", "老年人"]), "description": ""}
+            for i in range(1, 2001)
+        ]
+        catalog = PackageCatalog(lambda: packages, ttl=0)
+
+        for _ in range(200):
+            filters = {
+                "price_min": rng.choice([None, 30, 100]),
+                "price_max": rng.choice([None, 80, 200, 350]),
+                "data_min": rng.choice([None, 10, 50, 200]),
+                "data_max": rng.choice([None, 100, 500]),
+                "target_user": rng.choice([None, "在校生"]),
+                "sort_by": rng.choice(["price_asc", "price_desc", "data_desc"]),
+            }
+            assert catalog.query(**filters) == brute_force(packages, **filters), filters
+
+    def test_results_are_read_only(self, package_catalog):
+        """测试返回共享的只读对象，不复制"""
+        with pytest.raises(TypeError):
+            package_catalog.get("经济套餐")["price"] = 0
+
+        assert package_catalog.get("经济套餐") is package_catalog.get("经济套餐")
+
+        assert package_catalog.get("经济套餐")["price"] == 50.0
+        assert package_catalog.get("不存在的套餐") is None
+
+    def test_reload_bumps_version_on_change(self):
+        """测试内容变化时版本号加一并通知监听者，内容不变时版本不变"""
+        rows = [dict(p) for p in PACKAGES]
+        catalog = PackageCatalog(lambda: [dict(p) for p in rows], ttl=0)
+        changes = []
+        catalog.add_listener(lambda: changes.append(catalog.version))
+
+        assert catalog.reload() == 1
+        assert catalog.reload() == 1
+
+        rows[0]["price"] = 40.0
+        assert catalog.reload() == 2
+        assert changes == [2]
+        assert catalog.get("经济套餐")["price"] == 40.0
+
+    def test_ttl_expiry_reloads(self, monkeypatch):
+        """测试TTL到期后下次访问重新加载；加载失败时继续使用旧目录"""
+        loads = []
+
+        def loader():
+            loads.append(1)
+            if len(loads) > 2:
+                raise RuntimeError("db down")
+            return [dict(p) for p in PACKAGES]
+
+        catalog = PackageCatalog(loader, ttl=60)
+        catalog.query()
+        catalog.query()
+        assert len(loads) == 1
+
+        monkeypatch.setattr(catalog, "_loaded_at", catalog._loaded_at - 61)
+        catalog.query()
+        assert len(loads) == 2
+
+        monkeypatch.setattr(catalog, "_loaded_at", catalog._loaded_at - 61)
+        assert len(catalog.query()) == len(PACKAGES)
+        assert catalog.version == 1
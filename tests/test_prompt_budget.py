@@ -0,0 +1,176 @@
+"""
+NLU Prompt预算测试
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm import llm_gateway
+from core.nlu.function_definitions import FUNCTION_DEFINITIONS
+from core.nlu.nlu_engine import NLUEngine
+from core.nlu.prompt_budget import PromptBudgeter, PROMPT_SECTIONS, estimate_tokens
+from core.nlu.prompt_templates import OPTIMIZED_SYSTEM_PROMPT, SLOT_FILLING_INSTRUCTION
+from utils import metrics
+from tests.support.llm import FakeLLMClient, fake_completion
+
+WAITING_PHONE = {
+    "current_intent": "change_package",
+    "waiting_for_slot": "phone",
+    "slot_values": {"new_package_name": "畅游套餐"},
+}
+
+
+def tool_names(tools):
+    return [tool["function"]["name"] for tool in tools]
+
+
+class TestPromptBudgeter:
+    """Prompt预算器测试"""
+
+    @pytest.fixture
+    def budgeter(self):
+        return PromptBudgeter(max_tokens=4000)
+
+    def test_sections_cover_prompt(self):
+        """测试分节拼接后覆盖原Prompt全部内容"""
+        assert "".join(PROMPT_SECTIONS.values()).replace("\n", "") == OPTIMIZED_SYSTEM_PROMPT.replace("\n", "")
+
+    def test_full_mode(self, budgeter):
+        """测试普通状态使用全部工具与完整Prompt"""
+        plan = budgeter.plan("有便宜的套餐吗", {}, False, [{"role": "user", "content": "有便宜的套餐吗"}])
+
+        assert plan.tools == FUNCTION_DEFINITIONS
+        assert plan.sections == list(PROMPT_SECTIONS)
+        assert plan.tokens["total"] == plan.tokens["system"] + plan.tokens["tools"] + plan.tokens["messages"]
+
+    def test_slot_filling_only_current_tool(self, budgeter):
+        """测试等待手机号时只发送当前意图的工具"""
+        full = budgeter.plan("我不记得了", {}, False, [])
+        plan = budgeter.plan("我不记得了", WAITING_PHONE, True, [])
+
+        assert tool_names(plan.tools) == ["change_package"]
+        assert plan.tokens["total"] < full.tokens["total"] / 2
+
+    def test_slot_filling_keeps_switch_candidates(self, budgeter):
+        """测试输入出现切换关键词时保留对应意图的工具"""
+        plan = budgeter.plan("怎么查余额", WAITING_PHONE, True, [])
+
+        assert tool_names(plan.tools) == ["change_package", "query_usage", "business_consultation"]
+
+    def test_ceiling_drops_optional_sections(self):
+        """测试超出上限时按优先级丢弃可选分节，必需分节保留"""
+        budgeter = PromptBudgeter(max_tokens=1300, message_reserve=100)
+        plan = budgeter.plan("有什么套餐", {}, False, [{"role": "user", "content": "有什么套餐"}])
+
+        assert plan.tokens["total"] <= 1300
+        assert plan.dropped and plan.dropped[-1] == "错误示例"
+        assert {"intro", "重要提醒", "示例学习"} <= set(plan.sections)
+
+    def test_long_input_drops_context_not_sections(self):
+        """测试输入过长时丢弃上下文消息，前缀分节不变"""
+        budgeter = PromptBudgeter(max_tokens=2000, message_reserve=400)
+        short = budgeter.plan("有什么套餐", {}, False, [{"role": "user", "content": "有什么套餐"}])
+        text = "帮我看看有没有流量多一点的套餐" * 60
+        messages = [{"role": "user", "content": "最近对话：我还剩多少流量"}, {"role": "user", "content": text}]
+        plan = budgeter.plan(text, {}, False, messages)
+
+        assert plan.system_prompt == short.system_prompt
+        assert plan.dropped == short.dropped == []
+        assert plan.messages == messages[-1:]
+        assert plan.dropped_messages == 1
+
+    def test_estimate_tokens(self):
+        """测试中文/英文token估算"""
+        assert estimate_tokens("套餐") == 2
+        assert estimate_tokens("abcdefghij") == 3
+
+    def test_engine_request_uses_plan(self):
+        """测试NLU请求使用裁剪后的工具集"""
+        engine = NLUEngine()
+        engine.result_cache = None
+        engine.client = FakeLLMClient(0, fake_completion("change_package", {}))
+        requests = []
+        create = engine.client.chat.completions.create
+        engine.client.chat.completions.create = lambda **kwargs: requests.append(kwargs) or create(**kwargs)
+
+        context = engine._get_session_context("budget")
+        context.update(WAITING_PHONE)
+        engine.understand("我不记得了", "budget")
+
+        assert tool_names(requests[0]["tools"]) == ["change_package"]
+        assert requests[0]["messages"][0]["role"] == "system"
+
+
+class TestPromptPrefix:
+    """请求前缀（System Prompt + 工具定义）稳定性测试"""
+
+    @pytest.fixture
+    def nlu_engine(self):
+        engine = NLUEngine()
+        engine.result_cache = None
+        return engine
+
+    @staticmethod
+    def prefix(request):
+        return (request["messages"][0]["content"] + json.dumps(request["tools"], ensure_ascii=False)).encode("utf-8")
+
+    def build(self, engine, session_id, text, **context):
+        session = engine._get_session_context(session_id)
+        session.update(context)
+        return engine._build_llm_request(text, session, session_id)
+
+    def test_prefix_identical_across_sessions(self, nlu_engine):
+        """测试同一状态类别下不同会话（不同历史、槽位、手机号）的前缀字节一致"""
+        fresh = [
+            self.build(nlu_engine, "prefix_a", "有便宜的套餐吗"),
+            self.build(nlu_engine, "prefix_b", "那个多少钱", current_intent="query_package_detail",
+                       slot_values={"package_name": "畅游套餐"}, user_phone="13800138000"),
+            self.build(nlu_engine, "prefix_c", "帮我看看有没有流量多一点的", current_intent="query_usage",
+                       history=[{"role": "user", "content": "我还剩多少流量"}]),
+        ]
+        waiting = [
+            self.build(nlu_engine, "prefix_d", "我不记得了", current_intent="change_package",
+                       waiting_for_slot="phone", slot_values={"new_package_name": "畅游套餐"}),
+            self.build(nlu_engine, "prefix_e", "等一下", current_intent="change_package",
+                       waiting_for_slot="phone", slot_values={"new_package_name": "经济套餐"},
+                       user_phone="13900139000"),
+        ]
+
+        assert len({self.prefix(r) for r in fresh}) == 1
+        assert len({self.prefix(r) for r in waiting}) == 1
+        # 全量前缀就是原始Prompt，与状态无关
+        assert fresh[0]["messages"][0]["content"].replace("\n", "") == OPTIMIZED_SYSTEM_PROMPT.replace("\n", "")
+
+    def test_prefix_stable_with_long_input(self, nlu_engine):
+        """测试默认预算下超长输入（约2000字）不改变前缀字节"""
+        short = self.build(nlu_engine, "prefix_long_a", "有便宜的套餐吗")
+        long = self.build(nlu_engine, "prefix_long_b", "帮我看看有没有流量多一点的套餐，" * 125,
+                          history=[{"role": "user", "content": "我还剩多少流量"}])
+
+        assert self.prefix(long) == self.prefix(short)
+        assert long["messages"][-1]["content"].startswith("帮我看看")
+
+    def test_state_text_after_prefix(self, nlu_engine):
+        """测试槽位填充指示与任务上下文位于前缀之后"""
+        request = self.build(nlu_engine, "prefix_f", "我不记得了", current_intent="change_package",
+                             waiting_for_slot="phone", slot_values={"new_package_name": "畅游套餐"})
+
+        assert "槽位填充模式" not in request["messages"][0]["content"]
+        assert request["messages"][1]["content"].startswith(SLOT_FILLING_INSTRUCTION)
+        assert "畅游套餐" in request["messages"][1]["content"]
+
+    def test_prompt_cache_hit_metric(self):
+        """测试从usage记录前缀缓存命中token（DeepSeek与OpenAI两种格式）"""
+        hit = metrics.counter("llm_prompt_cache_hit_tokens_total", caller="prefix_test")
+        miss = metrics.counter("llm_prompt_cache_miss_tokens_total", caller="prefix_test")
+        before_hit, before_miss = hit.value, miss.value
+
+        deepseek = SimpleNamespace(prompt_tokens=1500, prompt_cache_hit_tokens=1280, prompt_cache_miss_tokens=220)
+        openai = SimpleNamespace(prompt_tokens=1500, prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+        llm_gateway._record_prompt_cache("prefix_test", deepseek)
+        llm_gateway._record_prompt_cache("prefix_test", openai)
+        llm_gateway._record_prompt_cache("prefix_test", SimpleNamespace(prompt_tokens=10))
+
+        assert hit.value - before_hit == 1280 + 1024
+        assert miss.value - before_miss == 220 + 476
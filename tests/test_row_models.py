@@ -0,0 +1,90 @@
+"""
+查询结果模型测试
+"""
+import copy
+import json
+import pickle
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from models import Package, UserAccount, json_default, to_plain
+
+ROW = (1, "经济套餐", 10, 100, Decimal("50.00"), "无限制", "入门")
+
+
+class TestRowModel:
+    """RowModel 映射接口测试"""
+
+    def test_from_tuple(self):
+        """测试按位置构建并转换类型"""
+        package = Package.from_row(ROW)
+
+        assert package.name == "经济套餐"
+        assert package.price == 50.0 and isinstance(package.price, float)
+
+    def test_from_sqlalchemy_row(self):
+        """测试按列名构建（SQLAlchemy Row）"""
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT '13800138000' AS phone, '畅游套餐' AS package_name, 100 AS data_gb, "
+                "300 AS voice_minutes, 180 AS price, '无限制' AS target_user, '' AS description, "
+                "5.2 AS monthly_usage_gb, 45 AS monthly_usage_minutes, NULL AS balance")).first()
+
+        account = UserAccount.from_row(row)
+
+        assert account.package_name == "畅游套餐"
+        assert account.balance == 0.0
+
+    def test_mapping_access(self):
+        """测试下游按字典方式读取"""
+        package = Package.from_row(ROW)
+
+        assert package["voice_minutes"] == 100
+        assert package.get("missing", "x") == "x"
+        assert "price" in package and "missing" not in package
+        assert list(package) == list(Package.__slots__)
+        assert package == dict(zip(Package.__slots__, ROW))
+        with pytest.raises(KeyError):
+            package["missing"]
+
+    def test_read_only(self):
+        """测试构建后不能按键或属性赋值，也不能新增、删除属性"""
+        package = Package.from_row(ROW)
+
+        with pytest.raises(TypeError):
+            package["price"] = 0
+        with pytest.raises(AttributeError):
+            package.price = 0
+        with pytest.raises(AttributeError):
+            package.extra = 1
+        with pytest.raises(AttributeError):
+            del package.name
+        assert package.price == 50.0
+
+    def test_copy_and_pickle(self):
+        """测试只读模型仍可复制和序列化"""
+        package = Package.from_row(ROW)
+
+        assert copy.copy(package) == package
+        assert pickle.loads(pickle.dumps(package)) == package
+
+    def test_from_dict(self):
+        """测试从字典构建，多余的键忽略，已是模型时原样返回"""
+        package = Package.from_dict({**dict(zip(Package.__slots__, ROW)), "score": 1})
+
+        assert package.to_dict() == dict(zip(Package.__slots__, ROW))
+        assert Package.from_dict(package) is package
+
+    def test_to_plain(self):
+        """测试API边界转换与JSON序列化"""
+        package = Package.from_row(ROW)
+        result = {"success": True, "data": [package], "recommendation": {"package": package}}
+
+        plain = to_plain(result)
+
+        assert type(plain["data"][0]) is dict
+        assert type(plain["recommendation"]["package"]) is dict
+        assert json.loads(json.dumps(result, default=json_default)) == plain
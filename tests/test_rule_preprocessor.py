@@ -0,0 +1,79 @@
+"""
+规则预处理器测试
+"""
+import pytest
+
+from core.nlu.rule_definitions import PRE_NLU_RULES
+from core.nlu.rule_matcher import KeywordAutomaton, required_keywords
+from core.nlu.rule_preprocessor import RulePreprocessor
+from tests.support.legacy_rules import LegacyRulePreprocessor, check_equivalent
+from tests.support.utterances import build_corpus
+
+
+class TestRuleMatcher:
+    """编译规则引擎测试"""
+
+    def test_required_keywords(self):
+        """测试从正则推导关键词预筛条件"""
+        groups = required_keywords(r"(\d+).{0,3}(元|块).{0,3}(以内|以下).{0,5}套餐")
+
+        assert groups == [("元", "块"), ("以内", "以下"), ("套餐",)]
+
+    def test_required_keywords_ignores_optional_parts(self):
+        """测试可选/非字面部分不作为必需关键词"""
+        assert required_keywords(r"(a.b|c)?x+") == []
+
+    def test_automaton_overlapping_keywords(self):
+        """测试重叠关键词（前缀、子串）都能被找到"""
+        automaton = KeywordAutomaton({"多少": 1, "多少个": 2, "套餐": 4, "经济套餐": 8, "办": 16})
+
+        assert automaton.scan("还有多少个经济套餐") == 1 | 2 | 4 | 8
+        assert automaton.scan("你好") == 0
+
+
+class TestRulePreprocessor:
+    """规则预处理器测试"""
+
+    @pytest.fixture
+    def preprocessor(self):
+        return RulePreprocessor()
+
+    def test_does_not_mutate_rule_definitions(self, preprocessor):
+        """测试不再原地排序模块级规则列表"""
+        names = [rule["name"] for rule in PRE_NLU_RULES]
+
+        RulePreprocessor()
+
+        assert [rule["name"] for rule in PRE_NLU_RULES] == names
+        assert [rule.get("priority", 0) for rule in preprocessor.rules] == sorted(
+            (rule.get("priority", 0) for rule in PRE_NLU_RULES), reverse=True)
+
+    def test_entities_single_pass(self, preprocessor):
+        """测试套餐名与手机号一次提取"""
+        result = preprocessor.preprocess("帮我办理畅游套餐，手机号13900139000", {})
+
+        assert result["intent"] == "change_package"
+        assert result["parameters"] == {"new_package_name": "畅游套餐", "phone": "13900139000"}
+
+    def test_price_extraction(self, preprocessor):
+        """测试价格提取"""
+        result = preprocessor.preprocess("有100块以内的套餐吗", {})
+
+        assert result["intent"] == "query_packages"
+        assert result["parameters"] == {"price_max": 100}
+
+    def test_context_rule(self, preprocessor):
+        """测试需要上下文的规则"""
+        assert preprocessor.preprocess("办理", {}) is None
+
+        context = {"current_intent": "query_packages", "slot_values": {"package_name": "经济套餐"}}
+        result = preprocessor.preprocess("办理", context)
+
+        assert result["rule_name"] == "上下文办理"
+        assert result["parameters"]["new_package_name"] == "经济套餐"
+
+    def test_matches_legacy_implementation(self, preprocessor):
+        """测试与优化前实现的输出完全一致"""
+        hits = check_equivalent(LegacyRulePreprocessor(), preprocessor, build_corpus(2000))
+
+        assert hits > 0
@@ -0,0 +1,91 @@
+"""
+NLU会话存储测试
+"""
+import pytest
+
+from core.nlu import session_store
+from core.nlu.session_store import MemorySessionStore
+from utils import metrics
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemorySessionStore:
+    """进程内会话存储测试"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(session_store.time, "monotonic", clock)
+        return clock
+
+    @pytest.fixture
+    def store(self, clock):
+        store = MemorySessionStore(max_size=3, ttl=60)
+        yield store
+        store.clear()
+
+    def test_lru_eviction(self, store):
+        """测试超出容量时淘汰最久未访问的会话"""
+        for i in range(3):
+            store.save(f"s{i}", {"i": i})
+        store.get("s0")  # s0 变为最近访问
+
+        store.save("s3", {"i": 3})
+
+        assert len(store) == 3
+        assert "s1" not in store
+        assert store.get("s0") == {"i": 0}
+
+    def test_idle_ttl_eviction(self, store, clock):
+        """测试空闲超时的会话被淘汰"""
+        store.save("old", {"v": 1})
+        clock.now += 30
+        store.save("new", {"v": 2})
+        clock.now += 31
+
+        assert store.get("old") is None
+        assert store.get("new") == {"v": 2}
+
+        clock.now += 61
+        store.collect()
+        assert len(store) == 0
+
+    def test_gauges(self, store):
+        """测试存活会话数与字节数仪表盘"""
+        live = metrics.gauge("nlu_sessions_live", store="memory")
+        size = metrics.gauge("nlu_sessions_bytes", store="memory")
+        live_before, size_before = live.value, size.value
+
+        store.save("a", {"history": ["x" * 10]})
+        store.save("b", {"history": []})
+
+        assert live.value - live_before == 2
+        assert size.value - size_before == store.size_bytes > 0
+
+        store.delete("a")
+        store.delete("b")
+        assert live.value == live_before
+        assert size.value == size_before
+
+    def test_engine_sessions_bounded(self, monkeypatch):
+        """测试NLU引擎会话数受上限约束"""
+        from config import settings
+        from core.nlu import NLUEngine
+
+        monkeypatch.setattr(settings, "NLU_SESSION_MAX_SIZE", 5)
+        engine = NLUEngine()
+
+        for i in range(20):
+            engine.understand("查下我的套餐", f"bounded_{i}")
+
+        assert len(engine.sessions) == 5
+        assert engine.sessions.get("bounded_19")["current_intent"] == "query_current_package"
@@ -0,0 +1,174 @@
+"""
+LLM请求合并测试
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.nlu.nlu_engine import NLUEngine
+from utils import LoopLocal, metrics
+from utils.singleflight import SingleFlight
+from tests.support.llm import FakeAsyncLLMClient, fake_completion
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "有便宜的套餐吗"}], "temperature": 0.2}
+
+
+class TestSingleFlight:
+    """请求合并测试"""
+
+    @pytest.fixture
+    def flight(self):
+        return SingleFlight("test")
+
+    def test_sync_followers_share_result(self, flight):
+        """测试并发的同步相同请求只执行一次"""
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return "response"
+
+        coalesced = metrics.counter("llm_coalesced_calls_total", group="test", caller="sync").value
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flight.call(REQUEST, slow, caller="sync"), range(5)))
+
+        assert results == ["response"] * 5
+        assert len(calls) == 1
+        assert metrics.counter("llm_coalesced_calls_total", group="test", caller="sync").value == coalesced + 4
+        assert flight.inflight() == 0
+
+    def test_async_followers_share_result(self, flight):
+        """测试并发的异步相同请求只执行一次，不同请求各自执行"""
+        calls = []
+
+        async def slow(content):
+            calls.append(content)
+            await asyncio.sleep(0.1)
+            return content
+
+        async def run():
+            other = dict(REQUEST, temperature=0.7)
+            return await asyncio.gather(
+                *(flight.acall(REQUEST, lambda: slow("a")) for _ in range(4)),
+                flight.acall(other, lambda: slow("b"))
+            )
+
+        assert asyncio.run(run()) == ["a", "a", "a", "a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_sync_follower_of_async_leader(self, flight):
+        """测试同步调用方等待另一线程事件循环中的异步leader"""
+        started = threading.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.2)
+            return "from-async"
+
+        leader = threading.Thread(target=lambda: asyncio.run(flight.acall(REQUEST, slow)))
+        leader.start()
+        started.wait(1)
+
+        result = flight.call(REQUEST, lambda: "from-sync")
+        leader.join()
+
+        assert result == "from-async"
+
+    def test_error_propagates_to_followers(self, flight):
+        """测试leader失败时follower收到同样的异常，之后的请求重新执行"""
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise TimeoutError("upstream timeout")
+
+        async def run():
+            return await asyncio.gather(*(flight.acall(REQUEST, failing) for _ in range(3)),
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, TimeoutError) for r in results)
+        assert flight.call(REQUEST, lambda: "retry") == "retry"
+
+    def test_leader_cancel_not_propagated(self, flight):
+        """测试leader被取消时follower重新发起请求并正常返回"""
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "response"
+
+        async def run():
+            leader = asyncio.create_task(flight.acall(REQUEST, slow))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(flight.acall(REQUEST, slow)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        assert asyncio.run(run()) == ["response"] * 3
+        # 被取消的leader一次，follower中新的leader一次
+        assert len(calls) == 2
+        assert flight.inflight() == 0
+
+    def test_sync_follower_timeout(self, flight):
+        """测试同步follower只按自己的时限等待，leader照常完成"""
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.3)
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            leader = pool.submit(flight.call, REQUEST, slow)
+            started.wait(1)
+            start = time.monotonic()
+            with pytest.raises(TimeoutError):
+                flight.call(REQUEST, slow, timeout=0.05)
+            assert time.monotonic() - start < 0.2
+            assert leader.result() == "response"
+
+        assert flight.inflight() == 0
+
+    def test_async_follower_timeout(self, flight):
+        """测试异步follower等待超时不影响leader和其他follower"""
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "response"
+
+        async def run():
+            leader = asyncio.create_task(flight.acall(REQUEST, slow))
+            await asyncio.sleep(0.01)
+            patient = asyncio.create_task(flight.acall(REQUEST, slow, timeout=1))
+            with pytest.raises(TimeoutError):
+                await flight.acall(REQUEST, slow, timeout=0.05)
+            return await asyncio.gather(leader, patient)
+
+        assert asyncio.run(run()) == ["response", "response"]
+        assert flight.inflight() == 0
+
+    def test_nlu_burst_single_llm_call(self):
+        """测试同一条消息的突发请求只触发一次NLU LLM调用"""
+        engine = NLUEngine()
+        engine.result_cache = None
+        client = FakeAsyncLLMClient(0.1, fake_completion("query_packages", {}))
+        engine._async_clients = LoopLocal(lambda: client)
+
+        async def run():
+            return await asyncio.gather(*(
+                engine.aunderstand("帮我看看有没有流量多一点的", f"burst_{i}") for i in range(10)
+            ))
+
+        results = asyncio.run(run())
+
+        assert client.calls == 1
+        assert all(r.intent == "query_packages" for r in results)
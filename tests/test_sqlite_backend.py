@@ -0,0 +1,107 @@
+"""
+SQLite后端测试（内存库，按 database/seed.py 生成数据）
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.seed import seed_database, sqlite_url
+from executor.db_executor import DatabaseExecutor
+from executor.package_catalog import PackageCatalog
+from utils import metrics
+
+
+@pytest.fixture
+def db():
+    db = DatabaseManager.create("sqlite://")
+    seed_database(db, users=500, packages=50)
+    return db
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """文件库：并发测试中每个线程使用自己的连接"""
+    db = DatabaseManager.create(sqlite_url(str(tmp_path / "telecom.db")))
+    seed_database(db, users=50, packages=10)
+    yield db
+    db._engine.dispose()
+
+
+def make_executor(db, catalog: bool = True) -> DatabaseExecutor:
+    executor = DatabaseExecutor()
+    executor.db = db
+    executor.catalog = PackageCatalog.from_db(db, ttl=0) if catalog else None
+    executor.user_cache = None
+    return executor
+
+
+class TestSQLiteBackend:
+    """DatabaseExecutor 在 SQLite 上的行为"""
+
+    def test_seeded_counts(self, db):
+        """测试生成的数据行数"""
+        assert db.dialect == "sqlite"
+        assert db.execute_query("SELECT COUNT(*) FROM t_user")[0][0] == 500
+        assert db.execute_query("SELECT COUNT(*) FROM t_packages")[0][0] == 50
+
+    def test_query_current_package(self, db):
+        """测试关联查询基础测试用户的当前套餐"""
+        result = make_executor(db).execute_function("query_current_package", {"phone": "13800138000"})
+
+        assert result["success"]
+        assert result["data"]["package_name"] == "经济套餐"
+        assert result["data"]["balance"] == 45.5
+
+    def test_catalog_matches_sql(self, db):
+        """测试进程内目录与SQL查询结果一致"""
+        filters = {"price_max": 300, "data_min": 50, "sort_by": "price_asc"}
+        from_sql = make_executor(db, catalog=False).execute_function("query_packages", filters)
+        from_catalog = make_executor(db).execute_function("query_packages", filters)
+
+        assert from_catalog["count"] == from_sql["count"] > 0
+        assert {p["id"] for p in from_catalog["data"]} == {p["id"] for p in from_sql["data"]}
+
+    def test_change_package_upserts(self, db):
+        """测试办理套餐：已有用户更新，新用户创建"""
+        executor = make_executor(db)
+
+        assert executor.execute_function("change_package", {"phone": "13800138000", "new_package_name": "畅游套餐"})["success"]
+        assert executor.execute_function("change_package", {"phone": "15000000001", "new_package_name": "畅游套餐"})["success"]
+
+        rows = db.execute_query(
+            "SELECT phone, current_package_id FROM t_user WHERE phone IN ('13800138000', '15000000001') ORDER BY phone")
+        assert rows == [("13800138000", 2), ("15000000001", 2)]
+
+    def test_idempotency_key_across_executors(self, db):
+        """测试不同进程（执行器）重复提交同一次确认只写一条变更记录"""
+        params = {"phone": "13800138000", "new_package_name": "无限套餐", "idempotency_key": "a" * 40}
+
+        first = make_executor(db).execute_function("change_package", dict(params))
+        second = make_executor(db).execute_function("change_package", dict(params))
+
+        assert first == second
+        assert db.execute_query("SELECT COUNT(*) FROM t_package_changes")[0][0] == 1
+
+    def test_concurrent_confirmations_across_executors(self, file_db):
+        """测试多个进程（执行器）并发提交同一次确认：唯一键冲突的一方按重复确认返回成功"""
+        params = {"phone": "13800138000", "new_package_name": "无限套餐", "idempotency_key": "b" * 40}
+        executors = [make_executor(file_db) for _ in range(8)]
+        barrier = threading.Barrier(len(executors))
+        duplicates = metrics.counter("idempotent_writes_total", function="change_package", result="duplicate_db")
+        before = duplicates.value
+
+        def confirm(executor):
+            barrier.wait()
+            return executor.execute_function("change_package", dict(params))
+
+        with ThreadPoolExecutor(max_workers=len(executors)) as pool:
+            results = list(pool.map(confirm, executors))
+
+        assert all(r == results[0] for r in results)
+        assert results[0]["success"]
+        assert duplicates.value == before + len(executors) - 1
+        assert file_db.execute_query("SELECT COUNT(*) FROM t_package_changes")[0][0] == 1
+        assert file_db.execute_query(
+            "SELECT current_package_id FROM t_user WHERE phone = '13800138000'") == [(3,)]
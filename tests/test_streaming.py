@@ -0,0 +1,69 @@
+"""
+流式NLG测试
+"""
+import asyncio
+
+import pytest
+
+from core.llm import llm_gateway
+from utils import LoopLocal
+from tests.support.chatbot import build_chatbot, USER_INPUT
+from tests.support.llm import FakeStreamingLLMClient
+
+CHUNKS = ["为您找到", "4个套餐，", "推荐畅游套餐。"]
+
+
+async def collect(bot, session_id):
+    return [event async for event in bot.astream_chat(USER_INPUT, session_id=session_id)]
+
+
+class TestStreamingNLG:
+    """astream_chat 测试（LLM/DB为离线模拟）"""
+
+    @pytest.fixture
+    def chatbot(self):
+        """NLG走LLM（4个套餐），支持流式输出"""
+        bot = build_chatbot(0.01, 0.0)
+        bot.nlg._async_llm_clients = LoopLocal(lambda: FakeStreamingLLMClient(0.01, 0.01, CHUNKS))
+        return bot
+
+    def test_chunks_then_final(self, chatbot):
+        """测试先逐段产出片段，最后产出完整响应"""
+        events = asyncio.run(collect(chatbot, "stream_test_001"))
+
+        assert [e["type"] for e in events] == ["chunk"] * len(CHUNKS) + ["final"]
+        assert [e["content"] for e in events[:-1]] == CHUNKS
+        result = events[-1]["result"]
+        assert result["intent"] == "query_packages"
+        assert result["state"]["turn_count"] == 2
+
+    def test_final_text_is_post_processed(self, chatbot, monkeypatch):
+        """测试片段不经后处理，最终文本经过后处理"""
+        formatter = chatbot.nlg.formatter
+        post_process = formatter.post_process
+        monkeypatch.setattr(formatter, "post_process", lambda text, *args: post_process(text, *args) + "【已处理】")
+
+        events = asyncio.run(collect(chatbot, "stream_test_002"))
+
+        assert all("【已处理】" not in e["content"] for e in events[:-1])
+        assert events[-1]["result"]["response"] == "".join(CHUNKS) + "【已处理】"
+
+    def test_stream_failure_falls_back_to_template(self, chatbot, monkeypatch):
+        """测试流式生成失败时降级为模板，仍然产出 final"""
+
+        async def broken(*args, **kwargs):
+            raise RuntimeError("stream broken")
+            yield
+
+        monkeypatch.setattr(llm_gateway, "astream", broken)
+        events = asyncio.run(collect(chatbot, "stream_test_003"))
+
+        assert [e["type"] for e in events] == ["final"]
+        assert events[0]["result"]["intent"] == "query_packages"
+        assert events[0]["result"]["response"]
+
+    def test_blocking_path_returns_full_text(self, chatbot):
+        """测试非流式接口等待完整生成后返回"""
+        result = asyncio.run(chatbot.achat(USER_INPUT, session_id="stream_test_004"))
+
+        assert result["response"] == "".join(CHUNKS)
@@ -0,0 +1,51 @@
+"""
+用户资料读穿缓存测试
+"""
+import pytest
+
+from executor.db_executor import DatabaseExecutor
+from executor.user_cache import UserProfileCache
+from utils import metrics
+from tests.support.db import PHONE
+
+class TestUserProfileCache:
+    """DatabaseExecutor 用户资料缓存测试（数据库为替身）"""
+
+    @pytest.fixture
+    def executor(self, fake_db, package_catalog):
+        executor = DatabaseExecutor()
+        executor.db = fake_db
+        executor.catalog = package_catalog
+        executor.user_cache = UserProfileCache(ttl=30)
+        return executor
+
+    def test_back_to_back_queries_hit_cache(self, executor):
+        """测试同一手机号的套餐查询与用量查询只查一次库"""
+        saved = metrics.histogram("db_queries_saved_per_turn")
+        before = saved.count
+
+        current = executor.execute_function("query_current_package", {"phone": PHONE})
+        usage = executor.execute_function("query_usage", {"phone": PHONE})
+
+        assert current["data"]["package_name"] == "经济套餐"
+        assert usage["balance"] == 45.5
+        assert executor.db.queries == 1
+        assert saved.count == before + 2
+
+    def test_change_package_invalidates(self, executor):
+        """测试办理套餐后缓存失效，再次查询读到新套餐"""
+        executor.execute_function("query_current_package", {"phone": PHONE})
+
+        result = executor.execute_function("change_package", {"phone": PHONE, "new_package_name": "畅游套餐"})
+        current = executor.execute_function("query_current_package", {"phone": PHONE})
+
+        assert result["success"]
+        assert current["data"]["package_name"] == "畅游套餐"
+        assert executor.db.queries == 2
+
+    def test_results_are_read_only(self, executor):
+        """测试缓存的资料只读，调用方无法修改"""
+        with pytest.raises(TypeError):
+            executor.execute_function("query_current_package", {"phone": PHONE})["data"]["balance"] = 0
+
+        assert executor.execute_function("query_usage", {"phone": PHONE})["balance"] == 45.5
@@ -8,6 +8,10 @@
 
 from .logger import logger
 from .validators import validate_phone,validate_price,validate_data_gb
-from .cache import ResponseCache
+from .cache import ResponseCache, TTLCache
+from .async_utils import LoopLocal, run_sync
+from .metrics import metrics
+from .singleflight import llm_singleflight
+from .deadline import Deadline, time_left
 
-__all__ = ['logger','validate_phone','validate_price','validate_data_gb','ResponseCache']
\ No newline at end of file
+__all__ = ['logger','validate_phone','validate_price','validate_data_gb','ResponseCache','TTLCache','LoopLocal','run_sync','metrics','llm_singleflight','Deadline','time_left']
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+异步工具
+"""
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Coroutine, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    按事件循环隔离的资源
+
+    AsyncOpenAI、redis.asyncio 等客户端内部的连接与创建它们的事件循环绑定，
+    跨循环复用会报错。这里为每个事件循环惰性创建一份实例，循环销毁后自动释放。
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        初始化
+
+        Args:
+            factory: 资源工厂函数（在目标事件循环内调用）
+        """
+        self._factory = factory
+        self._instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """获取当前事件循环对应的实例"""
+        loop = asyncio.get_running_loop()
+        instance = self._instances.get(loop)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(loop)
+                if instance is None:
+                    instance = self._factory()
+                    self._instances[loop] = instance
+        return instance
+
+
+class _BackgroundLoop:
+    """后台事件循环线程（供同步接口复用异步实现）"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="sync-bridge-loop",
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在后台事件循环内同步等待协程，请直接 await")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+_background_loop = _BackgroundLoop()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    在常驻后台事件循环中执行协程并阻塞等待结果
+
+    与 asyncio.run 不同，后台循环常驻，LoopLocal 缓存的异步客户端及其连接池可以跨调用复用。
+
+    Args:
+        coro: 协程对象
+
+    Returns:
+        协程返回值
+    """
+    return _background_loop.run(coro)
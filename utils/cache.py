@@ -3,12 +3,109 @@
 """
 import time
 import hashlib
+import json
+import threading
+from collections import OrderedDict
 from typing import Optional, Any
 from utils.logger import logger
 
 
+class TTLCache:
+    """
+    LRU + TTL 缓存
+
+    OrderedDict 维护访问顺序，读写均为 O(1)；线程安全
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300):
+        """
+        Args:
+            max_size: 最大条目数，超出时淘汰最久未访问的条目
+            ttl: 条目存活时间（秒），从写入时开始计算
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取缓存（命中时刷新LRU位置）"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        """写入缓存"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 条目数、命中/未命中/淘汰/过期次数与命中率
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+
 class ResponseCache:
-    """响应缓存"""
+    """
+    响应缓存（NLG确定性输出）
+
+    基于 TTLCache：LRU + TTL，读写 O(1)
+    """
+
+    # 可缓存的动作：REQUEST/CONFIRM 模板只依赖参数
+    CACHEABLE_ACTIONS = {"REQUEST", "CONFIRM"}
+    # 套餐目录类查询的模板渲染（INFORM）只依赖目录数据
+    CATALOG_INTENTS = {"query_packages", "query_package_detail"}
 
     def __init__(self, ttl: int = 300, max_size: int = 1000):
         """
@@ -18,7 +115,7 @@ class ResponseCache:
             ttl: 缓存存活时间（秒）
             max_size: 最大缓存数量
         """
-        self.cache = {}
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
         self.ttl = ttl
         self.max_size = max_size
         logger.info(f"响应缓存初始化: TTL={ttl}s, MaxSize={max_size}")
@@ -33,50 +130,24 @@ class ResponseCache:
         Returns:
             Optional[str]: 缓存的响应
         """
-        if cache_key not in self.cache:
-            return None
-
-        cached = self.cache[cache_key]
-
-        # 检查是否过期
-        if time.time() - cached["time"] > self.ttl:
-            del self.cache[cache_key]
-            logger.debug(f"缓存过期: {cache_key[:20]}...")
-            return None
-
-        logger.debug(f"缓存命中: {cache_key[:20]}...")
-        return cached["response"]
+        response = self.cache.get(cache_key)
+        if response is not None:
+            logger.debug(f"缓存命中: {cache_key[:20]}...")
+        return response
 
     def set(self, cache_key: str, response: str):
         """
-        设置缓存
+        设置缓存（超出容量时淘汰最久未访问的条目）
 
         Args:
             cache_key: 缓存键
             response: 响应内容
         """
-        # 检查容量
-        if len(self.cache) >= self.max_size:
-            self._evict_oldest()
-
-        self.cache[cache_key] = {
-            "response": response,
-            "time": time.time()
-        }
-
+        self.cache.set(cache_key, response)
         logger.debug(f"缓存设置: {cache_key[:20]}...")
 
-    def _evict_oldest(self):
-        """移除最老的缓存"""
-        if not self.cache:
-            return
-
-        oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k]["time"])
-        del self.cache[oldest_key]
-        logger.debug(f"缓存淘汰: {oldest_key[:20]}...")
-
-    @staticmethod
-    def generate_key(action_type: str, intent: str, parameters: Any) -> str | None:
+    @classmethod
+    def generate_key(cls, action_type: str, intent: str, parameters: Any) -> str | None:
         """
         生成缓存键
 
@@ -86,14 +157,16 @@ class ResponseCache:
             parameters: 参数
 
         Returns:
-            str: 缓存键
+            str: 缓存键；非确定性响应返回None
         """
         # 只对确定性响应生成缓存键
-        if action_type not in ["REQUEST", "CONFIRM"]:
+        if action_type not in cls.CACHEABLE_ACTIONS and not (
+                action_type == "INFORM" and intent in cls.CATALOG_INTENTS):
             return None
 
-        # 生成哈希键
-        key_str = f"{action_type}_{intent}_{str(parameters)}"
+        # 生成哈希键（参数按键排序，与插入顺序无关）
+        params = json.dumps(parameters, ensure_ascii=False, sort_keys=True, default=str)
+        key_str = f"{action_type}_{intent}_{params}"
         return hashlib.md5(key_str.encode()).hexdigest()
 
     def clear(self):
@@ -106,10 +179,6 @@ class ResponseCache:
         获取缓存统计
 
         Returns:
-            dict: 统计信息
+            dict: 条目数、命中/未命中/淘汰/过期次数与命中率
         """
-        return {
-            "size": len(self.cache),
-            "max_size": self.max_size,
-            "ttl": self.ttl
-        }
\ No newline at end of file
+        return self.cache.stats()
@@ -0,0 +1,54 @@
+"""
+请求时间预算（deadline）
+
+每轮对话创建一个 Deadline，依次传给 NLU → DB → NLG，各阶段按剩余预算决定是否降级：
+NLU 预算不足时跳过LLM（纯规则），DB 预算耗尽时跳过只读查询，NLG 预算不足时改用模板。
+触发的降级记录在 Deadline 上，最终写入响应 metadata。
+"""
+import time
+from typing import List, Optional
+
+from .metrics import metrics
+
+
+class Deadline:
+    """单轮请求的截止时间"""
+
+    def __init__(self, budget: float):
+        """
+        Args:
+            budget: 总预算（秒）
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.degradations: List[str] = []
+
+    def remaining(self) -> float:
+        """剩余预算（秒，不小于0）"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """预算是否已耗尽"""
+        return time.monotonic() >= self.expires_at
+
+    def allows(self, seconds: float) -> bool:
+        """剩余预算是否还够 seconds 秒"""
+        return self.remaining() >= seconds
+
+    def degrade(self, name: str):
+        """
+        记录一次降级（同名降级只记一次）
+
+        Args:
+            name: 降级名称，如 nlu_rule_only / db_skipped / nlg_template
+        """
+        if name in self.degradations:
+            return
+        self.degradations.append(name)
+        metrics.counter("deadline_degradations_total", stage=name).inc()
+
+
+def time_left(deadline: Optional[Deadline]) -> Optional[float]:
+    """剩余预算（秒）；未设置 deadline 时返回 None"""
+    return deadline.remaining() if deadline is not None else None
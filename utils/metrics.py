@@ -0,0 +1,190 @@
+"""
+进程内指标
+"""
+import threading
+import weakref
+from collections import deque
+from typing import Dict, Any, Tuple, Callable
+
+from .logger import logger
+
+
+def _make_key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_key(key: Tuple[str, Tuple]) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class Counter:
+    """单调递增计数器"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """可增可减的瞬时值"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    分布统计
+
+    记录总数/总和/最大值，并保留最近的样本用于估算分位数
+    """
+
+    def __init__(self, window: int = 1024):
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+            self._samples.append(value)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def quantile(self, q: float) -> float:
+        """估算分位数（基于最近窗口内的样本）"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 3),
+            "avg": round(self._sum / self._count, 3) if self._count else 0.0,
+            "p50": round(self.quantile(0.5), 3),
+            "p90": round(self.quantile(0.9), 3),
+            "p99": round(self.quantile(0.99), 3),
+            "max": round(self._max, 3)
+        }
+
+
+class MetricsRegistry:
+    """指标注册表（按名称+标签获取或创建）"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple, Counter] = {}
+        self._gauges: Dict[Tuple, Gauge] = {}
+        self._histograms: Dict[Tuple, Histogram] = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, store: dict, factory, name: str, labels: Dict[str, Any]):
+        key = _make_key(name, labels)
+        metric = store.get(key)
+        if metric is None:
+            with self._lock:
+                metric = store.setdefault(key, factory())
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        """获取计数器"""
+        return self._get(self._counters, Counter, name, labels)
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        """获取仪表盘"""
+        return self._get(self._gauges, Gauge, name, labels)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """获取分布统计"""
+        return self._get(self._histograms, Histogram, name, labels)
+
+    def register_collector(self, callback: Callable[[], None]):
+        """
+        注册采集回调：导出指标前调用，用于刷新需要主动计算的仪表盘
+
+        绑定方法以弱引用保存，对象被回收后自动失效
+
+        Args:
+            callback: 无参回调
+        """
+        if hasattr(callback, "__self__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        with self._lock:
+            self._collectors.append(ref)
+
+    def _run_collectors(self):
+        with self._lock:
+            self._collectors = [ref for ref in self._collectors if ref() is not None]
+            callbacks = [ref() for ref in self._collectors]
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"指标采集失败: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出所有指标
+
+        Returns:
+            dict: {"counters": {...}, "gauges": {...}, "histograms": {...}}
+        """
+        self._run_collectors()
+        return {
+            "counters": {_format_key(k): c.value for k, c in list(self._counters.items())},
+            "gauges": {_format_key(k): g.value for k, g in list(self._gauges.items())},
+            "histograms": {_format_key(k): h.summary() for k, h in list(self._histograms.items())}
+        }
+
+    def reset(self):
+        """清空所有指标（测试用）"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
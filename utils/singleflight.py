@@ -0,0 +1,178 @@
+"""
+请求合并（single-flight）
+
+相同请求并发到达时只有第一个（leader）真正执行，其余（follower）等待并共享leader的结果。
+同步与异步调用方共用同一张在途表：结果保存在 concurrent.futures.Future 中，
+同步follower阻塞等待，异步follower通过 asyncio.wrap_future 在任意事件循环中等待。
+
+leader被取消（客户端断开、竞速落败等）时不把取消传给follower：
+共享结果置为 _RETRY，follower重新发起（其中一个成为新的leader）。
+follower只按自己的时间预算（timeout）等待，超时抛出 TimeoutError，不影响leader和其他follower。
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .metrics import metrics
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    请求指纹（模型、消息、工具、温度等全部参数）
+
+    Args:
+        request: chat.completions.create 的参数
+
+    Returns:
+        str: 指纹
+    """
+    raw = json.dumps(request, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# leader未正常结束（被取消/中断）时的共享结果，follower需重新发起请求
+_RETRY = object()
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class SingleFlight:
+    """在途请求合并"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 名称（用作指标标签）
+        """
+        self.name = name
+        self.enabled = True
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """加入在途请求，返回 (future, 是否为leader)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            # 置为运行态：follower取消等待时不会连带取消共享结果
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        # 先移出在途表，之后到达的相同请求会重新发起
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _coalesced(self, caller: str):
+        metrics.counter("llm_coalesced_calls_total", group=self.name, caller=caller).inc()
+
+    def call(self, request: Dict[str, Any], fn: Callable[[], Any], caller: str = "",
+             timeout: Optional[float] = None) -> Any:
+        """
+        同步调用：相同请求在途时等待其结果
+
+        Args:
+            request: 请求参数（用于计算指纹）
+            fn: 实际执行的调用
+            caller: 调用方标签（指标用）
+            timeout: 作为follower时最多等待多久（秒），None 表示一直等待
+
+        Raises:
+            TimeoutError: 作为follower等待超时
+        """
+        if not self.enabled:
+            return fn()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        key = request_key(request)
+        future, leader = self._join(key)
+        if not leader:
+            if _in_event_loop():
+                # 在事件循环线程内阻塞等待可能卡住正在该循环上执行的leader，直接独立调用
+                return fn()
+            self._coalesced(caller)
+            result = future.result(timeout)
+            if result is _RETRY:
+                return self.call(request, fn, caller, _remaining(deadline))
+            return result
+
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._finish(key, future, _RETRY)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def acall(self, request: Dict[str, Any], fn: Callable[[], Awaitable[Any]], caller: str = "",
+                    timeout: Optional[float] = None) -> Any:
+        """
+        异步调用：相同请求在途时等待其结果（不阻塞事件循环）
+
+        Args:
+            request: 请求参数（用于计算指纹）
+            fn: 返回协程的实际调用
+            caller: 调用方标签（指标用）
+            timeout: 作为follower时最多等待多久（秒），None 表示一直等待
+
+        Raises:
+            TimeoutError: 作为follower等待超时
+        """
+        if not self.enabled:
+            return await fn()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        key = request_key(request)
+        future, leader = self._join(key)
+        if not leader:
+            self._coalesced(caller)
+            # shield：等待超时只结束这个follower，不取消共享结果
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            if result is _RETRY:
+                return await self.acall(request, fn, caller, _remaining(deadline))
+            return result
+
+        try:
+            result = await fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # 取消只属于leader自己，follower重新发起
+            self._finish(key, future, _RETRY)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def inflight(self) -> int:
+        """当前在途请求数"""
+        return len(self._inflight)
+
+
+# 全局LLM请求合并器（所有NLU/NLG实例共享）
+llm_singleflight = SingleFlight("llm")